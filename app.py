@@ -1,7 +1,7 @@
 # enhanced_app.py - Building on your existing app.py with security
 import os
 import sys
-from flask import Flask, session, redirect, url_for, jsonify, request, render_template_string
+from flask import Flask, session, redirect, url_for, jsonify, request, render_template
 from datetime import datetime
 import json
 
@@ -10,19 +10,20 @@ from demo_mode import DemoModeManager, mock_stripe_payment
 import xero_demo_data
 import plaid_demo_data
 
-# Xero imports (optional when in live mode)
-try:
-    from xero_oauth import init_oauth
-    from xero_python.accounting import AccountingApi
-    from xero_python.api_client import ApiClient, Configuration
-    from xero_python.api_client.oauth2 import OAuth2Token
-    from xero_python.exceptions import AccountingBadRequestException
-    from xero_python.identity import IdentityApi
-    from xero_python.api_client import serialize
-    XERO_SDK_AVAILABLE = True
-except Exception:
-    XERO_SDK_AVAILABLE = False
-from xero_client import save_token_and_tenant
+# Xero imports (optional when in live mode; imported on first use so demo mode never loads the SDK)
+from lazy_imports import lazy_attr, is_available
+init_oauth = lazy_attr("xero_oauth", "init_oauth")
+AccountingApi = lazy_attr("xero_python.accounting", "AccountingApi")
+ApiClient = lazy_attr("xero_python.api_client", "ApiClient")
+Configuration = lazy_attr("xero_python.api_client", "Configuration")
+OAuth2Token = lazy_attr("xero_python.api_client.oauth2", "OAuth2Token")
+IdentityApi = lazy_attr("xero_python.identity", "IdentityApi")
+XERO_SDK_AVAILABLE = is_available("xero_python") and is_available("authlib")
+from xero_client import save_token_and_tenant, tenant_entry
+from xero_paging import iter_contacts, iter_invoices
+from xero_governor import govern
+from xero_reports import XeroReports, ReportError
+from stripe_client import get_stripe_client
 
 # Import enhanced session configuration
 from session_config import configure_flask_sessions
@@ -51,6 +52,10 @@ except ImportError:
 
 app = Flask(__name__)
 
+# Compiled, cached page templates (templates/)
+from page_templates import configure_page_templates
+configure_page_templates(app)
+
 # Initialize demo mode management (adds /api/mode and /admin/mode, and banner helpers)
 demo = DemoModeManager(app)
 
@@ -62,6 +67,14 @@ app.config['XERO_CLIENT_SECRET'] = os.getenv('XERO_CLIENT_SECRET', 'YOUR_CLIENT_
 if SECURITY_ENABLED:
     security = SecurityManager()
 
+# Per-worker memory diagnostics (/admin/memory/*) and memory budget for /health
+from memory_diagnostics import configure_memory_diagnostics
+memory_diagnostics = configure_memory_diagnostics(app, require_api_key)
+
+# gzip/brotli by Accept-Encoding
+from compression import configure_compression
+configure_compression(app)
+
 # Xero setup (demo-safe)
 api_client = None
 oauth = None
@@ -81,15 +94,14 @@ if not demo.is_demo:
     if not XERO_SDK_AVAILABLE:
         raise RuntimeError("Xero SDK not available. Install dependencies or enable demo mode.")
 
-    api_client = ApiClient(Configuration(
+    api_client = govern(ApiClient(Configuration(
         oauth2_token=OAuth2Token(
             client_id=app.config['XERO_CLIENT_ID'],
             client_secret=app.config['XERO_CLIENT_SECRET'],
         )
-    ))
+    )))
 
     # Configure enhanced session management with OAuth token handlers
-    global session_config
     session_config = configure_flask_sessions(app, api_client)
     oauth, xero = init_oauth(app)
 
@@ -113,6 +125,9 @@ def health_check():
     if session_config:
         health_data['session_config'] = session_config.health_check()
     
+    # Resident memory versus the container limit for this worker
+    health_data['memory'] = memory_diagnostics.summary()
+    
     return jsonify(health_data)
 
 # NEW: API key management (if security enabled)
@@ -249,14 +264,15 @@ def callback():
             return "Authorization failed", 400
 
         # Your existing logic
-        from xero_python.identity import IdentityApi
         identity = IdentityApi(api_client)
         conns = identity.get_connections()
         if not conns:
             return "No Xero organisations available for this user.", 400
 
-        session['tenant_id'] = conns[0].tenant_id
-        save_token_and_tenant(token, session['tenant_id'])
+        # Every organisation is stored (firm-wide views); the first is the default tenant
+        tenants = [tenant_entry(conn) for conn in conns]
+        session['tenant_id'] = tenants[0]['tenant_id']
+        save_token_and_tenant(token, session['tenant_id'], tenants)
         
         # Enhanced: Log the successful connection
         if SECURITY_ENABLED:
@@ -353,10 +369,10 @@ def get_xero_contacts():
 
     try:
         accounting_api = AccountingApi(api_client)
-        contacts = accounting_api.get_contacts(xero_tenant_id=session.get('tenant_id'))
-        log_transaction('xero_contacts_access', len(contacts.contacts), 'items', 'success')
+        contacts = list(iter_contacts(accounting_api, session.get('tenant_id')))
+        log_transaction('xero_contacts_access', len(contacts), 'items', 'success')
         contacts_data = []
-        for contact in contacts.contacts:
+        for contact in contacts:
             contacts_data.append({
                 'contact_id': contact.contact_id,
                 'name': contact.name,
@@ -388,12 +404,9 @@ def get_xero_invoices():
 
     try:
         accounting_api = AccountingApi(api_client)
-        invoices = accounting_api.get_invoices(xero_tenant_id=session.get('tenant_id'), statuses=status_filter.split(','))
-        log_transaction('xero_invoices_access', len(invoices.invoices), 'items', 'success')
+        invoices = iter_invoices(accounting_api, session.get('tenant_id'), statuses=status_filter.split(','), limit=limit)
         invoices_data = []
-        for i, invoice in enumerate(invoices.invoices):
-            if i >= limit:
-                break
+        for invoice in invoices:
             invoices_data.append({
                 'invoice_id': invoice.invoice_id,
                 'invoice_number': invoice.invoice_number,
@@ -405,22 +418,48 @@ def get_xero_invoices():
                 'due_date': invoice.due_date.isoformat() if invoice.due_date else None,
                 'contact_name': invoice.contact.name if invoice.contact else None
             })
-        return jsonify({'success': True, 'mode': 'live', 'invoices': invoices_data, 'count': len(invoices_data), 'total_available': len(invoices.invoices)})
+        total_available = invoices.total if invoices.total is not None else len(invoices_data)
+        log_transaction('xero_invoices_access', total_available, 'items', 'success')
+        return jsonify({'success': True, 'mode': 'live', 'invoices': invoices_data, 'count': len(invoices_data), 'total_available': total_available})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# Xero reports (Profit & Loss, Balance Sheet, Trial Balance, Aged Receivables/Payables), cached per period
+xero_reports = XeroReports(lambda tenant_id: AccountingApi(api_client))
+
+def _xero_report(report):
+    if not session.get("token"):
+        return jsonify({'error': 'Xero not authenticated', 'auth_url': url_for('login', _external=True)}), 401
+    try:
+        args = request.args.to_dict()
+        refresh = args.pop('refresh', '') in ('1', 'true')
+        result = xero_reports.get(session.get('tenant_id'), report, args, refresh=refresh)
+        log_transaction(f'xero_report_{report}', 1, 'report', 'cached' if result['cached'] else 'success')
+        return jsonify({'success': True, 'mode': 'live', **result})
+    except ReportError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# NEW: Xero report (Profit & Loss)
 @app.route('/api/xero/report/profit-and-loss', methods=['GET'])
 @require_api_key
 def xero_profit_and_loss():
-    """Return a simple Profit & Loss report (demo-safe)."""
+    """Profit & Loss for ?from_date=&to_date= (demo-safe)."""
     try:
         if demo.is_demo:
             log_transaction('xero_report_pl_demo', 1, 'report', 'success')
             return jsonify({'success': True, 'mode': 'demo', 'report': xero_demo_data.PROFIT_AND_LOSS})
-        return jsonify({'error': 'Report not implemented for live mode in this app'}), 501
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    return _xero_report('profit-and-loss')
+
+@app.route('/api/xero/report/<report>', methods=['GET'])
+@require_api_key
+def xero_report(report):
+    """Balance Sheet, Trial Balance or Aged Receivables/Payables (live mode)."""
+    if demo.is_demo:
+        return jsonify({'error': 'Report not available in demo mode', 'report': report}), 501
+    return _xero_report(report)
 
 # NEW: Stripe integration endpoints
 @app.route('/api/stripe/payment', methods=['POST'])
@@ -450,15 +489,12 @@ def create_stripe_payment():
         if not stripe_key:
             return jsonify({'error': 'Stripe not configured', 'message': 'Set STRIPE_API_KEY or enable demo mode'}), 500
 
-        import stripe
-        stripe.api_key = stripe_key
-
-        payment_intent = stripe.PaymentIntent.create(
-            amount=amount_cents,
-            currency=currency,
-            description=description,
-            automatic_payment_methods={'enabled': True}
-        )
+        payment_intent = get_stripe_client(stripe_key).v1.payment_intents.create(params={
+            'amount': amount_cents,
+            'currency': currency,
+            'description': description,
+            'automatic_payment_methods': {'enabled': True}
+        })
 
         log_transaction('stripe_payment_create', amount_dollars, currency, 'created')
         return jsonify({'success': True, 'payment_intent_id': payment_intent.id, 'client_secret': payment_intent.client_secret, 'amount': amount_dollars, 'currency': currency, 'status': payment_intent.status, 'client': request.client_info['client_name']})
@@ -523,120 +559,17 @@ def admin_dashboard():
     audit_log = security._load_json(security.audit_file)
     recent_events = audit_log.get('events', [])[-10:]  # Last 10 events
     
-    dashboard_html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Financial Command Center - Admin Dashboard</title>
-        <style>
-            body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 20px; background: #f5f7fa; }
-            .container { max-width: 1200px; margin: 0 auto; }
-            .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; margin-bottom: 30px; }
-            .stats { display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 20px; margin-bottom: 30px; }
-            .stat-box { background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
-            .stat-value { font-size: 2.5em; font-weight: bold; color: #667eea; }
-            .stat-label { color: #666; margin-top: 10px; }
-            .section { background: white; padding: 25px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); margin-bottom: 20px; }
-            .api-key { border-left: 4px solid #667eea; padding: 15px; margin: 10px 0; background: #f8f9ff; }
-            .event { padding: 10px; margin: 5px 0; background: #f8f9fa; border-radius: 5px; font-size: 0.9em; }
-            .active { color: #27ae60; }
-            .inactive { color: #e74c3c; }
-            .btn { background: #667eea; color: white; padding: 12px 24px; border: none; border-radius: 6px; cursor: pointer; text-decoration: none; display: inline-block; margin: 5px; }
-            .btn:hover { background: #5a6fd8; }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Financial Command Center AI</h1>
-                <p>Admin Dashboard - API Key Management & Monitoring</p>
-            </div>
-            
-            <div class="stats">
-                <div class="stat-box">
-                    <div class="stat-value">{{ total_keys }}</div>
-                    <div class="stat-label">Total API Keys</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value active">{{ active_keys }}</div>
-                    <div class="stat-label">Active Keys</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value">{{ unique_clients }}</div>
-                    <div class="stat-label">Unique Clients</div>
-                </div>
-                <div class="stat-box">
-                    <div class="stat-value">{{ recent_events|length }}</div>
-                    <div class="stat-label">Recent Events</div>
-                </div>
-            </div>
-            
-            <div class="section">
-                <h2>🔑 API Keys Management</h2>
-                {% if api_keys %}
-                    {% for key, info in api_keys.items() %}
-                    <div class="api-key">
-                        <h3>{{ info.client_name }}</h3>
-                        <p><strong>API Key:</strong> <code>{{ key[:25] }}...</code></p>
-                        <p><strong>Status:</strong> 
-                            <span class="{{ 'active' if info.active else 'inactive' }}">
-                                {{ 'Active' if info.active else 'Inactive' }}
-                            </span>
-                        </p>
-                        <p><strong>Created:</strong> {{ info.created_at }}</p>
-                        <p><strong>Last Used:</strong> {{ info.last_used or 'Never' }}</p>
-                        <p><strong>Permissions:</strong> {{ ', '.join(info.permissions) }}</p>
-                    </div>
-                    {% endfor %}
-                {% else %}
-                    <p>No API keys created yet.</p>
-                {% endif %}
-                
-                <div style="margin-top: 20px;">
-                    <a href="/admin/create-demo-key" class="btn">Create Demo API Key</a>
-                </div>
-            </div>
-            
-            <div class="section">
-                <h2>📊 Recent Activity</h2>
-                {% if recent_events %}
-                    {% for event in recent_events %}
-                    <div class="event">
-                        <strong>{{ event.timestamp[:19] }}</strong> - 
-                        {{ event.event_type }} by {{ event.client_name }}
-                        {% if event.details %}
-                        <br><small>{{ event.details }}</small>
-                        {% endif %}
-                    </div>
-                    {% endfor %}
-                {% else %}
-                    <p>No recent activity.</p>
-                {% endif %}
-            </div>
-            
-            <div class="section">
-                <h2>🚀 Quick Actions</h2>
-                <a href="/health" class="btn">💓 Health Check</a>
-                <a href="/login" class="btn">🔗 Connect Xero</a>
-                <a href="/admin/create-demo-key" class="btn">🔑 Create Demo Key</a>
-                <a href="/" class="btn">🏠 Home</a>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-    
     # Calculate stats
     total_keys = len(api_keys)
     active_keys = sum(1 for info in api_keys.values() if info.get('active', False))
     unique_clients = len(set(info['client_name'] for info in api_keys.values())) if api_keys else 0
     
-    return demo.banner_html() + render_template_string(dashboard_html,
-                                api_keys=api_keys,
-                                total_keys=total_keys,
-                                active_keys=active_keys,
-                                unique_clients=unique_clients,
-                                recent_events=recent_events)
+    return demo.banner_html() + render_template('api_admin_dashboard.html',
+                                                api_keys=api_keys,
+                                                total_keys=total_keys,
+                                                active_keys=active_keys,
+                                                unique_clients=unique_clients,
+                                                recent_events=recent_events)
 
 @app.route('/admin/create-demo-key')
 def create_demo_key():
@@ -833,12 +766,11 @@ if __name__ == '__main__':
     print()
     print("🔥 Ready for client demonstrations!")
     
-    # Start the Flask application
-    if ssl_context:
-        app.run(host='localhost', port=port, debug=True, ssl_context=ssl_context)
-    else:
-        # HTTP mode
-        app.run(host='localhost', port=port, debug=True)
+    # Start under the production server (gunicorn/cheroot, see serve.py) instead of app.run(debug=True)
+    from serve import ServeConfig, serve
+    serve_config = ServeConfig.from_env()
+    serve_config.port = port
+    serve(app, serve_config, tls=ssl_context)
 # Ensure stdout can print Unicode on Windows consoles
 try:
     import io as _io
@@ -383,7 +383,7 @@ def create_installer_package_full():
             shutil.copy2(p, package_dir / p.name)
 
     # Required folders
-    for d in ["auth", "templates", "assets", "secure_config"]:
+    for d in ["auth", "templates", "static", "assets", "secure_config"]:
         src = Path(d)
         if src.exists():
             _copy_tree(src, package_dir / d)
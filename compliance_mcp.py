@@ -4,6 +4,9 @@
 
 from __future__ import annotations
 
+import startup_profiler
+startup_profiler.install()  # times imports when FCC_PROFILE_STARTUP is set
+
 import json
 import os
 import hashlib
@@ -14,24 +17,24 @@ from datetime import date, timedelta, datetime
 
 from mcp.server.fastmcp import FastMCP
 
-# -------- Optional Stripe (won't crash if unavailable) --------
-try:
-    import stripe  # type: ignore
-except Exception:
-    stripe = None  # we guard any usage
+from lazy_imports import lazy_import, lazy_attr, is_available
 
-# -------- Plaid SDK (required for Plaid tools) --------
-import plaid
-from plaid.api import plaid_api
+# -------- Optional Stripe (won't crash if unavailable; imported on first use) --------
+stripe = lazy_import("stripe") if is_available("stripe") else None  # we guard any usage
 
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from plaid.model.auth_get_request import AuthGetRequest
-from plaid.model.identity_get_request import IdentityGetRequest
-from plaid.model.webhook_verification_key_get_request import WebhookVerificationKeyGetRequest
+# -------- Plaid SDK (required for Plaid tools; imported on first use) --------
+plaid = lazy_import("plaid")
+plaid_api = lazy_import("plaid.api.plaid_api")
+
+TransactionsGetRequest = lazy_attr("plaid.model.transactions_get_request", "TransactionsGetRequest")
+TransactionsGetRequestOptions = lazy_attr("plaid.model.transactions_get_request_options", "TransactionsGetRequestOptions")
+AuthGetRequest = lazy_attr("plaid.model.auth_get_request", "AuthGetRequest")
+IdentityGetRequest = lazy_attr("plaid.model.identity_get_request", "IdentityGetRequest")
+WebhookVerificationKeyGetRequest = lazy_attr("plaid.model.webhook_verification_key_get_request", "WebhookVerificationKeyGetRequest")
 
 # ------------- App -------------
-app = FastMCP("compliance-suite")
+with startup_profiler.phase("fastmcp_app"):
+    app = FastMCP("compliance-suite")
 
 # ------------- Paths (Pathlib-only, no duplicate assignments) -------------
 ROOT = Path(__file__).resolve().parent
@@ -216,7 +219,8 @@ def _stripe_ready() -> bool:
 def _init_stripe():
     if not _stripe_ready():
         raise RuntimeError("Stripe not configured. Set STRIPE_API_KEY (test or live) to enable Stripe checks.")
-    stripe.api_key = os.environ["STRIPE_API_KEY"]
+    from stripe_client import get_stripe_client
+    return get_stripe_client(os.environ["STRIPE_API_KEY"])
 
 def _canon_text(x: Any) -> str:
     """Safe canonicalization: works for None, str, list, dict, etc."""
@@ -522,8 +526,7 @@ def stripe_payment_intent_status(payment_intent_id: str) -> Dict[str, Any]:
     """
     Optional: Check a Stripe PaymentIntent status (requires STRIPE_API_KEY).
     """
-    _init_stripe()
-    pi = stripe.PaymentIntent.retrieve(payment_intent_id)  # type: ignore[attr-defined]
+    pi = _init_stripe().v1.payment_intents.retrieve(payment_intent_id)
     _append_audit({"event": "stripe_pi_status", "pi": payment_intent_id, "status": pi.get("status")})
     return {
         "id": pi.get("id"),
@@ -562,5 +565,7 @@ def verify_plaid_webhook(plaid_verification_jwt: str, raw_body: bytes) -> bool:
 
 
 # ------------- Entry -------------
+startup_profiler.finish('compliance_mcp')
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Response Compression for Financial Command Center AI
+WSGI middleware that gzip/brotli-encodes responses by Accept-Encoding:
+- buffered responses above a minimum size, for an allow-list of content types
+- streamed (chunked) responses compressed chunk by chunk, flushed so each chunk is sent promptly
+- static payloads (/static/, immutable) compressed once and served from an in-memory cache
+
+Usage:
+    configure_compression(app)          # wraps app.wsgi_app
+
+Environment (all optional):
+    FCC_COMPRESSION=0                   # disable (e.g. when nginx compresses instead)
+    FCC_COMPRESSION_MIN_SIZE=1024, FCC_GZIP_LEVEL=6, FCC_BROTLI_QUALITY=4
+"""
+
+import os
+import zlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from lazy_imports import lazy_import, is_available
+
+logger = logging.getLogger(__name__)
+
+brotli = lazy_import("brotli") if is_available("brotli") else None
+
+COMPRESSIBLE_TYPES = frozenset({
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/x-ndjson',
+    'application/xml', 'application/problem+json', 'image/svg+xml',
+})
+
+# Static payloads are compressed once at the highest settings
+STATIC_PREFIXES = ('/static/',)
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
+def choose_encoding(accept_encoding: str, brotli_available: bool = True) -> Optional[str]:
+    """'br', 'gzip' or None for an Accept-Encoding header (q-values honoured, br preferred on ties)"""
+    offered = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[name] = q
+
+    candidates = ['br', 'gzip'] if brotli_available else ['gzip']
+    wildcard = offered.get('*')
+    best, best_q = None, 0.0
+    for encoding in candidates:
+        q = offered.get(encoding, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _Encoder:
+    """Incremental gzip/brotli encoder"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._br = brotli.Compressor(quality=level)
+        else:
+            self._gz = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush (so streamed chunks reach the client without waiting for more data)"""
+        if self.encoding == 'br':
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    encoder = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return encoder.compress(data) + encoder.flush()
+
+
+class StaticCache:
+    """LRU of compressed static payloads keyed by (path, validator, encoding)"""
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data: bytes) -> None:
+        if len(data) > self.max_bytes // 4:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+def _strip_encoding_suffix(if_none_match: str) -> str:
+    """Map '"abc-gzip"' back to '"abc"' so the app's conditional checks see its own ETags"""
+    for suffix in ('-gzip"', '-br"'):
+        if_none_match = if_none_match.replace(suffix, '"')
+    return if_none_match
+
+
+class CompressionMiddleware:
+    """Content-negotiated gzip/brotli compression for a WSGI app"""
+
+    def __init__(self, app, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 content_types: Iterable[str] = COMPRESSIBLE_TYPES,
+                 static_prefixes: Sequence[str] = STATIC_PREFIXES,
+                 static_cache: Optional[StaticCache] = None):
+        self.app = app
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = frozenset(content_types)
+        self.static_prefixes = tuple(static_prefixes)
+        self.static_cache = static_cache if static_cache is not None else StaticCache()
+
+    def _level(self, encoding: str, static: bool) -> int:
+        if static:
+            return STATIC_BROTLI_QUALITY if encoding == 'br' else STATIC_GZIP_LEVEL
+        return self.brotli_quality if encoding == 'br' else self.gzip_level
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        if environ.get('REQUEST_METHOD', 'GET') != 'HEAD':
+            encoding = choose_encoding(environ.get('HTTP_ACCEPT_ENCODING', ''), brotli is not None)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        revalidating = f'-{encoding}"' in environ.get('HTTP_IF_NONE_MATCH', '')
+        if 'HTTP_IF_NONE_MATCH' in environ:
+            environ['HTTP_IF_NONE_MATCH'] = _strip_encoding_suffix(environ['HTTP_IF_NONE_MATCH'])
+
+        captured: Dict[str, object] = {}
+
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return lambda data: None  # write() is not supported by Flask responses anyway
+
+        app_iter = self.app(environ, capture)
+        if 'status' not in captured:
+            # The app calls start_response on first iteration (allowed by PEP 3333)
+            app_iter = _prime(app_iter)
+        status = captured['status']
+        headers: List[Tuple[str, str]] = list(captured['headers'])
+        if status.startswith('304') and revalidating:
+            # Answer with the validator the client holds for the encoded representation
+            headers = [(k, f'{v[:-1]}-{encoding}"' if k.lower() == 'etag' and v.endswith('"') else v)
+                       for k, v in headers]
+        if not self._eligible(status, headers):
+            start_response(status, headers, captured['exc_info'])
+            return app_iter
+
+        headers = self._add_vary(headers)
+        length = _header(headers, 'Content-Length')
+        if length is not None and int(length) < self.min_size:
+            start_response(status, headers, captured['exc_info'])
+            return app_iter
+
+        path = environ.get('PATH_INFO', '')
+        static = path.startswith(self.static_prefixes) or 'immutable' in (_header(headers, 'Cache-Control') or '')
+
+        if length is None:
+            return self._stream(app_iter, encoding, status, headers, start_response, captured['exc_info'])
+
+        try:
+            body = b''.join(app_iter)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        key = None
+        if static:
+            validator = _header(headers, 'ETag') or f"{len(body)}:{_header(headers, 'Last-Modified')}"
+            key = (path, validator, encoding)
+            compressed = self.static_cache.get(key)
+        else:
+            compressed = None
+        if compressed is None:
+            compressed = compress(body, encoding, self._level(encoding, static))
+            if key is not None:
+                self.static_cache.put(key, compressed)
+
+        headers = self._encoded_headers(headers, encoding, len(compressed))
+        start_response(status, headers, captured['exc_info'])
+        return [compressed]
+
+    def _eligible(self, status: str, headers: List[Tuple[str, str]]) -> bool:
+        code = int(status.split(' ', 1)[0])
+        if code < 200 or code in (204, 206, 304):
+            return False
+        if _header(headers, 'Content-Encoding'):
+            return False
+        if 'no-transform' in (_header(headers, 'Cache-Control') or ''):
+            return False
+        content_type = (_header(headers, 'Content-Type') or '').split(';', 1)[0].strip().lower()
+        return content_type in self.content_types
+
+    @staticmethod
+    def _add_vary(headers: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        vary = _header(headers, 'Vary')
+        if vary is None:
+            return headers + [('Vary', 'Accept-Encoding')]
+        if 'accept-encoding' in vary.lower() or vary.strip() == '*':
+            return headers
+        return [(k, f"{v}, Accept-Encoding" if k.lower() == 'vary' else v) for k, v in headers]
+
+    @staticmethod
+    def _encoded_headers(headers, encoding: str, length: Optional[int]) -> List[Tuple[str, str]]:
+        out = []
+        for name, value in headers:
+            lname = name.lower()
+            if lname == 'content-length':
+                continue
+            if lname == 'etag' and value.endswith('"'):
+                # Strong validators must differ per encoding
+                value = f'{value[:-1]}-{encoding}"'
+            out.append((name, value))
+        out.append(('Content-Encoding', encoding))
+        if length is not None:
+            out.append(('Content-Length', str(length)))
+        return out
+
+    def _stream(self, app_iter, encoding, status, headers, start_response, exc_info):
+        encoder = _Encoder(encoding, self._level(encoding, False))
+        start_response(status, self._encoded_headers(headers, encoding, None), exc_info)
+
+        def generate():
+            try:
+                for data in app_iter:
+                    if data:
+                        yield encoder.chunk(data)
+                yield encoder.finish()
+            finally:
+                if hasattr(app_iter, 'close'):
+                    app_iter.close()
+        return generate()
+
+
+def _prime(app_iter):
+    iterator = iter(app_iter)
+    first = next(iterator, b'')
+
+    def chained():
+        try:
+            yield first
+            yield from iterator
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+    return chained()
+
+
+def _header(headers: List[Tuple[str, str]], name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def configure_compression(app, min_size: Optional[int] = None) -> Optional[CompressionMiddleware]:
+    """Wrap app.wsgi_app with CompressionMiddleware unless FCC_COMPRESSION=0"""
+    if not _env_flag('FCC_COMPRESSION', True):
+        logger.info("Response compression disabled (FCC_COMPRESSION=0)")
+        return None
+    middleware = CompressionMiddleware(
+        app.wsgi_app,
+        min_size=min_size if min_size is not None else _env_int('FCC_COMPRESSION_MIN_SIZE', 1024),
+        gzip_level=_env_int('FCC_GZIP_LEVEL', 6),
+        brotli_quality=_env_int('FCC_BROTLI_QUALITY', 4),
+    )
+    app.wsgi_app = middleware
+    app.extensions['compression'] = middleware
+    return middleware
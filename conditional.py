@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Conditional Responses for Financial Command Center AI
+Strong ETags derived from data versions rather than the rendered body, If-None-Match /
+If-Modified-Since handling that answers 304 before the view runs, and per-route Cache-Control
+
+Usage:
+    data_versions.register('integration_config', file_version('secure_config/config.enc'))
+
+    @route('/api/dashboard')
+    @conditional('demo:dashboard', cache_control=SHORT_LIVED)
+    def get_dashboard():
+        ...
+
+Resources without a registered version fall back to hashing the response body,
+which still saves the bandwidth of unchanged polls.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from flask import request, make_response
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control policies
+REVALIDATE = "no-cache"                                   # store, but ask every time
+PRIVATE_REVALIDATE = "private, no-cache"                  # per-user data, ask every time
+SHORT_LIVED = "private, max-age=15, must-revalidate"      # dashboards polled every few seconds
+
+
+@dataclass(frozen=True)
+class Version:
+    """Opaque version token for a piece of data, with an optional modification time (epoch seconds)"""
+    token: str
+    last_modified: Optional[float] = None
+
+
+VersionProvider = Callable[[], Optional[Version]]
+
+
+class DataVersions:
+    """Named data versions; providers are asked on every conditional request, so keep them cheap"""
+
+    def __init__(self):
+        self._providers: Dict[str, VersionProvider] = {}
+        self._families: Dict[str, Callable[[str], Optional[Version]]] = {}
+        self._counters: Dict[str, Version] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, provider: VersionProvider) -> None:
+        self._providers[name] = provider
+
+    def register_prefix(self, prefix: str, provider: Callable[[str], Optional[Version]]) -> None:
+        """Provider for a family of names (e.g. 'xero:' for 'xero:invoices:<tenant>'), given the full name"""
+        self._families[prefix] = provider
+
+    def bump(self, name: str) -> Version:
+        """Mark in-process data as changed (for data that only this worker owns)"""
+        with self._lock:
+            now = time.time()
+            version = Version(f"{os.getpid():x}.{time.time_ns():x}", now)
+            self._counters[name] = version
+        return version
+
+    def get(self, name: str) -> Optional[Version]:
+        provider = self._providers.get(name)
+        if provider is None:
+            for prefix, family in self._families.items():
+                if name.startswith(prefix):
+                    provider = lambda: family(name)
+                    break
+        if provider is not None:
+            try:
+                return provider()
+            except Exception as e:
+                logger.warning(f"Version provider for {name} failed: {e}")
+                return None
+        return self._counters.get(name)
+
+
+data_versions = DataVersions()
+
+
+def file_version(path: Union[str, os.PathLike]) -> VersionProvider:
+    """Version from a file's mtime and size; the same in every worker"""
+    def provider() -> Version:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return Version("absent")
+        return Version(f"{st.st_mtime_ns:x}-{st.st_size:x}", st.st_mtime)
+    return provider
+
+
+def static_version(data: Any) -> VersionProvider:
+    """Version for data that never changes while the process runs (hashed once)"""
+    digest = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    version = Version(digest)
+    return lambda: version
+
+
+def _resolve_names(resources: Sequence[Union[str, Callable[[], str]]]) -> List[str]:
+    return [r() if callable(r) else r for r in resources]
+
+
+def compute_etag(versions: Iterable[Version], extra: Sequence[Any] = ()) -> str:
+    """Strong ETag for this request's representation of the given data versions"""
+    parts = [
+        os.getenv("FCC_BUILD_ID", ""),
+        request.endpoint or request.path,
+        "&".join(sorted(f"{k}={v}" for k, v in request.args.items(multi=True))),
+        request.headers.get("Accept", ""),
+        *(v.token for v in versions),
+        *(str(e) for e in extra),
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:32]
+
+
+def _not_modified(etag: str, last_modified: Optional[float]) -> bool:
+    # If-None-Match wins over If-Modified-Since when both are sent (RFC 9110 13.2.2)
+    if request.if_none_match:
+        return etag in request.if_none_match
+    if last_modified is not None and request.if_modified_since is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+
+def _apply_policy(response, cache_control: str, vary: Sequence[str]):
+    response.headers["Cache-Control"] = cache_control
+    for header in vary:
+        response.vary.add(header)
+    return response
+
+
+def conditional(*resources: Union[str, Callable[[], str]],
+                cache_control: str = PRIVATE_REVALIDATE,
+                vary: Sequence[str] = ("Accept",),
+                key: Optional[Callable[[], Sequence[Any]]] = None):
+    """
+    Conditional GET for a view.
+    resources: data version names (or callables returning one, e.g. per tenant).
+    key: extra values that change the representation but have no version (e.g. a status flag).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(*args, **kwargs)
+
+            versions = [data_versions.get(name) for name in _resolve_names(resources)]
+            if any(v is None for v in versions):
+                # No version to go on: hash the body instead
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    response.add_etag()
+                    response.make_conditional(request)
+                return _apply_policy(response, cache_control, vary)
+
+            etag = compute_etag(versions, key() if key else ())
+            stamps = [v.last_modified for v in versions]
+            last_modified = max(stamps) if stamps and None not in stamps else None
+
+            if _not_modified(etag, last_modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+            return _apply_policy(response, cache_control, vary)
+        return wrapper
+    return decorator
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Contact Search for Financial Command Center AI
+In-memory trigram index over contact names, emails and phone numbers, for the lookups
+assistants make constantly ("find the contact for Acme"):
+- ranked fuzzy matches (typos, partial names, word order) from one index probe, no Xero calls
+- trigrams that appear in a large share of contacts are only checked against candidates
+  found through rarer ones, so a query costs microseconds even over 100k contacts
+- built from the local Xero mirror on first use, then updated in place from the rows each
+  sync changed (any process's sync: the mirror's change stamp is checked per search)
+
+Usage:
+    search = ContactSearch(mirror)
+    for score, contact in search.search(tenant_id, 'acme corp', limit=5):
+        ...
+    index = ContactIndex(); index.upsert_many(rows); index.search('globl systems')
+"""
+
+import re
+import heapq
+import logging
+import threading
+import unicodedata
+from collections import Counter
+from itertools import islice
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (prefix, row field, weight): a strong name match outranks an email or phone match
+FIELDS = (('n', 'name', 1.0), ('e', 'email', 0.85), ('p', 'phone', 0.85))
+# Slim copy kept per contact (the mirror row has more than search results need)
+STORED_FIELDS = ('contact_id', 'name', 'email', 'phone', 'status', 'is_customer', 'is_supplier')
+_FIELD_POSITION = {prefix: position for position, (prefix, _, _) in enumerate(FIELDS)}
+MIN_SCORE = 0.3
+_WORD = re.compile(r'[a-z0-9]+')
+_EMPTY: Set[int] = frozenset()
+
+
+def normalise(text: Optional[str]) -> str:
+    """Lower case, accents folded, punctuation as spaces"""
+    if not text or text == 'N/A':
+        return ''
+    text = str(text)
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return ' '.join(_WORD.findall(text.lower()))
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-style: each word padded with two leading spaces and one trailing"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _field_text(prefix: str, value) -> str:
+    if prefix == 'p':
+        return ''.join(ch for ch in str(value or '') if ch.isdigit())
+    return normalise(value)
+
+
+class ContactIndex:
+    """Trigram postings per field; rows are added, replaced and removed by contact_id"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._sizes: List[Tuple[int, ...]] = []            # trigram count per field, per doc
+        self._names: List[str] = []                        # normalised name, per doc
+        self._exact: Dict[str, Set[int]] = {}              # normalised name -> docs
+        self._postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _keys(self, row: Dict[str, Any]):
+        sizes, keys = [], []
+        for prefix, field, _ in FIELDS:
+            grams = trigrams(_field_text(prefix, row.get(field)))
+            sizes.append(len(grams))
+            keys.extend(prefix + gram for gram in grams)
+        return tuple(sizes), keys
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self.remove(row['contact_id'])
+            doc = self._free.pop() if self._free else len(self._docs)
+            sizes, keys = self._keys(row)
+            if doc == len(self._docs):
+                self._docs.append(row)
+                self._sizes.append(sizes)
+                self._names.append('')
+            else:
+                self._docs[doc], self._sizes[doc] = row, sizes
+            name = self._names[doc] = normalise(row.get('name'))
+            self._exact.setdefault(name, set()).add(doc)
+            self._ids[row['contact_id']] = doc
+            for key in keys:
+                self._postings.setdefault(key, set()).add(doc)
+
+    def upsert_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        count = 0
+        with self._lock:
+            for row in rows:
+                self.upsert(row)
+                count += 1
+        return count
+
+    def remove(self, contact_id: str) -> bool:
+        with self._lock:
+            doc = self._ids.pop(contact_id, None)
+            if doc is None:
+                return False
+            # Keys are recomputed rather than stored: the row is still here
+            for key in self._keys(self._docs[doc])[1]:
+                posting = self._postings.get(key)
+                if posting is not None:
+                    posting.discard(doc)
+                    if not posting:
+                        del self._postings[key]
+            names = self._exact.get(self._names[doc])
+            if names is not None:
+                names.discard(doc)
+                if not names:
+                    del self._exact[self._names[doc]]
+            self._docs[doc] = None
+            self._free.append(doc)
+            return True
+
+    def _probe(self, keys: List[str], common: int, shortlist: int) -> List[Tuple[int, int]]:
+        """(doc, trigrams matched) for the docs sharing the most query trigrams in one field"""
+        postings = sorted((self._postings.get(key, _EMPTY) for key in keys), key=len)
+        rare = [posting for posting in postings if len(posting) <= common]
+        if rare:
+            counter = Counter()
+            for posting in rare:
+                counter.update(posting)
+            best = dict(counter.most_common(shortlist))
+        elif postings:
+            # Only common trigrams (e.g. "ltd"): any contacts having the two rarest, all tied so far
+            rare = postings[:2]
+            both = rare[0] & rare[1] if len(rare) > 1 else rare[0]
+            best = dict.fromkeys(islice(both, shortlist), len(rare))
+        else:
+            return []
+        # Common trigrams are confirmed for the shortlist only
+        shortlisted = best.keys()
+        for posting in postings[len(rare):]:
+            for doc in shortlisted & posting:
+                best[doc] += 1
+        return list(best.items())
+
+    def search(self, query: str, limit: int = 10, min_score: float = MIN_SCORE,
+               include_archived: bool = False) -> List[Tuple[float, Dict[str, Any]]]:
+        """(score 0..1, row) best first; 1.0 is an exact name match"""
+        text = normalise(query)
+        if not text:
+            return []
+        digits = ''.join(ch for ch in str(query) if ch.isdigit())
+        probes = []
+        for prefix, _, weight in FIELDS:
+            if (prefix == 'p' and len(digits) < 3) or (prefix == 'e' and ' ' in text and '@' not in query):
+                continue   # emails and phone numbers have no spaces
+            grams = trigrams(digits if prefix == 'p' else text)
+            probes.append((prefix, weight, [prefix + gram for gram in grams], len(grams)))
+
+        with self._lock:
+            common = max(200, len(self._ids) // 100)
+            shortlist = max(limit * 5, 50)
+            scores: Dict[int, float] = {doc: 1.0 for doc in self._exact.get(text, ())}
+            for prefix, weight, keys, size in probes:
+                position = _FIELD_POSITION[prefix]
+                for doc, found in self._probe(keys, common, shortlist):
+                    if doc in scores and scores[doc] >= 1.0:
+                        continue
+                    # Mostly "how much of the query is there", a little "how much else is there"
+                    jaccard = found / (size + self._sizes[doc][position] - found)
+                    score = weight * (0.75 * found / size + 0.25 * jaccard)
+                    if position == 0 and self._names[doc].startswith(text):
+                        score = min(0.99, score + 0.05)
+                    if score > scores.get(doc, 0.0):
+                        scores[doc] = score
+
+            ranked = heapq.nlargest(limit * 2 + 10, scores.items(), key=itemgetter(1))
+            results = []
+            for doc, score in ranked:
+                row = self._docs[doc]
+                if score < min_score or (not include_archived and row.get('status') == 'ARCHIVED'):
+                    continue
+                results.append((round(score, 4), row))
+                if len(results) == limit:
+                    break
+            return results
+
+
+class ContactSearch:
+    """Per-tenant ContactIndex fed from a XeroMirror, caught up whenever the mirror changed"""
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _slim(row: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: row.get(key) for key in STORED_FIELDS}
+
+    def index(self, tenant_id: str) -> ContactIndex:
+        state = self.mirror.state(tenant_id, 'contacts')
+        entry = self._indexes.get(tenant_id)
+        if state is not None and (entry is None or entry['changed_at'] != state['changed_at']):
+            with self._lock:
+                entry = self._indexes.get(tenant_id)
+                if entry is None:
+                    entry = {'index': ContactIndex(), 'changed_at': None, 'mark': None}
+                    rows, _ = self.mirror.query(tenant_id, 'contacts')
+                else:
+                    # Only rows touched since the newest one already indexed
+                    rows, _ = self.mirror.query(tenant_id, 'contacts',
+                                                where=[('updated_date_utc', '>=', entry['mark'] or '')])
+                entry['index'].upsert_many(self._slim(row) for row in rows)
+                entry['mark'] = max([entry['mark'] or ''] + [row['updated_date_utc'] or '' for row in rows]) or None
+                entry['changed_at'] = state['changed_at']
+                self._indexes[tenant_id] = entry
+                logger.debug(f"Contact index for {tenant_id}: {len(rows)} rows applied, {len(entry['index'])} total")
+        return entry['index'] if entry else ContactIndex()
+
+    def search(self, tenant_id: str, query: str, limit: int = 10, **options) -> List[Tuple[float, Dict[str, Any]]]:
+        return self.index(tenant_id).search(query, limit=limit, **options)
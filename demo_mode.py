@@ -72,6 +72,9 @@ class DemoModeManager:
     # ------------------------- Flask glue -------------------------
     def init_app(self, app):
         from flask import g
+        from page_templates import configure_page_templates
+
+        configure_page_templates(app)
 
         @app.before_request
         def _set_demo_flag():
@@ -97,7 +100,7 @@ class DemoModeManager:
         self.add_routes(app)
 
     def add_routes(self, app):
-        from flask import request, jsonify, render_template_string, redirect, url_for
+        from flask import request, jsonify, render_template, redirect, url_for
 
         @app.route("/api/mode", methods=["GET", "POST"])
         def api_mode():
@@ -117,42 +120,7 @@ class DemoModeManager:
                 self.set_mode("live" if new_mode == "live" else "demo")
                 return redirect(url_for("admin_mode"))
 
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Mode Settings - Financial Command Center</title>
-                <style>
-                    body {{ font-family: 'Segoe UI', sans-serif; background:#f5f7fa; margin:0; padding:30px; }}
-                    .card {{ background:white; max-width: 720px; margin: 0 auto; padding: 30px; border-radius: 10px; box-shadow: 0 8px 24px rgba(0,0,0,0.08); }}
-                    .badge {{ display:inline-block; padding:6px 12px; border-radius: 9999px; font-weight:600; margin-left: 10px; }}
-                    .badge-demo {{ background:#fff3cd; color:#856404; }}
-                    .badge-live {{ background:#d4edda; color:#155724; }}
-                    .btn {{ background:#667eea; color:white; padding:10px 18px; border:none; border-radius:6px; cursor:pointer; margin-right:10px; }}
-                    .btn.secondary {{ background:#6c757d; }}
-                    .muted {{ color:#6c757d; }}
-                </style>
-            </head>
-            <body>
-                <div class="card">
-                    <h1>Application Mode
-                        {'<span class="badge badge-demo">Demo</span>' if self.is_demo else '<span class="badge badge-live">Live</span>'}
-                    </h1>
-                    <p class="muted">Switch between sample data (no API keys required) and real integrations.</p>
-
-                    <form method="POST" style="margin-top: 20px;">
-                        <button class="btn" name="mode" value="demo" type="submit">Use Demo Data</button>
-                        <button class="btn secondary" name="mode" value="live" type="submit">Use Real Data</button>
-                    </form>
-
-                    <div style="margin-top: 24px;">
-                        <a href="/admin/dashboard">Back to Dashboard</a>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            return render_template_string(html)
+            return render_template("admin_mode.html", is_demo=self.is_demo)
 
     # ------------------------- UI helpers -------------------------
     def banner_html(self) -> str:
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Concurrent Fan-out for Financial Command Center AI
+Runs independent source calls (Xero, Stripe, Plaid, ...) in parallel so an aggregate
+view costs the slowest source rather than the sum of them:
+- each source has its own deadline; a source that misses it is reported as a timeout
+  and the rest are returned anyway (the stray call finishes in the background)
+- every source is annotated with its status and latency, and its error if any
+- one shared, bounded worker pool per process (rebuilt in forked children)
+
+Usage:
+    results = gather({'xero': load_xero, 'stripe': load_stripe}, timeout=8, timeouts={'stripe': 3})
+    for name, result in results.items():
+        result.status, result.latency_ms, result.value, result.error
+
+    def load_stripe():
+        if not os.getenv('STRIPE_API_KEY'):
+            raise SourceSkipped('STRIPE_API_KEY not set')
+
+Environment:
+    FCC_FANOUT_WORKERS     threads shared by all fan-outs in the process (default 16)
+    FCC_FANOUT_TIMEOUT     default per-source deadline in seconds (default 10)
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("FCC_FANOUT_TIMEOUT", "10"))
+
+
+class SourceSkipped(Exception):
+    """Raised by a source that is not configured: reported as skipped rather than failed"""
+
+
+@dataclass
+class SourceResult:
+    name: str
+    status: str                 # ok | error | timeout | skipped
+    latency_ms: float
+    value: Any = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    def annotation(self) -> Dict[str, Any]:
+        """Status and latency for API responses (the value is reported separately)"""
+        note = {"status": self.status, "latency_ms": self.latency_ms}
+        if self.error:
+            note["error"] = self.error
+        return note
+
+
+# How often gather() looks for queued sources that have started (and so have a deadline)
+QUEUE_POLL = 0.05
+
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _workers() -> int:
+    return max(1, int(os.getenv("FCC_FANOUT_WORKERS", "16")))
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="fanout")
+    return _executor
+
+
+def _reset_after_fork() -> None:
+    # The parent's worker threads do not exist in the child
+    global _executor, _lock
+    _executor = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+def _run(name: str, fn: Callable[[], Any], starts: Dict[str, float]) -> SourceResult:
+    # The clock starts here, not at submit: time spent queued behind other sources is not the source's
+    started = starts[name] = time.perf_counter()
+    try:
+        value = fn()
+    except SourceSkipped as e:
+        return SourceResult(name, "skipped", _elapsed_ms(started), error=str(e) or None)
+    except Exception as e:
+        logger.warning(f"Fan-out source {name} failed: {e}")
+        return SourceResult(name, "error", _elapsed_ms(started), error=str(e) or type(e).__name__)
+    return SourceResult(name, "ok", _elapsed_ms(started), value=value)
+
+
+def gather(sources: Dict[str, Callable[[], Any]], timeout: Optional[float] = None,
+           timeouts: Optional[Dict[str, float]] = None) -> Dict[str, SourceResult]:
+    """
+    Call every source concurrently and return {name: SourceResult} in the order given,
+    once all have answered or missed their deadline (`timeouts[name]`, else `timeout`).
+    Deadlines and latencies count from when a source starts running, so sources queued
+    behind a full pool (more sources than FCC_FANOUT_WORKERS) are not charged for the wait.
+    Never raises for a source's failure.
+    """
+    timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+    timeouts = timeouts or {}
+    limits = {name: timeouts.get(name, timeout) for name in sources}
+    starts: Dict[str, float] = {}
+    submitted = time.perf_counter()
+    pool = _pool()
+    futures = {pool.submit(_run, name, fn, starts): name for name, fn in sources.items()}
+    # Backstop for a pool held up by stray calls: a source still queued this long is given up
+    queue_limit = max(limits.values(), default=0.0)
+
+    def deadline(name: str) -> float:
+        if name in starts:
+            return starts[name] + limits[name]
+        return submitted + queue_limit + limits[name]
+
+    results: Dict[str, SourceResult] = {}
+    pending = set(futures)
+    while pending:
+        names = [futures[future] for future in pending]
+        wake = min(deadline(name) for name in names)
+        if any(name not in starts for name in names):
+            wake = min(wake, time.perf_counter() + QUEUE_POLL)   # queued sources get a deadline once they start
+        done, pending = wait(pending, timeout=max(0.0, wake - time.perf_counter()), return_when=FIRST_COMPLETED)
+        for future in done:
+            results[futures[future]] = future.result()
+        now = time.perf_counter()
+        for future in [f for f in pending if deadline(futures[f]) <= now]:
+            pending.discard(future)
+            future.cancel()     # drops it if still queued; no-op once running (the call completes unobserved)
+            name, limit = futures[future], limits[futures[future]]
+            logger.warning(f"Fan-out source {name} timed out after {limit:g}s")
+            results[name] = SourceResult(name, "timeout", _elapsed_ms(starts.get(name, submitted)),
+                                         error=f"no answer within {limit:g}s")
+    return {name: results[name] for name in sources}
@@ -224,6 +224,8 @@ class DependencyManager:
                     "cffi>=1.17.1",
                     "pycparser==2.21",
                     "python-dotenv==1.0.0",
+                    # Threaded WSGI server used by serve.py on Windows
+                    "cheroot>=10.0.0",
                 ]), encoding="utf-8")
             except Exception as e:
                 self.logger.warning(f"Failed to write lite requirements: {e}")
@@ -427,6 +429,10 @@ class ServerManager:
                 "APP_MODE": env.get("APP_MODE", "demo"),
                 # Communicate chosen port to the app
                 "FCC_PORT": str(port),
+                # Desktop: local-only bind; serve.py picks cheroot/gunicorn with these pools
+                "FCC_HOST": env.get("FCC_HOST", "127.0.0.1"),
+                "FCC_WORKERS": env.get("FCC_WORKERS", "1"),
+                "FCC_THREADS": env.get("FCC_THREADS", "16"),
             })
             
             self.server_process = subprocess.Popen(
@@ -0,0 +1,12 @@
+# gunicorn.conf.py - gunicorn settings shared with serve.py
+#   gunicorn -c gunicorn.conf.py app_with_setup_wizard:app
+# Every value comes from the FCC_* environment (see serve.py); `kill -HUP` re-reads it.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from serve import ServeConfig, gunicorn_options, resolve_tls  # noqa: E402
+
+_config = ServeConfig.from_env()
+globals().update(gunicorn_options(_config, resolve_tls(_config)))
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Invoice PDFs for Financial Command Center AI
+Bulk invoice PDF downloads for month-end packs:
+- invoices are resolved in one batched get_invoices call (by number, by ID, or by filter)
+- PDFs download on a small thread pool, kept under Xero's limit of 5 concurrent calls per tenant
+- results are streamed into a zip as they arrive (PDFs are stored, not re-compressed)
+- every PDF is cached on disk under its InvoiceID and UpdatedDateUTC, so an unchanged
+  invoice is never downloaded twice; editing the invoice in Xero changes the key
+
+Usage:
+    bulk = BulkPdfDownload(api, tenant_id, PdfCache(PDF_CACHE_DIR))
+    invoices = bulk.resolve(numbers=['INV-0001', 'INV-0002'])
+    for chunk in bulk.zip_stream(invoices):
+        response.write(chunk)
+
+Environment (optional):
+    FCC_XERO_PDF_CONCURRENCY=4           # parallel PDF downloads (Xero allows 5 per tenant)
+    FCC_XERO_PDF_CACHE=exports/.pdf_cache
+    FCC_XERO_PDF_CACHE_MB=512            # cache size before the least recently used PDFs go
+"""
+
+import os
+import io
+import re
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from flask import has_request_context, copy_current_request_context
+except ImportError:  # standalone MCP use without Flask
+    has_request_context = lambda: False
+    copy_current_request_context = None
+
+from xero_mirror import IDS_PER_CALL
+from xero_paging import iter_invoices
+
+logger = logging.getLogger(__name__)
+
+PDF_CONCURRENCY = int(os.getenv('FCC_XERO_PDF_CONCURRENCY', '4'))
+PDF_CACHE_DIR = Path(os.getenv('FCC_XERO_PDF_CACHE') or Path(__file__).resolve().parent / 'exports' / '.pdf_cache')
+PDF_CACHE_BYTES = int(os.getenv('FCC_XERO_PDF_CACHE_MB', '512')) * 1024 * 1024
+MAX_BULK_INVOICES = 1000
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def pdf_bytes(resp: Any) -> Tuple[bytes, str]:
+    """
+    PDF content from whatever the SDK build returned: a temp-file path, a stream, an
+    HTTPResponse, bytes, or a %PDF / base64 string. Returns (content, how it was read).
+    """
+    # Some builds return a path string to a temp file
+    if isinstance(resp, str) and os.path.exists(resp):
+        with open(resp, 'rb') as f:
+            return f.read(), 'tempfile'
+    if hasattr(resp, 'read'):
+        return resp.read(), 'read()'
+    if hasattr(resp, 'data'):
+        return resp.data, '.data'
+    if isinstance(resp, (bytes, bytearray, memoryview)):
+        return bytes(resp), 'bytes'
+    if isinstance(resp, str):
+        s = resp.lstrip()
+        if s.startswith('%PDF'):
+            return resp.encode('latin-1', errors='ignore'), 'str-%PDF'
+        if re.fullmatch(r'[A-Za-z0-9+/=\r\n]+', s) and len(s.strip()) % 4 == 0:
+            try:
+                return base64.b64decode(s, validate=True), 'base64'
+            except ValueError:
+                pass
+        preview = s[:60].replace('\n', '\\n')
+        raise ValueError(f"Unexpected PDF response string (not a file, %PDF, or base64). Preview: '{preview}'")
+    try:
+        return bytes(resp), 'bytes(resp)'
+    except Exception:
+        raise ValueError(f"Unhandled PDF response type: {type(resp)}")
+
+
+def fetch_pdf(api, tenant_id: str, invoice_id: str) -> Tuple[bytes, str]:
+    """Download one invoice PDF with whichever method this SDK build has"""
+    if hasattr(api, 'get_invoice_as_pdf'):
+        resp = api.get_invoice_as_pdf(xero_tenant_id=tenant_id, invoice_id=invoice_id)
+    elif hasattr(api, 'get_invoice_pdf'):
+        resp = api.get_invoice_pdf(xero_tenant_id=tenant_id, invoice_id=invoice_id)
+    else:
+        raise ValueError("SDK missing PDF method (get_invoice_as_pdf / get_invoice_pdf).")
+    return pdf_bytes(resp)
+
+
+@dataclass(frozen=True)
+class InvoiceRef:
+    """Enough of an invoice to name, cache and fetch its PDF"""
+    invoice_id: str
+    number: Optional[str]
+    updated: Optional[str]        # UpdatedDateUTC, ISO
+
+    @property
+    def filename(self) -> str:
+        return _SAFE_NAME.sub('_', self.number or self.invoice_id) + '.pdf'
+
+
+class PdfCache:
+    """Content cache of invoice PDFs keyed by (tenant, invoice ID, UpdatedDateUTC)"""
+
+    def __init__(self, root=PDF_CACHE_DIR, max_bytes: int = PDF_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, tenant_id: str, ref: InvoiceRef) -> Optional[Path]:
+        if not ref.updated:
+            return None   # no version to key on: always download
+        stamp = hashlib.sha1(ref.updated.encode()).hexdigest()[:16]
+        return self.root / _SAFE_NAME.sub('_', tenant_id) / _SAFE_NAME.sub('_', ref.invoice_id) / f"{stamp}.pdf"
+
+    def get(self, tenant_id: str, ref: InvoiceRef) -> Optional[bytes]:
+        path = self._path(tenant_id, ref)
+        if path is None:
+            return None
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)   # least recently used goes first when pruning
+        except FileNotFoundError:
+            pass             # pruned meanwhile by another download; the bytes are already read
+        return content
+
+    def put(self, tenant_id: str, ref: InvoiceRef, content: bytes) -> None:
+        path = self._path(tenant_id, ref)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Older versions of this invoice can never be asked for again
+        for old in path.parent.glob('*.pdf'):
+            if old != path:
+                old.unlink(missing_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def prune(self) -> int:
+        """Drop least recently used PDFs until the cache fits max_bytes; returns files removed"""
+        with self._lock:
+            files = []
+            for p in self.root.glob('*/*/*.pdf'):
+                try:
+                    stat = p.stat()
+                except FileNotFoundError:
+                    continue     # replaced by a newer version while listing
+                files.append((stat.st_mtime, stat.st_size, p))
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+            return removed
+
+
+class BulkPdfDownload:
+    """Resolve, fetch (cache first) and zip many invoice PDFs for one tenant"""
+
+    def __init__(self, api, tenant_id: str, cache: Optional[PdfCache] = None,
+                 concurrency: int = PDF_CONCURRENCY):
+        self.api = api
+        self.tenant_id = tenant_id
+        self.cache = cache
+        self.concurrency = max(1, min(concurrency, 5))
+        self.stats = {'requested': 0, 'cached': 0, 'downloaded': 0, 'failed': 0}
+
+    def resolve(self, numbers: Iterable[str] = (), ids: Iterable[str] = (),
+                limit: int = MAX_BULK_INVOICES, **filters) -> List[InvoiceRef]:
+        """
+        Batched queries: by InvoiceNumbers and/or IDs (IDS_PER_CALL per call, since they travel
+        in the query string; numbers and IDs are looked up separately and merged, as Xero ANDs
+        the two), or by get_invoices filters (statuses=, where=, ...), paged only past 1000
+        invoices. summary_only skips line items.
+        """
+        numbers, ids = [n for n in numbers if n], [i for i in ids if i]
+        if numbers or ids:
+            batches = [dict(filters, **{param: values[start:start + IDS_PER_CALL]})
+                       for param, values in (('invoice_numbers', numbers), ('i_ds', ids))
+                       for start in range(0, len(values), IDS_PER_CALL)]
+        else:
+            batches = [dict(filters)]
+        refs, seen = [], set()
+        for kwargs in batches:
+            for invoice in iter_invoices(self.api, self.tenant_id, summary_only=True,
+                                         limit=limit - len(refs), **kwargs):
+                invoice_id = str(invoice.invoice_id)
+                if invoice_id in seen:
+                    continue      # named both by number and by ID
+                seen.add(invoice_id)
+                updated = getattr(invoice, 'updated_date_utc', None)
+                refs.append(InvoiceRef(invoice_id, getattr(invoice, 'invoice_number', None),
+                                       updated.isoformat() if hasattr(updated, 'isoformat') else updated))
+            if len(refs) >= limit:
+                break
+        return refs
+
+    def _load(self, ref: InvoiceRef) -> Tuple[InvoiceRef, Optional[bytes], str]:
+        if self.cache:
+            try:
+                content = self.cache.get(self.tenant_id, ref)
+            except OSError as e:
+                logger.warning(f"PDF cache read failed for {ref.number or ref.invoice_id}, downloading: {e}")
+                content = None
+            if content is not None:
+                return ref, content, 'cached'
+        try:
+            content, _ = fetch_pdf(self.api, self.tenant_id, ref.invoice_id)
+        except Exception as e:
+            logger.warning(f"PDF download failed for {ref.number or ref.invoice_id}: {e}")
+            return ref, None, str(e)
+        if self.cache:
+            try:
+                self.cache.put(self.tenant_id, ref, content)
+            except OSError as e:
+                logger.warning(f"PDF cache write failed for {ref.number or ref.invoice_id}: {e}")
+        return ref, content, 'downloaded'
+
+    def iter_pdfs(self, refs: List[InvoiceRef]) -> Iterator[Tuple[InvoiceRef, Optional[bytes], str]]:
+        """(ref, content or None, 'cached' | 'downloaded' | error) in request order, with at
+        most `concurrency` downloads in flight and a bounded window of finished ones waiting"""
+        # The web app's token getter reads the session; each task needs its own context copy
+        wrap = copy_current_request_context if has_request_context() else (lambda fn: fn)
+        window = self.concurrency * 2
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='xero-pdf') as pool:
+            for ref in refs:
+                pending.append(pool.submit(wrap(self._load), ref))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def zip_stream(self, refs: List[InvoiceRef]) -> Iterator[bytes]:
+        """The zip, chunk by chunk; ends with manifest.json listing every invoice and its outcome"""
+        sink = _ZipSink()
+        manifest = []
+        used = set()
+        self.stats['requested'] = len(refs)
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for ref, content, outcome in self.iter_pdfs(refs):
+                entry = {'invoice_id': ref.invoice_id, 'number': ref.number, 'updated': ref.updated}
+                if content is None:
+                    self.stats['failed'] += 1
+                    entry['error'] = outcome
+                else:
+                    self.stats[outcome] += 1
+                    name = ref.filename
+                    if name in used:
+                        name = f"{name[:-4]}_{ref.invoice_id[:8]}.pdf"
+                    used.add(name)
+                    archive.writestr(name, content)
+                    entry.update(file=name, source=outcome, size=len(content))
+                manifest.append(entry)
+                yield sink.take()
+            archive.writestr('manifest.json', json.dumps({'invoices': manifest, 'stats': self.stats}, indent=2))
+        yield sink.take()
+        if self.cache:
+            self.cache.prune()
+
+
+class _ZipSink(io.RawIOBase):
+    """Write-only, unseekable buffer: ZipFile writes into it and the stream drains it"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
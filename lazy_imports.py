@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Lazy SDK imports for Financial Command Center AI
+Defers importing xero_python, stripe, plaid and friends until first real use,
+so demo-mode and single-integration deployments don't pay for every SDK at startup
+
+Usage:
+    stripe = lazy_import("stripe", on_load=_configure_stripe)
+    Products = lazy_attr("plaid.model.products", "Products")
+
+    if is_available("xero_python"):
+        ...
+"""
+
+import sys
+import types
+import logging
+import importlib
+import importlib.util
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+_import_lock = threading.RLock()
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """True if `name` can be imported, without importing it (parent packages excepted)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def is_loaded(name: str) -> bool:
+    """True once the real module has been imported in this process"""
+    return name in sys.modules and not isinstance(sys.modules[name], LazyModule)
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access.
+    `on_load(module)` runs exactly once, after the import, under the same lock
+    (e.g. to apply SDK-wide settings such as stripe.api_version).
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_on_load"] = on_load
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with _import_lock:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                module = importlib.import_module(self.__name__)
+                on_load = self.__dict__["_lazy_on_load"]
+                if on_load is not None:
+                    on_load(module)
+                self.__dict__["_lazy_module"] = module
+                logger.debug(f"Lazily imported {self.__name__}")
+        return module
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self._load(), item)
+
+    def __setattr__(self, item: str, value: Any) -> None:
+        setattr(self._load(), item, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+class LazyAttribute:
+    """Stand-in for `from module import Name`; resolves on first call or attribute access"""
+
+    __slots__ = ("_module", "_name", "_target")
+
+    def __init__(self, module: str, name: str):
+        self._module = module
+        self._name = name
+        self._target = None
+
+    def resolve(self) -> Any:
+        if self._target is None:
+            with _import_lock:
+                if self._target is None:
+                    self._target = getattr(importlib.import_module(self._module), self._name)
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, item: str) -> Any:
+        return getattr(self.resolve(), item)
+
+    def __repr__(self) -> str:
+        return f"<lazy {self._module}.{self._name}>"
+
+
+def lazy_import(name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None) -> LazyModule:
+    """Module that is imported on first attribute access"""
+    return LazyModule(name, on_load=on_load)
+
+
+def lazy_attr(module: str, name: str) -> LazyAttribute:
+    """Class/function from `module` that is imported on first use"""
+    return LazyAttribute(module, name)
+
+
+def resolve(obj: Any) -> Any:
+    """Real object behind a lazy proxy (for isinstance checks, except clauses, etc.)"""
+    if isinstance(obj, LazyModule):
+        return obj._load()
+    if isinstance(obj, LazyAttribute):
+        return obj.resolve()
+    return obj
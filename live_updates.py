@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Live Updates for Financial Command Center AI
+Server-Sent Events feed that replaces full-page auto-refresh:
+- an in-process event bus with per-connection buffers and Last-Event-ID replay
+- shared pollers ("sources"), one per topic per worker, that run only while someone listens
+  and publish only what changed, so upstream load follows changes rather than open tabs
+
+Usage:
+    live = configure_live_updates(app)
+    live.register_source('health', lambda topic: Source(poll_health, interval=10))
+    return live.response(['health'], last_event_id=request.headers.get('Last-Event-ID'))
+
+Environment (all optional):
+    FCC_LIVE_MAX_STREAMS   concurrent SSE connections per worker (default: half of FCC_THREADS)
+    FCC_LIVE_MAX_SECONDS   connection lifetime before the browser reconnects (default 300)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from flask import Response
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+RETRY_MS = 5000
+HISTORY_SIZE = 256
+SUBSCRIBER_BUFFER = 100
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    topic: str
+    data: Any
+
+    @property
+    def name(self) -> str:
+        """SSE event name: the topic without its tenant suffix ('xero.invoices:abc' -> 'xero.invoices')"""
+        return self.topic.split(':', 1)[0]
+
+    def encode(self) -> str:
+        payload = json.dumps(self.data, default=str, separators=(',', ':'))
+        return f"id: {self.id}\nevent: {self.name}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """Buffered events for one connection; overflows ask the client to resync"""
+
+    def __init__(self, topics: Iterable[str], maxlen: int = SUBSCRIBER_BUFFER):
+        self.topics = frozenset(topics)
+        self._events: Deque[Event] = deque()
+        self._maxlen = maxlen
+        self._cond = threading.Condition()
+        self.overflowed = False
+
+    def push(self, event: Event) -> None:
+        with self._cond:
+            if len(self._events) >= self._maxlen:
+                self.overflowed = True
+                self._events.clear()
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: float) -> Optional[Event]:
+        with self._cond:
+            if not self._events:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class EventBus:
+    """Topic pub/sub for one worker process"""
+
+    def __init__(self, history: int = HISTORY_SIZE):
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscription] = []
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._counter = 0
+        # Ids are only meaningful to the worker that issued them
+        self._prefix = f"{os.getpid():x}"
+
+    def publish(self, topic: str, data: Any) -> Event:
+        with self._lock:
+            self._counter += 1
+            event = Event(f"{self._prefix}.{self._counter}", topic, data)
+            self._history.append(event)
+            subscribers = [s for s in self._subscribers if topic in s.topics]
+        for subscription in subscribers:
+            subscription.push(event)
+        return event
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[str] = None) -> Subscription:
+        subscription = Subscription(topics)
+        with self._lock:
+            for event in self._replay(subscription.topics, last_event_id):
+                subscription.push(event)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def listeners(self, topic: str) -> int:
+        with self._lock:
+            return sum(1 for s in self._subscribers if topic in s.topics)
+
+    def _replay(self, topics, last_event_id: Optional[str]) -> List[Event]:
+        if not last_event_id:
+            return []
+        prefix, _, counter = last_event_id.partition('.')
+        if prefix != self._prefix or not counter.isdigit():
+            return []
+        after = int(counter)
+        return [e for e in self._history if e.topic in topics and int(e.id.rsplit('.', 1)[1]) > after]
+
+
+@dataclass
+class Source:
+    """poll() returns the events that happened since its previous call (usually none)"""
+    poll: Callable[[], List[Any]]
+    interval: float = 30.0
+
+
+class LiveUpdates:
+    """Event bus plus on-demand pollers and the SSE response for one app"""
+
+    def __init__(self, max_streams: Optional[int] = None, max_seconds: Optional[int] = None):
+        self.bus = EventBus()
+        self.max_streams = max_streams or _env_int('FCC_LIVE_MAX_STREAMS', max(1, _env_int('FCC_THREADS', 8) // 2))
+        self.max_seconds = max_seconds or _env_int('FCC_LIVE_MAX_SECONDS', 300)
+        self._factories: Dict[str, Callable[[str], Source]] = {}
+        self._pollers: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+        self._streams = 0
+
+    def register_source(self, prefix: str, factory: Callable[[str], Source]) -> None:
+        """factory(topic) builds the Source for a topic named `prefix` or `prefix:<key>`"""
+        self._factories[prefix] = factory
+
+    def publish(self, topic: str, data: Any) -> Event:
+        return self.bus.publish(topic, data)
+
+    # Pollers
+
+    def _ensure_poller(self, topic: str) -> None:
+        factory = self._factories.get(topic.split(':', 1)[0])
+        if factory is None:
+            return
+        with self._lock:
+            if topic in self._pollers:
+                return
+            source = factory(topic)
+            thread = threading.Thread(target=self._run_poller, args=(topic, source),
+                                      name=f"live-{topic}", daemon=True)
+            self._pollers[topic] = thread
+        thread.start()
+
+    def _run_poller(self, topic: str, source: Source) -> None:
+        logger.debug(f"Live source {topic} started")
+        while True:
+            time.sleep(source.interval)
+            with self._lock:
+                if self.bus.listeners(topic) == 0:
+                    # Stop under the lock so a new subscriber restarts us cleanly
+                    self._pollers.pop(topic, None)
+                    logger.debug(f"Live source {topic} stopped (no listeners)")
+                    return
+            try:
+                for data in source.poll():
+                    self.bus.publish(topic, data)
+            except Exception as e:
+                logger.warning(f"Live source {topic} poll failed: {e}")
+
+    # SSE
+
+    def stream(self, topics: List[str], last_event_id: Optional[str] = None) -> Iterator[str]:
+        subscription = self.bus.subscribe(topics, last_event_id)
+        for topic in topics:
+            self._ensure_poller(topic)
+        deadline = time.monotonic() + self.max_seconds
+        try:
+            yield f"retry: {RETRY_MS}\n: connected\n\n"
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                event = subscription.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+                if subscription.overflowed:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                yield event.encode() if event is not None else ": ping\n\n"
+        finally:
+            self.bus.unsubscribe(subscription)
+
+    def _release_stream(self) -> None:
+        with self._lock:
+            self._streams -= 1
+
+    def response(self, topics: List[str], last_event_id: Optional[str] = None) -> Response:
+        with self._lock:
+            if self._streams >= self.max_streams:
+                busy = Response("Too many live connections", status=503, mimetype='text/plain')
+                busy.headers['Retry-After'] = '30'
+                return busy
+            self._streams += 1
+        response = Response(self.stream(topics, last_event_id), mimetype='text/event-stream')
+        # Runs on close even if the body was never iterated (client gone before the first byte)
+        response.call_on_close(self._release_stream)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # nginx: don't buffer the stream
+        return response
+
+
+def diff_rows(previous: Dict[str, Any], rows: Iterable[Dict[str, Any]], key: str) -> List[Dict[str, Any]]:
+    """Rows that are new or changed since `previous` (updated in place)"""
+    changed = []
+    for row in rows:
+        row_id = row.get(key)
+        if previous.get(row_id) != row:
+            previous[row_id] = row
+            changed.append(row)
+    return changed
+
+
+def configure_live_updates(app) -> LiveUpdates:
+    """Attach a LiveUpdates hub to the app (idempotent)"""
+    if 'live_updates' not in app.extensions:
+        app.extensions['live_updates'] = LiveUpdates()
+    return app.extensions['live_updates']
@@ -21,6 +21,8 @@ class FinancialCommandCenterMCP:
         self.server_url = os.getenv('FCC_SERVER_URL', 'https://localhost:8000')
         self.api_key = os.getenv('FCC_API_KEY', 'claude-desktop-integration')
         self.client = None
+        # url -> (ETag, parsed body) for conditional GETs
+        self._etag_cache: Dict[str, tuple] = {}
         
     async def setup_client(self):
         """Setup HTTP client with SSL verification disabled for localhost"""
@@ -44,14 +46,21 @@ class FinancialCommandCenterMCP:
             logger.info(f"Calling {method} {url}")
             
             if method == 'GET':
-                response = await self.client.get(url)
+                cached = self._etag_cache.get(url)
+                headers = {'If-None-Match': cached[0]} if cached else None
+                response = await self.client.get(url, headers=headers)
+                if response.status_code == 304 and cached:
+                    return cached[1]
             elif method == 'POST':
                 response = await self.client.post(url, json=data)
             else:
                 raise ValueError(f"Unsupported method: {method}")
             
             response.raise_for_status()
-            return response.json()
+            result = response.json()
+            if method == 'GET' and response.headers.get('ETag'):
+                self._etag_cache[url] = (response.headers['ETag'], result)
+            return result
             
         except httpx.ConnectError as e:
             logger.error(f"Connection failed to {self.server_url}: {e}")
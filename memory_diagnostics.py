@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+Memory Diagnostics for Financial Command Center AI
+Per-worker tracemalloc snapshots, snapshot diffs, per-route memory attribution
+and a resident-set-size summary against the container memory limit
+"""
+
+import os
+import json
+import tempfile
+import threading
+import time
+import tracemalloc
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Frames captured per allocation when tracing is started without an explicit value
+DEFAULT_TRACE_FRAMES = 10
+
+# RSS / limit ratios used for the health snapshot status
+WARNING_RATIO = 0.80
+CRITICAL_RATIO = 0.90
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1024, 'KB': 1024, 'KI': 1024, 'KIB': 1024,
+               'M': 1024 ** 2, 'MB': 1024 ** 2, 'MI': 1024 ** 2, 'MIB': 1024 ** 2,
+               'G': 1024 ** 3, 'GB': 1024 ** 3, 'GI': 1024 ** 3, 'GIB': 1024 ** 3}
+
+# cgroup v1 reports "no limit" as a page-aligned huge number
+_CGROUP_V1_UNLIMITED = 1 << 60
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
+def parse_size(value: Optional[str]) -> Optional[int]:
+    """Parse a docker-style size ("512M", "1g", "268435456") into bytes"""
+    if value is None:
+        return None
+    text = str(value).strip().upper().replace(' ', '')
+    if not text:
+        return None
+    number = text.rstrip('BKMGI')
+    unit = text[len(number):]
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except (ValueError, KeyError):
+        logger.warning(f"Unrecognised memory size: {value!r}")
+        return None
+
+
+def _read_first_line(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def get_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process, in bytes"""
+    try:
+        import psutil  # type: ignore
+        return psutil.Process().memory_info().rss
+    except Exception:
+        pass
+
+    try:
+        with open('/proc/self/status', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes elsewhere; it is a peak, not current
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+def get_memory_limit_bytes() -> Optional[int]:
+    """Configured memory limit: FCC_MEMORY_LIMIT, else the cgroup limit, else None"""
+    configured = parse_size(os.getenv('FCC_MEMORY_LIMIT'))
+    if configured:
+        return configured
+
+    v2 = _read_first_line('/sys/fs/cgroup/memory.max')
+    if v2 and v2 != 'max':
+        try:
+            return int(v2)
+        except ValueError:
+            pass
+
+    v1 = _read_first_line('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+    if v1:
+        try:
+            limit = int(v1)
+            if limit < _CGROUP_V1_UNLIMITED:
+                return limit
+        except ValueError:
+            pass
+    return None
+
+
+def get_container_usage_bytes() -> Optional[int]:
+    """Memory charged to the whole container (all workers), when running under a cgroup"""
+    for path in ('/sys/fs/cgroup/memory.current', '/sys/fs/cgroup/memory/memory.usage_in_bytes'):
+        value = _read_first_line(path)
+        if value:
+            try:
+                return int(value)
+            except ValueError:
+                continue
+    return None
+
+
+def _mb(value: Optional[int]) -> Optional[float]:
+    return None if value is None else round(value / (1024 * 1024), 1)
+
+
+class MemoryDiagnostics:
+    """Tracemalloc snapshots and memory budget reporting for one worker process"""
+
+    def __init__(self, app=None, auth_decorator: Optional[Callable] = None,
+                 max_snapshots: int = 5, report_dir: Optional[str] = None):
+        self.max_snapshots = max_snapshots
+        self.report_dir = Path(report_dir or os.getenv('FCC_MEMORY_REPORT_DIR')
+                               or Path(tempfile.gettempdir()) / 'fcc-memory')
+        self.route_stats_enabled = _env_flag('FCC_MEMORY_ROUTE_STATS', True)
+        self._lock = threading.Lock()
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._next_id = 1
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        # Requests in flight and requests started, so a traced peak is kept only for
+        # requests that had the worker to themselves (the peak is process-wide)
+        self._active = 0
+        self._started = 0
+
+        if _env_flag('FCC_TRACEMALLOC'):
+            self.start(int(os.getenv('FCC_TRACEMALLOC_FRAMES', DEFAULT_TRACE_FRAMES)))
+
+        if app is not None:
+            self.init_app(app, auth_decorator)
+
+    # ------------------------- Tracing control -------------------------
+    @property
+    def is_tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = DEFAULT_TRACE_FRAMES) -> Dict[str, Any]:
+        """Start tracemalloc in this worker (no-op if already tracing)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(max(1, int(frames)))
+            logger.info(f"tracemalloc started in pid {os.getpid()} with {frames} frames")
+        return self.tracing_status()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop tracemalloc and drop stored snapshots (they pin a lot of memory)"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info(f"tracemalloc stopped in pid {os.getpid()}")
+        with self._lock:
+            self._snapshots.clear()
+        return self.tracing_status()
+
+    def tracing_status(self) -> Dict[str, Any]:
+        status = {'tracing': tracemalloc.is_tracing(), 'pid': os.getpid()}
+        if status['tracing']:
+            current, peak = tracemalloc.get_traced_memory()
+            status.update({
+                'frames': tracemalloc.get_traceback_limit(),
+                'traced_current_mb': _mb(current),
+                'traced_peak_mb': _mb(peak),
+                'tracemalloc_overhead_mb': _mb(tracemalloc.get_tracemalloc_memory()),
+            })
+        return status
+
+    # ------------------------- Snapshots -------------------------
+    @staticmethod
+    def _filtered(snapshot: 'tracemalloc.Snapshot') -> 'tracemalloc.Snapshot':
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    @staticmethod
+    def _format_stat(stat, key_type: str) -> Dict[str, Any]:
+        frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+        entry = {
+            'site': frames[0] if frames else '<unknown>',
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count,
+        }
+        if key_type == 'traceback':
+            entry['traceback'] = frames
+        size_diff = getattr(stat, 'size_diff', None)
+        if size_diff is not None:
+            entry['size_diff_kb'] = round(size_diff / 1024, 1)
+            entry['count_diff'] = stat.count_diff
+        return entry
+
+    def take_snapshot(self, label: str = '') -> Dict[str, Any]:
+        """Capture a snapshot of this worker's traced allocations"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError('tracemalloc is not running in this worker; start it first')
+
+        snapshot = self._filtered(tracemalloc.take_snapshot())
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = {
+                'snapshot': snapshot,
+                'label': label or f'snapshot-{snapshot_id}',
+                'taken_at': datetime.now().isoformat(),
+                'rss_mb': _mb(get_rss_bytes()),
+            }
+            # Keep only the most recent snapshots; each one holds every traced block
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.pop(min(self._snapshots))
+
+        return {'id': snapshot_id, **self._describe(snapshot_id)}
+
+    def _describe(self, snapshot_id: int) -> Dict[str, Any]:
+        meta = self._snapshots[snapshot_id]
+        return {'label': meta['label'], 'taken_at': meta['taken_at'], 'rss_mb': meta['rss_mb']}
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{'id': sid, **self._describe(sid)} for sid in sorted(self._snapshots)]
+
+    def _get_snapshot(self, snapshot_id) -> 'tracemalloc.Snapshot':
+        if snapshot_id in (None, '', 'current', 'now'):
+            if not tracemalloc.is_tracing():
+                raise RuntimeError('tracemalloc is not running in this worker; start it first')
+            return self._filtered(tracemalloc.take_snapshot())
+        with self._lock:
+            meta = self._snapshots.get(int(snapshot_id))
+        if meta is None:
+            raise KeyError(f'Unknown snapshot id {snapshot_id} in pid {os.getpid()}')
+        return meta['snapshot']
+
+    def top(self, snapshot_id=None, limit: int = 20, key_type: str = 'lineno') -> Dict[str, Any]:
+        """Top allocation sites of a stored snapshot, or of a fresh one"""
+        snapshot = self._get_snapshot(snapshot_id)
+        stats = snapshot.statistics(key_type)
+        report = {
+            'pid': os.getpid(),
+            'snapshot': snapshot_id or 'current',
+            'group_by': key_type,
+            'total_traced_mb': _mb(sum(stat.size for stat in stats)),
+            'top': [self._format_stat(stat, key_type) for stat in stats[:limit]],
+        }
+        self._write_worker_report(report)
+        return report
+
+    def diff(self, base_id, target_id=None, limit: int = 20, key_type: str = 'lineno') -> Dict[str, Any]:
+        """Allocation growth between two snapshots (target defaults to a fresh snapshot)"""
+        base = self._get_snapshot(base_id)
+        target = self._get_snapshot(target_id)
+        stats = target.compare_to(base, key_type)
+        report = {
+            'pid': os.getpid(),
+            'base': base_id,
+            'target': target_id or 'current',
+            'group_by': key_type,
+            'net_growth_mb': _mb(sum(stat.size_diff for stat in stats)),
+            'top': [self._format_stat(stat, key_type) for stat in stats[:limit]],
+        }
+        self._write_worker_report(report)
+        return report
+
+    # ------------------------- Route attribution -------------------------
+    def _before_request(self):
+        from flask import g
+        g._memory_rss_start = get_rss_bytes()
+        with self._lock:
+            alone = self._active == 0
+            self._active += 1
+            self._started += 1
+            g._memory_started = self._started
+            if alone and tracemalloc.is_tracing():
+                g._memory_traced_start = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+
+    def _after_request(self, response):
+        from flask import g, request
+        rss_start = g.pop('_memory_rss_start', None)
+        traced_start = g.pop('_memory_traced_start', None)
+        started = g.get('_memory_started')
+        rss_end = get_rss_bytes()
+        endpoint = request.endpoint or request.path
+
+        rss_growth = (rss_end - rss_start) if (rss_start is not None and rss_end is not None) else 0
+        with self._lock:
+            peak_alloc = None
+            # Another request started meanwhile: the peak would include its allocations
+            if traced_start is not None and started == self._started and tracemalloc.is_tracing():
+                peak_alloc = max(0, tracemalloc.get_traced_memory()[1] - traced_start)
+
+            stats = self._routes.setdefault(endpoint, {
+                'requests': 0, 'rss_growth_total_kb': 0.0, 'rss_growth_max_kb': 0.0,
+                'peak_alloc_max_kb': None,
+            })
+            stats['requests'] += 1
+            stats['rss_growth_total_kb'] = round(stats['rss_growth_total_kb'] + rss_growth / 1024, 1)
+            stats['rss_growth_max_kb'] = max(stats['rss_growth_max_kb'], round(rss_growth / 1024, 1))
+            if peak_alloc is not None:
+                stats['peak_alloc_max_kb'] = max(stats['peak_alloc_max_kb'] or 0.0, round(peak_alloc / 1024, 1))
+            stats['last_seen'] = datetime.now().isoformat()
+        return response
+
+    def _teardown_request(self, exc=None):
+        # Runs for every request, including ones whose after_request handlers were skipped
+        from flask import g
+        if g.pop('_memory_started', None) is not None:
+            with self._lock:
+                self._active = max(0, self._active - 1)
+
+    def route_stats(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Routes ranked by the RSS growth they were active for (approximate with threads);
+        peak_alloc_max_kb only counts requests that did not overlap another one
+        """
+        with self._lock:
+            rows = [{'endpoint': name, **stats} for name, stats in self._routes.items()]
+        rows.sort(key=lambda r: (r['rss_growth_total_kb'], r['peak_alloc_max_kb'] or 0), reverse=True)
+        return rows[:limit]
+
+    # ------------------------- Budget summary -------------------------
+    def summary(self) -> Dict[str, Any]:
+        """RSS versus the configured memory limit, for the health snapshot"""
+        rss = get_rss_bytes()
+        limit = get_memory_limit_bytes()
+        container = get_container_usage_bytes()
+        # The limit is shared by every worker, so judge it against container usage when known
+        used = container if container is not None else rss
+        ratio = (used / limit) if (used is not None and limit) else None
+
+        status = 'unknown'
+        if ratio is not None:
+            status = 'critical' if ratio >= CRITICAL_RATIO else 'warning' if ratio >= WARNING_RATIO else 'ok'
+
+        return {
+            'status': status,
+            'pid': os.getpid(),
+            'rss_mb': _mb(rss),
+            'container_usage_mb': _mb(container),
+            'limit_mb': _mb(limit),
+            'usage_percent': round(ratio * 100, 1) if ratio is not None else None,
+            'tracing': tracemalloc.is_tracing(),
+        }
+
+    def _write_worker_report(self, report: Dict[str, Any]) -> None:
+        """Persist this worker's latest report so /admin/memory/workers can show all workers"""
+        try:
+            self.report_dir.mkdir(parents=True, exist_ok=True)
+            payload = {'summary': self.summary(), 'report': report, 'written_at': datetime.now().isoformat()}
+            path = self.report_dir / f'worker-{os.getpid()}.json'
+            tmp = path.with_suffix('.tmp')
+            tmp.write_text(json.dumps(payload, indent=2, default=str), encoding='utf-8')
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write memory report: {e}")
+
+    def worker_reports(self) -> List[Dict[str, Any]]:
+        """Latest report written by each worker that is still alive"""
+        reports = []
+        if not self.report_dir.exists():
+            return reports
+        for path in sorted(self.report_dir.glob('worker-*.json')):
+            try:
+                pid = int(path.stem.split('-', 1)[1])
+                os.kill(pid, 0)
+            except (ValueError, ProcessLookupError):
+                continue
+            except (PermissionError, OSError, AttributeError):
+                pass
+            try:
+                reports.append(json.loads(path.read_text(encoding='utf-8')))
+            except (OSError, json.JSONDecodeError):
+                continue
+        return reports
+
+    # ------------------------- Flask glue -------------------------
+    def init_app(self, app, auth_decorator: Optional[Callable] = None):
+        """Register request hooks and /admin/memory routes"""
+        if self.route_stats_enabled:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+            app.teardown_request(self._teardown_request)
+        app.extensions['memory_diagnostics'] = self
+        self.add_routes(app, auth_decorator or (lambda f: f))
+
+    def add_routes(self, app, auth):
+        from flask import jsonify, request
+
+        def _limit():
+            return max(1, min(request.args.get('limit', 20, type=int), 200))
+
+        def _group_by():
+            key_type = request.args.get('group_by', 'lineno')
+            return key_type if key_type in ('lineno', 'filename', 'traceback') else 'lineno'
+
+        @app.route('/admin/memory', methods=['GET'])
+        @auth
+        def memory_overview():
+            """Memory budget, tracing state, stored snapshots and top routes for this worker"""
+            return jsonify({
+                'summary': self.summary(),
+                'tracemalloc': self.tracing_status(),
+                'snapshots': self.list_snapshots(),
+                'routes': self.route_stats(_limit()),
+                'timestamp': datetime.now().isoformat(),
+            })
+
+        @app.route('/admin/memory/tracemalloc', methods=['POST'])
+        @auth
+        def memory_tracemalloc():
+            """Start or stop tracemalloc in the worker that serves this request"""
+            body = request.get_json(silent=True) or {}
+            action = str(body.get('action', 'start')).lower()
+            if action == 'start':
+                try:
+                    frames = int(body.get('frames', DEFAULT_TRACE_FRAMES))
+                except (TypeError, ValueError):
+                    frames = 0
+                if frames < 1:
+                    return jsonify({'error': 'frames must be a positive integer'}), 400
+                return jsonify(self.start(frames))
+            if action == 'stop':
+                return jsonify(self.stop())
+            return jsonify({'error': "action must be 'start' or 'stop'"}), 400
+
+        @app.route('/admin/memory/snapshots', methods=['GET', 'POST'])
+        @auth
+        def memory_snapshots():
+            """List snapshots, or take a new one"""
+            if request.method == 'GET':
+                return jsonify({'pid': os.getpid(), 'snapshots': self.list_snapshots()})
+            body = request.get_json(silent=True) or {}
+            try:
+                return jsonify(self.take_snapshot(str(body.get('label', ''))))
+            except RuntimeError as e:
+                return jsonify({'error': str(e), 'pid': os.getpid()}), 409
+
+        @app.route('/admin/memory/snapshots/<snapshot_id>', methods=['GET'])
+        @auth
+        def memory_snapshot_top(snapshot_id):
+            """Top allocation sites of a stored snapshot ('current' takes a fresh one)"""
+            try:
+                return jsonify(self.top(snapshot_id, _limit(), _group_by()))
+            except KeyError as e:
+                return jsonify({'error': str(e)}), 404
+            except (RuntimeError, ValueError) as e:
+                return jsonify({'error': str(e), 'pid': os.getpid()}), 409
+
+        @app.route('/admin/memory/diff', methods=['GET'])
+        @auth
+        def memory_diff():
+            """Allocation growth between ?base=<id> and ?target=<id|current>"""
+            base = request.args.get('base')
+            if not base:
+                return jsonify({'error': 'base snapshot id required'}), 400
+            try:
+                return jsonify(self.diff(base, request.args.get('target'), _limit(), _group_by()))
+            except KeyError as e:
+                return jsonify({'error': str(e)}), 404
+            except (RuntimeError, ValueError) as e:
+                return jsonify({'error': str(e), 'pid': os.getpid()}), 409
+
+        @app.route('/admin/memory/workers', methods=['GET'])
+        @auth
+        def memory_workers():
+            """Latest summary and report from every live worker"""
+            return jsonify({'workers': self.worker_reports(), 'served_by': os.getpid()})
+
+
+def configure_memory_diagnostics(app, auth_decorator: Optional[Callable] = None) -> MemoryDiagnostics:
+    """Convenience function to attach memory diagnostics to a Flask app"""
+    return MemoryDiagnostics(app, auth_decorator)
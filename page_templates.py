@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Page Templates for Financial Command Center AI
+Jinja setup for the server-rendered pages (home, health, Xero views, admin):
+templates compiled once per worker and auto-escaped
+
+Usage:
+    configure_page_templates(app)
+    return render_template('health.html', health_data=health_data, ...)
+
+Page CSS/JS lives in static/ and is linked with fingerprinted, long-cached URLs:
+    <link rel="stylesheet" href="{{ asset_url('css/health.css') }}">
+"""
+
+import os
+import logging
+from typing import Iterable, Optional
+
+from static_assets import configure_static_assets
+
+logger = logging.getLogger(__name__)
+
+# Pages compiled at startup (before gunicorn forks, when preloading)
+PAGE_TEMPLATES = (
+    'index.html',
+    'health.html',
+    'xero_profile.html',
+    'xero_contacts.html',
+    'xero_invoices.html',
+    'xero_error.html',
+    'admin_dashboard.html',
+    'api_admin_dashboard.html',
+    'admin_mode.html',
+    'demo_key.html',
+)
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    val = os.getenv(name)
+    if val is None:
+        return default
+    return val.strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
+def money(value) -> str:
+    """1234.5 -> '1,234.50'"""
+    try:
+        return f"{float(value):,.2f}"
+    except (TypeError, ValueError):
+        return "0.00"
+
+
+def precompile(app, names: Iterable[str] = PAGE_TEMPLATES) -> int:
+    """Load templates into the Jinja cache"""
+    compiled = 0
+    for name in names:
+        try:
+            app.jinja_env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            logger.warning(f"Template {name} failed to compile: {e}")
+    return compiled
+
+
+def configure_page_templates(app, precompile_pages: Optional[bool] = None):
+    """Configure Jinja for the page templates (idempotent)"""
+    if 'page_templates' in app.extensions:
+        return app.extensions['page_templates']
+
+    # The apps run with DEBUG on; keep that from turning on a stat() per render
+    if app.config.get('TEMPLATES_AUTO_RELOAD') is None:
+        app.config['TEMPLATES_AUTO_RELOAD'] = _env_flag('FCC_TEMPLATES_AUTO_RELOAD')
+    env = app.jinja_env
+    env.auto_reload = app.config['TEMPLATES_AUTO_RELOAD']
+    env.filters['money'] = money
+
+    configure_static_assets(app)
+    app.extensions['page_templates'] = env
+
+    if precompile_pages is None:
+        precompile_pages = not env.auto_reload
+    if precompile_pages:
+        logger.debug(f"Precompiled {precompile(app)} page templates")
+    return env
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Pagination for Financial Command Center AI
+Opaque cursors for list endpoints backed by Xero's paged APIs:
+- a cursor carries the page number plus the sort/filter it was issued for, so a client
+  can only continue the listing it started (changing a filter means starting over)
+- sort keys are whitelisted and mapped to the upstream `order` expression
+
+Usage:
+    query = ListQuery.from_request(request.args, sorts=INVOICE_SORTS, default_sort='-date')
+    result = api.get_invoices(tenant_id, page=query.page, page_size=query.page_size, order=query.order, ...)
+    return jsonify(query.page_of(rows, total=result.pagination.item_count))
+"""
+
+import json
+import base64
+import binascii
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class CursorError(ValueError):
+    """Malformed or tampered cursor (answer 400, the client should start over)"""
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(',', ':'), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise CursorError(f"Invalid cursor: {e}") from e
+    if not isinstance(state, dict) or not isinstance(state.get('page'), int) or state['page'] < 1:
+        raise CursorError("Invalid cursor")
+    return state
+
+
+@dataclass(frozen=True)
+class ListQuery:
+    """One page request: sort key, filters and position"""
+    sort: str
+    order: str
+    filters: Dict[str, str] = field(default_factory=dict)
+    page: int = 1
+    page_size: int = DEFAULT_PAGE_SIZE
+
+    @classmethod
+    def from_request(cls, args: Mapping[str, str], sorts: Mapping[str, str], default_sort: str,
+                     filters: tuple = ()) -> "ListQuery":
+        """
+        Build from query args. With ?cursor=... the cursor wins over every other argument.
+        sorts maps public sort keys ('-date') to upstream order expressions ('Date DESC').
+        """
+        cursor = args.get('cursor')
+        if cursor:
+            state = decode_cursor(cursor)
+            sort = state.get('sort', default_sort)
+            if sort not in sorts:
+                raise CursorError("Invalid cursor")
+            return cls(sort=sort, order=sorts[sort], filters=dict(state.get('filters') or {}),
+                       page=state['page'], page_size=_page_size(state.get('page_size')))
+
+        sort = args.get('sort') or default_sort
+        if sort not in sorts:
+            raise CursorError(f"Unknown sort '{sort}' (use one of: {', '.join(sorts)})")
+        values = {name: args.get(name, '').strip() for name in filters}
+        return cls(sort=sort, order=sorts[sort], filters={k: v for k, v in values.items() if v},
+                   page_size=_page_size(args.get('page_size')))
+
+    def next_cursor(self) -> str:
+        return encode_cursor({'sort': self.sort, 'filters': self.filters,
+                              'page': self.page + 1, 'page_size': self.page_size})
+
+    def page_of(self, items: List[Any], total: Optional[int] = None) -> Dict[str, Any]:
+        """Response body; a short page means there is nothing after it"""
+        has_more = len(items) >= self.page_size
+        if total is not None:
+            has_more = self.page * self.page_size < total
+        return {
+            'items': items,
+            'next_cursor': self.next_cursor() if has_more else None,
+            'total': total,
+            'page': self.page,
+            'page_size': self.page_size,
+            'sort': self.sort,
+            'filters': self.filters,
+        }
+
+
+def _page_size(value) -> int:
+    try:
+        size = int(value) if value not in (None, '') else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        raise CursorError(f"page_size must be an integer, got {value!r}")
+    return max(1, min(size, MAX_PAGE_SIZE))
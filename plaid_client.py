@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Plaid Client for Financial Command Center AI
+Long-lived PlaidApi instances, one per credential set and environment, so repeated
+balance and transaction calls reuse kept-alive connections instead of a new pool per call
+
+Usage:
+    from plaid_client import get_plaid_client
+
+    client = get_plaid_client()
+    balances = client.accounts_balance_get(AccountsBalanceGetRequest(access_token=token))
+
+Environment:
+    PLAID_CLIENT_ID, PLAID_SECRET      credentials
+    PLAID_ENV                          sandbox (default) | development | production
+    FCC_PLAID_POOL_SIZE                connections kept per client (default 10)
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+plaid = lazy_import("plaid")
+plaid_api = lazy_import("plaid.api.plaid_api")
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str, str], Any] = {}
+
+
+def _pool_size() -> int:
+    return max(1, int(os.getenv("FCC_PLAID_POOL_SIZE", "10")))
+
+
+def resolve_host(env: Optional[str] = None):
+    """Plaid host for sandbox/development/production (enum names differ across plaid-python versions)"""
+    env = (env or os.getenv("PLAID_ENV", "sandbox")).lower()
+    if env == "production":
+        return getattr(plaid.Environment, "Production", plaid.Environment.Sandbox)
+    if env == "development":
+        return getattr(plaid.Environment, "Development",
+                       getattr(plaid.Environment, "Sandbox", plaid.Environment.Production))
+    return getattr(plaid.Environment, "Sandbox", plaid.Environment.Production)
+
+
+def _new_client(client_id: str, secret: str, env: str):
+    configuration = plaid.Configuration(host=resolve_host(env), api_key={"clientId": client_id, "secret": secret})
+    configuration.connection_pool_maxsize = _pool_size()
+    return plaid_api.PlaidApi(plaid.ApiClient(configuration))
+
+
+def get_plaid_client(client_id: Optional[str] = None, secret: Optional[str] = None, env: Optional[str] = None):
+    """PlaidApi for the given credentials (default: PLAID_CLIENT_ID / PLAID_SECRET / PLAID_ENV), cached"""
+    client_id = client_id or os.getenv("PLAID_CLIENT_ID")
+    secret = secret or os.getenv("PLAID_SECRET")
+    if not client_id or not secret:
+        raise RuntimeError("Plaid not configured. Set PLAID_CLIENT_ID and PLAID_SECRET in the environment.")
+    env = (env or os.getenv("PLAID_ENV", "sandbox")).lower()
+
+    key = (client_id, hashlib.sha256(secret.encode()).hexdigest()[:16], env)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _new_client(client_id, secret, env)
+                logger.info(f"Plaid client ready ({env}, pool maxsize={_pool_size()})")
+    return client
+
+
+def clear_plaid_clients() -> None:
+    """Forget cached clients and their connections (credential rotation, tests, forked children)"""
+    global _lock
+    for client in list(_clients.values()):
+        try:
+            client.api_client.rest_client.pool_manager.clear()
+        except Exception:
+            pass
+    _clients.clear()
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Never share pooled sockets between a preloading parent and its workers
+    os.register_at_fork(after_in_child=clear_plaid_clients)
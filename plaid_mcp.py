@@ -1,36 +1,43 @@
 # plaid_mcp.py
+from __future__ import annotations
+
+import startup_profiler
+startup_profiler.install()  # times imports when FCC_PROFILE_STARTUP is set
 import os, json, uuid, hashlib
 from typing import List, Optional, Dict, Any
 from datetime import date, timedelta
 
 from mcp.server.fastmcp import FastMCP
 
-# ---- Plaid SDK (typed models) ----
-import plaid
-from plaid.api import plaid_api
+# ---- Plaid SDK (typed models, imported on first use) ----
+from lazy_imports import lazy_import, lazy_attr
+from plaid_client import get_plaid_client
+plaid = lazy_import("plaid")
+plaid_api = lazy_import("plaid.api.plaid_api")
 
-from plaid.model.products import Products
-from plaid.model.country_code import CountryCode
+Products = lazy_attr("plaid.model.products", "Products")
+CountryCode = lazy_attr("plaid.model.country_code", "CountryCode")
 
-from plaid.model.link_token_create_request import LinkTokenCreateRequest
-from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUser
+LinkTokenCreateRequest = lazy_attr("plaid.model.link_token_create_request", "LinkTokenCreateRequest")
+LinkTokenCreateRequestUser = lazy_attr("plaid.model.link_token_create_request_user", "LinkTokenCreateRequestUser")
 
-from plaid.model.sandbox_public_token_create_request import SandboxPublicTokenCreateRequest
-from plaid.model.sandbox_public_token_create_request_options import SandboxPublicTokenCreateRequestOptions
-from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
+SandboxPublicTokenCreateRequest = lazy_attr("plaid.model.sandbox_public_token_create_request", "SandboxPublicTokenCreateRequest")
+SandboxPublicTokenCreateRequestOptions = lazy_attr("plaid.model.sandbox_public_token_create_request_options", "SandboxPublicTokenCreateRequestOptions")
+ItemPublicTokenExchangeRequest = lazy_attr("plaid.model.item_public_token_exchange_request", "ItemPublicTokenExchangeRequest")
 
-from plaid.model.accounts_balance_get_request import AccountsBalanceGetRequest
-from plaid.model.transactions_get_request import TransactionsGetRequest
-from plaid.model.transactions_get_request_options import TransactionsGetRequestOptions
-from plaid.model.auth_get_request import AuthGetRequest
-from plaid.model.identity_get_request import IdentityGetRequest
-from plaid.model.item_remove_request import ItemRemoveRequest
-from plaid.model.webhook_verification_key_get_request import WebhookVerificationKeyGetRequest
+AccountsBalanceGetRequest = lazy_attr("plaid.model.accounts_balance_get_request", "AccountsBalanceGetRequest")
+TransactionsGetRequest = lazy_attr("plaid.model.transactions_get_request", "TransactionsGetRequest")
+TransactionsGetRequestOptions = lazy_attr("plaid.model.transactions_get_request_options", "TransactionsGetRequestOptions")
+AuthGetRequest = lazy_attr("plaid.model.auth_get_request", "AuthGetRequest")
+IdentityGetRequest = lazy_attr("plaid.model.identity_get_request", "IdentityGetRequest")
+ItemRemoveRequest = lazy_attr("plaid.model.item_remove_request", "ItemRemoveRequest")
+WebhookVerificationKeyGetRequest = lazy_attr("plaid.model.webhook_verification_key_get_request", "WebhookVerificationKeyGetRequest")
 
-from jose import jwt  # webhook verification helper
+jwt = lazy_import("jose.jwt")  # webhook verification helper
 
 # MCP app (exported name should be one of: app / mcp / server)
-app = FastMCP("plaid-integration")
+with startup_profiler.phase("fastmcp_app"):
+    app = FastMCP("plaid-integration")
 
 # ----------------- Local store (demo only) -----------------
 STORE_PATH = os.path.join(os.path.dirname(__file__), "plaid_store.json")
@@ -51,60 +58,10 @@ def _token_for(alias_or_token: str) -> str:
         return alias_or_token
     return store.get("items", {}).get(alias_or_token, {}).get("access_token") or alias_or_token
 
-# ----------------- Plaid client (robust across SDK/env) -----------------
-def _require_env(name: str) -> str:
-    val = os.environ.get(name)
-    if not val:
-        raise RuntimeError(f"Set {name} in the environment.")
-    return val
-
-# Some generated SDKs have enum objects, others accept raw hosts. Use URLs to avoid enum diffs.
-_PLAID_HOSTS = {
-    "sandbox":     "https://sandbox.plaid.com",
-    "development": "https://development.plaid.com",
-    "production":  "https://production.plaid.com",
-}
-
-def _resolve_host():
-    env = os.environ.get("PLAID_ENV", "sandbox").lower()
-    # Be defensive across plaid-python versions
-    if env == "production":
-        return getattr(plaid.Environment, "Production", plaid.Environment.Sandbox)
-    if env == "development":
-        return getattr(
-            plaid.Environment,
-            "Development",
-            getattr(plaid.Environment, "Sandbox", plaid.Environment.Production),
-        )
-    return getattr(plaid.Environment, "Sandbox", plaid.Environment.Production)
-
+# ----------------- Plaid client (pooled, see plaid_client.py) -----------------
 def _plaid_client() -> plaid_api.PlaidApi:
-    client_id = os.environ.get("PLAID_CLIENT_ID")
-    secret = os.environ.get("PLAID_SECRET")
-    if not client_id or not secret:
-        raise RuntimeError("Set PLAID_CLIENT_ID and PLAID_SECRET in the environment.")
-    cfg = plaid.Configuration(
-        host=_resolve_host(),
-        api_key={"clientId": client_id, "secret": secret},
-    )
-    return plaid_api.PlaidApi(plaid.ApiClient(cfg))
-
-def _new_client() -> plaid_api.PlaidApi:
-    client_id = _require_env("PLAID_CLIENT_ID")
-    secret    = _require_env("PLAID_SECRET")
-    cfg = plaid.Configuration(
-        host=_resolve_host(),
-        api_key={"clientId": client_id, "secret": secret},
-    )
-    return plaid_api.PlaidApi(plaid.ApiClient(cfg))
-
-# Lazy singleton so import never crashes if env isn’t set yet
-_PLAID_CLIENT: Optional[plaid_api.PlaidApi] = None
-def _client() -> plaid_api.PlaidApi:
-    global _PLAID_CLIENT
-    if _PLAID_CLIENT is None:
-        _PLAID_CLIENT = _new_client()
-    return _PLAID_CLIENT
+    # One long-lived client per credential set, so tool calls reuse kept-alive connections
+    return get_plaid_client()
 
 # ----------------- Helpers to normalize inputs -----------------
 def _as_product(p: Any) -> Products:
@@ -349,5 +306,7 @@ def verify_plaid_webhook(plaid_verification_jwt: str, raw_body: bytes) -> bool:
         return False
 
 # ----------------- Entry -----------------
+startup_profiler.finish('plaid_mcp')
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Production Server for Financial Command Center AI
+Runs the Flask app under a tuned WSGI server instead of app.run(debug=True):
+gunicorn (gthread workers) on Linux/macOS and in Docker, cheroot on Windows desktops
+
+Usage:
+    python serve.py                                  # app_with_setup_wizard:app, settings from env
+    python serve.py --app app:app --workers 4 --threads 16 --port 8443
+    gunicorn -c gunicorn.conf.py app_with_setup_wizard:app
+
+Environment (all optional):
+    FCC_HOST, FCC_PORT/PORT, FCC_WORKERS, FCC_THREADS, FCC_KEEPALIVE, FCC_TIMEOUT,
+    FCC_GRACEFUL_TIMEOUT, FCC_MAX_REQUESTS, FCC_MAX_REQUESTS_JITTER, FCC_PRELOAD,
+    FCC_RELOAD, FCC_SERVER (auto|gunicorn|cheroot|werkzeug),
+    FCC_TLS (auto|on|off), SSL_CERT_FILE, SSL_KEY_FILE
+    The Docker image sets FCC_TLS=off (nginx terminates TLS); docker-compose.ssl.yml sets it on.
+
+Graceful reload: `kill -HUP <master pid>` (gunicorn) restarts workers without dropping connections.
+"""
+
+import os
+import sys
+import signal
+import logging
+import argparse
+import importlib
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "gunicorn", "cheroot", "werkzeug")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+@dataclass
+class ServeConfig:
+    """Server tuning; defaults suit a 512M container or a desktop install"""
+    app: str = "app_with_setup_wizard:app"
+    host: str = "127.0.0.1"
+    port: int = 8000
+    workers: int = 2
+    threads: int = 8
+    keepalive: int = 5
+    timeout: int = 60
+    graceful_timeout: int = 30
+    max_requests: int = 1000
+    max_requests_jitter: int = 100
+    preload: bool = True
+    reload: bool = False
+    tls: str = "auto"
+    backend: str = "auto"
+    certfile: Optional[str] = field(default=None, repr=False)
+    keyfile: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_env(cls) -> "ServeConfig":
+        return cls(
+            app=os.getenv("FCC_APP", cls.app),
+            host=os.getenv("FCC_HOST", cls.host),
+            port=_env_int("FCC_PORT", _env_int("PORT", cls.port)),
+            workers=max(1, _env_int("FCC_WORKERS", cls.workers)),
+            threads=max(1, _env_int("FCC_THREADS", cls.threads)),
+            keepalive=_env_int("FCC_KEEPALIVE", cls.keepalive),
+            timeout=_env_int("FCC_TIMEOUT", cls.timeout),
+            graceful_timeout=_env_int("FCC_GRACEFUL_TIMEOUT", cls.graceful_timeout),
+            max_requests=_env_int("FCC_MAX_REQUESTS", cls.max_requests),
+            max_requests_jitter=_env_int("FCC_MAX_REQUESTS_JITTER", cls.max_requests_jitter),
+            preload=_env_bool("FCC_PRELOAD", cls.preload),
+            reload=_env_bool("FCC_RELOAD", cls.reload),
+            tls=os.getenv("FCC_TLS", cls.tls).strip().lower(),
+            backend=os.getenv("FCC_SERVER", cls.backend).strip().lower(),
+            certfile=os.getenv("SSL_CERT_FILE") or None,
+            keyfile=os.getenv("SSL_KEY_FILE") or None,
+        )
+
+
+def tls_enabled(config: ServeConfig) -> bool:
+    """auto follows the app's server-mode flags: HTTPS unless ALLOW_HTTP=true and FORCE_HTTPS=false"""
+    if config.tls in {"on", "true", "1"}:
+        return True
+    if config.tls in {"off", "false", "0"}:
+        return False
+    force_https = os.getenv("FORCE_HTTPS", "true").lower() == "true"
+    allow_http = os.getenv("ALLOW_HTTP", "false").lower() == "true"
+    return force_https or not allow_http
+
+
+def resolve_tls(config: ServeConfig) -> Optional[Tuple[str, str]]:
+    """(certfile, keyfile) from SSL_CERT_FILE/SSL_KEY_FILE or CertificateManager, or None for HTTP"""
+    if not tls_enabled(config):
+        return None
+    if config.certfile and config.keyfile:
+        return config.certfile, config.keyfile
+
+    from cert_manager import CertificateManager
+
+    cert_manager = CertificateManager()
+    if cert_manager.ensure_certificates():
+        logger.info("New SSL certificates generated (python cert_manager.py --bundle to trust the CA)")
+    return cert_manager.get_ssl_context()
+
+
+def load_app(target: str):
+    """Import 'module:attribute' (attribute defaults to app)"""
+    module_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "app")
+
+
+def gunicorn_options(config: ServeConfig, tls: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
+    """gunicorn settings for gthread workers (also used by gunicorn.conf.py)"""
+    options = {
+        "bind": f"{config.host}:{config.port}",
+        "workers": config.workers,
+        "worker_class": "gthread",
+        "threads": config.threads,
+        "keepalive": config.keepalive,
+        "timeout": config.timeout,
+        "graceful_timeout": config.graceful_timeout,
+        "max_requests": config.max_requests,
+        "max_requests_jitter": config.max_requests_jitter,
+        "preload_app": config.preload and not config.reload,
+        "reload": config.reload,
+        "accesslog": "-",
+        "errorlog": "-",
+        # Workers' scratch files in RAM (Docker's /tmp may be overlayfs)
+        "worker_tmp_dir": "/dev/shm" if os.path.isdir("/dev/shm") else None,
+    }
+    if tls:
+        options["certfile"], options["keyfile"] = tls
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def pick_backend(config: ServeConfig) -> str:
+    if config.backend != "auto":
+        return config.backend
+    if os.name != "nt":
+        try:
+            import gunicorn  # noqa: F401
+            return "gunicorn"
+        except ImportError:
+            pass
+    try:
+        import cheroot  # noqa: F401
+        return "cheroot"
+    except ImportError:
+        return "werkzeug"
+
+
+def _run_gunicorn(app, config: ServeConfig, tls):
+    from gunicorn.app.base import BaseApplication
+
+    class FCCApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(config, tls).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app if app is not None else load_app(config.app)
+
+    FCCApplication().run()
+
+
+def _run_cheroot(app, config: ServeConfig, tls):
+    from cheroot import wsgi
+
+    app = app if app is not None else load_app(config.app)
+    # One process: size the thread pool for the whole budget; idle keep-alive sockets close after `keepalive`
+    server = wsgi.Server(
+        (config.host, config.port), app,
+        numthreads=config.workers * config.threads,
+        timeout=config.keepalive,
+        shutdown_timeout=config.graceful_timeout,
+        request_queue_size=128,
+    )
+    if tls:
+        from cheroot.ssl.builtin import BuiltinSSLAdapter
+        server.ssl_adapter = BuiltinSSLAdapter(*tls)
+
+    def _stop(signum, frame):
+        logger.info(f"Signal {signum} received, draining connections")
+        server.stop()
+
+    for sig in (signal.SIGINT, signal.SIGTERM, getattr(signal, "SIGBREAK", None)):
+        if sig is not None:
+            signal.signal(sig, _stop)
+    if config.max_requests:
+        logger.info("cheroot runs a single process; max-requests recycling applies to gunicorn only")
+    try:
+        server.start()
+    finally:
+        server.stop()
+
+
+def _run_werkzeug(app, config: ServeConfig, tls):
+    from werkzeug.serving import run_simple
+
+    logger.warning("Neither gunicorn nor cheroot is installed; falling back to werkzeug's threaded server")
+    app = app if app is not None else load_app(config.app)
+    run_simple(
+        config.host, config.port, app,
+        threaded=True, use_reloader=config.reload, use_debugger=False,
+        ssl_context=tls,
+    )
+
+
+def serve(app=None, config: Optional[ServeConfig] = None, tls="auto"):
+    """
+    Serve `app` (or config.app when None) with the best available backend.
+    tls: "auto" resolves from config/env, None forces HTTP, "adhoc" uses werkzeug's self-signed mode.
+    """
+    config = config or ServeConfig.from_env()
+    if tls == "auto":
+        tls = resolve_tls(config)
+    backend = "werkzeug" if tls == "adhoc" else pick_backend(config)
+    if backend not in BACKENDS[1:]:
+        raise ValueError(f"Unknown server backend '{backend}'; choose from {', '.join(BACKENDS)}")
+
+    scheme = "https" if tls else "http"
+    logger.info(f"Serving {config.app if app is None else 'app'} on {scheme}://{config.host}:{config.port} "
+                f"with {backend} ({config.workers} workers x {config.threads} threads, keepalive {config.keepalive}s)")
+    {"gunicorn": _run_gunicorn, "cheroot": _run_cheroot, "werkzeug": _run_werkzeug}[backend](app, config, tls)
+
+
+def main(argv=None) -> int:
+    config = ServeConfig.from_env()
+    parser = argparse.ArgumentParser(description="Run Financial Command Center under a production WSGI server")
+    parser.add_argument("--app", default=config.app, help="module:attribute (default: %(default)s)")
+    parser.add_argument("--host", default=config.host)
+    parser.add_argument("--port", type=int, default=config.port)
+    parser.add_argument("--workers", type=int, default=config.workers)
+    parser.add_argument("--threads", type=int, default=config.threads)
+    parser.add_argument("--keepalive", type=int, default=config.keepalive)
+    parser.add_argument("--timeout", type=int, default=config.timeout)
+    parser.add_argument("--max-requests", type=int, default=config.max_requests)
+    parser.add_argument("--server", dest="backend", choices=BACKENDS, default=config.backend)
+    parser.add_argument("--tls", choices=("auto", "on", "off"), default=config.tls)
+    parser.add_argument("--reload", action="store_true", default=config.reload,
+                        help="Restart workers on code changes (development)")
+    args = parser.parse_args(argv)
+
+    for key, value in vars(args).items():
+        setattr(config, key, value)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logger.info(f"Server config: {asdict(config)}")
+    serve(config=config)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
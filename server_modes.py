@@ -9,6 +9,7 @@ import sys
 from pathlib import Path
 from flask import Flask, request, jsonify, render_template_string, redirect, url_for
 from datetime import datetime
+from static_assets import asset_url
 
 
 class ServerModeManager:
@@ -58,79 +59,7 @@ class ServerModeManager:
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>HTTPS Required - Financial Command Center AI</title>
-            <style>
-                body {
-                    font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
-                    margin: 0;
-                    padding: 0;
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }
-                .container {
-                    background: white;
-                    padding: 40px;
-                    border-radius: 15px;
-                    box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-                    max-width: 600px;
-                    text-align: center;
-                }
-                .icon {
-                    font-size: 4rem;
-                    margin-bottom: 20px;
-                    color: #e74c3c;
-                }
-                h1 {
-                    color: #2c3e50;
-                    margin-bottom: 15px;
-                    font-size: 2rem;
-                }
-                .subtitle {
-                    color: #7f8c8d;
-                    margin-bottom: 30px;
-                    font-size: 1.1rem;
-                }
-                .security-notice {
-                    background: #fff5f5;
-                    border: 2px solid #fed7d7;
-                    border-radius: 8px;
-                    padding: 20px;
-                    margin: 20px 0;
-                }
-                .security-notice h3 {
-                    color: #e53e3e;
-                    margin-top: 0;
-                }
-                .btn {
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 12px 30px;
-                    border: none;
-                    border-radius: 8px;
-                    font-size: 1.1rem;
-                    text-decoration: none;
-                    display: inline-block;
-                    margin: 10px;
-                    cursor: pointer;
-                    transition: all 0.3s ease;
-                }
-                .btn:hover {
-                    transform: translateY(-2px);
-                    box-shadow: 0 5px 15px rgba(102, 126, 234, 0.3);
-                }
-                .https-url {
-                    background: #f8f9fa;
-                    padding: 15px;
-                    border-radius: 5px;
-                    font-family: 'Monaco', 'Menlo', monospace;
-                    font-size: 1.1rem;
-                    color: #2c3e50;
-                    margin: 20px 0;
-                    border: 2px solid #e9ecef;
-                }
-            </style>
+            <link rel="stylesheet" href="{{ asset_url('css/https_required.css') }}">
         </head>
         <body>
             <div class="container">
@@ -173,115 +102,7 @@ class ServerModeManager:
             <meta charset="UTF-8">
             <meta name="viewport" content="width=device-width, initial-scale=1.0">
             <title>Security Warning - Financial Command Center AI</title>
-            <style>
-                body {
-                    font-family: 'Segoe UI', -apple-system, BlinkMacSystemFont, sans-serif;
-                    margin: 0;
-                    padding: 0;
-                    background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                    min-height: 100vh;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                }
-                .container {
-                    background: white;
-                    padding: 40px;
-                    border-radius: 15px;
-                    box-shadow: 0 20px 40px rgba(0,0,0,0.1);
-                    max-width: 700px;
-                    text-align: center;
-                }
-                .warning-icon {
-                    font-size: 4rem;
-                    margin-bottom: 20px;
-                    color: #f39c12;
-                    animation: pulse 2s infinite;
-                }
-                @keyframes pulse {
-                    0% { transform: scale(1); }
-                    50% { transform: scale(1.05); }
-                    100% { transform: scale(1); }
-                }
-                h1 {
-                    color: #e74c3c;
-                    margin-bottom: 15px;
-                    font-size: 2rem;
-                }
-                .subtitle {
-                    color: #7f8c8d;
-                    margin-bottom: 30px;
-                    font-size: 1.1rem;
-                }
-                .risk-notice {
-                    background: #fff3cd;
-                    border: 2px solid #ffeaa7;
-                    border-radius: 8px;
-                    padding: 20px;
-                    margin: 20px 0;
-                    text-align: left;
-                }
-                .risk-notice h3 {
-                    color: #856404;
-                    margin-top: 0;
-                }
-                .risk-list {
-                    color: #856404;
-                    margin: 15px 0;
-                }
-                .risk-list li {
-                    margin: 8px 0;
-                }
-                .btn-primary {
-                    background: linear-gradient(135deg, #00b894 0%, #00cec9 100%);
-                    color: white;
-                    padding: 15px 35px;
-                    border: none;
-                    border-radius: 8px;
-                    font-size: 1.2rem;
-                    text-decoration: none;
-                    display: inline-block;
-                    margin: 10px;
-                    cursor: pointer;
-                    transition: all 0.3s ease;
-                }
-                .btn-secondary {
-                    background: #6c757d;
-                    color: white;
-                    padding: 12px 25px;
-                    border: none;
-                    border-radius: 6px;
-                    font-size: 1rem;
-                    text-decoration: none;
-                    display: inline-block;
-                    margin: 5px;
-                    cursor: pointer;
-                    transition: all 0.3s ease;
-                }
-                .btn-primary:hover {
-                    transform: translateY(-2px);
-                    box-shadow: 0 5px 15px rgba(0, 184, 148, 0.3);
-                }
-                .btn-secondary:hover {
-                    background: #5a6268;
-                }
-                .https-url {
-                    background: #d4edda;
-                    padding: 15px;
-                    border-radius: 5px;
-                    font-family: 'Monaco', 'Menlo', monospace;
-                    font-size: 1.1rem;
-                    color: #155724;
-                    margin: 20px 0;
-                    border: 2px solid #c3e6cb;
-                }
-                .countdown {
-                    font-size: 1.2rem;
-                    color: #e74c3c;
-                    font-weight: bold;
-                    margin: 15px 0;
-                }
-            </style>
+            <link rel="stylesheet" href="{{ asset_url('css/http_warning.css') }}">
             <script>
                 let countdown = 10;
                 function updateCountdown() {
@@ -359,68 +180,7 @@ class ServerModeManager:
                 <meta charset="UTF-8">
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
                 <title>SSL Setup Guide - Financial Command Center AI</title>
-                <style>
-                    body { 
-                        font-family: 'Segoe UI', sans-serif; 
-                        margin: 0; 
-                        padding: 20px; 
-                        background: #f8f9fa; 
-                        line-height: 1.6;
-                    }
-                    .container { 
-                        max-width: 1000px; 
-                        margin: 0 auto; 
-                        background: white; 
-                        padding: 40px; 
-                        border-radius: 10px; 
-                        box-shadow: 0 2px 10px rgba(0,0,0,0.1); 
-                    }
-                    h1, h2, h3 { color: #2c3e50; }
-                    .alert { 
-                        padding: 15px; 
-                        border-radius: 5px; 
-                        margin: 20px 0; 
-                    }
-                    .alert-info { 
-                        background: #d1ecf1; 
-                        border: 1px solid #bee5eb; 
-                        color: #0c5460; 
-                    }
-                    .alert-success { 
-                        background: #d4edda; 
-                        border: 1px solid #c3e6cb; 
-                        color: #155724; 
-                    }
-                    .code { 
-                        background: #f8f9fa; 
-                        padding: 10px; 
-                        border-radius: 5px; 
-                        font-family: 'Courier New', monospace; 
-                        overflow-x: auto; 
-                        border: 1px solid #e9ecef; 
-                        margin: 10px 0;
-                    }
-                    .btn { 
-                        background: #007bff; 
-                        color: white; 
-                        padding: 10px 20px; 
-                        border: none; 
-                        border-radius: 5px; 
-                        text-decoration: none; 
-                        display: inline-block; 
-                        margin: 5px; 
-                    }
-                    .btn:hover { 
-                        background: #0056b3; 
-                    }
-                    .step { 
-                        background: #f8f9fa; 
-                        padding: 20px; 
-                        border-radius: 8px; 
-                        margin: 15px 0; 
-                        border-left: 4px solid #007bff; 
-                    }
-                </style>
+                <link rel="stylesheet" href="{{ asset_url('css/ssl_help.css') }}">
             </head>
             <body>
                 <div class="container">
@@ -535,17 +295,7 @@ ports:
             <head>
                 <meta charset="UTF-8">
                 <title>Certificate Bundle - Financial Command Center AI</title>
-                <style>
-                    body {{ font-family: 'Segoe UI', sans-serif; margin: 40px; background: #f5f7fa; }}
-                    .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 40px; border-radius: 10px; box-shadow: 0 2px 20px rgba(0,0,0,0.1); }}
-                    .success {{ background: #d4edda; padding: 20px; border-radius: 8px; border: 1px solid #c3e6cb; color: #155724; margin: 20px 0; }}
-                    .warning {{ background: #fff3cd; padding: 20px; border-radius: 8px; border: 1px solid #ffeaa7; color: #856404; margin: 20px 0; }}
-                    .code {{ background: #f8f9fa; padding: 10px; border-radius: 5px; font-family: 'Courier New', monospace; margin: 10px 0; word-break: break-all; }}
-                    .btn {{ background: #007bff; color: white; padding: 12px 24px; border: none; border-radius: 6px; text-decoration: none; display: inline-block; margin: 5px; }}
-                    .btn:hover {{ background: #0056b3; }}
-                    .install-steps {{ background: #f8f9fa; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-                    .step {{ margin: 15px 0; padding: 10px; background: white; border-radius: 5px; border-left: 4px solid #007bff; }}
-                </style>
+                <link rel="stylesheet" href="{asset_url('css/certificate_bundle.css')}">
             </head>
             <body>
                 <div class="container">
@@ -163,12 +163,13 @@ class APIValidator:
         stripe = None
         try:
             import stripe
+            from stripe_client import get_stripe_client
             
-            # Set the API key
-            stripe.api_key = api_key
+            # Candidate key gets its own client (never the global stripe.api_key, never cached)
+            client = get_stripe_client(api_key, cache=False)
             
             # Test the connection by retrieving account info
-            account = stripe.Account.retrieve()
+            account = client.v1.accounts.retrieve_current()
             
             # Additional validation for publishable key if provided
             publishable_valid = True
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Startup Profiler for Financial Command Center AI
+Records a per-module import-time tree and the cost of each init phase for the
+Flask apps and MCP servers, then prints a ranked report and writes it as JSON
+
+Two ways to use it:
+
+  # Out of process (most accurate): runs the target under `python -X importtime`
+  python startup_profiler.py app_with_setup_wizard --json reports/startup.json
+  python startup_profiler.py stripe_mcp --top 30
+
+  # In process: set FCC_PROFILE_STARTUP=1 before starting the app, gunicorn or an
+  # MCP server (e.g. in the Claude Desktop config "env" block). The report is
+  # printed to stderr and written to FCC_STARTUP_REPORT_DIR (default: reports/).
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib.abc
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROCESS_START = time.perf_counter()
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_REPORT_DIR = ROOT / "reports"
+
+_lock = threading.Lock()
+_phases: List[Dict[str, Any]] = []
+_phase_stack: List[str] = []
+_import_roots: List[Dict[str, Any]] = []
+_import_stack: List[Dict[str, Any]] = []
+_hook: Optional["_ImportTimer"] = None
+_finished = False
+
+
+def is_enabled() -> bool:
+    return os.getenv("FCC_PROFILE_STARTUP", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+# -----------------------------------------------------------------------------
+# Init phases
+# -----------------------------------------------------------------------------
+
+@contextmanager
+def phase(name: str):
+    """Time one init phase; nested phases record their parent"""
+    if _finished:
+        # Startup is over (e.g. initialize_xero_client() re-run after setup)
+        yield
+        return
+    parent = _phase_stack[-1] if _phase_stack else None
+    _phase_stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _phase_stack.pop()
+        with _lock:
+            _phases.append({
+                "name": name,
+                "parent": parent,
+                "start_ms": _ms(start - PROCESS_START),
+                "ms": _ms(elapsed),
+            })
+
+
+def phases() -> List[Dict[str, Any]]:
+    with _lock:
+        return list(_phases)
+
+
+# -----------------------------------------------------------------------------
+# In-process import timing (meta path hook)
+# -----------------------------------------------------------------------------
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wraps a real loader to time module creation + execution"""
+
+    def __init__(self, loader, name: str):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def _push(self) -> Dict[str, Any]:
+        node = {"module": self._name, "children": [], "_start": time.perf_counter()}
+        if _import_stack:
+            _import_stack[-1]["children"].append(node)
+        else:
+            _import_roots.append(node)
+        _import_stack.append(node)
+        return node
+
+    def _pop(self) -> None:
+        node = _import_stack.pop()
+        cumulative = time.perf_counter() - node.pop("_start")
+        node["cumulative_ms"] = _ms(cumulative)
+        node["self_ms"] = round(node["cumulative_ms"] - sum(c["cumulative_ms"] for c in node["children"]), 3)
+
+    def create_module(self, spec):
+        self._push()
+        try:
+            create = getattr(self._loader, "create_module", None)
+            return create(spec) if create else None
+        except BaseException:
+            self._pop()
+            raise
+
+    def exec_module(self, module):
+        # Hand the real loader back to the module before any of its code runs
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        if not _import_stack or _import_stack[-1]["module"] != self._name:
+            self._push()  # reload() skips create_module
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._pop()
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder that delegates to the real finders and times the loaders"""
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, fullname)
+            return spec
+        return None
+
+
+def install() -> bool:
+    """Start timing imports in this process if FCC_PROFILE_STARTUP is set"""
+    global _hook
+    if _hook is not None or not is_enabled():
+        return _hook is not None
+    _hook = _ImportTimer()
+    sys.meta_path.insert(0, _hook)
+    return True
+
+
+def uninstall() -> None:
+    global _hook
+    if _hook is not None and _hook in sys.meta_path:
+        sys.meta_path.remove(_hook)
+    _hook = None
+
+
+# -----------------------------------------------------------------------------
+# `python -X importtime` parsing
+# -----------------------------------------------------------------------------
+
+def parse_importtime(stderr_text: str) -> List[Dict[str, Any]]:
+    """Turn `-X importtime` output into a tree of {module, self_ms, cumulative_ms, children}"""
+    roots: List[Dict[str, Any]] = []
+    # importtime prints children before their parent; collect pending children per depth
+    pending: Dict[int, List[Dict[str, Any]]] = {}
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cumulative_us, name = rest.split("|", 2)
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            continue
+        stripped = name.lstrip(" ")
+        depth = (len(name) - len(stripped) - 1) // 2
+        node = {
+            "module": stripped.strip(),
+            "self_ms": round(self_us / 1000, 3),
+            "cumulative_ms": round(cumulative_us / 1000, 3),
+            "children": pending.pop(depth + 1, []),
+        }
+        if depth == 0:
+            roots.append(node)
+        else:
+            pending.setdefault(depth, []).append(node)
+    return roots
+
+
+# -----------------------------------------------------------------------------
+# Reports
+# -----------------------------------------------------------------------------
+
+def _walk(nodes: List[Dict[str, Any]]):
+    for node in nodes:
+        yield node
+        yield from _walk(node["children"])
+
+
+def build_report(target: str, tree: List[Dict[str, Any]], phase_rows: List[Dict[str, Any]],
+                 mode: str, wall_ms: Optional[float] = None, top: int = 25) -> Dict[str, Any]:
+    """Rank modules, top-level packages and init phases"""
+    flat = [{k: v for k, v in node.items() if k != "children"} for node in _walk(tree)]
+
+    packages: Dict[str, Dict[str, Any]] = {}
+    for row in flat:
+        pkg = row["module"].split(".", 1)[0]
+        entry = packages.setdefault(pkg, {"package": pkg, "self_ms": 0.0, "modules": 0})
+        entry["self_ms"] = round(entry["self_ms"] + row["self_ms"], 3)
+        entry["modules"] += 1
+
+    top_level_phases = [p for p in phase_rows if p["parent"] is None]
+    return {
+        "target": target,
+        "mode": mode,
+        "generated_at": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "pid": os.getpid(),
+        "wall_ms": wall_ms,
+        "modules_imported": len(flat),
+        "total_import_ms": round(sum(node["cumulative_ms"] for node in tree), 3),
+        "total_phase_ms": round(sum(p["ms"] for p in top_level_phases), 3),
+        "phases": sorted(phase_rows, key=lambda p: p["ms"], reverse=True),
+        "top_cumulative": sorted(flat, key=lambda r: r["cumulative_ms"], reverse=True)[:top],
+        "top_self": sorted(flat, key=lambda r: r["self_ms"], reverse=True)[:top],
+        "packages": sorted(packages.values(), key=lambda p: p["self_ms"], reverse=True)[:top],
+        "tree": tree,
+    }
+
+
+def format_report(report: Dict[str, Any], top: int = 15) -> str:
+    """Human-readable ranked summary of a report"""
+    lines = [
+        f"Startup profile: {report['target']} ({report['mode']})",
+        "=" * 60,
+        f"Wall time:        {report['wall_ms']} ms" if report.get("wall_ms") is not None else "",
+        f"Imports:          {report['total_import_ms']} ms across {report['modules_imported']} modules",
+        f"Init phases:      {report['total_phase_ms']} ms",
+        "",
+        "Init phases (slowest first):",
+    ]
+    for p in report["phases"][:top]:
+        indent = "    " if p["parent"] else "  "
+        lines.append(f"{indent}{p['ms']:>10.1f} ms  {p['name']}")
+    lines += ["", "Top-level packages by self time:"]
+    for p in report["packages"][:top]:
+        lines.append(f"  {p['self_ms']:>10.1f} ms  {p['package']} ({p['modules']} modules)")
+    lines += ["", "Modules by cumulative import time:"]
+    for row in report["top_cumulative"][:top]:
+        lines.append(f"  {row['cumulative_ms']:>10.1f} ms  {row['module']}")
+    return "\n".join(line for line in lines if line is not None)
+
+
+def write_report(report: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    if path is None:
+        report_dir = Path(os.getenv("FCC_STARTUP_REPORT_DIR") or DEFAULT_REPORT_DIR)
+        path = report_dir / f"startup_{report['target']}_{os.getpid()}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def finish(target: str) -> Optional[Dict[str, Any]]:
+    """Mark the end of startup for `target`; reports when profiling is active"""
+    global _finished
+    _finished = True
+    phases_file = os.getenv("FCC_STARTUP_PHASES_FILE")
+    if phases_file:
+        # Child of the CLI profiler: hand phases back, the parent owns the import tree
+        Path(phases_file).write_text(json.dumps({"phases": phases(), "wall_ms": _ms(time.perf_counter() - PROCESS_START)}),
+                                     encoding="utf-8")
+        return None
+    if _hook is None:
+        return None
+
+    uninstall()
+    report = build_report(target, _import_roots, phases(), mode="meta_path",
+                          wall_ms=_ms(time.perf_counter() - PROCESS_START))
+    try:
+        path = write_report(report)
+        print(format_report(report), file=sys.stderr)
+        print(f"Startup profile written to {path}", file=sys.stderr, flush=True)
+    except OSError as e:
+        print(f"Startup profile could not be written: {e}", file=sys.stderr, flush=True)
+    return report
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+
+def profile_target(target: str, top: int = 25, timeout: int = 120) -> Dict[str, Any]:
+    """Import `target` in a fresh interpreter under -X importtime and build a report"""
+    with tempfile.TemporaryDirectory() as tmp:
+        phases_file = Path(tmp) / "phases.json"
+        env = os.environ.copy()
+        env.pop("FCC_PROFILE_STARTUP", None)
+        env["FCC_STARTUP_PHASES_FILE"] = str(phases_file)
+        env.setdefault("PYTHONIOENCODING", "utf-8")
+        bootstrap = (
+            "import importlib, startup_profiler\n"
+            f"importlib.import_module({target!r})\n"
+            f"startup_profiler.finish({target!r})\n"
+        )
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", bootstrap],
+            cwd=str(ROOT), env=env, capture_output=True, text=True,
+            encoding="utf-8", errors="replace", timeout=timeout,
+        )
+        wall_ms = _ms(time.perf_counter() - started)
+        if proc.returncode != 0:
+            tail = "\n".join(proc.stderr.splitlines()[-15:])
+            raise RuntimeError(f"Importing {target} failed (exit {proc.returncode}):\n{tail}")
+
+        child = json.loads(phases_file.read_text(encoding="utf-8")) if phases_file.exists() else {}
+
+    report = build_report(target, parse_importtime(proc.stderr), child.get("phases", []),
+                          mode="importtime", wall_ms=wall_ms, top=top)
+    report["interpreter_ms"] = child.get("wall_ms")
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profile import time and init phases of an entry module")
+    parser.add_argument("targets", nargs="*", default=["app_with_setup_wizard"],
+                        help="Modules to profile, e.g. app_with_setup_wizard stripe_mcp plaid_mcp")
+    parser.add_argument("--json", dest="json_path", help="Where to write the JSON report (single target)")
+    parser.add_argument("--top", type=int, default=25, help="Rows per ranked section")
+    args = parser.parse_args(argv)
+
+    for target in args.targets:
+        try:
+            report = profile_target(target, top=args.top)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        path = write_report(report, Path(args.json_path) if args.json_path and len(args.targets) == 1
+                            else DEFAULT_REPORT_DIR / f"startup_{target}.json")
+        print(format_report(report, top=min(args.top, 15)))
+        print(f"\n📄 JSON report: {path}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
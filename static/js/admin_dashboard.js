@@ -0,0 +1,22 @@
+// Live updates: new security audit events are appended to Recent Activity (oldest first, last 10)
+function addActivity(event) {
+    const list = document.getElementById('recentActivity');
+    const placeholder = document.getElementById('noActivity');
+    if (placeholder) placeholder.remove();
+
+    const item = FCCLive.el('div', 'event');
+    item.appendChild(FCCLive.el('strong', '', String(event.timestamp).slice(0, 19)));
+    item.appendChild(document.createTextNode(' - ' + event.event_type + ' by ' + event.client_name));
+    if (event.details && Object.keys(event.details).length) {
+        item.appendChild(document.createElement('br'));
+        item.appendChild(FCCLive.el('small', '', JSON.stringify(event.details)));
+    }
+    list.appendChild(item);
+    while (list.children.length > 10) {
+        list.firstElementChild.remove();
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    FCCLive.connect(['audit'], {audit: addActivity});
+});
@@ -0,0 +1,47 @@
+const refreshIcon = `
+    <svg width="14" height="14" fill="currentColor" viewBox="0 0 20 20" ANIMATION>
+        <path fill-rule="evenodd" d="M4 2a1 1 0 011 1v2.101a7.002 7.002 0 0111.601 2.566 1 1 0 11-1.885.666A5.002 5.002 0 005.999 7H9a1 1 0 010 2H4a1 1 0 01-1-1V3a1 1 0 011-1zm.008 9.057a1 1 0 011.276.61A5.002 5.002 0 0014.001 13H11a1 1 0 110-2h5a1 1 0 011 1v5a1 1 0 11-2 0v-2.101a7.002 7.002 0 01-11.601-2.566 1 1 0 01.61-1.276z" clip-rule="evenodd"/>
+    </svg>`;
+
+const statusLabels = {live: 'Live', reconnecting: 'Reconnecting...', offline: 'Live updates paused'};
+
+function showStatus(state) {
+    const refreshElement = document.getElementById('autoRefresh');
+    if (refreshElement) {
+        refreshElement.innerHTML = refreshIcon.replace('ANIMATION', '') + `<span>${statusLabels[state] || state}</span>`;
+        refreshElement.style.background = '';
+    }
+}
+
+// Swap in a freshly rendered dashboard body without reloading the page
+function refreshPage() {
+    const refreshElement = document.getElementById('autoRefresh');
+    if (refreshElement) {
+        refreshElement.innerHTML = refreshIcon.replace('ANIMATION', 'style="animation: spin 1s linear infinite;"') + '<span>Refreshing...</span>';
+        refreshElement.style.background = 'rgba(40, 167, 69, 0.9)'; // Green background
+    }
+    fetch(window.location.pathname, {headers: {'Accept': 'text/html'}, credentials: 'same-origin'})
+        .then(response => response.text())
+        .then(html => {
+            const fresh = new DOMParser().parseFromString(html, 'text/html').querySelector('.container');
+            const current = document.querySelector('.container');
+            if (fresh && current) {
+                current.replaceWith(fresh);
+            }
+            showStatus('live');
+        })
+        .catch(() => window.location.reload());
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Health transitions are pushed; nothing is polled from the page
+    FCCLive.connect(['health'], {health: refreshPage}, showStatus);
+});
+
+// Add keyboard shortcut (Ctrl+R or F5 equivalent)
+document.addEventListener('keydown', function(e) {
+    if ((e.ctrlKey && e.key === 'r') || e.key === 'F5') {
+        e.preventDefault();
+        refreshPage();
+    }
+});
@@ -0,0 +1,57 @@
+// Server-Sent Events client for /api/live.
+// EventSource reconnects by itself (resending Last-Event-ID); when the server refuses
+// the stream (e.g. 503 at the connection cap) it gives up, so we retry with backoff.
+const FCCLive = {
+    connect(topics, handlers, onStatus) {
+        let delay = 5000;
+        const status = onStatus || function () {};
+
+        function open() {
+            const source = new EventSource('/api/live?topics=' + encodeURIComponent(topics.join(',')));
+            source.onopen = function () {
+                delay = 5000;
+                status('live');
+            };
+            source.onerror = function () {
+                if (source.readyState === EventSource.CLOSED) {
+                    status('offline');
+                    setTimeout(open, delay);
+                    delay = Math.min(delay * 2, 120000);
+                } else {
+                    status('reconnecting');
+                }
+            };
+            Object.keys(handlers).forEach(function (name) {
+                source.addEventListener(name, function (e) {
+                    handlers[name](JSON.parse(e.data));
+                });
+            });
+            // Too far behind to patch: start again from a fresh page
+            source.addEventListener('resync', function () {
+                source.close();
+                (handlers.resync || function () { window.location.reload(); })();
+            });
+        }
+
+        if (window.EventSource) {
+            open();
+        } else {
+            status('offline');
+        }
+    },
+
+    money(value) {
+        return Number(value || 0).toLocaleString('en-US', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+    },
+
+    day(value) {
+        return value ? String(value).slice(0, 10) : 'N/A';
+    },
+
+    el(tag, className, text) {
+        const node = document.createElement(tag);
+        if (className) node.className = className;
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+};
@@ -0,0 +1,131 @@
+// Windowed rendering for long lists: only the rows in (or near) the viewport exist in the DOM.
+// Rows have a fixed height (measured from the first rendered row when `measure` is set);
+// grids lay out `perRow()` items per row.
+class VirtualList {
+    constructor({viewport, body, rowHeight, render, spacer, perRow, onNearEnd, overscan, measure}) {
+        this.viewport = viewport;
+        this.body = body;
+        this.rowHeight = rowHeight;
+        this.render = render;
+        this.spacer = spacer;
+        this.perRow = perRow || (() => 1);
+        this.onNearEnd = onNearEnd || (() => {});
+        this.overscan = overscan || 6;
+        this.measure = measure || false;
+        this.items = [];
+        this.window = null;
+        this.viewport.addEventListener('scroll', () => this.schedule(), {passive: true});
+        window.addEventListener('resize', () => this.refresh(true));
+    }
+
+    setItems(items) {
+        this.items = items;
+        this.viewport.scrollTop = 0;
+        this.refresh(true);
+    }
+
+    append(items) {
+        this.items = this.items.concat(items);
+        this.refresh(true);
+    }
+
+    // Replace the item with the same key, or add it at the top
+    upsert(item, key) {
+        const index = this.items.findIndex(existing => existing[key] === item[key]);
+        if (index >= 0) {
+            this.items[index] = item;
+        } else {
+            this.items.unshift(item);
+        }
+        this.refresh(true);
+    }
+
+    schedule() {
+        if (!this.pending) {
+            this.pending = true;
+            requestAnimationFrame(() => {
+                this.pending = false;
+                this.refresh(false);
+            });
+        }
+    }
+
+    refresh(force) {
+        const perRow = Math.max(1, this.perRow());
+        const rows = Math.ceil(this.items.length / perRow);
+        const visible = Math.ceil(this.viewport.clientHeight / this.rowHeight);
+        const first = Math.max(0, Math.floor(this.viewport.scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(rows, first + visible + 2 * this.overscan);
+
+        const key = [first, last, perRow].join(':');
+        if (!force && key === this.window) return;
+        this.window = key;
+
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(this.spacer(first * this.rowHeight));
+        this.items.slice(first * perRow, last * perRow).forEach(item => fragment.appendChild(this.render(item)));
+        fragment.appendChild(this.spacer((rows - last) * this.rowHeight));
+        this.body.replaceChildren(fragment);
+
+        if (this.measure && last > first) {
+            const height = this.body.children[1].getBoundingClientRect().height;
+            if (height && Math.abs(height - this.rowHeight) > 0.5) {
+                this.rowHeight = height;
+                this.refresh(true);
+                return;
+            }
+        }
+
+        if (last >= rows - this.overscan) {
+            this.onNearEnd();
+        }
+    }
+}
+
+// Cursor-paginated loader for /xero/*/data endpoints
+class PagedSource {
+    constructor(url, onPage, onError) {
+        this.url = url;
+        this.onPage = onPage;
+        this.onError = onError || (() => {});
+        this.generation = 0;
+    }
+
+    // Start a new listing (new filters or sort); pages of the old one are ignored
+    reset(params) {
+        this.params = params;
+        this.cursor = null;
+        this.done = false;
+        this.generation += 1;
+        this.loading = false;
+        return this.next();
+    }
+
+    next() {
+        if (this.loading || this.done) return Promise.resolve();
+        this.loading = true;
+        const generation = this.generation;
+        const query = this.cursor
+            ? new URLSearchParams({cursor: this.cursor})
+            : new URLSearchParams(Object.entries(this.params).filter(([, value]) => value));
+        return fetch(this.url + '?' + query, {headers: {'Accept': 'application/json'}, credentials: 'same-origin'})
+            .then(response => response.json().then(body => ({ok: response.ok, body})))
+            .then(({ok, body}) => {
+                if (generation !== this.generation) return;  // filters changed meanwhile
+                this.loading = false;
+                if (!ok) {
+                    this.done = true;
+                    this.onError(body.error || 'Request failed');
+                    return;
+                }
+                this.cursor = body.next_cursor;
+                this.done = !body.next_cursor;
+                this.onPage(body, body.page === 1);
+            })
+            .catch(error => {
+                if (generation !== this.generation) return;
+                this.loading = false;
+                this.onError(String(error));
+            });
+    }
+}
@@ -0,0 +1,102 @@
+// Contacts are fetched a page at a time from /xero/contacts/data (server-side search,
+// customer/supplier filter and sort) and only the visible rows of cards are rendered.
+const CARD_ROW_HEIGHT = 170;   // .contact-card height + margin (see styles)
+const CARD_MIN_WIDTH = 350;
+const CARD_GAP = 20;
+let contactList;
+let contactPages;
+let contactTotal = null;
+let searchTimer;
+
+function contactCard(contact) {
+    const card = FCCLive.el('div', 'contact-card');
+    card.id = 'contact-' + contact.contact_id;
+
+    const tags = FCCLive.el('div', 'contact-tags');
+    tags.appendChild(FCCLive.el('span', 'tag', 'Status: ' + contact.status));
+    if (contact.is_customer) tags.appendChild(FCCLive.el('span', 'tag customer', 'Customer'));
+    if (contact.is_supplier) tags.appendChild(FCCLive.el('span', 'tag supplier', 'Supplier'));
+
+    card.append(
+        FCCLive.el('div', 'contact-name', contact.name),
+        FCCLive.el('div', 'contact-email', '📧 ' + contact.email),
+        FCCLive.el('div', 'contact-phone', '📞 ' + contact.phone),
+        tags
+    );
+    return card;
+}
+
+function gridSpacer(height) {
+    const spacer = FCCLive.el('div', 'grid-spacer');
+    spacer.style.height = height + 'px';
+    return spacer;
+}
+
+function cardsPerRow() {
+    const grid = document.getElementById('contactsGrid');
+    const perRow = Math.max(1, Math.floor((grid.clientWidth + CARD_GAP) / (CARD_MIN_WIDTH + CARD_GAP)));
+    grid.style.gridTemplateColumns = `repeat(${perRow}, 1fr)`;
+    return perRow;
+}
+
+// Breakdown counts cover the contacts loaded so far; the total comes from Xero
+function updateContactStats() {
+    const items = contactList.items;
+    const loaded = contactPages.done ? '' : `(first ${items.length} loaded)`;
+    document.getElementById('statCount').textContent = contactTotal !== null ? contactTotal : items.length;
+    document.getElementById('statCustomers').textContent = items.filter(c => c.is_customer).length;
+    document.getElementById('statSuppliers').textContent = items.filter(c => c.is_supplier).length;
+    document.getElementById('statWithEmail').textContent = items.filter(c => c.email !== 'N/A').length;
+    document.querySelectorAll('.stat-scope').forEach(node => node.textContent = loaded);
+    document.getElementById('listStatus').textContent =
+        items.length ? (contactPages.done ? `All ${items.length} contacts loaded` : 'Scroll for more…') : 'No contacts found';
+}
+
+function showError(message) {
+    const status = document.getElementById('listStatus');
+    status.textContent = 'Could not load contacts: ' + message;
+    status.classList.add('error');
+}
+
+function filterContacts() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(function() {
+        const status = document.getElementById('listStatus');
+        status.textContent = 'Loading contacts…';
+        status.classList.remove('error');
+        contactPages.reset({
+            q: document.getElementById('searchBox').value.trim(),
+            kind: document.getElementById('kindFilter').value,
+            sort: document.getElementById('sortOrder').value
+        });
+    }, 300);
+}
+
+// Live updates: changed contacts are pushed and patched in place
+function applyContact(contact) {
+    const kind = document.getElementById('kindFilter').value;
+    const listed = contactList.items.some(existing => existing.contact_id === contact.contact_id);
+    if (listed || !kind || contact['is_' + kind]) {
+        contactList.upsert(contact, 'contact_id');
+        updateContactStats();
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    contactList = new VirtualList({
+        viewport: document.getElementById('contactsViewport'),
+        body: document.getElementById('contactsGrid'),
+        rowHeight: CARD_ROW_HEIGHT,
+        perRow: cardsPerRow,
+        render: contactCard,
+        spacer: gridSpacer,
+        onNearEnd: () => contactPages.next()
+    });
+    contactPages = new PagedSource('/xero/contacts/data', function(page, first) {
+        contactTotal = page.total;
+        first ? contactList.setItems(page.items) : contactList.append(page.items);
+        updateContactStats();
+    }, showError);
+    filterContacts();
+    FCCLive.connect(['xero.contacts'], {'xero.contacts': applyContact});
+});
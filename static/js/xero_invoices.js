@@ -0,0 +1,105 @@
+// Rows are fetched a page at a time from /xero/invoices/data (server-side search, status
+// filter and sort) and only the visible ones are rendered.
+let invoiceList;
+let invoicePages;
+let invoiceTotal = null;
+let searchTimer;
+
+function invoiceRow(invoice) {
+    const row = document.createElement('tr');
+    row.className = 'invoice-row';
+    row.id = 'invoice-' + invoice.invoice_id;
+
+    const number = FCCLive.el('td');
+    number.appendChild(FCCLive.el('strong', '', invoice.invoice_number));
+    const type = FCCLive.el('td');
+    type.appendChild(FCCLive.el('span', 'type-badge type-' + String(invoice.type).toLowerCase(), invoice.type));
+    const status = FCCLive.el('td');
+    status.appendChild(FCCLive.el('span', 'status-badge status-' + String(invoice.status).toLowerCase(), invoice.status));
+    const dueClass = invoice.amount_due > 0 ? 'positive' : invoice.amount_due < 0 ? 'negative' : '';
+
+    row.append(
+        number,
+        FCCLive.el('td', '', invoice.contact_name),
+        type,
+        status,
+        FCCLive.el('td', '', FCCLive.day(invoice.date)),
+        FCCLive.el('td', '', FCCLive.day(invoice.due_date)),
+        FCCLive.el('td', 'amount positive', invoice.currency_code + ' $' + FCCLive.money(invoice.total)),
+        FCCLive.el('td', ('amount ' + dueClass).trim(), '$' + FCCLive.money(invoice.amount_due))
+    );
+    return row;
+}
+
+function spacerRow(height) {
+    const row = document.createElement('tr');
+    row.className = 'spacer-row';
+    const cell = document.createElement('td');
+    cell.colSpan = 8;
+    cell.style.height = height + 'px';
+    row.appendChild(cell);
+    return row;
+}
+
+// Amount totals cover the invoices loaded so far; the count comes from Xero
+function updateInvoiceStats() {
+    const items = invoiceList.items;
+    const sum = key => items.reduce((total, invoice) => total + Number(invoice[key] || 0), 0);
+    const loaded = invoicePages.done ? '' : `(first ${items.length} loaded)`;
+    document.getElementById('statCount').textContent = invoiceTotal !== null ? invoiceTotal : items.length;
+    document.getElementById('statTotal').textContent = '$' + FCCLive.money(sum('total'));
+    document.getElementById('statDue').textContent = '$' + FCCLive.money(sum('amount_due'));
+    document.getElementById('statPaid').textContent = '$' + FCCLive.money(sum('amount_paid'));
+    document.querySelectorAll('.stat-scope').forEach(node => node.textContent = loaded);
+    document.getElementById('listStatus').textContent =
+        items.length ? (invoicePages.done ? `All ${items.length} invoices loaded` : 'Scroll for more…') : 'No invoices found';
+}
+
+function showError(message) {
+    const status = document.getElementById('listStatus');
+    status.textContent = 'Could not load invoices: ' + message;
+    status.classList.add('error');
+}
+
+function filterInvoices() {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(function() {
+        const status = document.getElementById('listStatus');
+        status.textContent = 'Loading invoices…';
+        status.classList.remove('error');
+        invoicePages.reset({
+            q: document.getElementById('searchBox').value.trim(),
+            status: document.getElementById('statusFilter').value,
+            sort: document.getElementById('sortOrder').value
+        });
+    }, 300);
+}
+
+// Live updates: changed invoices are pushed and patched in place
+function applyInvoice(invoice) {
+    const statuses = document.getElementById('statusFilter').value.split(',').filter(Boolean);
+    const listed = invoiceList.items.some(existing => existing.invoice_id === invoice.invoice_id);
+    if (listed || !statuses.length || statuses.includes(invoice.status)) {
+        invoiceList.upsert(invoice, 'invoice_id');
+        updateInvoiceStats();
+    }
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    invoiceList = new VirtualList({
+        viewport: document.getElementById('invoiceViewport'),
+        body: document.getElementById('invoiceTableBody'),
+        rowHeight: 48,
+        measure: true,
+        render: invoiceRow,
+        spacer: spacerRow,
+        onNearEnd: () => invoicePages.next()
+    });
+    invoicePages = new PagedSource('/xero/invoices/data', function(page, first) {
+        invoiceTotal = page.total;
+        first ? invoiceList.setItems(page.items) : invoiceList.append(page.items);
+        updateInvoiceStats();
+    }, showError);
+    filterInvoices();
+    FCCLive.connect(['xero.invoices'], {'xero.invoices': applyInvoice});
+});
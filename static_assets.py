@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Static Assets for Financial Command Center AI
+Content-fingerprinted URLs for the CSS/JS under static/, so pages link to files that can be
+cached forever instead of repeating inline <style> blocks in every response:
+- asset_url('css/health.css') -> '/static/css/health.3f2a9c1b7e.css'
+- fingerprinted requests are answered with `Cache-Control: public, max-age=31536000, immutable`;
+  plain or stale-hash requests still work but must revalidate
+- nginx can serve the same URLs straight from disk (see nginx/ssl.conf)
+
+Usage:
+    configure_static_assets(app)         # done by configure_page_templates()
+    <link rel="stylesheet" href="{{ asset_url('css/health.css') }}">
+
+Environment (optional):
+    FCC_TEMPLATES_AUTO_RELOAD=1          # also re-hash assets when they change on disk
+"""
+
+import os
+import re
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, send_from_directory, url_for
+
+logger = logging.getLogger(__name__)
+
+HASH_LENGTH = 10
+IMMUTABLE = "public, max-age=31536000, immutable"
+FINGERPRINTED = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$' % HASH_LENGTH)
+
+
+class AssetManifest:
+    """Content hashes for files under a static folder, computed once (or on change when watching)"""
+
+    def __init__(self, root: str, watch: bool = False):
+        self.root = root
+        self.watch = watch
+        self._entries: Dict[str, Tuple[int, str]] = {}   # filename -> (mtime_ns, digest)
+        self._lock = threading.Lock()
+
+    def scan(self) -> int:
+        """Hash every file up front (before workers fork, when preloading)"""
+        count = 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                rel = os.path.relpath(os.path.join(dirpath, name), self.root).replace(os.sep, '/')
+                if self.digest(rel):
+                    count += 1
+        return count
+
+    def digest(self, filename: str) -> Optional[str]:
+        entry = self._entries.get(filename)
+        if entry is not None and not self.watch:
+            return entry[1]
+        path = os.path.join(self.root, *filename.split('/'))
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:HASH_LENGTH]
+        with self._lock:
+            self._entries[filename] = (mtime, digest)
+        return digest
+
+    def fingerprint(self, filename: str) -> str:
+        """'css/health.css' -> 'css/health.<digest>.css' (unchanged if the file is missing)"""
+        digest = self.digest(filename)
+        if digest is None:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return f"{stem}.{digest}{ext}"
+
+    def resolve(self, requested: str) -> Tuple[str, bool]:
+        """Map a requested name to (file on disk, whether it may be cached as immutable)"""
+        match = FINGERPRINTED.match(requested)
+        if match:
+            filename = match.group('stem') + match.group('ext')
+            digest = self.digest(filename)
+            if digest is not None:
+                # A stale hash still gets today's file, just not with a year-long cache lifetime
+                return filename, digest == match.group('digest')
+        return requested, False
+
+
+def asset_url(filename: str) -> str:
+    """Fingerprinted URL for a file under static/ (needs an app context)"""
+    manifest = current_app.extensions['static_assets']
+    return url_for('static', filename=manifest.fingerprint(filename))
+
+
+def configure_static_assets(app, watch: Optional[bool] = None) -> Optional[AssetManifest]:
+    """Serve static/ with fingerprinted, immutable URLs and add asset_url() to templates (idempotent)"""
+    if 'static_assets' in app.extensions:
+        return app.extensions['static_assets']
+    if not app.static_folder or 'static' not in app.view_functions:
+        logger.warning("No static folder; asset_url() will not be available")
+        return None
+
+    if watch is None:
+        watch = bool(app.jinja_env.auto_reload)
+    manifest = AssetManifest(app.static_folder, watch=watch)
+    logger.debug(f"Fingerprinted {manifest.scan()} static assets")
+
+    def static(filename):
+        real, immutable = manifest.resolve(filename)
+        response = send_from_directory(app.static_folder, real, max_age=0)
+        response.headers['Cache-Control'] = IMMUTABLE if immutable else 'no-cache'
+        response.expires = None
+        return response
+
+    app.view_functions['static'] = static
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.extensions['static_assets'] = manifest
+    return manifest
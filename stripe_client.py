@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Stripe Client for Financial Command Center AI
+Explicit StripeClient instances bound to an API key instead of the global stripe.api_key,
+so threaded workers (gunicorn gthread) can make concurrent payment calls safely
+
+Usage:
+    from stripe_client import get_stripe_client
+
+    client = get_stripe_client(stripe_key)
+    pi = client.v1.payment_intents.create(params={...}, options={"idempotency_key": key})
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from lazy_imports import lazy_import
+
+logger = logging.getLogger(__name__)
+
+stripe = lazy_import("stripe")
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_http_client = None
+
+
+def _pool_size() -> int:
+    return max(1, int(os.getenv("FCC_STRIPE_POOL_SIZE", "20")))
+
+
+def _timeout() -> float:
+    return float(os.getenv("FCC_STRIPE_TIMEOUT", "30"))
+
+
+def _get_http_client():
+    """One requests.Session per process, with a connection pool sized for the worker's threads"""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=_pool_size())
+                session.mount("https://", adapter)
+                _http_client = stripe.RequestsClient(session=session, timeout=_timeout())
+                logger.info(f"Stripe HTTP pool ready (maxsize={_pool_size()})")
+    return _http_client
+
+
+def _new_client(api_key: str, stripe_version: Optional[str]):
+    return stripe.StripeClient(
+        api_key,
+        stripe_version=stripe_version,
+        max_network_retries=int(os.getenv("STRIPE_MAX_RETRIES", "2")),
+        http_client=_get_http_client(),
+    )
+
+
+def get_stripe_client(api_key: Optional[str] = None, stripe_version: Optional[str] = None, cache: bool = True):
+    """
+    StripeClient for `api_key` (default: STRIPE_API_KEY).
+    Cached per key and API version; pass cache=False for one-off keys such as setup-wizard validation.
+    """
+    api_key = api_key or os.getenv("STRIPE_API_KEY")
+    if not api_key:
+        raise RuntimeError("Stripe not configured. Set STRIPE_API_KEY or complete the setup wizard.")
+    stripe_version = stripe_version or os.getenv("STRIPE_API_VERSION") or None
+
+    if not cache:
+        return _new_client(api_key, stripe_version)
+
+    key = (api_key, stripe_version)
+    client = _clients.get(key)
+    if client is None:
+        _get_http_client()  # built outside the cache lock (it takes the same lock)
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _new_client(api_key, stripe_version)
+    return client
+
+
+def clear_stripe_clients() -> None:
+    """Forget cached clients and the HTTP pool (key rotation, tests, forked children)"""
+    global _lock, _http_client
+    _clients.clear()
+    _http_client = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Never share pooled sockets between a preloading parent and its workers
+    os.register_at_fork(after_in_child=clear_stripe_clients)
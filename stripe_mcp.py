@@ -14,6 +14,10 @@
 # - In production, prefer confirm client-side (confirm_now=False) with Stripe.js.
 # - Webhooks: use verify_webhook() to check signatures; host HTTP separately as needed.
 
+from __future__ import annotations
+
+import startup_profiler
+startup_profiler.install()  # times imports when FCC_PROFILE_STARTUP is set
 import os
 import re
 import sys
@@ -21,18 +25,25 @@ import json
 from uuid import uuid4
 from typing import Optional, Dict, Any, List, Literal, Union
 
-import stripe
 from mcp.server.fastmcp import FastMCP
+from lazy_imports import lazy_import
+from stripe_client import get_stripe_client
 
 # -----------------------------------------------------------------------------
 # Config & App
 # -----------------------------------------------------------------------------
 
-app = FastMCP("stripe-integration")
+with startup_profiler.phase("fastmcp_app"):
+    app = FastMCP("stripe-integration")
+
+STRIPE_API_VERSION = os.environ.get("STRIPE_API_VERSION", "2024-06-20")  # pin what you test with
+
+# Stripe SDK global tuning, applied when the SDK is first imported (first tool call)
+def _configure_stripe(module) -> None:
+    module.api_version = STRIPE_API_VERSION
+    module.max_network_retries = int(os.environ.get("STRIPE_MAX_RETRIES", "2"))
 
-# Stripe SDK global tuning (safe to set at import time)
-stripe.api_version = os.environ.get("STRIPE_API_VERSION", "2024-06-20")  # pin what you test with
-stripe.max_network_retries = int(os.environ.get("STRIPE_MAX_RETRIES", "2"))
+stripe = lazy_import("stripe", on_load=_configure_stripe)
 
 # Environment toggles
 def _bool_env(name: str, default: bool = False) -> bool:
@@ -53,7 +64,7 @@ print(
     json.dumps({
         "msg": "stripe_mcp starting",
         "prod": PRODUCTION_MODE,
-        "api_version": stripe.api_version,
+        "api_version": STRIPE_API_VERSION,
         "default_currency": DEFAULT_CURRENCY,
     }),
     file=sys.stderr,
@@ -113,14 +124,18 @@ def _validate_email(email: Optional[str]) -> Optional[str]:
 def _idempo(prefix: str, provided: Optional[str] = None) -> str:
     return provided or f"{prefix}-{uuid4()}"
 
-def set_stripe_key_or_die() -> None:
+def stripe_client_or_die() -> stripe.StripeClient:
+    """Pooled, thread-safe client bound to STRIPE_API_KEY (no global stripe.api_key)."""
     key = os.environ.get("STRIPE_API_KEY")
     if not key:
         raise RuntimeError(
             "Set STRIPE_API_KEY in the environment before running. "
             "Example (PowerShell):  $env:STRIPE_API_KEY='sk_test_...'"
         )
-    stripe.api_key = key
+    return get_stripe_client(key, stripe_version=STRIPE_API_VERSION)
+
+def _params(**kwargs: Any) -> Dict[str, Any]:
+    return {k: v for k, v in kwargs.items() if v is not None}
 
 # -----------------------------------------------------------------------------
 # Tools: Payments core
@@ -152,7 +167,7 @@ def process_payment(
     In test/dev, you can set confirm_now=True to confirm server-side with a test PM.
     """
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         amount_cents = _to_cents(amount_dollars)
         curr = _validate_currency(currency or DEFAULT_CURRENCY)
         email = _validate_email(customer_email)
@@ -195,9 +210,9 @@ def process_payment(
             kwargs["payment_method"] = test_payment_method
             kwargs["confirm"] = True
 
-        pi: stripe.PaymentIntent = stripe.PaymentIntent.create(
-            **kwargs,
-            idempotency_key=_idempo("pi", idempotency_key)
+        pi: stripe.PaymentIntent = sc.v1.payment_intents.create(
+            params=kwargs,
+            options={"idempotency_key": _idempo("pi", idempotency_key)},
         )
 
         return {
@@ -225,8 +240,8 @@ def process_payment(
 def check_payment_status(payment_intent_id: str) -> Dict[str, Any]:
     """Retrieve a PaymentIntent and return details."""
     try:
-        set_stripe_key_or_die()
-        pi: stripe.PaymentIntent = stripe.PaymentIntent.retrieve(payment_intent_id)
+        sc = stripe_client_or_die()
+        pi: stripe.PaymentIntent = sc.v1.payment_intents.retrieve(payment_intent_id)
         return {
             "id": pi.id,
             "status": pi.status,
@@ -250,15 +265,15 @@ def process_refund(
 ) -> Dict[str, Any]:
     """Refund a PaymentIntent (full if no amount specified)."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {"payment_intent": payment_intent_id}
         if refund_amount_dollars is not None:
             cents = _to_cents(refund_amount_dollars)
             kwargs["amount"] = cents
 
-        refund: stripe.Refund = stripe.Refund.create(
-            **kwargs,
-            idempotency_key=_idempo("rf", idempotency_key)
+        refund: stripe.Refund = sc.v1.refunds.create(
+            params=kwargs,
+            options={"idempotency_key": _idempo("rf", idempotency_key)},
         )
         return {
             "id": refund.id,
@@ -280,15 +295,15 @@ def capture_payment_intent(
 ) -> Dict[str, Any]:
     """Capture funds for a previously authorized PaymentIntent."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {}
         if amount_to_capture_dollars is not None:
             kwargs["amount_to_capture"] = _to_cents(amount_to_capture_dollars)
 
-        pi: stripe.PaymentIntent = stripe.PaymentIntent.capture(
+        pi: stripe.PaymentIntent = sc.v1.payment_intents.capture(
             payment_intent_id,
-            **kwargs,
-            idempotency_key=_idempo("cap", idempotency_key)
+            params=kwargs,
+            options={"idempotency_key": _idempo("cap", idempotency_key)},
         )
         return {"id": pi.id, "status": pi.status, "amount_received": _from_cents(getattr(pi, "amount_received", None))}
     except Exception as e:
@@ -299,8 +314,8 @@ def capture_payment_intent(
 def cancel_payment_intent(payment_intent_id: str, reason: Optional[str] = None) -> Dict[str, Any]:
     """Cancel a PaymentIntent."""
     try:
-        set_stripe_key_or_die()
-        pi: stripe.PaymentIntent = stripe.PaymentIntent.cancel(payment_intent_id, cancellation_reason=reason)
+        sc = stripe_client_or_die()
+        pi: stripe.PaymentIntent = sc.v1.payment_intents.cancel(payment_intent_id, params=_params(cancellation_reason=reason))
         return {"id": pi.id, "status": pi.status, "cancellation_reason": getattr(pi, "cancellation_reason", None)}
     except Exception as e:
         return _err(e)
@@ -312,10 +327,10 @@ def cancel_payment_intent(payment_intent_id: str, reason: Optional[str] = None)
 @app.tool()
 def create_customer(email: Optional[str] = None, name: Optional[str] = None, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         if email:
             _validate_email(email)
-        cust: stripe.Customer = stripe.Customer.create(email=email, name=name, metadata=metadata or {})
+        cust: stripe.Customer = sc.v1.customers.create(params=_params(email=email, name=name, metadata=metadata or {}))
         return {"id": cust.id, "email": cust.email, "name": cust.name}
     except Exception as e:
         return _err(e)
@@ -325,13 +340,13 @@ def create_customer(email: Optional[str] = None, name: Optional[str] = None, met
 def create_setup_intent(customer_id: Optional[str] = None, payment_method_types: Optional[List[str]] = None) -> Dict[str, Any]:
     """Create a SetupIntent to save a card for future use."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {}
         if customer_id:
             kwargs["customer"] = customer_id
         if payment_method_types:
             kwargs["payment_method_types"] = payment_method_types
-        si: stripe.SetupIntent = stripe.SetupIntent.create(**kwargs)
+        si: stripe.SetupIntent = sc.v1.setup_intents.create(params=kwargs)
         return {"id": si.id, "status": si.status, "client_secret": getattr(si, "client_secret", None)}
     except Exception as e:
         return _err(e)
@@ -340,9 +355,9 @@ def create_setup_intent(customer_id: Optional[str] = None, payment_method_types:
 @app.tool()
 def list_payment_methods(customer_id: str, type: Literal["card", "us_bank_account", "sepa_debit"] = "card") -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        pms = stripe.PaymentMethod.list(customer=customer_id, type=type)
-        return {"data": [{"id": pm.id, "type": pm.type, "card": getattr(pm, "card", None)} for pm in pms.auto_paging_iter(limit=20)]}
+        sc = stripe_client_or_die()
+        pms = sc.v1.payment_methods.list(params={"customer": customer_id, "type": type, "limit": 20})
+        return {"data": [{"id": pm.id, "type": pm.type, "card": getattr(pm, "card", None)} for pm in pms.data]}
     except Exception as e:
         return _err(e)
 
@@ -350,8 +365,8 @@ def list_payment_methods(customer_id: str, type: Literal["card", "us_bank_accoun
 @app.tool()
 def attach_payment_method(customer_id: str, payment_method_id: str) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        pm = stripe.PaymentMethod.attach(payment_method_id, customer=customer_id)
+        sc = stripe_client_or_die()
+        pm = sc.v1.payment_methods.attach(payment_method_id, params={"customer": customer_id})
         return {"id": pm.id, "customer": pm.customer, "type": pm.type}
     except Exception as e:
         return _err(e)
@@ -360,8 +375,8 @@ def attach_payment_method(customer_id: str, payment_method_id: str) -> Dict[str,
 @app.tool()
 def detach_payment_method(payment_method_id: str) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        pm = stripe.PaymentMethod.detach(payment_method_id)
+        sc = stripe_client_or_die()
+        pm = sc.v1.payment_methods.detach(payment_method_id)
         return {"id": pm.id, "customer": pm.customer, "type": pm.type}
     except Exception as e:
         return _err(e)
@@ -373,8 +388,8 @@ def detach_payment_method(payment_method_id: str) -> Dict[str, Any]:
 @app.tool()
 def create_product(name: str, metadata: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        p: stripe.Product = stripe.Product.create(name=name, metadata=metadata or {})
+        sc = stripe_client_or_die()
+        p: stripe.Product = sc.v1.products.create(params={"name": name, "metadata": metadata or {}})
         return {"id": p.id, "name": p.name}
     except Exception as e:
         return _err(e)
@@ -383,12 +398,12 @@ def create_product(name: str, metadata: Optional[Dict[str, str]] = None) -> Dict
 @app.tool()
 def create_price(product_id: str, unit_amount_dollars: float, currency: Optional[str] = None, recurring_interval: Optional[str] = None) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         curr = _validate_currency(currency or DEFAULT_CURRENCY)
         kwargs: Dict[str, Any] = {"product": product_id, "unit_amount": _to_cents(unit_amount_dollars), "currency": curr}
         if recurring_interval:
             kwargs["recurring"] = {"interval": recurring_interval}
-        price: stripe.Price = stripe.Price.create(**kwargs)
+        price: stripe.Price = sc.v1.prices.create(params=kwargs)
         return {"id": price.id, "unit_amount_dollars": _from_cents(price.unit_amount), "currency": price.currency, "recurring": getattr(price, "recurring", None)}
     except Exception as e:
         return _err(e)
@@ -406,7 +421,7 @@ def create_checkout_session(
 ) -> Dict[str, Any]:
     """Hosted Checkout (handles redirects automatically)."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {
             "mode": mode,
             "line_items": line_items,
@@ -417,7 +432,7 @@ def create_checkout_session(
         }
         if customer_id:
             kwargs["customer"] = customer_id
-        cs: stripe.checkout.Session = stripe.checkout.Session.create(**kwargs)
+        cs: stripe.checkout.Session = sc.v1.checkout.sessions.create(params=kwargs)
         return {"id": cs.id, "url": getattr(cs, "url", None), "mode": cs.mode}
     except Exception as e:
         return _err(e)
@@ -427,11 +442,11 @@ def create_checkout_session(
 def create_subscription(customer_id: str, price_id: str, trial_days: Optional[int] = None, payment_behavior: str = "default_incomplete") -> Dict[str, Any]:
     """Create a subscription (incomplete until payment is confirmed)."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {"customer": customer_id, "items": [{"price": price_id}], "payment_behavior": payment_behavior}
         if trial_days:
             kwargs["trial_period_days"] = trial_days
-        sub: stripe.Subscription = stripe.Subscription.create(**kwargs)
+        sub: stripe.Subscription = sc.v1.subscriptions.create(params=kwargs)
         return {"id": sub.id, "status": sub.status, "latest_invoice": getattr(sub, "latest_invoice", None)}
     except Exception as e:
         return _err(e)
@@ -440,10 +455,10 @@ def create_subscription(customer_id: str, price_id: str, trial_days: Optional[in
 @app.tool()
 def cancel_subscription(subscription_id: str, at_period_end: bool = False) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        sub: stripe.Subscription = stripe.Subscription.modify(subscription_id, cancel_at_period_end=at_period_end)
+        sc = stripe_client_or_die()
+        sub: stripe.Subscription = sc.v1.subscriptions.update(subscription_id, params={"cancel_at_period_end": at_period_end})
         if not at_period_end:
-            sub = stripe.Subscription.delete(subscription_id)
+            sub = sc.v1.subscriptions.cancel(subscription_id)
         return {"id": sub.id, "status": sub.status, "cancel_at_period_end": getattr(sub, "cancel_at_period_end", None)}
     except Exception as e:
         return _err(e)
@@ -456,11 +471,11 @@ def cancel_subscription(subscription_id: str, at_period_end: bool = False) -> Di
 def list_payments(limit: int = 10, customer_id: Optional[str] = None) -> Dict[str, Any]:
     """List recent charges (Payments)."""
     try:
-        set_stripe_key_or_die()
+        sc = stripe_client_or_die()
         kwargs: Dict[str, Any] = {"limit": min(max(limit, 1), 100)}
         if customer_id:
             kwargs["customer"] = customer_id
-        charges = stripe.Charge.list(**kwargs)
+        charges = sc.v1.charges.list(params=kwargs)
         out = []
         for ch in charges:
             out.append({
@@ -479,8 +494,8 @@ def list_payments(limit: int = 10, customer_id: Optional[str] = None) -> Dict[st
 @app.tool()
 def retrieve_charge(charge_id: str) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        ch = stripe.Charge.retrieve(charge_id)
+        sc = stripe_client_or_die()
+        ch = sc.v1.charges.retrieve(charge_id)
         return {"id": ch.id, "amount_dollars": _from_cents(ch.amount), "currency": ch.currency, "status": ch.status}
     except Exception as e:
         return _err(e)
@@ -489,8 +504,8 @@ def retrieve_charge(charge_id: str) -> Dict[str, Any]:
 @app.tool()
 def retrieve_refund(refund_id: str) -> Dict[str, Any]:
     try:
-        set_stripe_key_or_die()
-        rf = stripe.Refund.retrieve(refund_id)
+        sc = stripe_client_or_die()
+        rf = sc.v1.refunds.retrieve(refund_id)
         return {"id": rf.id, "amount_dollars": _from_cents(rf.amount), "status": rf.status, "charge": getattr(rf, "charge", None)}
     except Exception as e:
         return _err(e)
@@ -506,8 +521,8 @@ def verify_webhook(payload: str, signature_header: str, webhook_secret: str) ->
     Use this to validate incoming events from your HTTP endpoint.
     """
     try:
-        set_stripe_key_or_die()  # not strictly needed for verification, but keeps env consistent
-        event = stripe.Webhook.construct_event(payload=payload, sig_header=signature_header, secret=webhook_secret)
+        sc = stripe_client_or_die()  # not strictly needed for verification, but keeps env consistent
+        event = sc.construct_event(payload, signature_header, webhook_secret)
         return {"ok": True, "id": event["id"], "type": event["type"], "created": event["created"]}
     except Exception as e:
         return _err(e)
@@ -524,7 +539,9 @@ def ping() -> Dict[str, Any]:
 # Entry
 # -----------------------------------------------------------------------------
 
+startup_profiler.finish('stripe_mcp')
+
 if __name__ == "__main__":
     # Optional early validation if running directly (uv run python stripe_mcp.py)
-    set_stripe_key_or_die()
+    stripe_client_or_die()
     app.run()  # stdio transport by default
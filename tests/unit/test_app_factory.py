@@ -0,0 +1,62 @@
+# tests/unit/test_app_factory.py - create_app() factory and lazy Xero integration tests
+import pytest
+
+
+@pytest.fixture
+def wizard_module(temp_dir, monkeypatch):
+    """app_with_setup_wizard imported with its runtime files kept out of the repo"""
+    monkeypatch.chdir(temp_dir)
+    import app_with_setup_wizard
+    return app_with_setup_wizard
+
+
+class TestCreateApp:
+    """Factory wiring"""
+
+    def test_routes_keep_endpoint_names(self, wizard_module):
+        app = wizard_module.create_app({'TESTING': True})
+        for endpoint in ('index', 'setup_wizard', 'health_check', 'admin_dashboard', 'get_xero_invoices'):
+            assert endpoint in app.view_functions
+        assert app.config['TESTING'] is True
+
+    def test_apps_are_independent(self, wizard_module):
+        first = wizard_module.create_app()
+        second = wizard_module.create_app()
+        assert first.extensions['xero_integration'] is not second.extensions['xero_integration']
+
+
+class TestLazyXeroIntegration:
+    """Xero client is built on first use and cached per worker"""
+
+    def test_not_built_at_create_time(self, wizard_module, monkeypatch):
+        calls = []
+        original = wizard_module.initialize_xero_client
+        monkeypatch.setattr(wizard_module, 'initialize_xero_client',
+                            lambda app: calls.append(app) or original(app))
+
+        app = wizard_module.create_app()
+        integration = app.extensions['xero_integration']
+        assert calls == []
+
+        assert integration.available is True
+        assert integration.get_api_client() is integration.get_api_client()
+        assert len(calls) == 1
+
+    def test_reset_rebuilds_on_next_use(self, wizard_module):
+        integration = wizard_module.create_app().extensions['xero_integration']
+        client = integration.get_api_client()
+        integration.reset()
+        assert integration.get_api_client() is not client
+
+    def test_unconfigured_xero_reports_unavailable(self, wizard_module, monkeypatch):
+        monkeypatch.setattr(wizard_module, 'initialize_xero_client', lambda app: None)
+        app = wizard_module.create_app()
+        assert app.extensions['xero_integration'].available is False
+        response = app.test_client().get('/login')
+        assert response.status_code == 400
+
+    def test_forked_child_drops_cached_client(self, wizard_module):
+        integration = wizard_module.create_app().extensions['xero_integration']
+        integration.get_api_client()
+        wizard_module.XeroIntegration._after_fork_in_child()
+        assert integration._loaded is False
@@ -0,0 +1,109 @@
+# tests/unit/test_compression.py - gzip/brotli compression middleware tests
+import gzip
+import json
+
+import pytest
+from flask import Flask, Response, jsonify, request
+
+
+@pytest.fixture
+def compressed_app():
+    """Flask app wrapped in CompressionMiddleware"""
+    from compression import CompressionMiddleware
+    app = Flask(__name__)
+    rows = [{'invoice_id': f'INV-{i:04d}', 'customer': 'Acme Corporation', 'amount': i * 10.5} for i in range(200)]
+
+    @app.route('/big')
+    def big():
+        return jsonify({'invoices': rows})
+
+    @app.route('/small')
+    def small():
+        return jsonify({'ok': True})
+
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' + b'\x00' * 4096, mimetype='image/png')
+
+    @app.route('/stream')
+    def stream():
+        return Response((json.dumps(row) + '\n' for row in rows), mimetype='application/x-ndjson')
+
+    @app.route('/versioned')
+    def versioned():
+        response = jsonify({'invoices': rows})
+        response.set_etag('v1')
+        return response.make_conditional(request)
+
+    @app.route('/static/app.css')
+    def css():
+        return Response('.card { padding: 20px; }\n' * 200, mimetype='text/css')
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=512)
+    return app
+
+
+class TestNegotiation:
+    """Accept-Encoding handling"""
+
+    def test_choose_encoding(self):
+        from compression import choose_encoding
+        assert choose_encoding('gzip, deflate, br') == 'br'
+        assert choose_encoding('gzip, deflate, br', brotli_available=False) == 'gzip'
+        assert choose_encoding('br;q=0, gzip;q=0.5') == 'gzip'
+        assert choose_encoding('identity') is None
+        assert choose_encoding('') is None
+
+    def test_gzip_json(self, compressed_app):
+        response = compressed_app.test_client().get('/big', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        assert len(json.loads(gzip.decompress(response.data))['invoices']) == 200
+
+    def test_brotli_json(self, compressed_app):
+        brotli = pytest.importorskip('brotli')
+        response = compressed_app.test_client().get('/big', headers={'Accept-Encoding': 'br, gzip'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert len(json.loads(brotli.decompress(response.data))['invoices']) == 200
+
+
+class TestThresholds:
+    """Size and content-type limits"""
+
+    def test_small_and_binary_responses_untouched(self, compressed_app):
+        client = compressed_app.test_client()
+        assert 'Content-Encoding' not in client.get('/small', headers={'Accept-Encoding': 'gzip'}).headers
+        assert 'Content-Encoding' not in client.get('/image', headers={'Accept-Encoding': 'gzip'}).headers
+
+    def test_no_accept_encoding(self, compressed_app):
+        response = compressed_app.test_client().get('/big')
+        assert 'Content-Encoding' not in response.headers
+
+
+class TestStreamingAndCaching:
+    """Chunked responses, ETags and static payloads"""
+
+    def test_streamed_response_compressed(self, compressed_app):
+        response = compressed_app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).decode().splitlines()
+        assert len(lines) == 200
+
+    def test_etag_suffixed_and_revalidates(self, compressed_app):
+        client = compressed_app.test_client()
+        first = client.get('/versioned', headers={'Accept-Encoding': 'gzip'})
+        assert first.headers['ETag'] == '"v1-gzip"'
+        second = client.get('/versioned', headers={'Accept-Encoding': 'gzip', 'If-None-Match': '"v1-gzip"'})
+        assert second.status_code == 304
+        assert second.headers['ETag'] == '"v1-gzip"'
+
+    def test_static_payload_compressed_once(self, compressed_app):
+        middleware = compressed_app.wsgi_app
+        client = compressed_app.test_client()
+        first = client.get('/static/app.css', headers={'Accept-Encoding': 'gzip'})
+        assert len(middleware.static_cache._entries) == 1
+        second = client.get('/static/app.css', headers={'Accept-Encoding': 'gzip'})
+        assert first.data == second.data
+        assert gzip.decompress(second.data).startswith(b'.card')
@@ -0,0 +1,100 @@
+# tests/unit/test_conditional.py - ETag / conditional GET tests
+import pytest
+from flask import Flask, jsonify
+
+
+@pytest.fixture
+def versioned_app(monkeypatch):
+    """Tiny app with one versioned and one unversioned route"""
+    import conditional as conditional_module
+    from conditional import conditional, DataVersions, Version
+
+    state = {'current': Version('v1', 1_700_000_000.0)}
+    versions = DataVersions()
+    versions.register('items', lambda: state['current'])
+    monkeypatch.setattr(conditional_module, 'data_versions', versions)
+
+    calls = []
+    app = Flask(__name__)
+
+    @app.route('/items')
+    @conditional('items', cache_control='private, max-age=5')
+    def items():
+        calls.append('items')
+        return jsonify({'items': [1, 2, 3]})
+
+    @app.route('/unversioned')
+    @conditional('nothing-registered')
+    def unversioned():
+        calls.append('unversioned')
+        return jsonify({'ok': True})
+
+    return app, state, calls
+
+
+class TestVersionedRoutes:
+    """ETags computed from the data version"""
+
+    def test_matching_etag_skips_the_view(self, versioned_app):
+        app, _, calls = versioned_app
+        client = app.test_client()
+        first = client.get('/items')
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, max-age=5'
+
+        second = client.get('/items', headers={'If-None-Match': first.headers['ETag']})
+        assert second.status_code == 304
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert calls == ['items']
+
+    def test_new_version_changes_etag(self, versioned_app):
+        from conditional import Version
+        app, state, _ = versioned_app
+        client = app.test_client()
+        etag = client.get('/items').headers['ETag']
+        state['current'] = Version('v2', 1_700_000_100.0)
+        response = client.get('/items', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_query_string_is_part_of_the_etag(self, versioned_app):
+        app, _, _ = versioned_app
+        client = app.test_client()
+        assert client.get('/items?page=1').headers['ETag'] != client.get('/items?page=2').headers['ETag']
+
+    def test_if_modified_since(self, versioned_app):
+        app, _, calls = versioned_app
+        client = app.test_client()
+        last_modified = client.get('/items').headers['Last-Modified']
+        response = client.get('/items', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+        assert calls == ['items']
+
+
+class TestFallback:
+    """Body hashing when no version is registered"""
+
+    def test_body_hash_etag(self, versioned_app):
+        app, _, calls = versioned_app
+        client = app.test_client()
+        etag = client.get('/unversioned').headers['ETag']
+        response = client.get('/unversioned', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert calls == ['unversioned', 'unversioned']
+
+
+class TestAppRoutes:
+    """Routes in app_with_setup_wizard"""
+
+    def test_dashboard_poll_gets_304(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard
+        client = app_with_setup_wizard.create_app({'TESTING': True}).test_client()
+        headers = {'Accept': 'application/json'}
+        first = client.get('/api/dashboard', headers=headers)
+        assert first.status_code == 200
+        assert 'max-age' in first.headers['Cache-Control']
+
+        second = client.get('/api/dashboard', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+        assert second.status_code == 304
+        assert second.data == b''
@@ -0,0 +1,164 @@
+# tests/unit/test_contact_search.py - Trigram contact index and mirror-fed search tests
+import random
+import string
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+CONTACTS = [
+    {'contact_id': 'c-1', 'name': 'Acme Corporation', 'email': 'billing@acme-corp.com', 'phone': '+1 (555) 010-1234'},
+    {'contact_id': 'c-2', 'name': 'Acme Supplies Ltd', 'email': 'orders@acmesupplies.co.uk', 'phone': 'N/A'},
+    {'contact_id': 'c-3', 'name': 'Global Systems Ltd', 'email': 'finance@globalsys.com', 'phone': '020 7946 0958'},
+    {'contact_id': 'c-4', 'name': 'TechStart Inc', 'email': 'accounts@techstart.io', 'phone': 'N/A'},
+    {'contact_id': 'c-5', 'name': 'Café Zoë', 'email': 'N/A', 'phone': 'N/A'},
+    {'contact_id': 'c-6', 'name': 'Old Acme Holdings', 'email': 'N/A', 'phone': 'N/A', 'status': 'ARCHIVED'},
+]
+
+
+@pytest.fixture
+def index():
+    from contact_search import ContactIndex
+    index = ContactIndex()
+    index.upsert_many(dict(row) for row in CONTACTS)
+    return index
+
+
+def ids(results):
+    return [row['contact_id'] for _, row in results]
+
+
+class TestRanking:
+    """Fuzzy matching on name, email and phone"""
+
+    def test_exact_name_scores_one(self, index):
+        results = index.search('acme corporation')
+        assert results[0][0] == 1.0 and ids(results)[0] == 'c-1'
+
+    def test_partial_name_ranks_best_match_first(self, index):
+        assert set(ids(index.search('acme'))[:2]) == {'c-1', 'c-2'}
+        assert ids(index.search('acme supp'))[0] == 'c-2'
+
+    def test_typos_are_tolerated(self, index):
+        assert ids(index.search('globel systms'))[0] == 'c-3'
+        assert ids(index.search('tekstart'))[0] == 'c-4'
+
+    def test_email_and_phone(self, index):
+        assert ids(index.search('finance@globalsys'))[0] == 'c-3'
+        assert ids(index.search('555 0101234'))[0] == 'c-1'
+
+    def test_accents_are_folded(self, index):
+        assert ids(index.search('cafe zoe'))[0] == 'c-5'
+
+    def test_archived_contacts_are_hidden_unless_asked(self, index):
+        assert 'c-6' not in ids(index.search('old acme holdings'))
+        assert ids(index.search('old acme holdings', include_archived=True))[0] == 'c-6'
+
+    def test_unrelated_query_finds_nothing(self, index):
+        assert index.search('zzqx') == []
+        assert index.search('  ') == []
+
+
+class TestUpdates:
+    """Rows replaced and removed in place"""
+
+    def test_upsert_replaces_the_old_row(self, index):
+        index.upsert({'contact_id': 'c-4', 'name': 'Nimbus Analytics', 'email': 'N/A', 'phone': 'N/A'})
+        assert 'c-4' not in ids(index.search('techstart'))
+        assert ids(index.search('nimbus'))[0] == 'c-4'
+        assert len(index) == len(CONTACTS)
+
+    def test_remove_frees_the_slot(self, index):
+        assert index.remove('c-3') is True and index.remove('c-3') is False
+        assert 'c-3' not in ids(index.search('global systems ltd'))
+        index.upsert({'contact_id': 'c-7', 'name': 'Global Freight', 'email': 'N/A', 'phone': 'N/A'})
+        assert ids(index.search('global'))[0] == 'c-7'
+
+
+class FakeXero:
+    """Answers get_contacts with If-Modified-Since filtering"""
+
+    def __init__(self, contacts):
+        self.contacts = {c.contact_id: c for c in contacts}
+
+    def get_contacts(self, xero_tenant_id, page=1, page_size=100, if_modified_since=None, **kwargs):
+        matching = [c for c in self.contacts.values()
+                    if if_modified_since is None or c.updated_date_utc > if_modified_since]
+        return SimpleNamespace(contacts=matching[(page - 1) * page_size:page * page_size])
+
+
+def make_contact(contact_id, name, minutes, status='ACTIVE'):
+    return SimpleNamespace(contact_id=contact_id, name=name, email_address=None, phone_number=None,
+                           contact_status=status, is_supplier=False, is_customer=True,
+                           updated_date_utc=T0 + timedelta(minutes=minutes))
+
+
+class TestContactSearch:
+    """Index built from the mirror and caught up after syncs"""
+
+    @pytest.fixture
+    def xero(self):
+        return FakeXero([make_contact('c-1', 'Acme Corporation', 1), make_contact('c-2', 'TechStart Inc', 2)])
+
+    @pytest.fixture
+    def mirror(self, tmp_path, xero):
+        from xero_mirror import XeroMirror
+        mirror = XeroMirror(tmp_path / 'mirror.db', api_factory=lambda: xero)
+        mirror.sync('t-1', 'contacts')
+        return mirror
+
+    def test_sync_changes_reach_the_index(self, mirror, xero, monkeypatch):
+        from contact_search import ContactSearch
+        search = ContactSearch(mirror)
+        assert ids(search.search('t-1', 'acme corp'))[0] == 'c-1'
+
+        xero.contacts['c-3'] = make_contact('c-3', 'Nimbus Analytics', 10)
+        xero.contacts['c-1'] = make_contact('c-1', 'Acme Corporation', 11, status='ARCHIVED')
+        mirror.sync('t-1', 'contacts')
+
+        queried = []
+        original = mirror.query
+        monkeypatch.setattr(mirror, 'query', lambda *a, **k: queried.append(k) or original(*a, **k))
+        assert ids(search.search('t-1', 'nimbus'))[0] == 'c-3'
+        assert search.search('t-1', 'acme corporation') == []
+        assert len(queried) == 1 and queried[0]['where'][0][:2] == ('updated_date_utc', '>=')
+
+        # No sync since: the index is used as is
+        search.search('t-1', 'techstart')
+        assert len(queried) == 1
+
+    def test_unsynced_tenant_has_no_matches(self, mirror):
+        from contact_search import ContactSearch
+        assert ContactSearch(mirror).search('t-2', 'acme') == []
+
+
+class TestScale:
+    """Query cost stays flat with the number of contacts"""
+
+    def test_100k_contacts(self):
+        from contact_search import ContactIndex
+        rng = random.Random(7)
+        suffixes = ['Ltd', 'Inc', 'LLC', 'Corporation', 'Services', 'Group', '']
+
+        def word():
+            return rng.choice(string.ascii_uppercase) + ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 7)))
+
+        index = ContactIndex()
+        index.upsert_many({'contact_id': f'c-{n}', 'name': f'{word()} {word()} {rng.choice(suffixes)}'.strip(),
+                           'email': f'{word().lower()}@{word().lower()}.com', 'phone': 'N/A'}
+                          for n in range(100_000))
+        index.upsert({'contact_id': 'target', 'name': 'Acme Corporation', 'email': 'billing@acme.com', 'phone': 'N/A'})
+
+        queries = ['acme corp', 'acmee corporation', 'billing@acme', 'ltd', 'Corporation']
+        for query in queries:
+            index.search(query, limit=5)
+        started = time.perf_counter()
+        for _ in range(20):
+            for query in queries:
+                index.search(query, limit=5)
+        per_query = (time.perf_counter() - started) / (20 * len(queries))
+        assert ids(index.search('acmee corporation', limit=5))[0] == 'target'
+        assert per_query < 0.02     # ~1ms typical; loose for slow CI machines
@@ -0,0 +1,103 @@
+# tests/unit/test_fanout.py - Concurrent source fan-out and xero_dashboard aggregation tests
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+def sleeper(seconds, value=None):
+    def source():
+        time.sleep(seconds)
+        return value
+    return source
+
+
+class TestGather:
+    """Parallel calls, deadlines and annotations"""
+
+    def test_sources_run_in_parallel(self):
+        from fanout import gather
+        started = time.perf_counter()
+        results = gather({name: sleeper(0.2, name) for name in 'abcd'}, timeout=5)
+        assert time.perf_counter() - started < 0.6
+        assert [r.value for r in results.values()] == list('abcd')
+        assert all(r.ok and r.latency_ms >= 190 for r in results.values())
+
+    def test_slow_source_times_out_and_the_rest_are_returned(self):
+        from fanout import gather
+        started = time.perf_counter()
+        results = gather({'fast': sleeper(0, 1), 'slow': sleeper(2, 2)}, timeout=5, timeouts={'slow': 0.2})
+        assert time.perf_counter() - started < 1
+        assert results['fast'].value == 1
+        assert results['slow'].status == 'timeout' and 'within 0.2s' in results['slow'].error
+
+    def test_pool_held_by_a_stray_call_still_returns(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        import fanout
+        monkeypatch.setattr(fanout, '_executor', ThreadPoolExecutor(max_workers=1))
+        started = time.perf_counter()
+        results = fanout.gather({'hung': sleeper(3), 'queued': sleeper(0, 'x')}, timeout=0.2)
+        assert time.perf_counter() - started < 1
+        assert results['hung'].status == 'timeout' and results['queued'].status == 'timeout'
+
+    def test_errors_and_skips_are_annotated(self):
+        from fanout import gather, SourceSkipped
+
+        def broken():
+            raise ValueError('bad token')
+
+        def unconfigured():
+            raise SourceSkipped('no key')
+
+        results = gather({'broken': broken, 'unconfigured': unconfigured, 'ok': lambda: 'yes'})
+        assert results['broken'].annotation() == {'status': 'error', 'latency_ms': results['broken'].latency_ms,
+                                                  'error': 'bad token'}
+        assert results['unconfigured'].status == 'skipped'
+        assert list(results) == ['broken', 'unconfigured', 'ok']
+
+
+class TestDashboard:
+    """xero_dashboard: slowest source, not the sum; partial results"""
+
+    @pytest.fixture
+    def dashboard(self, monkeypatch):
+        import xero_mcp
+        monkeypatch.setattr(xero_mcp, '_tenant', lambda: 't-1')
+        monkeypatch.setattr(xero_mcp, '_mirror', lambda source='mirror': None)
+        for name in ('STRIPE_API_KEY', 'PLAID_CLIENT_ID', 'PLAID_SECRET', 'PLAID_ACCESS_TOKEN'):
+            monkeypatch.delenv(name, raising=False)
+        return xero_mcp
+
+    def fake_api(self, delay, fail_invoices=False):
+        def get_accounts(tenant_id):
+            time.sleep(delay)
+            return SimpleNamespace(accounts=[1, 2, 3])
+
+        def get_invoices(xero_tenant_id, **kwargs):
+            time.sleep(delay)
+            if fail_invoices:
+                raise RuntimeError('Xero 503')
+            return SimpleNamespace(invoices=[SimpleNamespace(invoice_number='INV-9')],
+                                   pagination=SimpleNamespace(item_count=42))
+
+        return SimpleNamespace(get_accounts=get_accounts, get_invoices=get_invoices)
+
+    def test_sources_load_concurrently(self, dashboard, monkeypatch):
+        monkeypatch.setattr(dashboard, '_api', lambda: self.fake_api(0.3))
+        started = time.perf_counter()
+        out = dashboard.xero_dashboard()
+        assert time.perf_counter() - started < 0.55
+        assert out['xero'] == {'tenant_id': 't-1', 'accounts_count': 3, 'invoices_count': 42, 'last_invoice': 'INV-9'}
+        assert out['sources'] == ['xero']
+        assert out['timings']['stripe']['status'] == 'skipped' and 'stripe_error' not in out
+
+    def test_failed_and_slow_sources_are_reported(self, dashboard, monkeypatch):
+        monkeypatch.setattr(dashboard, '_api', lambda: self.fake_api(0, fail_invoices=True))
+        monkeypatch.setenv('STRIPE_API_KEY', 'sk_test_x')
+        slow = SimpleNamespace(v1=SimpleNamespace(charges=SimpleNamespace(list=lambda params: time.sleep(2))))
+        monkeypatch.setattr(dashboard, 'get_stripe_client', lambda: slow)
+        out = dashboard.xero_dashboard(timeout=0.3)
+        assert out['xero']['accounts_count'] == 3 and 'invoices_count' not in out['xero']
+        assert out['xero_error'] == 'invoices: Xero 503'
+        assert out['timings']['stripe']['status'] == 'timeout' and 'stripe_error' in out
+        assert out['elapsed_ms'] < 1000
@@ -0,0 +1,199 @@
+# tests/unit/test_invoice_pdfs.py - Bulk invoice PDF download tests
+import io
+import json
+import threading
+import time
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeApi:
+    """get_invoices over a fixed ledger, get_invoice_as_pdf with a concurrency gauge"""
+
+    def __init__(self, count=12, fail=()):
+        self.ledger = [SimpleNamespace(invoice_id=f'id-{n}', invoice_number=f'INV-{n:04d}',
+                                       updated_date_utc=datetime(2024, 1, 1, 0, n // 60, n % 60))
+                       for n in range(count)]
+        self.fail = set(fail)
+        self.invoice_calls = []
+        self.pdf_calls = []
+        self.in_flight = self.peak = 0
+        self._lock = threading.Lock()
+
+    def get_invoices(self, xero_tenant_id, page=1, page_size=100, invoice_numbers=None, i_ds=None, **kwargs):
+        self.invoice_calls.append(dict(kwargs, invoice_numbers=invoice_numbers, i_ds=i_ds))
+        rows = [inv for inv in self.ledger if (not invoice_numbers or inv.invoice_number in invoice_numbers)
+                and (not i_ds or inv.invoice_id in i_ds)]
+        start = (page - 1) * page_size
+        return SimpleNamespace(invoices=rows[start:start + page_size], pagination=None)
+
+    def get_invoice_as_pdf(self, xero_tenant_id, invoice_id):
+        with self._lock:
+            self.pdf_calls.append(invoice_id)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        if invoice_id in self.fail:
+            raise ConnectionError('429 Too Many Requests')
+        return io.BytesIO(b'%PDF-1.4 ' + invoice_id.encode())
+
+
+def unzip(chunks):
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    return {name: archive.read(name) for name in archive.namelist()}
+
+
+class TestPdfBytes:
+    """Every response shape the SDK builds return"""
+
+    def test_shapes(self, tmp_path):
+        import base64
+        from invoice_pdfs import pdf_bytes
+        temp = tmp_path / 'x.tmp'
+        temp.write_bytes(b'%PDF-file')
+        assert pdf_bytes(str(temp)) == (b'%PDF-file', 'tempfile')
+        assert pdf_bytes(io.BytesIO(b'%PDF-s')) == (b'%PDF-s', 'read()')
+        assert pdf_bytes(SimpleNamespace(data=b'%PDF-d')) == (b'%PDF-d', '.data')
+        assert pdf_bytes(bytearray(b'%PDF-b')) == (b'%PDF-b', 'bytes')
+        assert pdf_bytes('%PDF-str') == (b'%PDF-str', 'str-%PDF')
+        assert pdf_bytes(base64.b64encode(b'%PDF-64').decode()) == (b'%PDF-64', 'base64')
+
+    def test_unexpected_string(self):
+        from invoice_pdfs import pdf_bytes
+        with pytest.raises(ValueError, match='Preview'):
+            pdf_bytes('<html>error</html>')
+
+
+class TestBulkDownload:
+    """Batched lookup, bounded concurrency, zip contents and the content cache"""
+
+    def test_resolve_is_one_batched_query(self):
+        from invoice_pdfs import BulkPdfDownload
+        api = FakeApi()
+        refs = BulkPdfDownload(api, 't').resolve(numbers=['INV-0001', 'INV-0005'])
+        assert [r.number for r in refs] == ['INV-0001', 'INV-0005']
+        assert len(api.invoice_calls) == 1
+        assert api.invoice_calls[0]['invoice_numbers'] == ['INV-0001', 'INV-0005']
+        assert api.invoice_calls[0]['summary_only'] is True
+
+    def test_ids_are_resolved_in_chunks(self):
+        from invoice_pdfs import BulkPdfDownload
+        from xero_mirror import IDS_PER_CALL
+        api = FakeApi(count=120)
+        refs = BulkPdfDownload(api, 't').resolve(ids=[f'id-{n}' for n in range(120)])
+        assert len(refs) == 120 and len({r.invoice_id for r in refs}) == 120
+        assert [len(call['i_ds']) for call in api.invoice_calls] == [IDS_PER_CALL, IDS_PER_CALL, 20]
+
+    def test_numbers_and_ids_are_merged_not_intersected(self):
+        from invoice_pdfs import BulkPdfDownload
+        api = FakeApi()
+        refs = BulkPdfDownload(api, 't').resolve(numbers=['INV-0001', 'INV-0002'], ids=['id-2', 'id-7'])
+        assert [r.invoice_id for r in refs] == ['id-1', 'id-2', 'id-7']
+        assert all(not (call['invoice_numbers'] and call['i_ds']) for call in api.invoice_calls)
+
+    def test_zip_has_every_pdf_and_a_manifest(self):
+        from invoice_pdfs import BulkPdfDownload
+        api = FakeApi(count=12, fail={'id-3'})
+        bulk = BulkPdfDownload(api, 't', concurrency=3)
+        files = unzip(bulk.zip_stream(bulk.resolve(ids=[f'id-{n}' for n in range(12)])))
+        assert files['INV-0000.pdf'] == b'%PDF-1.4 id-0'
+        assert 'INV-0003.pdf' not in files and len(files) == 12   # 11 PDFs + manifest
+        manifest = json.loads(files['manifest.json'])
+        assert manifest['stats'] == {'requested': 12, 'cached': 0, 'downloaded': 11, 'failed': 1}
+        assert '429' in next(e['error'] for e in manifest['invoices'] if e['invoice_id'] == 'id-3')
+        assert 1 < api.peak <= 3
+
+    def test_concurrency_stays_under_xero_limit(self):
+        from invoice_pdfs import BulkPdfDownload
+        assert BulkPdfDownload(FakeApi(), 't', concurrency=20).concurrency == 5
+
+    def test_unchanged_invoices_come_from_the_cache(self, tmp_path):
+        from invoice_pdfs import BulkPdfDownload, PdfCache
+        api = FakeApi(count=4)
+        cache = PdfCache(tmp_path / 'cache')
+        first = BulkPdfDownload(api, 't', cache)
+        unzip(first.zip_stream(first.resolve(ids=['id-0', 'id-1'])))
+
+        api.ledger[1].updated_date_utc = datetime(2024, 2, 1)   # edited in Xero
+        api.pdf_calls.clear()
+        second = BulkPdfDownload(api, 't', cache)
+        files = unzip(second.zip_stream(second.resolve(ids=['id-0', 'id-1'])))
+        assert api.pdf_calls == ['id-1']
+        assert second.stats['cached'] == 1 and second.stats['downloaded'] == 1
+        assert files['INV-0000.pdf'] == b'%PDF-1.4 id-0'
+        assert len(list((tmp_path / 'cache' / 't' / 'id-1').glob('*.pdf'))) == 1
+
+    def test_prune_keeps_cache_within_budget(self, tmp_path):
+        from invoice_pdfs import PdfCache, InvoiceRef
+        cache = PdfCache(tmp_path, max_bytes=250)
+        for n in range(5):
+            cache.put('t', InvoiceRef(f'id-{n}', None, f'2024-01-0{n + 1}'), b'x' * 100)
+        assert cache.prune() == 3
+        assert len(list(tmp_path.glob('*/*/*.pdf'))) == 2
+
+    def test_file_pruned_during_a_read_is_still_served(self, tmp_path, monkeypatch):
+        import os
+        from invoice_pdfs import PdfCache, InvoiceRef
+        cache = PdfCache(tmp_path)
+        ref = InvoiceRef('id-0', None, '2024-01-01')
+        cache.put('t', ref, b'%PDF-1.4 id-0')
+
+        def pruned(path, *args, **kwargs):
+            raise FileNotFoundError(path)      # another download's prune() removed it after the read
+        monkeypatch.setattr(os, 'utime', pruned)
+        assert cache.get('t', ref) == b'%PDF-1.4 id-0'
+
+    def test_cache_errors_count_as_misses(self, tmp_path):
+        from invoice_pdfs import BulkPdfDownload, PdfCache
+
+        class BrokenCache(PdfCache):
+            def get(self, tenant_id, ref):
+                raise PermissionError('cache unreadable')
+
+            def put(self, tenant_id, ref, content):
+                raise OSError('disk full')
+
+        api = FakeApi(count=2)
+        download = BulkPdfDownload(api, 't', BrokenCache(tmp_path))
+        files = unzip(download.zip_stream(download.resolve(ids=['id-0', 'id-1'])))
+        assert files['INV-0001.pdf'] == b'%PDF-1.4 id-1'
+        assert download.stats['downloaded'] == 2 and download.stats['failed'] == 0
+
+
+class TestPdfEndpoint:
+    """POST /api/xero/invoices/pdfs"""
+
+    @pytest.fixture
+    def client(self, temp_dir, tmp_path, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard as module
+        api = FakeApi(count=3)
+        monkeypatch.setattr(module, 'AccountingApi', lambda client: api)
+        app = module.create_app({'TESTING': True, 'XERO_MIRROR': False, 'XERO_PDF_CACHE': str(tmp_path)})
+        app.extensions['xero_integration'] = SimpleNamespace(available=True, get_api_client=lambda: None)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['token'] = {'access_token': 'x'}
+            sess['tenant_id'] = 'tenant-1'
+        return client
+
+    def _post(self, client, body):
+        from auth.security import SecurityManager
+        key = SecurityManager().generate_api_key('pdf-tests')
+        return client.post('/api/xero/invoices/pdfs', json=body, headers={'X-API-Key': key})
+
+    def test_streams_zip(self, client):
+        response = self._post(client, {'invoice_numbers': ['INV-0000', 'INV-0002']})
+        assert response.status_code == 200
+        assert response.mimetype == 'application/zip'
+        files = unzip([response.get_data()])
+        assert set(files) == {'INV-0000.pdf', 'INV-0002.pdf', 'manifest.json'}
+
+    def test_requires_a_selection(self, client):
+        assert self._post(client, {}).status_code == 400
+        assert self._post(client, {'status': 'NOPE'}).status_code == 400
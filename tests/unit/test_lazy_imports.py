@@ -0,0 +1,75 @@
+# tests/unit/test_lazy_imports.py - Lazy SDK import tests
+import sys
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def probe_module(temp_dir, monkeypatch):
+    """Throwaway importable module, removed from sys.modules afterwards"""
+    (temp_dir / '_fcc_lazy_probe.py').write_text(
+        'LOADS = 1\n'
+        'class Widget:\n'
+        '    def __init__(self, size):\n'
+        '        self.size = size\n'
+    )
+    monkeypatch.syspath_prepend(str(temp_dir))
+    sys.modules.pop('_fcc_lazy_probe', None)
+    yield '_fcc_lazy_probe'
+    sys.modules.pop('_fcc_lazy_probe', None)
+
+
+class TestLazyModule:
+    """Module proxy behaviour"""
+
+    def test_imports_on_first_attribute_access(self, probe_module):
+        from lazy_imports import lazy_import, is_loaded
+        module = lazy_import(probe_module)
+        assert not is_loaded(probe_module)
+        assert module.LOADS == 1
+        assert is_loaded(probe_module)
+
+    def test_on_load_runs_once_across_threads(self, probe_module):
+        from lazy_imports import lazy_import
+        calls = []
+        module = lazy_import(probe_module, on_load=lambda m: calls.append(m))
+
+        threads = [threading.Thread(target=lambda: module.Widget) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+
+    def test_setattr_reaches_real_module(self, probe_module):
+        from lazy_imports import lazy_import
+        module = lazy_import(probe_module)
+        module.api_key = 'sk_test_x'
+        assert sys.modules[probe_module].api_key == 'sk_test_x'
+
+
+class TestLazyAttribute:
+    """`from x import Name` stand-ins"""
+
+    def test_call_and_resolve(self, probe_module):
+        from lazy_imports import lazy_attr, resolve
+        Widget = lazy_attr(probe_module, 'Widget')
+        assert probe_module not in sys.modules
+        widget = Widget(3)
+        assert widget.size == 3
+        assert isinstance(widget, resolve(Widget))
+
+    def test_availability_without_import(self):
+        from lazy_imports import is_available
+        assert is_available('json')
+        assert not is_available('_fcc_definitely_missing_sdk')
+
+
+class TestEntryPointsStayLight:
+    """MCP servers must not import their SDK until a tool runs"""
+
+    def test_compliance_mcp_defers_plaid(self):
+        import compliance_mcp
+        assert compliance_mcp.plaid.__class__.__name__ == 'LazyModule'
+        assert 'merchants' in compliance_mcp.blacklist_list()
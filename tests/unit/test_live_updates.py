@@ -0,0 +1,128 @@
+# tests/unit/test_live_updates.py - Server-Sent Events live feed tests
+import time
+
+import pytest
+
+
+class TestEventBus:
+    """Publish/subscribe, replay and overflow"""
+
+    def test_only_subscribed_topics_are_delivered(self):
+        from live_updates import EventBus
+        bus = EventBus()
+        subscription = bus.subscribe(['health'])
+        bus.publish('audit', {'event_type': 'ignored'})
+        bus.publish('health', {'overall_status': 'good'})
+        event = subscription.get(timeout=0.1)
+        assert event.topic == 'health'
+        assert event.data == {'overall_status': 'good'}
+        assert subscription.get(timeout=0.01) is None
+
+    def test_last_event_id_replays_missed_events(self):
+        from live_updates import EventBus
+        bus = EventBus()
+        first = bus.publish('audit', {'n': 1})
+        bus.publish('audit', {'n': 2})
+        bus.publish('audit', {'n': 3})
+        subscription = bus.subscribe(['audit'], last_event_id=first.id)
+        assert [subscription.get(0.01).data['n'] for _ in range(2)] == [2, 3]
+
+    def test_foreign_event_ids_are_not_replayed(self):
+        from live_updates import EventBus
+        bus = EventBus()
+        bus.publish('audit', {'n': 1})
+        subscription = bus.subscribe(['audit'], last_event_id='other-worker.0')
+        assert subscription.get(timeout=0.01) is None
+
+    def test_overflow_flags_resync(self):
+        from live_updates import EventBus, SUBSCRIBER_BUFFER
+        bus = EventBus()
+        subscription = bus.subscribe(['health'])
+        for n in range(SUBSCRIBER_BUFFER + 1):
+            bus.publish('health', {'n': n})
+        assert subscription.overflowed
+
+    def test_event_encoding_uses_topic_prefix_as_event_name(self):
+        from live_updates import Event
+        encoded = Event('a.1', 'xero.invoices:tenant-1', {'invoice_id': 'INV-1'}).encode()
+        assert encoded == 'id: a.1\nevent: xero.invoices\ndata: {"invoice_id":"INV-1"}\n\n'
+
+
+class TestLiveUpdates:
+    """Shared pollers and the SSE response"""
+
+    def test_poller_publishes_and_stops_without_listeners(self):
+        from live_updates import LiveUpdates, Source
+        live = LiveUpdates(max_streams=2, max_seconds=5)
+        polls = []
+
+        def poll():
+            polls.append(1)
+            return [{'n': len(polls)}]
+
+        live.register_source('health', lambda topic: Source(poll, interval=0.01))
+        subscription = live.bus.subscribe(['health'])
+        live._ensure_poller('health')
+        live._ensure_poller('health')  # one poller per topic, however many tabs
+        assert subscription.get(timeout=1).data == {'n': 1}
+        assert len(live._pollers) == 1
+
+        live.bus.unsubscribe(subscription)
+        deadline = time.monotonic() + 2
+        while live._pollers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert live._pollers == {}
+
+    def test_stream_yields_events_until_max_seconds(self):
+        from live_updates import LiveUpdates
+        live = LiveUpdates(max_streams=2, max_seconds=1)
+        stream = live.stream(['health'])
+        assert next(stream).startswith('retry: ')
+        live.publish('health', {'overall_status': 'warning'})
+        assert 'event: health' in next(stream)
+        assert [chunk for chunk in stream if not chunk.startswith(':')] == []  # heartbeats only, then closes
+        assert live.bus.listeners('health') == 0
+
+    def test_stream_cap_returns_503(self):
+        from flask import Flask
+        from live_updates import LiveUpdates
+        live = LiveUpdates(max_streams=1, max_seconds=1)
+        with Flask(__name__).test_request_context():
+            first = live.response(['health'])
+            assert first.mimetype == 'text/event-stream'
+            assert first.headers['X-Accel-Buffering'] == 'no'
+            busy = live.response(['health'])
+            assert busy.status_code == 503
+            assert 'Retry-After' in busy.headers
+            first.close()
+            assert live.response(['health']).status_code == 200
+
+    def test_diff_rows_reports_only_changes(self):
+        from live_updates import diff_rows
+        seen = {}
+        rows = [{'invoice_id': 'a', 'total': 1.0}, {'invoice_id': 'b', 'total': 2.0}]
+        assert diff_rows(seen, rows, 'invoice_id') == rows
+        changed = [{'invoice_id': 'a', 'total': 1.0}, {'invoice_id': 'b', 'total': 3.0}]
+        assert diff_rows(seen, changed, 'invoice_id') == [{'invoice_id': 'b', 'total': 3.0}]
+
+
+class TestAppRoute:
+    """/api/live in app_with_setup_wizard"""
+
+    @pytest.fixture
+    def client(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard
+        return app_with_setup_wizard.create_app({'TESTING': True}).test_client()
+
+    def test_xero_topics_need_a_session(self, client):
+        response = client.get('/api/live?topics=xero.invoices')
+        assert response.status_code == 400
+
+    def test_health_stream(self, client):
+        response = client.get('/api/live?topics=health', buffered=False)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert 'Content-Encoding' not in response.headers
+        assert next(response.response).startswith(b'retry: ')
+        response.close()
@@ -0,0 +1,133 @@
+# tests/unit/test_memory_diagnostics.py - Memory diagnostics tests
+import threading
+import tracemalloc
+
+import pytest
+from flask import Flask
+
+
+@pytest.fixture
+def diagnostics(temp_dir, monkeypatch):
+    """MemoryDiagnostics attached to a bare Flask app"""
+    from memory_diagnostics import MemoryDiagnostics
+
+    monkeypatch.delenv('FCC_TRACEMALLOC', raising=False)
+    app = Flask(__name__)
+    diag = MemoryDiagnostics(app, report_dir=str(temp_dir / 'memory'))
+    yield app, diag
+    diag.stop()
+
+
+class TestSizeParsing:
+    """Docker-style size strings"""
+
+    def test_parse_size_units(self):
+        from memory_diagnostics import parse_size
+        assert parse_size('512M') == 512 * 1024 * 1024
+        assert parse_size('1g') == 1024 ** 3
+        assert parse_size('2048') == 2048
+        assert parse_size('') is None
+        assert parse_size('lots') is None
+
+    def test_env_limit_overrides_cgroup(self, monkeypatch):
+        from memory_diagnostics import get_memory_limit_bytes
+        monkeypatch.setenv('FCC_MEMORY_LIMIT', '256M')
+        assert get_memory_limit_bytes() == 256 * 1024 * 1024
+
+
+class TestMemoryDiagnostics:
+    """Snapshots, diffs and budget summary"""
+
+    def test_summary_status_against_limit(self, diagnostics, monkeypatch):
+        import memory_diagnostics
+        _, diag = diagnostics
+        monkeypatch.setattr(memory_diagnostics, 'get_container_usage_bytes', lambda: None)
+        monkeypatch.setattr(memory_diagnostics, 'get_rss_bytes', lambda: 470 * 1024 * 1024)
+        monkeypatch.setattr(memory_diagnostics, 'get_memory_limit_bytes', lambda: 512 * 1024 * 1024)
+        summary = diag.summary()
+        assert summary['status'] == 'critical'
+        assert summary['limit_mb'] == 512.0
+
+    def test_snapshot_requires_tracing(self, diagnostics):
+        _, diag = diagnostics
+        diag.stop()
+        with pytest.raises(RuntimeError):
+            diag.take_snapshot()
+
+    def test_snapshot_and_diff(self, diagnostics):
+        _, diag = diagnostics
+        diag.start(frames=5)
+        base = diag.take_snapshot('base')
+        hoard = [bytearray(1024) for _ in range(2000)]
+        report = diag.diff(base['id'], limit=5)
+        assert report['net_growth_mb'] > 0
+        assert report['top'][0]['size_diff_kb'] > 0
+        assert len(hoard) == 2000
+
+    def test_snapshot_retention_is_bounded(self, diagnostics):
+        _, diag = diagnostics
+        diag.start(frames=1)
+        for _ in range(diag.max_snapshots + 3):
+            diag.take_snapshot()
+        assert len(diag.list_snapshots()) == diag.max_snapshots
+
+    def test_routes_and_attribution(self, diagnostics):
+        app, diag = diagnostics
+
+        @app.get('/work')
+        def work():
+            return 'ok'
+
+        client = app.test_client()
+        client.get('/work')
+        response = client.get('/admin/memory')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'summary' in data
+        assert any(row['endpoint'] == 'work' for row in data['routes'])
+
+        assert client.post('/admin/memory/snapshots', json={}).status_code == 409
+        client.post('/admin/memory/tracemalloc', json={'action': 'start', 'frames': 3})
+        assert tracemalloc.is_tracing()
+        snap = client.post('/admin/memory/snapshots', json={'label': 't'}).get_json()
+        top = client.get(f"/admin/memory/snapshots/{snap['id']}?limit=3").get_json()
+        assert len(top['top']) <= 3
+        assert client.get('/admin/memory/diff').status_code == 400
+
+    def test_overlapping_requests_keep_no_peak(self, diagnostics):
+        app, diag = diagnostics
+        entered, release = threading.Event(), threading.Event()
+
+        @app.get('/slow')
+        def slow():
+            entered.set()
+            release.wait(5)
+            return 'ok'
+
+        @app.get('/fast')
+        def fast():
+            return 'ok'
+
+        client = app.test_client()
+        assert client.get('/admin/memory?limit=abc').status_code == 200
+        client.post('/admin/memory/tracemalloc', json={'action': 'start'})
+        worker = threading.Thread(target=lambda: app.test_client().get('/slow'))
+        worker.start()
+        assert entered.wait(5)
+        client.get('/fast')                 # started while /slow was in flight
+        release.set()
+        worker.join(5)
+        client.get('/fast')                 # alone
+
+        routes = {row['endpoint']: row for row in diag.route_stats()}
+        assert routes['slow']['peak_alloc_max_kb'] is None
+        assert routes['fast']['requests'] == 2 and routes['fast']['peak_alloc_max_kb'] is not None
+        assert diag._active == 0
+
+    def test_bad_frames_is_a_client_error(self, diagnostics):
+        app, diag = diagnostics
+        client = app.test_client()
+        for frames in ('abc', None, 0, [3]):
+            response = client.post('/admin/memory/tracemalloc', json={'action': 'start', 'frames': frames})
+            assert response.status_code == 400
+        assert not tracemalloc.is_tracing()
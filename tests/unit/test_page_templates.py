@@ -0,0 +1,60 @@
+# tests/unit/test_page_templates.py - Compiled page template tests
+import re
+
+import pytest
+
+
+@pytest.fixture
+def wizard_app(temp_dir, monkeypatch):
+    """create_app() with its runtime files kept out of the repo"""
+    monkeypatch.chdir(temp_dir)
+    import app_with_setup_wizard
+    return app_with_setup_wizard.create_app({'TESTING': True})
+
+
+class TestTemplateSetup:
+    """Compilation and caching"""
+
+    def test_debug_does_not_enable_auto_reload(self, wizard_app):
+        assert wizard_app.debug is True
+        assert wizard_app.jinja_env.auto_reload is False
+
+    def test_pages_precompiled_at_create_time(self, wizard_app):
+        from page_templates import PAGE_TEMPLATES
+        cached = {key[1] for key in wizard_app.jinja_env.cache.keys()}
+        assert set(PAGE_TEMPLATES) <= cached
+
+    def test_page_css_is_linked_not_inlined(self, wizard_app):
+        response = wizard_app.test_client().get('/health', headers={'Accept': 'text/html'})
+        html = response.get_data(as_text=True)
+        assert '<style>' not in html
+        assert re.search(r'href="/static/css/health\.[0-9a-f]{10}\.css"', html)
+
+
+class TestPageRendering:
+    """Rendered pages"""
+
+    def test_health_page(self, wizard_app):
+        response = wizard_app.test_client().get('/health', headers={'Accept': 'text/html'})
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        assert 'System Health Dashboard' in html
+        assert 'status-card' in html
+
+    def test_contacts_shell_escapes_search(self, wizard_app):
+        from flask import render_template
+        with wizard_app.test_request_context():
+            html = render_template('xero_contacts.html', tenant_id='t-1', q='"><script>x</script>',
+                                   kind='customer', sort='name')
+        assert '<script>x</script>' not in html
+        assert '&lt;script&gt;x&lt;/script&gt;' in html
+        assert '<option value="customer" selected>' in html
+
+    def test_invoices_shell_loads_paging_scripts(self, wizard_app):
+        from flask import render_template
+        with wizard_app.test_request_context():
+            html = render_template('xero_invoices.html', tenant_id='t-1', q='', status='PAID', sort='-total')
+        assert '<option value="PAID" selected>' in html
+        assert '<option value="-total" selected>' in html
+        assert '/static/js/virtual_list.' in html
+        assert '/static/js/xero_invoices.' in html
@@ -0,0 +1,103 @@
+# tests/unit/test_pagination.py - Cursor pagination and paged Xero data endpoint tests
+from types import SimpleNamespace
+
+import pytest
+
+SORTS = {'name': 'Name ASC', '-name': 'Name DESC'}
+
+
+class TestListQuery:
+    """Cursor encoding and argument parsing"""
+
+    def test_first_page_from_args(self):
+        from pagination import ListQuery
+        query = ListQuery.from_request({'sort': '-name', 'q': ' acme ', 'page_size': '25'},
+                                       sorts=SORTS, default_sort='name', filters=('q', 'kind'))
+        assert (query.page, query.page_size, query.order) == (1, 25, 'Name DESC')
+        assert query.filters == {'q': 'acme'}
+
+    def test_cursor_carries_sort_and_filters(self):
+        from pagination import ListQuery
+        first = ListQuery.from_request({'q': 'acme'}, sorts=SORTS, default_sort='name', filters=('q',))
+        body = first.page_of(['row'] * first.page_size, total=250)
+        # A cursor wins over conflicting arguments
+        second = ListQuery.from_request({'cursor': body['next_cursor'], 'q': 'other'},
+                                        sorts=SORTS, default_sort='name', filters=('q',))
+        assert (second.page, second.filters, second.sort) == (2, {'q': 'acme'}, 'name')
+
+    def test_last_page_has_no_cursor(self):
+        from pagination import ListQuery
+        query = ListQuery.from_request({'page_size': '10'}, sorts=SORTS, default_sort='name')
+        assert query.page_of(['row'] * 4)['next_cursor'] is None
+        assert query.page_of(['row'] * 10, total=10)['next_cursor'] is None
+
+    def test_page_size_is_capped(self):
+        from pagination import ListQuery, MAX_PAGE_SIZE
+        query = ListQuery.from_request({'page_size': '100000'}, sorts=SORTS, default_sort='name')
+        assert query.page_size == MAX_PAGE_SIZE
+
+    @pytest.mark.parametrize('args', [{'cursor': 'not-a-cursor!'}, {'sort': 'password'}, {'page_size': 'ten'}])
+    def test_bad_input_raises_cursor_error(self, args):
+        from pagination import ListQuery, CursorError
+        with pytest.raises(CursorError):
+            ListQuery.from_request(args, sorts=SORTS, default_sort='name')
+
+
+class FakeAccountingApi:
+    """Records the paging arguments sent to Xero"""
+    calls = []
+
+    def __init__(self, api_client):
+        pass
+
+    def get_invoices(self, **kwargs):
+        FakeAccountingApi.calls.append(kwargs)
+        invoices = [SimpleNamespace(invoice_id=f'inv-{i}', invoice_number=f'INV-{i}', total=10.0, amount_due=5.0,
+                                    amount_paid=5.0, status='AUTHORISED', type='ACCREC', currency_code='USD',
+                                    contact=SimpleNamespace(name='Acme'), date=None, due_date=None)
+                    for i in range(kwargs['page_size'])]
+        return SimpleNamespace(invoices=invoices, pagination=SimpleNamespace(item_count=3 * kwargs['page_size']))
+
+
+class TestXeroDataEndpoints:
+    """/xero/invoices/data and /xero/contacts/data"""
+
+    @pytest.fixture
+    def client(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard
+        # The live (source=xero) path; the mirror has its own tests in test_xero_mirror.py
+        app = app_with_setup_wizard.create_app({'TESTING': True, 'XERO_MIRROR': False})
+        app.extensions['xero_integration'] = SimpleNamespace(available=True, get_api_client=lambda: None)
+        monkeypatch.setattr(app_with_setup_wizard, 'AccountingApi', FakeAccountingApi)
+        FakeAccountingApi.calls = []
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['token'] = {'access_token': 'x'}
+            sess['tenant_id'] = 'tenant-1'
+        return client
+
+    def test_pages_follow_the_cursor(self, client):
+        first = client.get('/xero/invoices/data?status=AUTHORISED&sort=-total&page_size=20').get_json()
+        assert len(first['items']) == 20
+        assert first['total'] == 60
+        second = client.get(f"/xero/invoices/data?cursor={first['next_cursor']}").get_json()
+        assert second['page'] == 2
+        assert FakeAccountingApi.calls[1]['page'] == 2
+        assert FakeAccountingApi.calls[1]['order'] == 'Total DESC'
+        assert FakeAccountingApi.calls[1]['statuses'] == ['AUTHORISED']
+
+    def test_invalid_filter_rejected(self, client):
+        assert client.get('/xero/invoices/data?status=BOGUS').status_code == 400
+        assert client.get('/xero/invoices/data?cursor=zzz').status_code == 400
+        assert FakeAccountingApi.calls == []
+
+    def test_html_view_makes_no_xero_calls(self, client):
+        response = client.get('/xero/invoices')
+        assert response.status_code == 200
+        assert FakeAccountingApi.calls == []
+
+    def test_data_endpoint_needs_session(self, client):
+        with client.session_transaction() as sess:
+            sess.clear()
+        assert client.get('/xero/contacts/data').status_code == 401
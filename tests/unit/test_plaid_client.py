@@ -0,0 +1,36 @@
+# tests/unit/test_plaid_client.py - Pooled Plaid client tests
+import pytest
+
+
+@pytest.fixture
+def plaid_clients():
+    """plaid_client with an empty cache before and after each test"""
+    pytest.importorskip('plaid')
+    import plaid_client
+    plaid_client.clear_plaid_clients()
+    yield plaid_client
+    plaid_client.clear_plaid_clients()
+
+
+class TestPlaidClientRegistry:
+    """Per-credential cached clients"""
+
+    def test_cached_per_credentials_and_env(self, plaid_clients):
+        first = plaid_clients.get_plaid_client('id', 'secret')
+        assert plaid_clients.get_plaid_client('id', 'secret') is first
+        assert plaid_clients.get_plaid_client('id', 'rotated') is not first
+        assert plaid_clients.get_plaid_client('id', 'secret', env='production') is not first
+
+    def test_defaults_to_env_and_pool_size(self, plaid_clients, monkeypatch):
+        monkeypatch.setenv('PLAID_CLIENT_ID', 'id')
+        monkeypatch.setenv('PLAID_SECRET', 'secret')
+        monkeypatch.setenv('FCC_PLAID_POOL_SIZE', '7')
+        client = plaid_clients.get_plaid_client()
+        assert client is plaid_clients.get_plaid_client('id', 'secret')
+        assert client.api_client.configuration.connection_pool_maxsize == 7
+
+    def test_missing_credentials_raise(self, plaid_clients, monkeypatch):
+        monkeypatch.delenv('PLAID_CLIENT_ID', raising=False)
+        monkeypatch.delenv('PLAID_SECRET', raising=False)
+        with pytest.raises(RuntimeError):
+            plaid_clients.get_plaid_client()
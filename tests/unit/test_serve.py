@@ -0,0 +1,82 @@
+# tests/unit/test_serve.py - Production server configuration tests
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clean_serve_env(monkeypatch):
+    """No ambient server/TLS settings leak into these tests"""
+    for name in ('FCC_HOST', 'FCC_PORT', 'PORT', 'FCC_WORKERS', 'FCC_THREADS', 'FCC_MAX_REQUESTS',
+                 'FCC_TLS', 'FCC_SERVER', 'FCC_RELOAD', 'SSL_CERT_FILE', 'SSL_KEY_FILE',
+                 'FORCE_HTTPS', 'ALLOW_HTTP'):
+        monkeypatch.delenv(name, raising=False)
+
+
+class TestServeConfig:
+    """Settings from FCC_* environment"""
+
+    def test_env_overrides(self, monkeypatch):
+        from serve import ServeConfig
+        monkeypatch.setenv('FCC_PORT', '9443')
+        monkeypatch.setenv('FCC_WORKERS', '3')
+        monkeypatch.setenv('FCC_THREADS', '12')
+        monkeypatch.setenv('FCC_MAX_REQUESTS', 'not-a-number')
+        config = ServeConfig.from_env()
+        assert (config.port, config.workers, config.threads) == (9443, 3, 12)
+        assert config.max_requests == ServeConfig.max_requests
+
+    def test_gunicorn_options(self):
+        from serve import ServeConfig, gunicorn_options
+        options = gunicorn_options(ServeConfig(host='0.0.0.0', port=8000), ('c.crt', 'c.key'))
+        assert options['bind'] == '0.0.0.0:8000'
+        assert options['worker_class'] == 'gthread'
+        assert options['preload_app'] is True
+        assert options['max_requests'] == 1000
+        assert (options['certfile'], options['keyfile']) == ('c.crt', 'c.key')
+
+    def test_reload_disables_preload(self):
+        from serve import ServeConfig, gunicorn_options
+        options = gunicorn_options(ServeConfig(reload=True))
+        assert options['reload'] is True
+        assert options['preload_app'] is False
+        assert 'certfile' not in options
+
+
+class TestTls:
+    """TLS follows the app's FORCE_HTTPS / ALLOW_HTTP flags unless FCC_TLS is set"""
+
+    def test_auto_follows_server_mode(self, monkeypatch):
+        from serve import ServeConfig, tls_enabled
+        assert tls_enabled(ServeConfig()) is True
+        monkeypatch.setenv('FORCE_HTTPS', 'false')
+        monkeypatch.setenv('ALLOW_HTTP', 'true')
+        assert tls_enabled(ServeConfig()) is False
+        assert tls_enabled(ServeConfig(tls='on')) is True
+
+    def test_explicit_cert_files(self):
+        from serve import ServeConfig, resolve_tls
+        config = ServeConfig(tls='on', certfile='/certs/server.crt', keyfile='/certs/server.key')
+        assert resolve_tls(config) == ('/certs/server.crt', '/certs/server.key')
+        assert resolve_tls(ServeConfig(tls='off')) is None
+
+    def test_container_serves_http_under_prod_flags(self, monkeypatch):
+        """docker-compose.prod.yml's FORCE_HTTPS must not turn the nginx upstream into HTTPS"""
+        from serve import ServeConfig, tls_enabled
+        monkeypatch.setenv('FORCE_HTTPS', 'true')
+        monkeypatch.setenv('ALLOW_HTTP', 'false')
+        monkeypatch.setenv('FCC_TLS', 'off')     # set by the Dockerfile
+        assert tls_enabled(ServeConfig.from_env()) is False
+        monkeypatch.setenv('FCC_TLS', 'on')      # docker-compose.ssl.yml
+        assert tls_enabled(ServeConfig.from_env()) is True
+
+
+class TestBackend:
+    """Backend selection"""
+
+    def test_explicit_backend(self):
+        from serve import ServeConfig, pick_backend
+        assert pick_backend(ServeConfig(backend='werkzeug')) == 'werkzeug'
+
+    def test_unknown_backend_rejected(self):
+        from serve import ServeConfig, serve
+        with pytest.raises(ValueError):
+            serve(app=object(), config=ServeConfig(backend='bjoern'), tls=None)
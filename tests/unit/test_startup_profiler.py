@@ -0,0 +1,95 @@
+# tests/unit/test_startup_profiler.py - Startup profiler tests
+import sys
+
+import pytest
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _leaf_a
+import time:       200 |        200 |     _leaf_c
+import time:       300 |        500 |   _leaf_b
+import time:      1000 |       1600 | pkg
+import time:        50 |         50 | other.mod
+"""
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """startup_profiler with fresh module state"""
+    import startup_profiler
+
+    monkeypatch.setattr(startup_profiler, '_phases', [])
+    monkeypatch.setattr(startup_profiler, '_phase_stack', [])
+    monkeypatch.setattr(startup_profiler, '_import_roots', [])
+    monkeypatch.setattr(startup_profiler, '_import_stack', [])
+    monkeypatch.setattr(startup_profiler, '_finished', False)
+    monkeypatch.delenv('FCC_STARTUP_PHASES_FILE', raising=False)
+    yield startup_profiler
+    startup_profiler.uninstall()
+
+
+class TestImportTimeParsing:
+    """`python -X importtime` output to tree"""
+
+    def test_tree_structure(self, profiler):
+        tree = profiler.parse_importtime(IMPORTTIME_SAMPLE)
+        assert [n['module'] for n in tree] == ['pkg', 'other.mod']
+        pkg = tree[0]
+        assert pkg['cumulative_ms'] == 1.6
+        assert [c['module'] for c in pkg['children']] == ['_leaf_a', '_leaf_b']
+        assert pkg['children'][1]['children'][0]['module'] == '_leaf_c'
+
+    def test_report_ranking(self, profiler):
+        tree = profiler.parse_importtime(IMPORTTIME_SAMPLE)
+        report = profiler.build_report('demo', tree, [], mode='importtime')
+        assert report['modules_imported'] == 5
+        assert report['total_import_ms'] == 1.65
+        assert report['top_self'][0]['module'] == 'pkg'
+        assert report['packages'][0]['package'] == 'pkg'
+        assert 'demo' in profiler.format_report(report)
+
+
+class TestPhases:
+    """Init phase timing"""
+
+    def test_nested_phases_record_parent(self, profiler):
+        with profiler.phase('outer'):
+            with profiler.phase('inner'):
+                pass
+        rows = {p['name']: p for p in profiler.phases()}
+        assert rows['inner']['parent'] == 'outer'
+        assert rows['outer']['parent'] is None
+
+    def test_phases_stop_recording_after_finish(self, profiler):
+        profiler.finish('demo')
+        with profiler.phase('late'):
+            pass
+        assert profiler.phases() == []
+
+
+class TestInProcessProfiling:
+    """FCC_PROFILE_STARTUP meta path hook"""
+
+    def test_disabled_without_env(self, profiler, monkeypatch):
+        monkeypatch.delenv('FCC_PROFILE_STARTUP', raising=False)
+        assert profiler.install() is False
+
+    def test_records_imports_and_writes_report(self, profiler, temp_dir, monkeypatch):
+        (temp_dir / '_fcc_probe_child.py').write_text('VALUE = 1\n')
+        (temp_dir / '_fcc_probe.py').write_text('import _fcc_probe_child\n')
+        monkeypatch.syspath_prepend(str(temp_dir))
+        monkeypatch.setenv('FCC_PROFILE_STARTUP', '1')
+        monkeypatch.setenv('FCC_STARTUP_REPORT_DIR', str(temp_dir / 'reports'))
+
+        assert profiler.install() is True
+        import _fcc_probe
+        report = profiler.finish('probe')
+
+        try:
+            probe = next(n for n in report['tree'] if n['module'] == '_fcc_probe')
+            assert probe['children'][0]['module'] == '_fcc_probe_child'
+            assert _fcc_probe.__loader__.__class__.__name__ != '_TimedLoader'
+            assert list((temp_dir / 'reports').glob('startup_probe_*.json'))
+        finally:
+            sys.modules.pop('_fcc_probe', None)
+            sys.modules.pop('_fcc_probe_child', None)
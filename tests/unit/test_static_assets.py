@@ -0,0 +1,74 @@
+# tests/unit/test_static_assets.py - Fingerprinted static asset tests
+import pytest
+from flask import Flask, render_template_string
+
+
+@pytest.fixture
+def asset_app(tmp_path):
+    """Flask app with a throwaway static folder"""
+    from static_assets import configure_static_assets
+    static = tmp_path / 'static'
+    (static / 'css').mkdir(parents=True)
+    (static / 'css' / 'site.css').write_text('body { color: #333; }\n')
+    app = Flask(__name__, static_folder=str(static))
+    configure_static_assets(app)
+    return app, static
+
+
+class TestFingerprints:
+    """asset_url() and the manifest"""
+
+    def test_url_contains_content_hash(self, asset_app):
+        app, _ = asset_app
+        with app.test_request_context():
+            url = render_template_string("{{ asset_url('css/site.css') }}")
+        assert url.startswith('/static/css/site.') and url.endswith('.css')
+        assert len(url.split('.')[-2]) == 10
+
+    def test_hash_changes_with_content_when_watching(self, asset_app):
+        from static_assets import AssetManifest
+        _, static = asset_app
+        manifest = AssetManifest(str(static), watch=True)
+        before = manifest.fingerprint('css/site.css')
+        (static / 'css' / 'site.css').write_text('body { color: #000; margin: 0; }\n')
+        assert manifest.fingerprint('css/site.css') != before
+
+    def test_missing_file_left_alone(self, asset_app):
+        app, _ = asset_app
+        assert app.extensions['static_assets'].fingerprint('css/nope.css') == 'css/nope.css'
+
+
+class TestServing:
+    """Cache headers on /static/"""
+
+    def test_fingerprinted_url_is_immutable(self, asset_app):
+        app, _ = asset_app
+        with app.test_request_context():
+            url = render_template_string("{{ asset_url('css/site.css') }}")
+        response = app.test_client().get(url)
+        assert response.status_code == 200
+        assert response.data == b'body { color: #333; }\n'
+        assert 'immutable' in response.headers['Cache-Control']
+
+    def test_plain_and_stale_urls_revalidate(self, asset_app):
+        app, _ = asset_app
+        client = app.test_client()
+        plain = client.get('/static/css/site.css')
+        stale = client.get('/static/css/site.0123456789.css')
+        assert plain.status_code == stale.status_code == 200
+        assert plain.headers['Cache-Control'] == stale.headers['Cache-Control'] == 'no-cache'
+
+    def test_repo_pages_reference_existing_assets(self):
+        import os
+        import re
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        referenced = set()
+        for folder, names in (('templates', None), ('.', ('server_modes.py', 'claude_integration.py'))):
+            for name in names or os.listdir(os.path.join(root, folder)):
+                path = os.path.join(root, folder, name)
+                if os.path.isfile(path):
+                    with open(path, encoding='utf-8') as f:
+                        referenced |= set(re.findall(r"asset_url\('([^']+)'\)", f.read()))
+        assert referenced
+        missing = [name for name in referenced if not os.path.isfile(os.path.join(root, 'static', name))]
+        assert missing == []
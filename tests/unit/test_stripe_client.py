@@ -0,0 +1,54 @@
+# tests/unit/test_stripe_client.py - Pooled Stripe client tests
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def stripe_clients():
+    """stripe_client with an empty cache before and after each test"""
+    import stripe_client
+    stripe_client.clear_stripe_clients()
+    yield stripe_client
+    stripe_client.clear_stripe_clients()
+
+
+class TestStripeClientRegistry:
+    """Per-key cached clients sharing one HTTP pool"""
+
+    def test_cached_per_key(self, stripe_clients):
+        first = stripe_clients.get_stripe_client('sk_test_a')
+        assert stripe_clients.get_stripe_client('sk_test_a') is first
+        assert stripe_clients.get_stripe_client('sk_test_b') is not first
+
+    def test_defaults_to_env_key(self, stripe_clients, monkeypatch):
+        monkeypatch.setenv('STRIPE_API_KEY', 'sk_test_env')
+        assert stripe_clients.get_stripe_client() is stripe_clients.get_stripe_client('sk_test_env')
+
+    def test_missing_key_raises(self, stripe_clients, monkeypatch):
+        monkeypatch.delenv('STRIPE_API_KEY', raising=False)
+        with pytest.raises(RuntimeError):
+            stripe_clients.get_stripe_client()
+
+    def test_uncached_clients_share_pool(self, stripe_clients, monkeypatch):
+        monkeypatch.setenv('FCC_STRIPE_POOL_SIZE', '7')
+        one_off = stripe_clients.get_stripe_client('sk_test_probe', cache=False)
+        assert stripe_clients.get_stripe_client('sk_test_probe', cache=False) is not one_off
+        adapter = stripe_clients._get_http_client()._session.get_adapter('https://api.stripe.com')
+        assert adapter._pool_maxsize == 7
+
+    def test_concurrent_first_use_builds_one_client(self, stripe_clients):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(stripe_clients.get_stripe_client('sk_test_c')))
+                   for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len({id(client) for client in results}) == 1
+
+    def test_global_api_key_untouched(self, stripe_clients):
+        import stripe
+        before = stripe.api_key
+        stripe_clients.get_stripe_client('sk_test_scoped')
+        assert stripe.api_key == before
@@ -0,0 +1,170 @@
+# tests/unit/test_xero_export.py - Streaming invoice export tests
+import csv
+import gzip
+import json
+
+import pytest
+
+
+def invoice(n, minute=None):
+    return {'invoice_id': f'inv-{n}', 'invoice_number': f'INV-{n:04d}', 'type': 'ACCREC', 'status': 'PAID',
+            'contact_name': 'Acme', 'date': '2024-12-31', 'currency_code': 'USD', 'total': float(n),
+            'due_date': None, 'amount_due': 0.0, 'amount_paid': float(n),
+            'updated_date_utc': f'2024-05-01T{(n if minute is None else minute) // 60:02d}:'
+                                f'{(n if minute is None else minute) % 60:02d}:00'}
+
+
+class FakePages:
+    """PageSource over `count` invoices in UpdatedDateUTC order; optionally fails once on reaching a page"""
+
+    def __init__(self, count, page_size=10, fail_at=None):
+        self.invoices = {f'inv-{n}': invoice(n) for n in range(count)}
+        self.page_size, self.fail_at = page_size, fail_at
+        self.starts = []
+
+    def edit(self, n, minute):
+        self.invoices[f'inv-{n}'] = dict(invoice(n, minute), total=-1.0)
+
+    def __call__(self, since):
+        self.starts.append(since)
+        rows = sorted((row for row in self.invoices.values() if since is None or row['updated_date_utc'] >= since),
+                      key=lambda row: (row['updated_date_utc'], row['invoice_id']))
+        for number, first in enumerate(range(0, len(rows), self.page_size), start=1):
+            if number == self.fail_at:
+                self.fail_at = None
+                raise ConnectionError('rate limited')
+            yield rows[first:first + self.page_size]
+
+
+class TestExport:
+    """Formats, compression and limits"""
+
+    def test_csv_has_header_and_every_row(self, tmp_path):
+        from xero_export import export_invoices, Checkpoint
+        checkpoint = Checkpoint(tmp_path / 'x.checkpoint.json')
+        result = export_invoices(FakePages(25), tmp_path / 'out.csv', checkpoint=checkpoint)
+        with open(result['file'], newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert result['count'] == len(rows) == 25
+        assert rows[0]['number'] == 'INV-0000' and rows[-1]['total'] == '24.0'
+        assert not checkpoint.path.exists() and not (tmp_path / 'out.csv.part').exists()
+
+    def test_gzipped_ndjson_is_one_readable_file(self, tmp_path):
+        from xero_export import export_invoices
+        result = export_invoices(FakePages(25), tmp_path / 'out.ndjson.gz', fmt='ndjson', compress=True)
+        with gzip.open(result['file'], 'rt') as f:
+            lines = [json.loads(line) for line in f]
+        assert [line['invoice_id'] for line in lines] == [f'inv-{n}' for n in range(25)]
+
+    def test_limit_cuts_mid_page_and_stops(self, tmp_path):
+        from xero_export import export_invoices
+        pages = FakePages(1000)
+        result = export_invoices(pages, tmp_path / 'out.csv', limit=15)
+        assert result['count'] == 15
+
+    def test_unknown_format(self, tmp_path):
+        from xero_export import export_path, ExportError
+        with pytest.raises(ExportError):
+            export_path(tmp_path, 'x', 'xlsx', False)
+
+
+class TestResume:
+    """Checkpointed exports continue after an interruption"""
+
+    @pytest.mark.parametrize('compress', [False, True])
+    def test_interrupted_export_resumes_without_duplicates(self, tmp_path, compress):
+        from xero_export import export_invoices, Checkpoint
+        checkpoint = Checkpoint(tmp_path / 'x.checkpoint.json')
+        pages = FakePages(45, fail_at=3)
+        target = tmp_path / ('out.csv.gz' if compress else 'out.csv')
+        with pytest.raises(ConnectionError):
+            export_invoices(pages, target, compress=compress, checkpoint=checkpoint)
+        assert checkpoint.load()['mark'] == {'updated': '2024-05-01T00:19:00', 'ids': ['inv-19']}
+
+        result = export_invoices(pages, target, compress=compress, checkpoint=checkpoint)
+        assert pages.starts == [None, '2024-05-01T00:19:00']
+        assert result['resumed'] and result['count'] == 45
+        opener = gzip.open if compress else open
+        with opener(result['file'], 'rt', newline='') as f:
+            numbers = [row['number'] for row in csv.DictReader(f)]
+        assert numbers == [f'INV-{n:04d}' for n in range(45)]
+
+    def test_checkpoint_for_other_export_is_ignored(self, tmp_path):
+        from xero_export import export_invoices, Checkpoint
+        checkpoint = Checkpoint(tmp_path / 'x.checkpoint.json')
+        with pytest.raises(ConnectionError):
+            export_invoices(FakePages(45, fail_at=2), tmp_path / 'a.csv', checkpoint=checkpoint,
+                            params={'kind': 'ACCREC'})
+        pages = FakePages(45)
+        result = export_invoices(pages, tmp_path / 'b.csv', checkpoint=checkpoint, params={'kind': 'ACCPAY'})
+        assert pages.starts == [None] and not result['resumed'] and result['count'] == 45
+        assert not (tmp_path / 'a.csv.part').exists()
+
+    def test_invoice_edited_between_runs_drops_nothing(self, tmp_path):
+        from xero_export import export_invoices, Checkpoint
+        checkpoint = Checkpoint(tmp_path / 'x.checkpoint.json')
+        pages = FakePages(45, fail_at=3)
+        with pytest.raises(ConnectionError):
+            export_invoices(pages, tmp_path / 'out.csv', checkpoint=checkpoint)
+        pages.edit(4, minute=500)       # an already exported invoice moves to the end of the order
+
+        result = export_invoices(pages, tmp_path / 'out.csv', checkpoint=checkpoint)
+        with open(result['file'], newline='') as f:
+            rows = list(csv.DictReader(f))
+        numbers = [row['number'] for row in rows]
+        assert numbers == [f'INV-{n:04d}' for n in range(45)] + ['INV-0004']
+        assert rows[-1]['total'] == '-1.0'
+
+    def test_ties_on_the_mark_are_not_repeated(self, tmp_path):
+        from xero_export import export_invoices, Checkpoint
+        checkpoint = Checkpoint(tmp_path / 'x.checkpoint.json')
+        pages = FakePages(30, fail_at=2)
+        for n in range(5, 15):
+            pages.edit(n, minute=5)     # one timestamp straddles the page boundary
+            pages.invoices[f'inv-{n}']['total'] = float(n)
+        with pytest.raises(ConnectionError):
+            export_invoices(pages, tmp_path / 'out.csv', checkpoint=checkpoint)
+        assert checkpoint.load()['mark']['updated'] == '2024-05-01T00:05:00'
+        result = export_invoices(pages, tmp_path / 'out.csv', checkpoint=checkpoint)
+        with open(result['file'], newline='') as f:
+            numbers = sorted(row['number'] for row in csv.DictReader(f))
+        assert numbers == [f'INV-{n:04d}' for n in range(30)]
+
+
+class TestMirrorPages:
+    """The mirror source walks by keyset, so rows moving mid-walk are not skipped"""
+
+    def test_walks_every_row_across_ties(self, tmp_path):
+        from xero_export import mirror_invoice_pages
+
+        class Mirror:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def query(self, tenant_id, entity, where=(), order=None, limit=None, offset=0):
+                rows = sorted((r for r in self.rows if all(r[f] >= v for f, op, v in where)),
+                              key=lambda r: (r['updated_date_utc'], r['invoice_id']))
+                return rows[offset:offset + limit], len(rows)
+
+        rows = [invoice(n, minute=n // 7) for n in range(40)]
+        pages = list(mirror_invoice_pages(Mirror(rows), 't-1', page_size=5)(None))
+        assert sorted(r['invoice_id'] for page in pages for r in page) == sorted(r['invoice_id'] for r in rows)
+        assert all(len(page) <= 5 for page in pages[:-1])
+
+
+class TestXeroPages:
+    """Resuming from Xero narrows the caller's filter with the keyset"""
+
+    def test_where_clause_joins_with_double_ampersand(self):
+        from types import SimpleNamespace
+        from xero_export import xero_invoice_pages
+        calls = []
+
+        def get_invoices(**kwargs):
+            calls.append(kwargs.get('where'))
+            return SimpleNamespace(invoices=[])
+
+        pages = xero_invoice_pages(SimpleNamespace(get_invoices=get_invoices), 't-1', where='Type=="ACCREC"')
+        list(pages(None))
+        list(pages('2024-05-01T09:30:15.250000+00:00'))
+        assert calls == ['Type=="ACCREC"', 'Type=="ACCREC" && UpdatedDateUTC>=DateTime(2024,05,01,09,30,15)']
@@ -0,0 +1,147 @@
+# tests/unit/test_xero_governor.py - Host-wide Xero rate-limit governor tests
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def make_governor(tmp_path):
+    def make(**limits):
+        from xero_governor import XeroGovernor, Limits
+        return XeroGovernor(tmp_path / 'governor.db', Limits(**limits), timeout=5)
+    return make
+
+
+class TestBudget:
+    """Concurrency, per-minute and daily limits"""
+
+    def test_concurrent_calls_are_capped(self, make_governor):
+        governor = make_governor(concurrent=2)
+        in_flight, peak, lock = [0], [0], threading.Lock()
+
+        def call():
+            with governor.slot('t'):
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.05)
+                with lock:
+                    in_flight[0] -= 1
+
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert peak[0] == 2
+
+    def test_minute_budget_spreads_calls(self, make_governor):
+        governor = make_governor(per_minute=3, window=0.5)
+        started = time.time()
+        for _ in range(6):
+            with governor.slot('t'):
+                pass
+        assert time.time() - started >= 0.45
+        assert governor.utilisation('t')['t']['minute']['used'] <= 3
+
+    def test_tenants_have_separate_budgets(self, make_governor):
+        governor = make_governor(per_minute=1, window=30)
+        with governor.slot('a'):
+            pass
+        with governor.slot('b'):
+            pass
+        assert governor.wait_time('a') > 25 and governor.wait_time('b') > 25
+
+    def test_spent_daily_cap_fails_fast(self, make_governor):
+        from xero_governor import RateLimitExceeded
+        governor = make_governor(per_day=1)
+        with governor.slot('t'):
+            pass
+        started = time.time()
+        with pytest.raises(RateLimitExceeded) as error:
+            governor.acquire('t', timeout=1)
+        assert time.time() - started < 0.5
+        assert error.value.reason == 'daily limit' and error.value.retry_after > 3600
+
+    def test_processes_share_one_file(self, tmp_path):
+        from xero_governor import XeroGovernor, Limits
+        first = XeroGovernor(tmp_path / 'g.db', Limits(per_minute=2, window=30))
+        second = XeroGovernor(tmp_path / 'g.db', Limits(per_minute=2, window=30))
+        with first.slot('t'):
+            pass
+        with second.slot('t'):
+            pass
+        assert first.wait_time('t') > 25
+
+
+class TestXeroHeaders:
+    """Retry-After and X-*Limit-Remaining"""
+
+    def test_retry_after_pauses_the_tenant(self, make_governor):
+        governor = make_governor()
+        call = governor.acquire('t')
+        governor.release(call, {'Retry-After': '30', 'X-Rate-Limit-Problem': 'minute'}, status=429)
+        assert 25 < governor.wait_time('t') <= 30
+        report = governor.utilisation('t')['t']
+        assert report['last_problem'] == 'minute' and report['throttled'] == 1
+
+    def test_reported_minute_remaining_overrides_local_count(self, make_governor):
+        governor = make_governor(per_minute=60)
+        call = governor.acquire('t')
+        governor.release(call, {'x-minlimit-remaining': '0', 'X-DayLimit-Remaining': '4000'}, status=200)
+        assert governor.wait_time('t') > 50
+        assert governor.utilisation('t')['t']['xero_reported'] == {'minute_remaining': 0, 'day_remaining': 4000}
+
+    def test_utilisation_is_the_tightest_limit(self, make_governor):
+        governor = make_governor(per_minute=10, concurrent=2)
+        call = governor.acquire('t')
+        report = governor.utilisation()['t']
+        assert report['concurrent']['in_flight'] == 1 and report['utilisation'] == 0.5
+        governor.release(call)
+
+
+class TestGovern:
+    """The ApiClient wrapper"""
+
+    class FakeApiClient:
+        def __init__(self, responses):
+            self.responses = list(responses)
+            self.calls = 0
+
+        def request(self, method, url, query_params=None, headers=None, **kwargs):
+            self.calls += 1
+            response = self.responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+    @staticmethod
+    def too_many(retry_after):
+        error = Exception('429')
+        error.status, error.headers = 429, {'Retry-After': str(retry_after)}
+        return error
+
+    def test_429_is_retried_after_retry_after(self, make_governor):
+        from xero_governor import govern
+        governor = make_governor()
+        ok = SimpleNamespace(status=200, headers={'X-MinLimit-Remaining': '55'})
+        client = govern(self.FakeApiClient([self.too_many(0), ok]), governor)
+        assert client.request('GET', '/Invoices', headers={'xero-tenant-id': 't'}) is ok
+        assert client.calls == 2
+        assert governor.utilisation('t')['t']['throttled'] == 1
+
+    def test_long_retry_after_is_raised(self, make_governor):
+        from xero_governor import govern
+        client = govern(self.FakeApiClient([self.too_many(3600)]), make_governor())
+        with pytest.raises(Exception, match='429'):
+            client.request('GET', '/Invoices', headers={'xero-tenant-id': 't'})
+        assert client.calls == 1
+
+    def test_calls_without_a_tenant_are_not_metered(self, make_governor):
+        from xero_governor import govern
+        governor = make_governor()
+        client = govern(self.FakeApiClient(['ok']), governor)
+        assert client.request('GET', '/connections', headers={}) == 'ok'
+        assert governor.utilisation() == {}
@@ -0,0 +1,160 @@
+# tests/unit/test_xero_mirror.py - Local Xero mirror and incremental sync tests
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_invoice(n, status='AUTHORISED', minutes=0, total=100.0, contact='Acme'):
+    return SimpleNamespace(invoice_id=f'inv-{n}', invoice_number=f'INV-{n:03d}', type='ACCREC', status=status,
+                           reference=None, total=total, currency_code='USD', date=(T0 + timedelta(days=n)).date(),
+                           due_date=None, contact=SimpleNamespace(contact_id='c-1', name=contact),
+                           amount_due=total, amount_paid=0.0, updated_date_utc=T0 + timedelta(minutes=minutes))
+
+
+class FakeXero:
+    """Answers get_invoices like Xero: If-Modified-Since filtering and paging"""
+
+    def __init__(self, invoices):
+        self.invoices = {i.invoice_id: i for i in invoices}
+        self.calls = []
+
+    def get_invoices(self, xero_tenant_id, page=1, page_size=100, if_modified_since=None, **kwargs):
+        self.calls.append({'page': page, 'if_modified_since': if_modified_since})
+        matching = [i for i in self.invoices.values()
+                    if if_modified_since is None or i.updated_date_utc > if_modified_since]
+        batch = matching[(page - 1) * page_size:page * page_size]
+        return SimpleNamespace(invoices=batch, pagination=SimpleNamespace(item_count=len(matching)))
+
+
+@pytest.fixture
+def xero():
+    return FakeXero([make_invoice(n, minutes=n) for n in range(1, 6)])
+
+
+@pytest.fixture
+def mirror(tmp_path, xero):
+    from xero_mirror import XeroMirror
+    return XeroMirror(tmp_path / 'mirror.db', api_factory=lambda: xero, page_size=2)
+
+
+class TestSync:
+    """Full and incremental synchronization"""
+
+    def test_first_sync_pages_through_everything(self, mirror, xero):
+        result = mirror.sync('t-1', 'invoices')
+        assert result.full and result.fetched == 5 and len(result.changed) == 5
+        assert [c['page'] for c in xero.calls] == [1, 2, 3]
+        assert result.high_water_mark == (T0 + timedelta(minutes=5)).isoformat()
+
+    def test_incremental_sync_asks_since_high_water_mark(self, mirror, xero):
+        mirror.sync('t-1', 'invoices')
+        xero.calls.clear()
+        xero.invoices['inv-2'] = make_invoice(2, status='PAID', minutes=30)
+        result = mirror.sync('t-1', 'invoices')
+        assert not result.full
+        assert xero.calls[0]['if_modified_since'] < T0 + timedelta(minutes=5)
+        assert [row['invoice_id'] for row in result.changed] == ['inv-2']
+        assert mirror.state('t-1', 'invoices')['high_water_mark'] == (T0 + timedelta(minutes=30)).isoformat()
+
+    def test_tenants_are_kept_apart(self, mirror):
+        mirror.sync('t-1', 'invoices')
+        assert mirror.query('t-2', 'invoices') == ([], 0)
+        assert mirror.state('t-2', 'invoices') is None
+
+    def test_version_changes_only_when_rows_change(self, mirror, xero):
+        mirror.sync('t-1', 'invoices')
+        before = mirror.version('t-1', 'invoices')
+        mirror.sync('t-1', 'invoices')
+        assert mirror.version('t-1', 'invoices') == before
+        xero.invoices['inv-9'] = make_invoice(9, minutes=60)
+        mirror.sync('t-1', 'invoices')
+        assert mirror.version('t-1', 'invoices') != before
+
+
+class TestQuery:
+    """Filtering, search and ordering in SQLite"""
+
+    @pytest.fixture(autouse=True)
+    def synced(self, mirror, xero):
+        xero.invoices['inv-3'] = make_invoice(3, status='PAID', minutes=3, total=900.0, contact='Globex 100%')
+        mirror.sync('t-1', 'invoices')
+
+    def test_filters_order_and_paging(self, mirror):
+        rows, total = mirror.query('t-1', 'invoices', where=[('status', 'in', ['AUTHORISED'])],
+                                   order='Total DESC', limit=2, offset=2)
+        assert total == 4
+        assert [row['invoice_number'] for row in rows] == ['INV-004', 'INV-005']
+
+    def test_search_is_literal(self, mirror):
+        rows, total = mirror.query('t-1', 'invoices', search='100%')
+        assert total == 1 and rows[0]['invoice_id'] == 'inv-3'
+
+    def test_unknown_fields_are_rejected(self, mirror):
+        with pytest.raises(ValueError):
+            mirror.query('t-1', 'invoices', order='data; DROP TABLE records')
+        with pytest.raises(ValueError):
+            mirror.query('t-1', 'invoices', where=[('status', 'LIKE', 'x')])
+
+
+class TestFreshness:
+    """ensure(): inline first sync, background refresh when stale"""
+
+    def test_cold_read_syncs_inline(self, mirror):
+        freshness = mirror.ensure('t-1', 'invoices')
+        assert freshness['source'] == 'mirror' and freshness['stale'] is False
+        assert freshness['record_count'] == 5
+
+    def test_stale_read_refreshes_in_background(self, mirror, monkeypatch):
+        mirror.sync('t-1', 'invoices')
+        mirror.max_age = 0
+        started = []
+        monkeypatch.setattr(mirror, 'refresh_in_background', lambda *key: started.append(key))
+        assert mirror.ensure('t-1', 'invoices')['stale'] is True
+        assert started == [('t-1', 'invoices')]
+
+    def test_failed_first_sync_raises_mirror_error(self, tmp_path):
+        from xero_mirror import XeroMirror, MirrorError
+        def unreachable():
+            raise ConnectionError('offline')
+        with pytest.raises(MirrorError):
+            XeroMirror(tmp_path / 'm.db', api_factory=unreachable).ensure('t-1', 'contacts')
+
+
+class TestMirroredEndpoints:
+    """/xero/invoices/data and /api/xero/invoices read the mirror"""
+
+    @pytest.fixture
+    def client(self, temp_dir, tmp_path, monkeypatch, xero):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard
+        app = app_with_setup_wizard.create_app({'TESTING': True, 'XERO_MIRROR_PATH': str(tmp_path / 'app.db')})
+        app.extensions['xero_integration'] = SimpleNamespace(available=True, get_api_client=lambda: None)
+        app.extensions['xero_mirror'].api_factory = lambda: xero
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['token'] = {'access_token': 'x'}
+            sess['tenant_id'] = 'tenant-1'
+        return client
+
+    def test_data_endpoint_serves_mirror_with_freshness(self, client, xero):
+        first = client.get('/xero/invoices/data?status=AUTHORISED&sort=-date&page_size=2').get_json()
+        calls = len(xero.calls)
+        second = client.get(f"/xero/invoices/data?cursor={first['next_cursor']}").get_json()
+        assert len(xero.calls) == calls
+        assert [row['invoice_number'] for row in first['items'] + second['items']] == \
+            ['INV-005', 'INV-004', 'INV-003', 'INV-002']
+        assert first['total'] == 5 and first['freshness']['source'] == 'mirror'
+
+    def test_data_version_follows_mirror(self, client, xero):
+        from conditional import data_versions
+        app = client.application
+        client.get('/xero/invoices/data')
+        with app.app_context():
+            before = data_versions.get('xero:invoices:tenant-1')
+            assert before is not None and data_versions.get('xero:live') is None
+            xero.invoices['inv-7'] = make_invoice(7, minutes=90)
+            app.extensions['xero_mirror'].sync('tenant-1', 'invoices')
+            assert data_versions.get('xero:invoices:tenant-1') != before
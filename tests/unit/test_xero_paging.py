@@ -0,0 +1,64 @@
+# tests/unit/test_xero_paging.py - Paged Xero iterator tests
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+class PagedEndpoint:
+    """A Xero list endpoint with `count` records, recording which pages were asked for"""
+
+    def __init__(self, count, fail_on_page=None):
+        self.count = count
+        self.fail_on_page = fail_on_page
+        self.pages = []
+
+    def __call__(self, page, page_size, **kwargs):
+        self.pages.append(page)
+        if page == self.fail_on_page:
+            raise ConnectionError('Xero went away')
+        start = (page - 1) * page_size
+        items = list(range(start, min(start + page_size, self.count)))
+        return SimpleNamespace(invoices=items, pagination=SimpleNamespace(item_count=self.count))
+
+
+class TestIterPages:
+    """All pages, in order, with bounded prefetch"""
+
+    @pytest.mark.parametrize('prefetch', [0, 2])
+    def test_reads_every_page(self, prefetch):
+        from xero_paging import iter_records
+        endpoint = PagedEndpoint(25)
+        assert list(iter_records(endpoint, 'invoices', page_size=10, prefetch=prefetch)) == list(range(25))
+        assert endpoint.pages == [1, 2, 3]
+
+    def test_short_first_page_starts_no_thread(self):
+        from xero_paging import iter_records
+        before = threading.active_count()
+        assert len(list(iter_records(PagedEndpoint(7), 'invoices', page_size=10))) == 7
+        assert threading.active_count() == before
+
+    def test_prefetch_is_bounded(self):
+        from xero_paging import iter_pages
+        endpoint = PagedEndpoint(1000)
+        pages = iter_pages(endpoint, 'invoices', page_size=10, prefetch=2)
+        next(pages)
+        next(pages)
+        time.sleep(0.2)
+        # page 2 handed over, pages 3-4 queued, page 5 fetched and waiting for room
+        assert max(endpoint.pages) <= 5
+        pages.close()
+
+    def test_limit_stops_paging(self):
+        from xero_paging import iter_records
+        endpoint = PagedEndpoint(500)
+        records = iter_records(endpoint, 'invoices', limit=15, page_size=10)
+        assert list(records) == list(range(15))
+        assert records.total == 500
+        assert endpoint.pages == [1, 2]
+
+    def test_errors_reach_the_consumer(self):
+        from xero_paging import iter_records
+        with pytest.raises(ConnectionError):
+            list(iter_records(PagedEndpoint(100, fail_on_page=3), 'invoices', page_size=10))
@@ -0,0 +1,70 @@
+# tests/unit/test_xero_query.py - Invoice query translation tests
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+SORTS = {'-date': 'Date DESC', '-total': 'Total DESC'}
+
+
+class TestInvoiceQuery:
+    """Request args -> Xero arguments / mirror conditions"""
+
+    def test_xero_kwargs_fetch_one_slice(self):
+        from xero_query import InvoiceQuery
+        query = InvoiceQuery.from_args({'status': 'authorised,paid', 'type': 'accrec', 'date_from': '2024-01-01',
+                                        'date_to': '2024-03-31', 'contact': 'Acme "Ltd"', 'sort': '-total',
+                                        'page': '3', 'limit': '10'}, sorts=SORTS, default_sort='-date')
+        kwargs = query.xero_kwargs()
+        assert (kwargs['page'], kwargs['page_size'], kwargs['order']) == (3, 10, 'Total DESC')
+        assert kwargs['statuses'] == ['AUTHORISED', 'PAID']
+        assert kwargs['where'] == ('Type=="ACCREC" && Date>=DateTime(2024,01,01) && Date<=DateTime(2024,03,31)'
+                                   ' && Contact.Name.ToLower().Contains("acme \\"ltd\\"")')
+
+    def test_contact_id_uses_the_indexed_argument(self):
+        from xero_query import InvoiceQuery
+        contact_id = '3e776c4b-ea9e-4bb1-96be-6b0c7a71a37f'
+        query = InvoiceQuery.from_args({'contact_id': contact_id}, sorts=SORTS, default_sort='-date')
+        assert query.xero_kwargs()['contact_i_ds'] == [contact_id]
+        assert 'where' not in query.xero_kwargs()
+
+    def test_defaults_and_limit_cap(self):
+        from xero_query import InvoiceQuery, MAX_LIMIT
+        query = InvoiceQuery.from_args({'limit': '5000'}, sorts=SORTS, default_sort='-date',
+                                       default_status='DRAFT,AUTHORISED')
+        assert query.limit == MAX_LIMIT
+        assert query.statuses == ('DRAFT', 'AUTHORISED')
+
+    def test_mirror_kwargs_page_offset(self):
+        from xero_query import InvoiceQuery
+        query = InvoiceQuery.from_args({'page': '2', 'limit': '25', 'date_to': '2024-01-31'},
+                                       sorts=SORTS, default_sort='-date')
+        kwargs = query.mirror_kwargs()
+        assert (kwargs['limit'], kwargs['offset'], kwargs['order']) == (25, 25, 'Date DESC')
+        assert ('date', '<=', '2024-01-31T23:59:59.999999') in kwargs['where']
+
+    @pytest.mark.parametrize('args', [{'status': 'BOGUS'}, {'type': 'BILL'}, {'date_from': '01/02/2024'},
+                                      {'page': '0'}, {'limit': 'ten'}, {'sort': 'password'},
+                                      {'contact_id': "x') || true"},
+                                      {'date_from': '2024-02-01', 'date_to': '2024-01-01'}])
+    def test_bad_args_raise_query_error(self, args):
+        from xero_query import InvoiceQuery, QueryError
+        with pytest.raises(QueryError):
+            InvoiceQuery.from_args(args, sorts=SORTS, default_sort='-date')
+
+    def test_mirror_answers_the_same_slice(self, tmp_path):
+        from xero_mirror import XeroMirror
+        from xero_query import InvoiceQuery
+        invoices = [SimpleNamespace(invoice_id=f'inv-{n}', invoice_number=f'INV-{n}', type='ACCREC',
+                                    status='PAID' if n % 2 else 'AUTHORISED', total=float(n), date=f'2024-01-{n:02d}',
+                                    contact=SimpleNamespace(contact_id='c', name='Acme'),
+                                    updated_date_utc=datetime(2024, 1, n, tzinfo=timezone.utc))
+                    for n in range(1, 21)]
+        api = SimpleNamespace(get_invoices=lambda **kw: SimpleNamespace(invoices=invoices if kw['page'] == 1 else []))
+        mirror = XeroMirror(tmp_path / 'm.db', api_factory=lambda: api)
+        mirror.sync('t', 'invoices')
+        query = InvoiceQuery.from_args({'status': 'PAID', 'date_from': '2024-01-05', 'sort': '-total',
+                                        'page': '2', 'limit': '3'}, sorts=SORTS, default_sort='-date')
+        rows, total = mirror.query('t', 'invoices', **query.mirror_kwargs())
+        assert total == 8
+        assert [row['invoice_id'] for row in rows] == ['inv-13', 'inv-11', 'inv-9']
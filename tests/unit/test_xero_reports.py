@@ -0,0 +1,238 @@
+# tests/unit/test_xero_reports.py - Xero financial report cache tests
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+
+def xero_report(name, amount):
+    cell = lambda value, account=None: SimpleNamespace(
+        value=value, attributes=[SimpleNamespace(id='account', value=account)] if account else None)
+    rows = [SimpleNamespace(row_type='Header', title=None, cells=[cell(''), cell('Period')], rows=None),
+            SimpleNamespace(row_type='Section', title='Income', cells=None, rows=[
+                SimpleNamespace(row_type='Row', title=None, cells=[cell('Sales', 'acc-1'), cell(str(amount))],
+                                rows=None)])]
+    return SimpleNamespace(reports=[SimpleNamespace(report_name=name, report_titles=[name], report_date='1 May 2024',
+                                                    updated_date_utc=None, rows=rows)])
+
+
+class FakeXero:
+    """Report endpoints that count their calls"""
+
+    def __init__(self, lock_date=None):
+        self.calls = []
+        self.lock_date = lock_date
+        self.amount = 100
+        self.fail = False
+
+    def get_organisations(self, xero_tenant_id):
+        return SimpleNamespace(organisations=[SimpleNamespace(period_lock_date=self.lock_date,
+                                                              end_of_year_lock_date=None)])
+
+    def _report(self, name, xero_tenant_id, **params):
+        self.calls.append((name, xero_tenant_id, params))
+        if self.fail:
+            raise RuntimeError('429 Too Many Requests')
+        return xero_report(name, self.amount)
+
+    def get_report_profit_and_loss(self, xero_tenant_id, **params):
+        return self._report('ProfitAndLoss', xero_tenant_id, **params)
+
+    def get_report_balance_sheet(self, xero_tenant_id, **params):
+        return self._report('BalanceSheet', xero_tenant_id, **params)
+
+
+class FakeMirror:
+    """Change stamps and invoice rows, as XeroMirror reports them"""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.changed_at = 1.0
+
+    def state(self, tenant_id, entity):
+        return {'changed_at': self.changed_at, 'high_water_mark': None, 'synced_at': 1.0, 'record_count': 0}
+
+    def ensure(self, tenant_id, entity):
+        pass
+
+    def query(self, tenant_id, entity, where=(), **kwargs):
+        kind = dict((field, value) for field, _, value in where)['type']
+        rows = [row for row in self.rows if row['type'] == kind]
+        return rows, len(rows)
+
+
+@pytest.fixture
+def xero():
+    return FakeXero(lock_date=date(2024, 3, 31))
+
+
+@pytest.fixture
+def mirror():
+    return FakeMirror()
+
+
+@pytest.fixture
+def reports(tmp_path, xero, mirror):
+    from xero_reports import XeroReports, ReportCache
+    return XeroReports(lambda tenant_id: xero, ReportCache(tmp_path / 'reports.db'), mirror)
+
+
+OPEN = {'from_date': date.today().replace(day=1).isoformat(), 'to_date': date.today().isoformat()}
+CLOSED = {'from_date': '2024-01-01', 'to_date': '2024-03-31'}
+
+
+class TestParams:
+    """Parameters are validated and normalised into the cache key"""
+
+    def test_defaults_and_validation(self):
+        from xero_reports import report_params, ReportError
+        today = date(2024, 5, 17)
+        assert report_params('profit-and-loss', {}, today) == {'from_date': '2024-05-01', 'to_date': '2024-05-17'}
+        assert report_params('balance-sheet', {'periods': '3', 'timeframe': 'quarter', 'payments_only': 'false'},
+                             today) == {'date': '2024-05-17', 'periods': 3, 'timeframe': 'QUARTER'}
+        for report, args in [('cash-flow', {}), ('profit-and-loss', {'from_date': 'May'}),
+                             ('profit-and-loss', {'from_date': '2024-06-01', 'to_date': '2024-05-01'}),
+                             ('balance-sheet', {'periods': 12}), ('balance-sheet', {'timeframe': 'WEEK'})]:
+            with pytest.raises(ReportError):
+                report_params(report, args, today)
+
+
+class TestCache:
+    """Closed periods are cached for good; open periods until a change or the TTL"""
+
+    def test_closed_period_never_reruns(self, reports, xero, mirror):
+        first = reports.get('t-1', 'profit-and-loss', CLOSED)
+        assert first['closed'] and not first['cached']
+        assert first['data']['rows'][1]['rows'][0] == {'type': 'Row', 'title': None, 'cells': ['Sales', '100'],
+                                                        'account_id': 'acc-1'}
+        mirror.changed_at = 2.0
+        reports.cache.ttl = 0
+        again = reports.get('t-1', 'profit-and-loss', CLOSED)
+        assert again['cached'] and again['data'] == first['data']
+        assert len(xero.calls) == 1
+        assert xero.calls[0] == ('ProfitAndLoss', 't-1', {'from_date': '2024-01-01', 'to_date': '2024-03-31'})
+
+    def test_open_period_reruns_on_change(self, reports, xero, mirror):
+        assert not reports.get('t-1', 'profit-and-loss', OPEN)['closed']
+        assert reports.get('t-1', 'profit-and-loss', OPEN)['cached']
+        xero.amount = 250
+        mirror.changed_at = 2.0     # an invoice was synced or pushed by a webhook
+        result = reports.get('t-1', 'profit-and-loss', OPEN)
+        assert not result['cached'] and result['data']['rows'][1]['rows'][0]['cells'][1] == '250'
+        assert len(xero.calls) == 2
+
+    def test_open_period_expires_after_ttl(self, reports, xero):
+        reports.get('t-1', 'balance-sheet', {})
+        reports.cache.ttl = 0
+        assert not reports.get('t-1', 'balance-sheet', {})['cached']
+        assert len(xero.calls) == 2
+
+    def test_keys_differ_by_tenant_and_params(self, reports, xero):
+        reports.get('t-1', 'balance-sheet', {'date': '2024-01-31'})
+        reports.get('t-2', 'balance-sheet', {'date': '2024-01-31'})
+        reports.get('t-1', 'balance-sheet', {'date': '2024-01-31', 'periods': 3})
+        reports.get('t-1', 'balance-sheet', {'date': '2024-01-31', 'periods': 3})
+        assert len(xero.calls) == 3
+
+    def test_shared_between_instances(self, tmp_path, xero, mirror):
+        from xero_reports import XeroReports, ReportCache
+        XeroReports(lambda tid: xero, ReportCache(tmp_path / 'shared.db'), mirror).get('t-1', 'profit-and-loss', OPEN)
+        other = XeroReports(lambda tid: xero, ReportCache(tmp_path / 'shared.db'), mirror)
+        assert other.get('t-1', 'profit-and-loss', OPEN)['cached'] and len(xero.calls) == 1
+
+    def test_stale_copy_served_when_xero_fails(self, reports, xero):
+        reports.get('t-1', 'profit-and-loss', OPEN)
+        xero.fail = True
+        result = reports.get('t-1', 'profit-and-loss', OPEN, refresh=True)
+        assert result['stale'] and result['cached'] and '429' in result['error']
+        with pytest.raises(RuntimeError):
+            reports.get('t-2', 'profit-and-loss', OPEN)
+
+    def test_without_lock_date_nothing_is_closed(self, tmp_path, mirror):
+        from xero_reports import XeroReports, ReportCache
+        xero = FakeXero()
+        reports = XeroReports(lambda tid: xero, ReportCache(tmp_path / 'reports.db'), mirror)
+        old = (date.today() - timedelta(days=400)).isoformat()
+        assert not reports.is_closed('t-1', 'balance-sheet', {'date': old})
+        assert reports.get('t-1', 'balance-sheet', {'date': old})['cached'] is False
+        mirror.changed_at = 2.0     # a back-dated edit in an unlocked period
+        assert not reports.get('t-1', 'balance-sheet', {'date': old})['cached']
+        assert len(xero.calls) == 2
+
+
+def aged_invoice(contact, kind, due, amount, currency='USD'):
+    return {'type': kind, 'contact_id': contact, 'contact_name': contact.title(), 'due_date': due,
+            'amount_due': amount, 'currency_code': currency}
+
+
+class TestAged:
+    """Aged receivables/payables come from today's outstanding invoices"""
+
+    def test_buckets_by_days_overdue(self):
+        from xero_reports import aged
+        rows = [aged_invoice('acme', 'ACCREC', '2024-06-10', 100), aged_invoice('acme', 'ACCREC', '2024-05-20', 50),
+                aged_invoice('acme', 'ACCREC', '2024-02-01', 25), aged_invoice('nimbus', 'ACCREC', '2024-04-15', 70),
+                aged_invoice('nimbus', 'ACCREC', '2024-05-01', 10, 'EUR')]
+        data = aged(rows, date(2024, 6, 1))
+        assert data['totals']['USD'] == {'total': 245.0, 'current': 100.0, '1-30': 50.0, '31-60': 70.0,
+                                         '61-90': 0.0, '90+': 25.0}
+        assert data['totals']['EUR']['31-60'] == 10.0
+        assert [(c['contact_id'], c['currency'], c['total']) for c in data['contacts']] == \
+            [('acme', 'USD', 175.0), ('nimbus', 'USD', 70.0), ('nimbus', 'EUR', 10.0)]
+        only = aged(rows, date(2024, 6, 1), contact_id='nimbus')
+        assert [c['contact_id'] for c in only['contacts']] == ['nimbus', 'nimbus']
+
+    def test_only_as_of_today(self, reports, mirror, xero):
+        from xero_reports import ReportError
+        today = date.today()
+        mirror.rows = [aged_invoice('acme', 'ACCREC', (today - timedelta(days=10)).isoformat(), 40),
+                       aged_invoice('supplier', 'ACCPAY', (today + timedelta(days=5)).isoformat(), 999)]
+        result = reports.get('t-1', 'aged-receivables')
+        assert result['params'] == {'date': today.isoformat()} and not result['closed'] and xero.calls == []
+        assert result['data']['totals']['USD']['1-30'] == 40.0
+        assert reports.get('t-1', 'aged-payables', {'date': today.isoformat()})['data']['totals']['USD']['current'] == 999.0
+        with pytest.raises(ReportError):
+            reports.get('t-1', 'aged-receivables', {'date': '2024-06-01'})
+
+    def test_live_reads_use_the_report_client(self, tmp_path, xero):
+        from xero_reports import XeroReports, ReportCache
+        due = (date.today() - timedelta(days=45)).isoformat()
+
+        def get_invoices(xero_tenant_id, **kwargs):
+            xero.calls.append(('Invoices', xero_tenant_id, kwargs.get('where')))
+            invoice = SimpleNamespace(invoice_id='inv-1', invoice_number='INV-1', type='ACCREC', status='AUTHORISED',
+                                      total=80, currency_code='USD', date=None, due_date=date.fromisoformat(due),
+                                      contact=SimpleNamespace(contact_id='acme', name='Acme'), amount_due=80,
+                                      amount_paid=0, updated_date_utc=None, reference=None)
+            return SimpleNamespace(invoices=[invoice] if kwargs.get('page', 1) == 1 else [])
+        xero.get_invoices = get_invoices
+        reports = XeroReports(lambda tenant_id: xero, ReportCache(tmp_path / 'reports.db'))
+        data = reports.get('t-1', 'aged-receivables')['data']
+        assert data['totals']['USD']['31-60'] == 80.0
+        assert xero.calls[0][:2] == ('Invoices', 't-1')
+
+
+class TestReportRoute:
+    """GET /api/xero/report/<report> on the web app"""
+
+    @pytest.fixture
+    def client(self, temp_dir, monkeypatch, reports):
+        monkeypatch.chdir(temp_dir)
+        from app_with_setup_wizard import create_app
+        from auth.security import SecurityManager
+        app = create_app({'TESTING': True, 'XERO_MIRROR': False})
+        app.extensions['xero_integration'] = SimpleNamespace(available=True, get_api_client=lambda: None)
+        app.extensions['xero_reports'] = reports
+        client = app.test_client()
+        client.environ_base['HTTP_X_API_KEY'] = SecurityManager().generate_api_key('reports-test')
+        with client.session_transaction() as sess:
+            sess['token'] = {'access_token': 'x'}
+            sess['tenant_id'] = 't-1'
+        return client
+
+    def test_report_is_served_from_cache(self, client, xero):
+        first = client.get('/api/xero/report/profit-and-loss?from_date=2024-01-01&to_date=2024-03-31')
+        assert first.status_code == 200 and first.get_json()['closed'] and not first.get_json()['cached']
+        second = client.get('/api/xero/report/profit-and-loss?from_date=2024-01-01&to_date=2024-03-31')
+        assert second.get_json()['cached'] and len(xero.calls) == 1
+        assert client.get('/api/xero/report/cash-flow').status_code == 400
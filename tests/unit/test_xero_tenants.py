@@ -0,0 +1,155 @@
+# tests/unit/test_xero_tenants.py - Multi-tenant storage and firm-wide aggregation tests
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+TODAY = date(2024, 6, 1)
+
+
+def make_invoice(n, amount_due, due, kind='ACCREC', status='AUTHORISED', currency='USD'):
+    return SimpleNamespace(invoice_id=f'inv-{n}', invoice_number=f'INV-{n:03d}', type=kind, status=status,
+                           reference=None, total=amount_due, currency_code=currency, date=T0.date(),
+                           due_date=due, contact=SimpleNamespace(contact_id='c-1', name='Acme'),
+                           amount_due=amount_due, amount_paid=0.0, updated_date_utc=T0 + timedelta(minutes=n))
+
+
+class FakeXero:
+    """get_invoices per tenant, with a delay and optional failure per tenant"""
+
+    def __init__(self, invoices, delay=0.0, failing=()):
+        self.invoices, self.delay, self.failing = invoices, delay, set(failing)
+
+    def get_invoices(self, xero_tenant_id, page=1, page_size=100, if_modified_since=None, **kwargs):
+        time.sleep(self.delay)
+        if xero_tenant_id in self.failing:
+            raise RuntimeError('Xero 503')
+        batch = self.invoices.get(xero_tenant_id, [])
+        return SimpleNamespace(invoices=batch[(page - 1) * page_size:page * page_size])
+
+
+TENANTS = [{'tenant_id': f't-{n}', 'tenant_name': f'Client {n}'} for n in range(1, 4)]
+INVOICES = {
+    't-1': [make_invoice(1, 100.0, date(2024, 5, 1)), make_invoice(2, 50.0, date(2024, 7, 1)),
+            make_invoice(3, 999.0, date(2024, 5, 1), kind='ACCPAY'),
+            make_invoice(4, 75.0, date(2024, 5, 1), status='DRAFT')],
+    't-2': [make_invoice(5, 400.0, date(2024, 5, 20)), make_invoice(6, 20.0, date(2024, 5, 20), currency='GBP')],
+    't-3': [make_invoice(7, 0.0, date(2024, 5, 1))],
+}
+
+
+def mirror_for(tmp_path, xero):
+    from xero_mirror import XeroMirror
+    return XeroMirror(tmp_path / 'mirror.db', api_factory=lambda: xero)
+
+
+class TestOutstanding:
+    """Receivables and payables merged across tenants"""
+
+    def test_totals_per_currency_and_tenant(self, tmp_path):
+        from xero_tenants import outstanding
+        report = outstanding(TENANTS, 'ACCREC', mirror=mirror_for(tmp_path, FakeXero(INVOICES)), today=TODAY)
+        assert report['complete'] and report['tenant_count'] == 3
+        assert report['totals']['USD'] == {'outstanding': 550.0, 'overdue': 500.0, 'count': 3,
+                                           'overdue_count': 2, 'tenants': 2}
+        assert report['totals']['GBP']['outstanding'] == 20.0
+        assert [t['tenant_id'] for t in report['tenants']] == ['t-2', 't-1', 't-3']
+        assert report['tenants'][1]['by_currency']['USD'] == {'outstanding': 150.0, 'overdue': 100.0,
+                                                              'count': 2, 'overdue_count': 1}
+
+    def test_payables(self, tmp_path):
+        from xero_tenants import outstanding
+        report = outstanding(TENANTS, 'accpay', mirror=mirror_for(tmp_path, FakeXero(INVOICES)), today=TODAY)
+        assert report['view'] == 'payables' and report['totals']['USD']['outstanding'] == 999.0
+
+    def test_tenants_are_queried_concurrently(self, tmp_path):
+        from xero_tenants import outstanding
+        tenants = [{'tenant_id': f't-{n}', 'tenant_name': None} for n in range(1, 7)]
+        started = time.perf_counter()
+        outstanding(tenants, mirror=mirror_for(tmp_path, FakeXero(INVOICES, delay=0.3)), today=TODAY)
+        assert time.perf_counter() - started < 1.0      # six tenants, ~one tenant's latency
+
+    def test_more_tenants_than_workers_are_not_charged_for_queueing(self, monkeypatch):
+        from concurrent.futures import ThreadPoolExecutor
+        import fanout
+        from xero_tenants import across_tenants
+        monkeypatch.setattr(fanout, '_executor', ThreadPoolExecutor(max_workers=2))
+
+        def tenant_query(tenant_id):
+            time.sleep(0.2)
+            return tenant_id
+        tenants = [{'tenant_id': f't-{n}', 'tenant_name': None} for n in range(6)]
+        entries = across_tenants(tenant_query, tenants, timeout=0.35)   # three waves of ~0.2s each
+        assert [e['status'] for e in entries] == ['ok'] * 6
+        assert all(e['latency_ms'] < 340 for e in entries)     # time in the queue is not latency
+        fanout._executor.shutdown(wait=True)
+
+    def test_failing_tenant_is_reported_not_fatal(self, tmp_path):
+        from xero_tenants import outstanding
+        report = outstanding(TENANTS, mirror=mirror_for(tmp_path, FakeXero(INVOICES, failing={'t-2'})), today=TODAY)
+        assert not report['complete']
+        failed = [t for t in report['tenants'] if t['status'] == 'error']
+        assert [t['tenant_id'] for t in failed] == ['t-2'] and 'Xero 503' in failed[0]['error']
+        assert report['totals']['USD']['outstanding'] == 150.0
+
+    def test_unknown_kind(self):
+        from xero_tenants import outstanding
+        with pytest.raises(ValueError):
+            outstanding(TENANTS, 'BILLS')
+
+
+class TestTenantStore:
+    """Every connection is kept with the token"""
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        import xero_client
+        manager = xero_client.TokenManager(tmp_path / 'xero_token.json')
+        monkeypatch.setattr(xero_client, '_tokens', manager)
+        return xero_client
+
+    def test_all_connections_are_stored(self, store):
+        conns = [SimpleNamespace(tenant_id='t-1', tenant_name='One', tenant_type='ORGANISATION'),
+                 SimpleNamespace(tenant_id='t-2', tenant_name='Two', tenant_type='ORGANISATION')]
+        store.save_token_and_tenant({'access_token': 'a'}, 't-1', [store.tenant_entry(c) for c in conns])
+        assert [t['tenant_id'] for t in store.get_tenants()] == ['t-1', 't-2']
+        store.save_token_and_tenant({'access_token': 'b'}, 't-1')     # re-login without a list keeps it
+        assert len(store.get_tenants()) == 2 and store.get_tenant_id() == 't-1'
+
+    def test_single_tenant_store_still_lists_its_tenant(self, store):
+        store._tokens.replace({'token': {'access_token': 'a'}, 'tenant_id': 't-old'})
+        assert store.get_tenants() == [{'tenant_id': 't-old', 'tenant_name': None, 'tenant_type': None}]
+
+
+class TestFirmEndpoint:
+    """GET /api/xero/firm/<view>"""
+
+    @pytest.fixture
+    def client(self, temp_dir, tmp_path, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        import app_with_setup_wizard as module
+        monkeypatch.setattr(module, 'get_tenants', lambda: TENANTS)
+        monkeypatch.setattr(module, '_xero_mirror', lambda: mirror_for(tmp_path, FakeXero(INVOICES)))
+        app = module.create_app({'TESTING': True, 'XERO_MIRROR': False})
+        app.extensions['xero_integration'] = SimpleNamespace(available=True, get_api_client=lambda: None)
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['token'] = {'access_token': 'x'}
+            sess['tenant_id'] = 't-1'
+        return client
+
+    def _get(self, client, path):
+        from auth.security import SecurityManager
+        key = SecurityManager().generate_api_key('firm-tests')
+        return client.get(path, headers={'X-API-Key': key})
+
+    def test_receivables(self, client):
+        response = self._get(client, '/api/xero/firm/receivables')
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['tenant_count'] == 3 and body['totals']['GBP']['outstanding'] == 20.0
+
+    def test_unknown_view(self, client):
+        assert self._get(client, '/api/xero/firm/profit').status_code == 404
@@ -0,0 +1,140 @@
+# tests/unit/test_xero_tokens.py - In-memory Xero token store and proactive refresh tests
+import json
+import os
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def manager(tmp_path):
+    from xero_client import TokenManager
+    manager = TokenManager(tmp_path / 'xero_token.json', refresh_margin=300)
+    yield manager
+    manager.stop()
+
+
+def token(expires_in, refresh_token='r1', access_token='a1'):
+    return {'access_token': access_token, 'refresh_token': refresh_token, 'token_type': 'Bearer',
+            'expires_in': 1800, 'expires_at': time.time() + expires_in, 'scope': ['accounting.transactions']}
+
+
+class TestTokenCache:
+    """Reads come from memory until the file changes"""
+
+    def test_unchanged_file_is_not_reread(self, manager, monkeypatch):
+        manager.replace({'token': token(1800), 'tenant_id': 't1'})
+        reads = []
+        original = type(manager.path).read_text
+        monkeypatch.setattr(type(manager.path), 'read_text', lambda self, *a, **k: reads.append(1) or original(self, *a, **k))
+        for _ in range(50):
+            assert manager.load()['tenant_id'] == 't1'
+        assert reads == []
+
+    def test_another_process_writing_is_picked_up(self, manager):
+        manager.replace({'token': token(1800), 'tenant_id': 't1'})
+        assert manager.load()['tenant_id'] == 't1'
+        manager.path.write_text(json.dumps({'token': token(1800), 'tenant_id': 't2-longer'}))
+        assert manager.load()['tenant_id'] == 't2-longer'
+
+    def test_update_keeps_other_keys_and_writes_atomically(self, manager):
+        manager.replace({'token': token(1800), 'tenant_id': 't1', 'client_id': 'c'})
+        manager.update(tenant_id='t2')
+        on_disk = json.loads(manager.path.read_text())
+        assert on_disk['tenant_id'] == 't2' and on_disk['client_id'] == 'c'
+        assert [p.name for p in manager.path.parent.iterdir()] == ['xero_token.json']
+
+    def test_callers_cannot_mutate_the_cache(self, manager):
+        manager.replace({'token': token(1800), 'tenant_id': 't1'})
+        manager.load()['token']['access_token'] = 'changed'
+        assert manager.load()['token']['access_token'] == 'a1'
+
+
+class TestRefresh:
+    """Proactive, coalesced refresh"""
+
+    def test_fresh_token_is_not_refreshed(self, manager):
+        manager.replace({'token': token(1800)})
+        calls = []
+        assert manager.refresh(lambda: calls.append(1)) is False
+        assert calls == []
+
+    def test_concurrent_refreshes_coalesce(self, manager):
+        manager.replace({'token': token(60)})
+        calls = []
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.05)
+            manager.update(token=token(1800, refresh_token='r2', access_token='a2'))
+
+        threads = [threading.Thread(target=manager.refresh, args=(refresh,)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == [1]
+        assert manager.load()['token']['access_token'] == 'a2'
+        assert not manager.path.with_name('xero_token.json.lock').exists()
+
+    def test_background_refresher_runs_before_expiry(self, manager):
+        manager.replace({'token': token(120)})    # inside the 300s margin
+        refreshed = threading.Event()
+
+        def refresh():
+            manager.update(token=token(1800, access_token='a2'))
+            refreshed.set()
+
+        manager.start_refresher(refresh)
+        assert refreshed.wait(2)
+        assert manager.load()['token']['access_token'] == 'a2'
+
+    def test_stale_lock_from_a_dead_process_is_ignored(self, manager):
+        import xero_client
+        manager.replace({'token': token(60)})
+        lock = manager.path.with_name('xero_token.json.lock')
+        lock.write_text('')
+        old = time.time() - xero_client.LOCK_STALE_AFTER - 5
+        os.utime(lock, (old, old))
+        assert manager.refresh(lambda: manager.update(token=token(1800))) is True
+
+
+class TestClientRegistry:
+    """get_api_client(): one pooled ApiClient per tenant and credential version"""
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        import xero_client
+        monkeypatch.setenv('FCC_XERO_TOKEN_REFRESH', '0')
+        monkeypatch.setenv('FCC_XERO_POOL_SIZE', '7')
+        manager = xero_client.TokenManager(tmp_path / 'xero_token.json')
+        manager.replace({'token': token(1800), 'tenant_id': 't1', 'client_id': 'id', 'client_secret': 'secret'})
+        monkeypatch.setattr(xero_client, '_tokens', manager)
+        xero_client.clear_api_clients()
+        yield manager
+        xero_client.clear_api_clients()
+
+    def test_client_is_reused(self, store):
+        from xero_client import get_api_client
+        client = get_api_client()
+        assert get_api_client('t1') is client
+        assert client.configuration.connection_pool_maxsize == 7
+
+    def test_token_refresh_keeps_the_client(self, store):
+        from xero_client import get_api_client
+        client = get_api_client()
+        store.update(token=token(1800, access_token='a2'))
+        assert get_api_client() is client
+        assert client.get_oauth2_token()['access_token'] == 'a2'
+
+    def test_new_credentials_rebuild(self, store):
+        import xero_client
+        client = xero_client.get_api_client()
+        store.update(client_secret='rotated')
+        assert xero_client.get_api_client() is not client
+        assert len(xero_client._clients) == 1
+
+    def test_tenants_get_their_own_client(self, store):
+        from xero_client import get_api_client
+        assert get_api_client('t1') is not get_api_client('t2')
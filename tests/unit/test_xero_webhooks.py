@@ -0,0 +1,198 @@
+# tests/unit/test_xero_webhooks.py - Xero webhook verification and targeted mirror refresh tests
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+KEY = 'webhook-signing-key'
+T0 = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def make_contact(contact_id, name, minutes):
+    return SimpleNamespace(contact_id=contact_id, name=name, email_address=None, phone_number=None,
+                           contact_status='ACTIVE', is_supplier=False, is_customer=True,
+                           updated_date_utc=T0 + timedelta(minutes=minutes))
+
+
+class FakeXero:
+    """get_contacts with If-Modified-Since and by-id reads"""
+
+    def __init__(self, contacts):
+        self.contacts = {c.contact_id: c for c in contacts}
+        self.calls = []
+
+    def get_contacts(self, xero_tenant_id, page=1, page_size=100, if_modified_since=None, i_ds=None, **kwargs):
+        self.calls.append({'if_modified_since': if_modified_since, 'i_ds': i_ds})
+        matching = [c for c in self.contacts.values()
+                    if (if_modified_since is None or c.updated_date_utc > if_modified_since)
+                    and (i_ds is None or c.contact_id in i_ds)]
+        return SimpleNamespace(contacts=matching[(page - 1) * page_size:page * page_size])
+
+
+def notification(*events):
+    return json.dumps({'events': [{'resourceUrl': f'https://api.xero.com/api.xro/2.0/Contacts/{rid}',
+                                   'resourceId': rid, 'eventDateUtc': '2024-05-01T13:00:00',
+                                   'eventType': 'UPDATE', 'eventCategory': category, 'tenantId': tenant,
+                                   'tenantType': 'ORGANISATION'} for tenant, category, rid in events],
+                       'firstEventSequence': 1, 'lastEventSequence': len(events), 'entropy': 'XYZ'}).encode()
+
+
+def signed(payload, key=KEY):
+    from xero_webhooks import signature
+    return signature(payload, key)
+
+
+@pytest.fixture
+def xero():
+    return FakeXero([make_contact('c-1', 'Acme', 1), make_contact('c-2', 'TechStart', 2)])
+
+
+@pytest.fixture
+def mirror(tmp_path, xero):
+    from xero_mirror import XeroMirror
+    mirror = XeroMirror(tmp_path / 'mirror.db', api_factory=lambda: xero)
+    mirror.sync('t-1', 'contacts')
+    xero.calls.clear()
+    return mirror
+
+
+class TestSignature:
+    """Intent to receive: 200 for a valid signature, 401 otherwise"""
+
+    def test_intent_to_receive(self):
+        from xero_webhooks import XeroWebhookReceiver
+        receiver = XeroWebhookReceiver(key=KEY)
+        payload = json.dumps({'events': [], 'firstEventSequence': 0, 'lastEventSequence': 0,
+                              'entropy': 'ABC'}).encode()
+        assert receiver.handle(payload, signed(payload)) == 200
+        assert receiver.handle(payload, signed(payload, 'wrong-key')) == 401
+        assert receiver.handle(payload, None) == 401
+        assert receiver.handle(payload + b' ', signed(payload)) == 401    # any byte changed
+
+    def test_missing_key_is_a_server_error(self, monkeypatch):
+        from xero_webhooks import XeroWebhookReceiver
+        monkeypatch.delenv('XERO_WEBHOOK_KEY', raising=False)
+        assert XeroWebhookReceiver().handle(b'{}', 'x') == 500
+
+
+class TestRefresh:
+    """Events re-read only the records they name"""
+
+    def test_event_refreshes_the_named_record(self, mirror, xero):
+        from xero_webhooks import XeroWebhookReceiver
+        changes = []
+        receiver = XeroWebhookReceiver(mirror, on_change=lambda *args: changes.append(args), key=KEY, delay=0)
+        before = mirror.state('t-1', 'contacts')
+
+        xero.contacts['c-2'] = make_contact('c-2', 'TechStart Group', 30)
+        payload = notification(('t-1', 'CONTACT', 'c-2'), ('t-1', 'CONTACT', 'c-2'))
+        assert receiver.handle(payload, signed(payload)) == 200
+        assert receiver.wait_idle(5)
+
+        assert xero.calls == [{'if_modified_since': None, 'i_ds': ['c-2']}]
+        rows, _ = mirror.query('t-1', 'contacts', where=[('contact_id', '=', 'c-2')])
+        assert rows[0]['name'] == 'TechStart Group'
+        assert [(tenant, entity, [r['name'] for r in rows]) for tenant, entity, rows in changes] == \
+            [('t-1', 'contacts', ['TechStart Group'])]
+        after = mirror.state('t-1', 'contacts')
+        assert after['changed_at'] > before['changed_at']      # ETags and derived caches move on
+        assert after['high_water_mark'] == before['high_water_mark'] and after['synced_at'] == before['synced_at']
+
+    def test_unchanged_record_changes_nothing(self, mirror):
+        from xero_webhooks import XeroWebhookReceiver
+        before = mirror.state('t-1', 'contacts')
+        assert XeroWebhookReceiver(mirror, key=KEY).apply('t-1', 'contacts', {'c-1'}) == []
+        assert mirror.state('t-1', 'contacts')['changed_at'] == before['changed_at']
+
+    def test_unsynced_tenant_and_other_categories_are_skipped(self, mirror, xero):
+        from xero_webhooks import XeroWebhookReceiver
+        receiver = XeroWebhookReceiver(mirror, key=KEY, delay=0)
+        payload = notification(('t-9', 'CONTACT', 'c-1'), ('t-1', 'SUBSCRIPTION', 's-1'))
+        assert receiver.handle(payload, signed(payload)) == 200
+        assert receiver.wait_idle(5)
+        assert xero.calls == [] and receiver.stats['events'] == 1
+
+    def test_contact_index_follows_a_webhook(self, mirror, xero):
+        from contact_search import ContactSearch
+        from xero_webhooks import XeroWebhookReceiver
+        search = ContactSearch(mirror)
+        assert search.search('t-1', 'nimbus') == []
+        xero.contacts['c-3'] = make_contact('c-3', 'Nimbus Analytics', 40)
+        XeroWebhookReceiver(mirror, key=KEY).apply('t-1', 'contacts', {'c-3'})
+        assert search.search('t-1', 'nimbus')[0][1]['contact_id'] == 'c-3'
+
+
+class TestFailedRefresh:
+    """A refresh Xero refuses is retried, then left for the next sync"""
+
+    def test_first_failure_is_retried(self, mirror, xero):
+        from xero_webhooks import XeroWebhookReceiver
+        read = xero.get_contacts
+        failures = []
+
+        def flaky(*args, **kwargs):
+            if not failures:
+                failures.append(kwargs)
+                raise RuntimeError('503 Service Unavailable')
+            return read(*args, **kwargs)
+        xero.get_contacts = flaky
+        receiver = XeroWebhookReceiver(mirror, key=KEY, delay=0, retry_delays=(0.01,))
+
+        xero.contacts['c-2'] = make_contact('c-2', 'TechStart Group', 30)
+        payload = notification(('t-1', 'CONTACT', 'c-2'))
+        assert receiver.handle(payload, signed(payload)) == 200
+        assert receiver.wait_idle(5)
+
+        rows, _ = mirror.query('t-1', 'contacts', where=[('contact_id', '=', 'c-2')])
+        assert rows[0]['name'] == 'TechStart Group'
+        assert receiver.stats['retried'] == 1 and receiver.stats['failed'] == 0
+
+    def test_exhausted_retries_mark_the_entity_stale(self, mirror, xero, monkeypatch):
+        from xero_webhooks import XeroWebhookReceiver
+        refreshed = []
+        monkeypatch.setattr(mirror, 'refresh_in_background', lambda tenant_id, entity: refreshed.append(entity))
+        xero.get_contacts = lambda *args, **kwargs: (_ for _ in ()).throw(RuntimeError('401 Unauthorized'))
+        receiver = XeroWebhookReceiver(mirror, key=KEY, retry_delays=())
+
+        assert receiver.apply('t-1', 'contacts', {'c-2'}) == []
+        assert receiver.stats['failed'] == 1 and receiver.wait_idle(1)
+        state = mirror.state('t-1', 'contacts')
+        assert state['synced_at'] == 0 and state['high_water_mark']    # next sync stays incremental
+        mirror.ensure('t-1', 'contacts')
+        assert refreshed == ['contacts']
+
+
+class TestWebhookRoute:
+    """POST /xero/webhook on the web app"""
+
+    @pytest.fixture
+    def client(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setenv('XERO_WEBHOOK_KEY', KEY)
+        from app_with_setup_wizard import create_app
+        return create_app({'TESTING': True, 'XERO_MIRROR': False}).test_client()
+
+    def test_valid_and_invalid_signatures(self, client):
+        payload = notification(('t-1', 'INVOICE', 'inv-1'))
+        response = client.post('/xero/webhook', data=payload, headers={'x-xero-signature': signed(payload)})
+        assert response.status_code == 200 and response.get_data() == b''
+        response = client.post('/xero/webhook', data=payload, headers={'x-xero-signature': 'forged'})
+        assert response.status_code == 401
+
+
+class TestLiveWatcher:
+    """With webhooks, live pages read the mirror instead of polling Xero"""
+
+    def test_publishes_rows_changed_by_events(self, mirror, xero, monkeypatch):
+        monkeypatch.setenv('XERO_WEBHOOK_KEY', KEY)
+        from app_with_setup_wizard import _xero_poller
+        from xero_webhooks import XeroWebhookReceiver
+        poll = _xero_poller('xero.contacts:t-1', mirror)
+        assert poll() == []
+        assert poll() == []
+        xero.contacts['c-1'] = make_contact('c-1', 'Acme Holdings', 50)
+        XeroWebhookReceiver(mirror, key=KEY).apply('t-1', 'contacts', {'c-1'})
+        assert [row['name'] for row in poll()] == ['Acme Holdings']
+        assert poll() == []
+        assert all(call['i_ds'] for call in xero.calls)     # no timed syncs against Xero
@@ -1,5 +1,5 @@
 # webhook_server.py
-# Minimal, production-friendly Stripe webhook endpoint (FastAPI)
+# Minimal, production-friendly Stripe and Xero webhook endpoints (FastAPI)
 
 import os
 import json
@@ -7,13 +7,20 @@ import logging
 from typing import Any, Dict
 
 from fastapi import FastAPI, Request, Header, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 import stripe
 
+from lazy_imports import lazy_attr
+from xero_client import get_api_client
+from xero_mirror import open_mirror, mirror_enabled
+from xero_webhooks import XeroWebhookReceiver, SIGNATURE_HEADER
+
+AccountingApi = lazy_attr("xero_python.accounting", "AccountingApi")
+
 # --- Stripe SDK baseline (pin API version you test with)
 stripe.api_version = os.environ.get("STRIPE_API_VERSION", "2024-06-20")
-stripe.api_key = os.environ.get("STRIPE_API_KEY", "")  # not required for signature verification
+# No global stripe.api_key: signature verification doesn't need it, and API calls go through stripe_client
 
 WEBHOOK_SECRET = os.environ.get("STRIPE_WEBHOOK_SECRET", "")  # whsec_...
 
@@ -21,6 +28,11 @@ app = FastAPI(title="Stripe Webhook Server", version="1.0.0")
 log = logging.getLogger("webhook")
 logging.basicConfig(level=logging.INFO)
 
+# Xero change events refresh just the named records in the shared mirror; the web app and
+# MCP server see them through the mirror's change stamp (ETags, contact index, live pages)
+xero_webhooks = XeroWebhookReceiver(
+    open_mirror(lambda: AccountingApi(get_api_client())) if mirror_enabled() else None)
+
 
 @app.get("/health")
 async def health():
@@ -96,3 +108,17 @@ async def stripe_webhook(
         # Alternatively, return 500 to force retry (be sure your handler is idempotent).
         log.exception(f"Handler error for event {event.get('id')}: {e}")
         return JSONResponse({"received": True, "warning": "handler error was logged"}, status_code=200)
+
+
+@app.post("/xero/webhook")
+async def xero_webhook(request: Request):
+    """
+    Xero sends contact/invoice events, and an "intent to receive" check when the webhook is
+    set up: 200 with an EMPTY body for a valid x-xero-signature, 401 for an invalid one.
+    The signature covers the raw body, so it is read before any parsing.
+    """
+    payload: bytes = await request.body()
+    status = xero_webhooks.handle(payload, request.headers.get(SIGNATURE_HEADER))
+    if status == 500:
+        raise HTTPException(status_code=500, detail="Missing XERO_WEBHOOK_KEY")
+    return Response(status_code=status)
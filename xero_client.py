@@ -1,10 +1,20 @@
 # xero_client.py
 import os, json
+import hashlib
+import time
+import logging
+import tempfile
+import threading
 from pathlib import Path
-from typing import Optional, Dict
-from xero_python.api_client import ApiClient, Configuration
-from xero_python.api_client.oauth2 import OAuth2Token
+from typing import Optional, Dict, List, Callable, Any, Tuple
+from lazy_imports import lazy_attr
+from xero_governor import govern
 
+ApiClient = lazy_attr("xero_python.api_client", "ApiClient")
+Configuration = lazy_attr("xero_python.api_client", "Configuration")
+OAuth2Token = lazy_attr("xero_python.api_client.oauth2", "OAuth2Token")
+
+logger = logging.getLogger(__name__)
 
 TOKENS_DIR = Path(__file__).resolve().parent / "tokens"
 TOKENS_DIR.mkdir(exist_ok=True)
@@ -12,54 +22,290 @@ TOKEN_FILE = TOKENS_DIR / "xero_token.json"
 
 ALLOWED_KEYS = {"access_token","refresh_token","token_type","expires_in","expires_at","scope","id_token"}
 
+# Refresh this long before expires_at (Xero access tokens last 30 minutes)
+REFRESH_MARGIN = float(os.getenv("FCC_XERO_TOKEN_REFRESH_MARGIN", "300"))
+LOCK_STALE_AFTER = 60.0
+
 def _sanitize_token(token: Dict) -> Dict:
     return {k: v for k, v in (token or {}).items() if k in ALLOWED_KEYS}
 
-def save_token_and_tenant(token: Dict, tenant_id: str) -> None:
-    data = {
+
+class TokenManager:
+    """
+    The token file, cached in memory: a read is an os.stat() unless another process
+    changed the file. Writes are atomic (temp file + rename). A background thread
+    refreshes the access token before it expires, and concurrent refreshes, in this
+    process or another, collapse into one.
+    """
+
+    def __init__(self, path: Path, refresh_margin: float = REFRESH_MARGIN):
+        self.path = Path(path)
+        self.refresh_margin = refresh_margin
+        self._reset()
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._data: Optional[Dict] = None
+        self._stamp = None
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> Optional[Dict]:
+        stamp = self._stat()
+        if stamp != self._stamp:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8")) if stamp else None
+            except Exception:
+                data = None
+            self._data, self._stamp = data, stamp
+        return self._data
+
+    def load(self) -> Optional[Dict]:
+        """The store ({token, tenant_id, ...}) or None; callers get their own copy"""
+        with self._lock:
+            data = self._read()
+        if data is None:
+            return None
+        copy = dict(data)
+        if isinstance(copy.get("token"), dict):
+            copy["token"] = dict(copy["token"])
+        return copy
+
+    def update(self, **changes) -> None:
+        """Read-modify-write of the store, written atomically"""
+        with self._lock:
+            data = dict(self._read() or {})
+            data.update(changes)
+            self._write(data)
+
+    def replace(self, data: Dict) -> None:
+        with self._lock:
+            self._write(dict(data))
+
+    def _write(self, data: Dict) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, indent=2))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._data, self._stamp = data, self._stat()
+
+    # Refresh
+
+    def expires_in(self) -> Optional[float]:
+        """Seconds until the access token expires (None: no token or no expiry)"""
+        token = (self.load() or {}).get("token") or {}
+        expires_at = token.get("expires_at")
+        return float(expires_at) - time.time() if expires_at else None
+
+    def _needs_refresh(self) -> bool:
+        token = (self.load() or {}).get("token") or {}
+        expires_at = token.get("expires_at")
+        return (bool(expires_at) and bool(token.get("refresh_token"))
+                and float(expires_at) - time.time() <= self.refresh_margin)
+
+    def refresh(self, refresh: Callable[[], Any]) -> bool:
+        """
+        Refresh unless someone else already has: callers in this process queue on one lock,
+        other processes on a lock file next to the token. Returns True if a refresh ran.
+        """
+        with self._refresh_lock:
+            if not self._needs_refresh():
+                return False
+            with _FileLock(self.path.with_name(self.path.name + ".lock")):
+                if not self._needs_refresh():   # another process refreshed while we waited
+                    return False
+                refresh()
+                logger.info("Xero access token refreshed ahead of expiry")
+                return True
+
+    def start_refresher(self, refresh: Callable[[], Any]) -> None:
+        """Background refresh before expiry (one thread per process; idempotent)"""
+        if os.getenv("FCC_XERO_TOKEN_REFRESH", "1").lower() in ("0", "false", "no", "off"):
+            return
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._run, args=(refresh,),
+                                               name="xero-token-refresh", daemon=True)
+            self._refresher.start()
+
+    def _run(self, refresh: Callable[[], Any]) -> None:
+        while not self._stop.is_set():
+            if not self._needs_refresh():
+                # Re-check at least every minute: a re-login or another process may change the file
+                remaining = self.expires_in()
+                delay = 60.0 if remaining is None else remaining - self.refresh_margin
+                self._stop.wait(min(max(delay, 1.0), 60.0))
+                continue
+            try:
+                self.refresh(refresh)
+            except Exception as e:
+                logger.warning(f"Background Xero token refresh failed: {e}")
+                self._stop.wait(30.0)
+                continue
+            if self._needs_refresh():
+                self._stop.wait(30.0)   # refreshed, but Xero's token is still short-lived
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class _FileLock:
+    """Exclusive lock file across processes; a lock older than LOCK_STALE_AFTER is abandoned"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def __enter__(self):
+        while True:
+            try:
+                os.close(os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(self.path).st_mtime > LOCK_STALE_AFTER:
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.1)
+
+    def __exit__(self, *exc):
+        self.path.unlink(missing_ok=True)
+
+
+_tokens = TokenManager(TOKEN_FILE)
+if hasattr(os, "register_at_fork"):
+    # The refresher thread and held locks don't survive a fork
+    os.register_at_fork(after_in_child=_tokens._reset)
+
+
+def save_token_and_tenant(token: Dict, tenant_id: str, tenants: Optional[List[Dict]] = None) -> None:
+    """Store the token, the default tenant and every connected tenant (kept if not given)"""
+    if tenants is None:
+        tenants = (load_store() or {}).get("tenants") or []
+    _tokens.replace({
         "token": _sanitize_token(token),
         "tenant_id": tenant_id,
+        "tenants": tenants,
         "client_id": os.getenv("XERO_CLIENT_ID", ""),
         "client_secret": os.getenv("XERO_CLIENT_SECRET", "")
-    }
-    TOKEN_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    })
 
 def load_store() -> Optional[Dict]:
-    if TOKEN_FILE.exists():
-        try:
-            return json.loads(TOKEN_FILE.read_text(encoding="utf-8"))
-        except Exception:
-            return None
-    return None
+    return _tokens.load()
 
-def load_api_client() -> ApiClient:
+def _pool_size() -> int:
+    return max(1, int(os.getenv("FCC_XERO_POOL_SIZE", "10")))
+
+def _credentials() -> Tuple[str, str]:
     store = load_store() or {}
-    oauth = OAuth2Token(
-        client_id=store.get("client_id") or os.getenv("XERO_CLIENT_ID", ""),
-        client_secret=store.get("client_secret") or os.getenv("XERO_CLIENT_SECRET", "")
-    )
-    api_client = ApiClient(Configuration(oauth2_token=oauth))
+    return (store.get("client_id") or os.getenv("XERO_CLIENT_ID", ""),
+            store.get("client_secret") or os.getenv("XERO_CLIENT_SECRET", ""))
+
+def _new_api_client(client_id: str, client_secret: str) -> ApiClient:
+    configuration = Configuration(oauth2_token=OAuth2Token(client_id=client_id, client_secret=client_secret))
+    # Connections kept alive per host; sized for the threads that share the client
+    configuration.connection_pool_maxsize = _pool_size()
+    # Metered against the host-wide per-tenant budget (shared with the web app)
+    api_client = govern(ApiClient(configuration))
 
-    # token getter/saver hooks
+    # token getter/saver hooks (served from memory; the file is only re-read when it changes)
     @api_client.oauth2_token_getter
     def _get_token():
-        s = load_store() or {}
-        return s.get("token")
+        return (_tokens.load() or {}).get("token")
 
     @api_client.oauth2_token_saver
     def _save_token(token):
-        s = load_store() or {}
-        s["token"] = _sanitize_token(token or {})
-        TOKEN_FILE.write_text(json.dumps(s, indent=2), encoding="utf-8")
+        _tokens.update(token=_sanitize_token(token or {}))
 
+    _tokens.start_refresher(lambda: get_api_client().refresh_oauth2_token())
     return api_client
 
+def load_api_client() -> ApiClient:
+    """A new ApiClient (own connection pool); prefer get_api_client() for repeated calls"""
+    return _new_api_client(*_credentials())
+
+
+_clients_lock = threading.Lock()
+_clients: Dict[Tuple[str, str], Any] = {}
+
+def get_api_client(tenant_id: Optional[str] = None) -> ApiClient:
+    """
+    Long-lived ApiClient for `tenant_id` (default: the stored tenant), so repeated calls reuse
+    kept-alive TLS connections. Tokens are read per call, so a refresh needs no rebuild; the
+    client is rebuilt only when the app's client id/secret change.
+    """
+    client_id, client_secret = _credentials()
+    tenant = tenant_id or get_tenant_id()
+    key = (tenant, hashlib.sha256(f"{client_id}:{client_secret}".encode()).hexdigest()[:16])
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                for stale in [k for k in _clients if k[0] == tenant]:
+                    _close(_clients.pop(stale))
+                client = _clients[key] = _new_api_client(client_id, client_secret)
+    return client
+
+def _close(api_client) -> None:
+    try:
+        api_client.rest_client.pool_manager.clear()
+    except Exception:
+        pass
+
+def clear_api_clients() -> None:
+    """Forget pooled clients and their connections (credential rotation, tests, forked children)"""
+    global _clients_lock
+    for client in list(_clients.values()):
+        _close(client)
+    _clients.clear()
+    _clients_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    # Never share pooled sockets between a preloading parent and its workers
+    os.register_at_fork(after_in_child=clear_api_clients)
+
 def set_tenant_id(tenant_id: str) -> None:
-    s = load_store() or {}
-    s["tenant_id"] = tenant_id
-    TOKEN_FILE.write_text(json.dumps(s, indent=2), encoding="utf-8")
+    _tokens.update(tenant_id=tenant_id)
 
 
 def get_tenant_id() -> str:
     store = load_store() or {}
     return store.get("tenant_id", "")
+
+
+def tenant_entry(connection) -> Dict[str, Any]:
+    """A Xero connection (IdentityApi.get_connections) as stored: id, name and type"""
+    return {"tenant_id": str(getattr(connection, "tenant_id", "") or ""),
+            "tenant_name": getattr(connection, "tenant_name", None),
+            "tenant_type": getattr(connection, "tenant_type", None)}
+
+
+def save_tenants(tenants: List[Dict]) -> None:
+    _tokens.update(tenants=list(tenants))
+
+
+def get_tenants() -> List[Dict]:
+    """Every connected organisation; stores from before multi-tenant support list the default one"""
+    store = load_store() or {}
+    tenants = store.get("tenants")
+    if tenants:
+        return tenants
+    return [{"tenant_id": store["tenant_id"], "tenant_name": None, "tenant_type": None}] if store.get("tenant_id") else []
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Xero Rate-Limit Governor for Financial Command Center AI
+One budget per Xero tenant, shared by every process on the host (Flask workers, the MCP
+servers, scripts), so they stop colliding on Xero's limits and collecting 429s:
+- 60 calls per rolling minute, 5 concurrent calls and 5000 calls per day, per tenant
+- callers wait their turn in a first-come, first-served queue when the budget is spent
+- Xero's X-MinLimit-Remaining / X-DayLimit-Remaining headers correct the local count (other
+  hosts may use the same app), and a 429's Retry-After pauses the tenant for everyone
+- state lives in a small SQLite file; each admission is one short write transaction
+
+Usage:
+    api_client = govern(ApiClient(...))      # every call that carries xero-tenant-id is metered
+    with get_governor().slot(tenant_id):     # or meter a call by hand
+        ...
+    get_governor().utilisation(tenant_id)    # budget in use, for dashboards
+
+Environment (optional):
+    FCC_XERO_GOVERNOR=0                  # don't meter calls
+    FCC_XERO_GOVERNOR_PATH=tokens/xero_governor.db
+    FCC_XERO_CALLS_PER_MINUTE=60
+    FCC_XERO_CONCURRENT_CALLS=5
+    FCC_XERO_CALLS_PER_DAY=5000
+    FCC_XERO_GOVERNOR_TIMEOUT=120        # longest a caller waits for a slot before failing
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "tokens" / "xero_governor.db"
+DAY = 86400.0
+POLL_INTERVAL = 0.05              # re-check while waiting on another process's call to finish
+WAITER_TTL = 10.0                 # a queued caller not seen for this long has gone away
+STUCK_CALL = 300.0                # an unfinished call this old belongs to a dead process
+RETRIES_ON_429 = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_id TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    pid INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS calls_tenant_started ON calls (tenant_id, started);
+CREATE TABLE IF NOT EXISTS waiters (
+    ticket INTEGER PRIMARY KEY AUTOINCREMENT,
+    tenant_id TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tenants (
+    tenant_id TEXT PRIMARY KEY,
+    blocked_until REAL NOT NULL DEFAULT 0,
+    problem TEXT,
+    min_remaining INTEGER,
+    min_seen REAL,
+    day_remaining INTEGER,
+    day_seen REAL,
+    throttled INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class RateLimitExceeded(RuntimeError):
+    """No slot within the caller's timeout (e.g. the daily cap is spent)"""
+
+    def __init__(self, tenant_id: str, retry_after: float, reason: str):
+        super().__init__(f"Xero rate limit for tenant {tenant_id}: {reason}; retry in {retry_after:.0f}s")
+        self.tenant_id = tenant_id
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class Limits:
+    per_minute: int = 60
+    concurrent: int = 5
+    per_day: int = 5000
+    window: float = 60.0          # seconds in the "minute" (shorter in tests)
+
+    @classmethod
+    def from_env(cls) -> "Limits":
+        return cls(per_minute=int(os.getenv('FCC_XERO_CALLS_PER_MINUTE', '60')),
+                   concurrent=int(os.getenv('FCC_XERO_CONCURRENT_CALLS', '5')),
+                   per_day=int(os.getenv('FCC_XERO_CALLS_PER_DAY', '5000')))
+
+
+def _header(headers, name: str) -> Optional[str]:
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = {key.lower(): v for key, v in dict(headers).items()}.get(name.lower())
+    return value
+
+
+def _int(value) -> Optional[int]:
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class XeroGovernor:
+    """Host-wide per-tenant budget in SQLite (every process opens the same file)"""
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path, limits: Optional[Limits] = None, timeout: float = 120.0):
+        self.path = str(path)
+        self.limits = limits or Limits()
+        self.timeout = timeout
+        self._local = threading.local()
+        self._pruned_at = 0.0
+        XeroGovernor._instances.add(self)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        # SQLite connections must not cross a fork
+        for governor in list(cls._instances):
+            governor._local = threading.local()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _prune(self, conn: sqlite3.Connection, now: float) -> None:
+        if now - self._pruned_at < 5:
+            return
+        self._pruned_at = now
+        conn.execute("DELETE FROM waiters WHERE seen < ?", (now - WAITER_TTL,))
+        conn.execute("UPDATE calls SET finished = ? WHERE finished IS NULL AND started < ?",
+                     (now, now - STUCK_CALL))
+        conn.execute("DELETE FROM calls WHERE started < ?", (now - DAY,))
+
+    # Budget
+
+    def _wait(self, conn: sqlite3.Connection, tenant_id: str, now: float):
+        """(seconds until a call may start, reason) for the tenant right now; 0 when it may"""
+        limits = self.limits
+        state = conn.execute(
+            "SELECT blocked_until, problem, min_remaining, min_seen, day_remaining, day_seen "
+            "FROM tenants WHERE tenant_id = ?", (tenant_id,)).fetchone()
+        blocked_until, problem, min_remaining, min_seen, day_remaining, day_seen = state or (0, None, None, None, None, None)
+        if blocked_until > now:
+            return blocked_until - now, f"Xero asked us to back off ({problem or '429'})"
+
+        in_flight = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND finished IS NULL",
+                                 (tenant_id,)).fetchone()[0]
+        if in_flight >= limits.concurrent:
+            return POLL_INTERVAL, "concurrent limit"
+
+        minute_start = now - limits.window
+        used, oldest = conn.execute("SELECT COUNT(*), MIN(started) FROM calls WHERE tenant_id = ? AND started > ?",
+                                    (tenant_id, minute_start)).fetchone()
+        if min_remaining is not None and min_seen and min_seen > minute_start:
+            # Xero's own count (includes calls from other hosts) minus what we've sent since
+            since = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND started > ?",
+                                 (tenant_id, min_seen)).fetchone()[0]
+            if min_remaining - since <= 0:
+                return max(min_seen + limits.window - now, POLL_INTERVAL), "minute limit (reported by Xero)"
+        if used >= limits.per_minute:
+            return max(oldest + limits.window - now, POLL_INTERVAL), "minute limit"
+
+        day_start = now - DAY
+        used, oldest = conn.execute("SELECT COUNT(*), MIN(started) FROM calls WHERE tenant_id = ? AND started > ?",
+                                    (tenant_id, day_start)).fetchone()
+        if day_remaining is not None and day_seen and day_seen > day_start:
+            since = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND started > ?",
+                                 (tenant_id, day_seen)).fetchone()[0]
+            if day_remaining - since <= 0:
+                return max(day_seen + DAY - now, POLL_INTERVAL), "daily limit (reported by Xero)"
+        if used >= limits.per_day:
+            return max(oldest + DAY - now, POLL_INTERVAL), "daily limit"
+        return 0.0, ""
+
+    def wait_time(self, tenant_id: str) -> float:
+        """Seconds before a new call for the tenant could start (ignoring the queue)"""
+        return self._wait(self._connection(), tenant_id, time.time())[0]
+
+    def acquire(self, tenant_id: str, timeout: Optional[float] = None) -> int:
+        """Wait for this caller's turn and a free slot; returns the call id for release()"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        pid = os.getpid()
+        ticket = None
+        try:
+            while True:
+                now = time.time()
+                with self._transaction() as conn:
+                    self._prune(conn, now)
+                    if ticket is None:
+                        ticket = conn.execute("INSERT INTO waiters (tenant_id, pid, seen) VALUES (?, ?, ?)",
+                                              (tenant_id, pid, now)).lastrowid
+                    else:
+                        conn.execute("INSERT OR REPLACE INTO waiters (ticket, tenant_id, pid, seen) "
+                                     "VALUES (?, ?, ?, ?)", (ticket, tenant_id, pid, now))
+                    first = conn.execute("SELECT MIN(ticket) FROM waiters WHERE tenant_id = ?",
+                                         (tenant_id,)).fetchone()[0]
+                    wait, reason = self._wait(conn, tenant_id, now)
+                    if first == ticket and wait == 0:
+                        conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+                        ticket = None
+                        return conn.execute("INSERT INTO calls (tenant_id, started, pid) VALUES (?, ?, ?)",
+                                            (tenant_id, now, pid)).lastrowid
+                if first != ticket:
+                    wait, reason = max(wait, POLL_INTERVAL), reason or "queued behind earlier callers"
+                if now + wait > deadline:
+                    raise RateLimitExceeded(tenant_id, wait, reason)
+                # Long waits are re-checked: a release elsewhere or fresh headers may free a slot
+                time.sleep(min(wait, 1.0))
+        finally:
+            if ticket is not None:
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM waiters WHERE ticket = ?", (ticket,))
+
+    def release(self, call_id: int, headers=None, status: Optional[int] = None) -> None:
+        """Finish a call; Xero's rate-limit headers (and a 429's Retry-After) update the tenant"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("UPDATE calls SET finished = ? WHERE id = ?", (now, call_id))
+            row = conn.execute("SELECT tenant_id FROM calls WHERE id = ?", (call_id,)).fetchone()
+            if row is None:
+                return
+            tenant_id = row[0]
+            conn.execute("INSERT OR IGNORE INTO tenants (tenant_id) VALUES (?)", (tenant_id,))
+            min_remaining = _int(_header(headers, 'X-MinLimit-Remaining'))
+            if min_remaining is not None:
+                conn.execute("UPDATE tenants SET min_remaining = ?, min_seen = ? WHERE tenant_id = ?",
+                             (min_remaining, now, tenant_id))
+            day_remaining = _int(_header(headers, 'X-DayLimit-Remaining'))
+            if day_remaining is not None:
+                conn.execute("UPDATE tenants SET day_remaining = ?, day_seen = ? WHERE tenant_id = ?",
+                             (day_remaining, now, tenant_id))
+            if status == 429:
+                retry_after = _int(_header(headers, 'Retry-After'))
+                problem = _header(headers, 'X-Rate-Limit-Problem')
+                conn.execute("UPDATE tenants SET blocked_until = MAX(blocked_until, ?), problem = ?, "
+                             "throttled = throttled + 1 WHERE tenant_id = ?",
+                             (now + (retry_after if retry_after is not None else self.limits.window),
+                              problem, tenant_id))
+                logger.warning(f"Xero 429 for tenant {tenant_id} ({problem or 'unknown limit'}), "
+                               f"pausing {retry_after}s")
+
+    @contextmanager
+    def slot(self, tenant_id: str, timeout: Optional[float] = None):
+        """with governor.slot(tenant): ... (use release() directly to pass response headers)"""
+        call_id = self.acquire(tenant_id, timeout)
+        try:
+            yield call_id
+        finally:
+            self.release(call_id)
+
+    def utilisation(self, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+        """Budget in use per tenant (every tenant seen in the last day when none is given)"""
+        conn, now, limits = self._connection(), time.time(), self.limits
+        if tenant_id:
+            tenants = [tenant_id]
+        else:
+            tenants = [row[0] for row in conn.execute(
+                "SELECT DISTINCT tenant_id FROM calls WHERE started > ?", (now - DAY,))]
+        report = {}
+        for tenant in tenants:
+            minute = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND started > ?",
+                                  (tenant, now - limits.window)).fetchone()[0]
+            day = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND started > ?",
+                               (tenant, now - DAY)).fetchone()[0]
+            in_flight = conn.execute("SELECT COUNT(*) FROM calls WHERE tenant_id = ? AND finished IS NULL",
+                                     (tenant,)).fetchone()[0]
+            waiting = conn.execute("SELECT COUNT(*) FROM waiters WHERE tenant_id = ? AND seen > ?",
+                                   (tenant, now - WAITER_TTL)).fetchone()[0]
+            state = conn.execute("SELECT blocked_until, problem, min_remaining, day_remaining, throttled "
+                                 "FROM tenants WHERE tenant_id = ?", (tenant,)).fetchone() or (0, None, None, None, 0)
+            report[tenant] = {
+                'minute': {'used': minute, 'limit': limits.per_minute},
+                'concurrent': {'in_flight': in_flight, 'limit': limits.concurrent},
+                'day': {'used': day, 'limit': limits.per_day},
+                'waiting': waiting,
+                'blocked_for': round(max(0.0, state[0] - now), 1),
+                'last_problem': state[1],
+                'xero_reported': {'minute_remaining': state[2], 'day_remaining': state[3]},
+                'throttled': state[4],
+                'utilisation': round(max(minute / limits.per_minute, in_flight / limits.concurrent,
+                                         day / limits.per_day), 3),
+            }
+        return report
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=XeroGovernor._after_fork_in_child)
+
+
+def governor_enabled() -> bool:
+    return os.getenv('FCC_XERO_GOVERNOR', '1').lower() not in ('0', 'false', 'no', 'off')
+
+
+_GOVERNOR: Optional[XeroGovernor] = None
+_GOVERNOR_LOCK = threading.Lock()
+
+
+def get_governor() -> XeroGovernor:
+    """The host-wide governor at the configured path"""
+    global _GOVERNOR
+    if _GOVERNOR is None:
+        with _GOVERNOR_LOCK:
+            if _GOVERNOR is None:
+                _GOVERNOR = XeroGovernor(os.getenv('FCC_XERO_GOVERNOR_PATH') or DEFAULT_PATH,
+                                         Limits.from_env(),
+                                         timeout=float(os.getenv('FCC_XERO_GOVERNOR_TIMEOUT', '120')))
+    return _GOVERNOR
+
+
+def _response_headers(response):
+    headers = getattr(response, 'headers', None)
+    if headers is None and hasattr(response, 'getheaders'):
+        headers = response.getheaders()
+    return headers
+
+
+def govern(api_client, governor: Optional[XeroGovernor] = None):
+    """
+    Meter every tenant-scoped call made through this xero_python ApiClient (idempotent).
+    Calls without a xero-tenant-id header (identity, token refresh) pass straight through.
+    A 429 is retried after its Retry-After when that fits within the governor's timeout.
+    """
+    if getattr(api_client, '_fcc_governed', False) or (governor is None and not governor_enabled()):
+        return api_client
+    send = api_client.request
+
+    def request(method, url, query_params=None, headers=None, **kwargs):
+        tenant_id = _header(headers, 'xero-tenant-id')
+        if not tenant_id:
+            return send(method, url, query_params=query_params, headers=headers, **kwargs)
+        gov = governor or get_governor()
+        attempt = 0
+        while True:
+            call_id = gov.acquire(tenant_id)
+            try:
+                response = send(method, url, query_params=query_params, headers=headers, **kwargs)
+            except Exception as e:
+                status = getattr(e, 'status', None)
+                gov.release(call_id, getattr(e, 'headers', None) if status else None, status)
+                if status == 429 and attempt < RETRIES_ON_429 and gov.wait_time(tenant_id) <= gov.timeout:
+                    attempt += 1
+                    continue
+                raise
+            gov.release(call_id, _response_headers(response), getattr(response, 'status', None))
+            return response
+
+    api_client.request = request
+    api_client._fcc_governed = True
+    return api_client
@@ -1,21 +1,48 @@
 # xero_mcp.py
 from __future__ import annotations
-import csv, io
-import os, shutil, base64, re
+import startup_profiler
+startup_profiler.install()  # times imports when FCC_PROFILE_STARTUP is set
+import io
+import os
 import json
+import time
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 from mcp.server.fastmcp import FastMCP
-from xero_client import load_api_client, get_tenant_id
+from xero_client import get_api_client, get_tenant_id, get_tenants, save_tenants, tenant_entry
 from xero_client import set_tenant_id
-from xero_python.accounting import Contacts, Contact, Phone, Address
-from xero_python.accounting import AccountingApi, Invoices, Invoice, LineItem
-from xero_python.accounting import Invoice as _Invoice, Invoices as _Invoices
+from xero_governor import get_governor
+from lazy_imports import lazy_attr
+from xero_mirror import open_mirror, mirror_enabled
+from xero_paging import iter_contacts, iter_invoices
+from xero_query import InvoiceQuery, QueryError, INVOICE_TYPES
+from xero_export import (export_invoices, export_path, mirror_invoice_pages, xero_invoice_pages,
+                         Checkpoint, ExportError)
+from invoice_pdfs import BulkPdfDownload, PdfCache, fetch_pdf, MAX_BULK_INVOICES
+from contact_search import ContactSearch
+from fanout import SourceSkipped, gather
+from plaid_client import get_plaid_client
+from xero_tenants import outstanding
+from xero_reports import XeroReports, ReportError
+from stripe_client import get_stripe_client
+
+# xero_python models are imported on first tool call, not at MCP spawn
+Contacts = lazy_attr("xero_python.accounting", "Contacts")
+Contact = lazy_attr("xero_python.accounting", "Contact")
+Phone = lazy_attr("xero_python.accounting", "Phone")
+Address = lazy_attr("xero_python.accounting", "Address")
+AccountingApi = lazy_attr("xero_python.accounting", "AccountingApi")
+Invoices = lazy_attr("xero_python.accounting", "Invoices")
+Invoice = lazy_attr("xero_python.accounting", "Invoice")
+LineItem = lazy_attr("xero_python.accounting", "LineItem")
+IdentityApi = lazy_attr("xero_python.identity", "IdentityApi")
+_Invoice, _Invoices = Invoice, Invoices
 
 from xero_client import set_tenant_id
 
-app = FastMCP("xero-mcp")
+with startup_profiler.phase("fastmcp_app"):
+    app = FastMCP("xero-mcp")
 
 EXPORTS_DIR = Path(__file__).resolve().parent / "exports"
 EXPORTS_DIR.mkdir(exist_ok=True)
@@ -25,7 +52,37 @@ def _now_slug():
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
 def _api() -> AccountingApi:
-    return AccountingApi(load_api_client())
+    # Pooled per tenant: tool calls reuse kept-alive connections to Xero
+    return AccountingApi(get_api_client())
+
+_MIRROR = None
+
+def _mirror(source: str = "mirror"):
+    """Shared local mirror (same file as the web app), or None for live reads"""
+    global _MIRROR
+    if source == "live" or not mirror_enabled():
+        return None
+    if _MIRROR is None:
+        _MIRROR = open_mirror(_api)
+    return _MIRROR
+
+_CONTACT_SEARCH = None
+
+def _contact_search(mirror) -> ContactSearch:
+    """Trigram index over the mirrored contacts, kept for the life of the server"""
+    global _CONTACT_SEARCH
+    if _CONTACT_SEARCH is None:
+        _CONTACT_SEARCH = ContactSearch(mirror)
+    return _CONTACT_SEARCH
+
+_REPORTS = None
+
+def _reports(mirror) -> XeroReports:
+    """Report service over the shared report cache (same file as the web app)"""
+    global _REPORTS
+    if _REPORTS is None:
+        _REPORTS = XeroReports(lambda tenant_id: AccountingApi(get_api_client(tenant_id)), mirror=mirror)
+    return _REPORTS
 
 def _tenant() -> str:
     tid = get_tenant_id()
@@ -67,14 +124,60 @@ def xero_set_tenant(tenant_id: str) -> dict:
     _save_tenant(tenant_id)
     return {"ok": True, "tenant_id": tenant_id, "saved_to": str(TENANT_FILE)}
 
+@app.tool()
+def xero_list_tenants(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Every connected Xero organisation (e.g. an accounting firm's clients).
+    refresh=True re-reads the connections from Xero.
+    """
+    if refresh:
+        conns = IdentityApi(get_api_client()).get_connections()
+        save_tenants([tenant_entry(conn) for conn in conns])
+    tenants = get_tenants()
+    return {"count": len(tenants), "current": get_tenant_id(), "tenants": tenants}
+
+@app.tool()
+def xero_firm_outstanding(kind: str = "ACCREC", timeout: float = 30.0, source: str = "mirror") -> Dict[str, Any]:
+    """
+    Outstanding receivables (ACCREC) or payables (ACCPAY) across ALL connected organisations:
+    firm-wide totals per currency plus each organisation's outstanding/overdue amounts,
+    largest first. Organisations are queried concurrently; any that fail or exceed
+    `timeout` seconds are listed with their error and left out of the totals.
+    """
+    tenants = get_tenants()
+    if not tenants:
+        return {"ok": False, "error": "No tenants stored. Log in via the Flask app first."}
+    try:
+        report = outstanding(tenants, kind, mirror=_mirror(source), timeout=max(1.0, float(timeout)))
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
+    return {"ok": True, **report}
+
+@app.tool()
+def xero_report(report: str = "profit-and-loss", from_date: str = "", to_date: str = "", date: str = "",
+                periods: int = 1, timeframe: str = "", contact_id: str = "", refresh: bool = False) -> Dict[str, Any]:
+    """
+    Financial report for the current organisation: profit-and-loss (from_date..to_date,
+    default this month), balance-sheet or trial-balance (as of date, default today),
+    aged-receivables or aged-payables (as of today, optional contact_id). Served from the
+    report cache: closed periods never re-run, open ones at most every 15 minutes or
+    when the data changes; refresh=True forces a new run.
+    """
+    args = {"from_date": from_date, "to_date": to_date, "date": date, "periods": periods if periods > 1 else None,
+            "timeframe": timeframe, "contact_id": contact_id}
+    try:
+        return {"ok": True, **_reports(_mirror()).get(_tenant(), report, args, refresh=bool(refresh))}
+    except ReportError as e:
+        return {"ok": False, "error": str(e)}
+
 @app.tool()
 def xero_list_contacts(limit: int = 10, order: str = "Name ASC") -> Dict[str, Any]:
     """List first N contacts."""
-    cs = _api().get_contacts(xero_tenant_id=_tenant(), order=order)
+    cs = iter_contacts(_api(), _tenant(), order=order, limit=max(1, int(limit)))
     def brief(c):
         return {"name": c.name, "email": c.email_address, "is_customer": bool(c.is_customer), "is_supplier": bool(c.is_supplier)}
-    items = [brief(c) for c in (cs.contacts or [])[: max(1, int(limit))]]
-    return {"count": len(cs.contacts or []), "first": items}
+    items = [brief(c) for c in cs]
+    return {"count": cs.total if cs.total is not None else len(items), "first": items}
 
 @app.tool()
 def xero_create_contact(
@@ -134,74 +237,23 @@ def xero_get_invoice_pdf(invoice_number: str = "", invoice_id: str = "") -> dict
             return {"ok": False, "error": f"No invoice found with number {invoice_number}"}
         inv_id = str(invs.invoices[0].invoice_id)
 
-    # Try whichever PDF method exists
-    if hasattr(api, "get_invoice_as_pdf"):
-        resp = api.get_invoice_as_pdf(xero_tenant_id=tid, invoice_id=inv_id)
-    elif hasattr(api, "get_invoice_pdf"):
-        resp = api.get_invoice_pdf(xero_tenant_id=tid, invoice_id=inv_id)
-    else:
-        return {"ok": False, "error": "SDK missing PDF method (get_invoice_as_pdf / get_invoice_pdf)."}
-
-    # Destination path
+    try:
+        content, via = fetch_pdf(api, tid, inv_id)
+    except ValueError as e:
+        return {"ok": False, "error": str(e)}
     out_path = EXPORTS_DIR / f"invoice_{inv_id}_{_now_slug()}.pdf"
+    out_path.write_bytes(content)
+    return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": via}
 
-    # Case A) Some builds return a path string to a temp file
-    if isinstance(resp, str) and os.path.exists(resp):
-        try:
-            # If the temp file lacks .pdf, we still copy it with .pdf extension
-            shutil.copyfile(resp, out_path)
-            size = out_path.stat().st_size
-            return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": size, "via": "tempfile"}
-        finally:
-            # Optional: clean up temp file if you want
-            # os.remove(resp)
-            pass
-
-    # Case B) Stream-like object
-    if hasattr(resp, "read"):
-        content = resp.read()
-        out_path.write_bytes(content)
-        return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": "read()"}
-
-    # Case C) urllib3 HTTPResponse-like
-    if hasattr(resp, "data"):
-        content = resp.data
-        out_path.write_bytes(content)
-        return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": ".data"}
-
-    # Case D) Direct bytes-ish
-    if isinstance(resp, (bytes, bytearray, memoryview)):
-        content = bytes(resp)
-        out_path.write_bytes(content)
-        return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": "bytes"}
-
-    # Case E) String but not a path: handle %PDF or base64
-    if isinstance(resp, str):
-        s = resp.lstrip()
-        if s.startswith("%PDF"):
-            content = resp.encode("latin-1", errors="ignore")
-            out_path.write_bytes(content)
-            return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": "str-%PDF"}
-        # try base64
-        base64ish = re.fullmatch(r"[A-Za-z0-9+/=\r\n]+", s) and (len(s.strip()) % 4 == 0)
-        if base64ish:
-            try:
-                content = base64.b64decode(s, validate=True)
-                out_path.write_bytes(content)
-                return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": "base64"}
-            except Exception:
-                pass
-        # If it’s a string that isn’t a path, %PDF, or base64:
-        preview = s[:60].replace("\n", "\\n")
-        return {"ok": False, "error": f"Unexpected PDF response string (not a file, %PDF, or base64). Preview: '{preview}'"}
-
-    # Last resort
-    try:
-        content = bytes(resp)
-        out_path.write_bytes(content)
-        return {"ok": True, "file": str(out_path), "invoice_id": inv_id, "size": len(content), "via": "bytes(resp)"}
-    except Exception:
-        return {"ok": False, "error": f"Unhandled PDF response type: {type(resp)}"}
+
+@app.tool()
+def xero_rate_limit_status() -> dict:
+    """
+    Xero API budget in use for the current tenant (calls this minute, in flight, today),
+    shared with the web app and any other process on this machine.
+    """
+    tid = _tenant()
+    return {"ok": True, "tenant_id": tid, **get_governor().utilisation(tid).get(tid, {})}
 
 
 @app.tool()
@@ -224,11 +276,27 @@ def xero_org_info() -> dict:
     }
 
 @app.tool()
-def xero_find_contact(name: str, limit: int = 5) -> dict:
+def xero_find_contact(name: str, limit: int = 5, source: str = "mirror") -> dict:
     """
-    Try exact match first; if not found, return up to `limit` fuzzy matches (contains, case-insensitive).
+    Exact name match if there is one, else up to `limit` ranked fuzzy matches on name, email
+    or phone (typos and partial names are fine). Searches a local index of the mirrored
+    contacts unless source="live" (exact, then contains, against Xero).
     """
-    api = _api(); tid = _tenant()
+    tid = _tenant()
+    limit = max(1, int(limit))
+    mirror = _mirror(source)
+    if mirror:
+        freshness = mirror.ensure(tid, "contacts")
+        matches = _contact_search(mirror).search(tid, name, limit=limit)
+        if matches and matches[0][0] >= 1.0:
+            c = matches[0][1]
+            return {"match": "exact", "contact": {"contact_id": c["contact_id"], "name": c["name"], "email": c["email"]},
+                    "freshness": freshness}
+        out = [{"contact_id": c["contact_id"], "name": c["name"], "email": c["email"], "score": score}
+               for score, c in matches]
+        return {"match": "fuzzy", "count": len(out), "contacts": out, "freshness": freshness}
+
+    api = _api()
     q = name.replace('"', '\\"')
 
     # Exact
@@ -238,8 +306,8 @@ def xero_find_contact(name: str, limit: int = 5) -> dict:
         return {"match": "exact", "contact": {"contact_id": c.contact_id, "name": c.name, "email": c.email_address}}
 
     # Fuzzy (contains)
-    fuzzy = api.get_contacts(xero_tenant_id=tid, where=f'Name.ToLower().Contains("{q.lower()}")', order="Name ASC")
-    out = [{"contact_id": c.contact_id, "name": c.name, "email": c.email_address} for c in (fuzzy.contacts or [])[:max(1,int(limit))]]
+    fuzzy = iter_contacts(api, tid, where=f'Name.ToLower().Contains("{q.lower()}")', order="Name ASC", limit=limit)
+    out = [{"contact_id": c.contact_id, "name": c.name, "email": c.email_address} for c in fuzzy]
     return {"match": "fuzzy", "count": len(out), "contacts": out}
 
 @app.tool()
@@ -249,39 +317,44 @@ def xero_list_invoices(
     contact_name: str = "",
     date_from: str = "",          # "YYYY-MM-DD"
     date_to: str = "",            # "YYYY-MM-DD"
-    limit: int = 10
+    limit: int = 10,
+    source: str = "mirror"        # mirror | live
 ) -> dict:
     """
     List invoices with optional filters.
+    Reads the local mirror (kept fresh by incremental syncs) unless source="live".
     """
-    api = _api(); tid = _tenant()
-    wh = []
-
-    if kind and kind.upper() in ("ACCREC", "ACCPAY"):
-        wh.append(f'Type=="{kind.upper()}"')
-
-    if status:
-        wh.append(f'Status=="{status.upper()}"')
-
-    if contact_name:
-        q = contact_name.replace('"','\\"')
-        wh.append(f'Contact.Name.ToLower().Contains("{q.lower()}")')
-
-    # Xero supports Date/DateUTC filters via Date >= DateTime(YYYY,MM,DD)
-    def _ymd(s): 
-        y,m,d = [int(x) for x in s.split("-")]
-        return f"Date >= DateTime({y},{m},{d})"
-    def _ymd_to(s): 
-        y,m,d = [int(x) for x in s.split("-")]
-        return f"Date <= DateTime({y},{m},{d})"
-
-    if date_from:
-        wh.append(_ymd(date_from))
-    if date_to:
-        wh.append(_ymd_to(date_to))
-
-    where = " && ".join(wh) if wh else None
-    invs = api.get_invoices(xero_tenant_id=tid, where=where, order="Date DESC")
+    try:
+        query = InvoiceQuery.from_args({
+            "type": kind if kind and kind.upper() in INVOICE_TYPES else "",
+            "status": status,
+            "contact": contact_name,
+            "date_from": date_from,
+            "date_to": date_to,
+            "limit": str(max(1, int(limit))),
+        }, sorts={"-date": "Date DESC"}, default_sort="-date", max_limit=1000)
+    except QueryError as e:
+        return {"ok": False, "error": str(e)}
+
+    tid = _tenant()
+    mirror = _mirror(source)
+    if mirror:
+        freshness = mirror.ensure(tid, "invoices")
+        rows, total = mirror.query(tid, "invoices", **query.mirror_kwargs())
+        items = [{
+            "invoice_id": r["invoice_id"],
+            "number": r["invoice_number"],
+            "type": r["type"],
+            "status": r["status"],
+            "contact": r["contact_name"],
+            "total": r["total"],
+            "currency": r["currency_code"],
+            "date": r["date"],
+        } for r in rows]
+        return {"total": total, "first": items, "filters": query.filters(), "freshness": freshness}
+
+    # One page of exactly `limit` invoices; Xero filters, orders and counts
+    invs = _api().get_invoices(xero_tenant_id=tid, **query.xero_kwargs())
     def brief(i):
         return {
             "invoice_id": str(i.invoice_id),
@@ -293,8 +366,9 @@ def xero_list_invoices(
             "currency": i.currency_code,
             "date": str(i.date) if getattr(i, "date", None) else None
         }
-    items = [brief(i) for i in (invs.invoices or [])[:max(1,int(limit))]]
-    return {"total": len(invs.invoices or []), "first": items, "where": where}
+    items = [brief(i) for i in (invs.invoices or [])]
+    total = getattr(getattr(invs, "pagination", None), "item_count", None)
+    return {"total": total if total is not None else len(items), "first": items, "where": query.where()}
 
 @app.tool()
 def xero_delete_draft_invoice(invoice_number: str) -> dict:
@@ -334,82 +408,166 @@ def xero_delete_draft_invoice(invoice_number: str) -> dict:
         return {"ok": False, "error": f"Update failed: {e}"}
 
 @app.tool()
-def xero_export_invoices_csv(limit: int = 100, kind: str = "ALL") -> dict:
+def xero_export_invoices_csv(limit: int = 0, kind: str = "ALL", fmt: str = "csv", compress: bool = False,
+                             resume: bool = True, source: str = "mirror") -> dict:
     """
-    Export up to `limit` invoices to a CSV file in exports/.
-    Columns: number, type, status, contact, date, currency, total.
+    Export invoices (all of them, or the first `limit`) to exports/ as csv, ndjson or parquet,
+    optionally gzipped. Columns: number, type, status, contact, date, currency, total, then
+    invoice_id, due_date, amount_due, amount_paid, updated_date_utc.
+    Rows are written page by page as they arrive, so large ledgers don't sit in memory; an
+    interrupted export of the same kind/format continues from its checkpoint when resume=True.
     """
-    api = _api(); tid = _tenant()
-    where = None
-    if kind and kind.upper() in ("ACCREC","ACCPAY"):
-        where = f'Type=="{kind.upper()}"'
-    invs = api.get_invoices(xero_tenant_id=tid, where=where, order="Date DESC")
-    rows = []
-    for i in (invs.invoices or [])[:max(1,int(limit))]:
-        rows.append([
-            i.invoice_number,
-            i.type,
-            i.status,
-            getattr(i.contact, "name", None),
-            str(i.date) if getattr(i, "date", None) else "",
-            i.currency_code,
-            float(i.total or 0),
-        ])
-
-    path = EXPORTS_DIR / f"invoices_{kind or 'ALL'}_{_now_slug()}.csv"
-    with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["number","type","status","contact","date","currency","total"])
-        w.writerows(rows)
-
-    return {"ok": True, "count": len(rows), "file": str(path)}
+    tid = _tenant()
+    kind = kind.upper() if kind and kind.upper() in INVOICE_TYPES else "ALL"
+    try:
+        path = export_path(EXPORTS_DIR, f"invoices_{kind}_{_now_slug()}", fmt, compress)
+    except ExportError as e:
+        return {"ok": False, "error": str(e)}
+
+    mirror = _mirror(source)
+    if mirror:
+        freshness = mirror.ensure(tid, "invoices")
+        pages = mirror_invoice_pages(mirror, tid, where=[("type", "=", kind)] if kind != "ALL" else [])
+    else:
+        freshness = {"source": "xero"}
+        pages = xero_invoice_pages(_api(), tid, **({"where": f'Type=="{kind}"'} if kind != "ALL" else {}))
+
+    checkpoint = Checkpoint(EXPORTS_DIR / f".invoices_{kind}_{fmt}{'_gz' if compress else ''}.checkpoint.json")
+    if not resume:
+        checkpoint.clear()
+    try:
+        result = export_invoices(pages, path, fmt=fmt, compress=compress, checkpoint=checkpoint,
+                                 params={"tenant_id": tid, "kind": kind, "source": source},
+                                 limit=int(limit) if int(limit) > 0 else None)
+    except ExportError as e:
+        return {"ok": False, "error": str(e)}
+    return dict(result, freshness=freshness)
 
 
+@app.tool()
+def xero_bulk_invoice_pdfs(invoice_numbers: Optional[List[str]] = None, status: str = "", kind: str = "",
+                           date_from: str = "", date_to: str = "", contact: str = "",
+                           limit: int = MAX_BULK_INVOICES) -> dict:
+    """
+    Download many invoice PDFs into one zip in exports/ (with a manifest.json).
+    Either list invoice_numbers, or filter by status (comma-separated), kind (ACCREC/ACCPAY),
+    date_from/date_to (YYYY-MM-DD) and contact name. Unchanged invoices come from the local
+    PDF cache; the rest download a few at a time.
+    """
+    api = _api(); tid = _tenant()
+    try:
+        query = InvoiceQuery(statuses=tuple(s.strip().upper() for s in status.split(",") if s.strip()),
+                             invoice_type=kind.strip().upper() or None,
+                             date_from=date.fromisoformat(date_from) if date_from else None,
+                             date_to=date.fromisoformat(date_to) if date_to else None,
+                             contact=contact.strip())
+    except (QueryError, ValueError) as e:
+        return {"ok": False, "error": str(e)}
+    filters = {k: v for k, v in query.xero_kwargs().items() if k in ("statuses", "where")}
+    if not invoice_numbers and not filters:
+        return {"ok": False, "error": "Provide invoice_numbers or at least one filter"}
+
+    bulk = BulkPdfDownload(api, tid, PdfCache())
+    refs = bulk.resolve(numbers=invoice_numbers or (), limit=max(1, min(int(limit), MAX_BULK_INVOICES)),
+                        **({} if invoice_numbers else filters))
+    if not refs:
+        return {"ok": False, "error": "No invoices matched"}
+    out_path = EXPORTS_DIR / f"invoice_pdfs_{_now_slug()}.zip"
+    with open(out_path, "wb") as f:
+        for chunk in bulk.zip_stream(refs):
+            f.write(chunk)
+    missing = sorted(set(invoice_numbers or ()) - {r.number for r in refs})
+    return {"ok": True, "file": str(out_path), "size": out_path.stat().st_size, **bulk.stats,
+            "not_found": missing}
+
+
+def _dashboard_sources(tid: str, mirror) -> Dict[str, Any]:
+    """Independent loaders behind xero_dashboard; each runs on its own fan-out thread"""
+
+    def xero_accounts():
+        if mirror:
+            freshness = mirror.ensure(tid, "accounts")
+            _, count = mirror.query(tid, "accounts", limit=0)
+            return {"accounts_count": count, "freshness": freshness}
+        return {"accounts_count": len(_api().get_accounts(tid).accounts or [])}
+
+    def xero_invoices():
+        if mirror:
+            freshness = mirror.ensure(tid, "invoices")
+            last, count = mirror.query(tid, "invoices", order="Date DESC", limit=1)
+            return {"invoices_count": count, "last_invoice": last[0]["invoice_number"] if last else None,
+                    "freshness": freshness}
+        invs = iter_invoices(_api(), tid, order="Date DESC", limit=1)
+        last = next(invs, None)
+        return {"invoices_count": invs.total or 0, "last_invoice": last.invoice_number if last else None}
+
+    def stripe():
+        if not os.getenv("STRIPE_API_KEY"):
+            raise SourceSkipped("STRIPE_API_KEY not set")
+        charges = get_stripe_client().v1.charges.list(params={"limit": 5})
+        return [{"id": c["id"], "amount": c["amount"], "currency": c["currency"], "paid": c["paid"]}
+                for c in charges.get("data", [])]
+
+    def plaid():
+        if not (os.getenv("PLAID_CLIENT_ID") and os.getenv("PLAID_SECRET") and os.getenv("PLAID_ACCESS_TOKEN")):
+            raise SourceSkipped("PLAID_CLIENT_ID, PLAID_SECRET and PLAID_ACCESS_TOKEN not all set")
+        from plaid.model.accounts_balance_get_request import AccountsBalanceGetRequest
+        req = AccountsBalanceGetRequest(access_token=os.getenv("PLAID_ACCESS_TOKEN"))
+        return get_plaid_client().accounts_balance_get(req).to_dict().get("accounts")
+
+    return {"xero_accounts": xero_accounts, "xero_invoices": xero_invoices, "stripe": stripe, "plaid": plaid}
 
 @app.tool()
-def xero_dashboard() -> Dict[str, Any]:
+def xero_dashboard(timeout: float = 8.0) -> Dict[str, Any]:
     """
     Compact multi-source snapshot: Xero always; Stripe/Plaid included if envs are set.
+    Sources load in parallel, each with `timeout` seconds; whatever answered is returned,
+    with per-source status/latency in "timings" and failures in "<source>_error".
     """
+    started = time.perf_counter()
     out: Dict[str, Any] = {"sources": []}
-    # XERO
+    mirror = None
     try:
-        api = _api()
         tid = _tenant()
-        accts = api.get_accounts(tid)
-        invs  = api.get_invoices(tid, order="Date DESC")
-        out["xero"] = {"tenant_id": tid, "accounts_count": len(accts.accounts or []), "invoices_count": len(invs.invoices or []), "last_invoice": (invs.invoices[0].invoice_number if (invs.invoices or []) else None)}
-        out["sources"].append("xero")
+        mirror = _mirror()
     except Exception as e:
-        out["xero_error"] = str(e)
-
-    # STRIPE (optional)
-    try:
-        import stripe
-        if os.getenv("STRIPE_API_KEY"):
-            stripe.api_key = os.getenv("STRIPE_API_KEY")
-            charges = stripe.Charge.list(limit=5)
-            out["stripe"] = [{"id": c["id"], "amount": c["amount"], "currency": c["currency"], "paid": c["paid"]} for c in charges.get("data", [])]
-            out["sources"].append("stripe")
-    except Exception as e:
-        out["stripe_error"] = str(e)
-
-    # PLAID (optional)
-    try:
-        import plaid
-        from plaid.api import plaid_api
-        if os.getenv("PLAID_CLIENT_ID") and os.getenv("PLAID_SECRET") and os.getenv("PLAID_ACCESS_TOKEN"):
-            cfg = plaid.Configuration(host=plaid.Environment.Sandbox, api_key={"clientId": os.getenv("PLAID_CLIENT_ID"), "secret": os.getenv("PLAID_SECRET")})
-            client = plaid_api.PlaidApi(plaid.ApiClient(cfg))
-            from plaid.model.accounts_balance_get_request import AccountsBalanceGetRequest
-            req = AccountsBalanceGetRequest(access_token=os.getenv("PLAID_ACCESS_TOKEN"))
-            balances = client.accounts_balance_get(req).to_dict()
-            out["plaid"] = balances.get("accounts")
-            out["sources"].append("plaid")
-    except Exception as e:
-        out["plaid_error"] = str(e)
-
+        tid, out["xero_error"] = None, str(e)
+    sources = _dashboard_sources(tid, mirror)
+    if tid is None:
+        sources = {name: fn for name, fn in sources.items() if not name.startswith("xero_")}
+
+    results = gather(sources, timeout=max(0.1, float(timeout)))
+
+    xero_parts = [results[name] for name in ("xero_accounts", "xero_invoices") if name in results]
+    if any(r.ok for r in xero_parts):
+        out["xero"] = {"tenant_id": tid}
+        freshness = {}
+        for r in xero_parts:
+            if r.ok:
+                value = dict(r.value)
+                if "freshness" in value:
+                    freshness[r.name[len("xero_"):]] = value.pop("freshness")
+                out["xero"].update(value)
+        if freshness:
+            out["xero"]["freshness"] = freshness
+        out["sources"].append("xero")
+    errors = [f"{r.name[len('xero_'):]}: {r.error}" for r in xero_parts if r.status in ("error", "timeout")]
+    if errors:
+        out["xero_error"] = "; ".join(errors)
+
+    for name in ("stripe", "plaid"):
+        r = results[name]
+        if r.ok:
+            out[name] = r.value
+            out["sources"].append(name)
+        elif r.status in ("error", "timeout"):
+            out[f"{name}_error"] = r.error
+
+    out["timings"] = {name: r.annotation() for name, r in results.items()}
+    out["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
     return out
 
+startup_profiler.finish('xero_mcp')
+
 if __name__ == "__main__":
     app.run()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+Xero Mirror for Financial Command Center AI
+A local SQLite copy of a tenant's contacts, invoices, accounts and payments, so list views,
+the JSON API and the MCP tools read in milliseconds instead of downloading every record
+from Xero (60 calls/minute per tenant) on each request:
+- each (tenant, entity) keeps a high-water mark: the newest UpdatedDateUTC seen
+- a sync asks Xero only for records modified since that mark (If-Modified-Since), walking
+  every page with prefetch (xero_paging)
+- reads never wait on Xero once a tenant has been synced; a stale mirror is refreshed in
+  the background and the response says how old the data is (freshness metadata)
+
+Usage:
+    mirror = configure_xero_mirror(app, api_factory=lambda: AccountingApi(get_api_client()))
+    freshness = mirror.ensure(tenant_id, 'invoices')
+    rows, total = mirror.query(tenant_id, 'invoices', where=[('status', 'in', ['AUTHORISED'])],
+                               search='acme', order='Date DESC', limit=50)
+
+Environment (optional):
+    FCC_XERO_MIRROR=0                    # read from Xero live instead
+    FCC_XERO_MIRROR_PATH=tokens/xero_mirror.db
+    FCC_XERO_MIRROR_MAX_AGE=300          # seconds before a read triggers a background sync
+                                         # (3600 when XERO_WEBHOOK_KEY is set: webhooks keep it fresh)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from conditional import Version
+from xero_paging import iter_pages, PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "tokens" / "xero_mirror.db"
+DEFAULT_MAX_AGE = 300
+# With Xero webhooks (xero_webhooks) changes arrive as events; the timed sync is only a backstop
+WEBHOOK_MAX_AGE = 3600
+# Xero compares If-Modified-Since to the second; re-read a little to be safe (upserts are idempotent)
+HIGH_WATER_OVERLAP = timedelta(seconds=1)
+# Ids per by-id request (they travel in the query string)
+IDS_PER_CALL = 50
+
+
+def enum_value(value, default='N/A'):
+    """Xero enums expose .value; tolerate plain strings and missing fields"""
+    if not value:
+        return default
+    return value.value if hasattr(value, 'value') else str(value)
+
+
+def _iso(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def contact_row(contact) -> Dict[str, Any]:
+    """Contact as stored in the mirror and shown on /xero/contacts"""
+    return {
+        'contact_id': str(getattr(contact, 'contact_id', '') or ''),
+        'name': getattr(contact, 'name', 'N/A') or 'N/A',
+        'email': getattr(contact, 'email_address', 'N/A') or 'N/A',
+        'phone': getattr(contact, 'phone_number', 'N/A') or 'N/A',
+        'status': enum_value(getattr(contact, 'contact_status', None)),
+        'is_supplier': bool(getattr(contact, 'is_supplier', False)),
+        'is_customer': bool(getattr(contact, 'is_customer', False)),
+        'first_name': getattr(contact, 'first_name', '') or '',
+        'last_name': getattr(contact, 'last_name', '') or '',
+        'updated_date_utc': _iso(getattr(contact, 'updated_date_utc', None)),
+    }
+
+
+def invoice_row(invoice) -> Dict[str, Any]:
+    """Invoice as stored in the mirror and shown on /xero/invoices"""
+    contact = getattr(invoice, 'contact', None)
+    return {
+        'invoice_id': str(getattr(invoice, 'invoice_id', '') or ''),
+        'invoice_number': getattr(invoice, 'invoice_number', None) or 'N/A',
+        'type': enum_value(getattr(invoice, 'type', None)),
+        'status': enum_value(getattr(invoice, 'status', None)),
+        'reference': getattr(invoice, 'reference', None),
+        'total': float(getattr(invoice, 'total', 0) or 0),
+        'currency_code': enum_value(getattr(invoice, 'currency_code', None), 'USD'),
+        'date': _iso(getattr(invoice, 'date', None)),
+        'due_date': _iso(getattr(invoice, 'due_date', None)),
+        'contact_id': str(getattr(contact, 'contact_id', '') or '') or None,
+        'contact_name': (getattr(contact, 'name', None) or 'N/A') if contact else 'N/A',
+        'amount_due': float(getattr(invoice, 'amount_due', 0) or 0),
+        'amount_paid': float(getattr(invoice, 'amount_paid', 0) or 0),
+        'updated_date_utc': _iso(getattr(invoice, 'updated_date_utc', None)),
+    }
+
+
+def account_row(account) -> Dict[str, Any]:
+    """Chart-of-accounts entry as stored in the mirror"""
+    return {
+        'account_id': str(getattr(account, 'account_id', '') or ''),
+        'code': getattr(account, 'code', None),
+        'name': getattr(account, 'name', None),
+        'type': enum_value(getattr(account, 'type', None), None),
+        'class': enum_value(getattr(account, '_class', None), None),
+        'status': enum_value(getattr(account, 'status', None), None),
+        'currency_code': enum_value(getattr(account, 'currency_code', None), None),
+        'tax_type': getattr(account, 'tax_type', None),
+        'bank_account_number': getattr(account, 'bank_account_number', None),
+        'updated_date_utc': _iso(getattr(account, 'updated_date_utc', None)),
+    }
+
+
+def payment_row(payment) -> Dict[str, Any]:
+    """Payment as stored in the mirror"""
+    invoice = getattr(payment, 'invoice', None)
+    account = getattr(payment, 'account', None)
+    return {
+        'payment_id': str(getattr(payment, 'payment_id', '') or ''),
+        'date': _iso(getattr(payment, 'date', None)),
+        'amount': float(getattr(payment, 'amount', 0) or 0),
+        'reference': getattr(payment, 'reference', None),
+        'status': enum_value(getattr(payment, 'status', None), None),
+        'payment_type': enum_value(getattr(payment, 'payment_type', None), None),
+        'invoice_id': str(getattr(invoice, 'invoice_id', '') or '') or None,
+        'invoice_number': getattr(invoice, 'invoice_number', None) if invoice else None,
+        'account_id': str(getattr(account, 'account_id', '') or '') or None,
+        'updated_date_utc': _iso(getattr(payment, 'updated_date_utc', None)),
+    }
+
+
+@dataclass(frozen=True)
+class Entity:
+    """How one Xero collection is fetched and projected"""
+    method: str                       # AccountingApi method
+    attr: str                         # list attribute on the response
+    key: str                          # id field of the row
+    row: Callable[[Any], Dict[str, Any]]
+    fields: Dict[str, str]            # Xero field name (for order=) -> row field
+    search: Tuple[str, ...] = ()      # row fields matched by search=
+    paged: bool = True
+    params: Dict[str, Any] = field(default_factory=dict)
+    ids_param: Optional[str] = None   # AccountingApi argument fetching given ids (webhook refreshes)
+
+
+ENTITIES: Dict[str, Entity] = {
+    'contacts': Entity(
+        'get_contacts', 'contacts', 'contact_id', contact_row,
+        fields={'Name': 'name', 'EmailAddress': 'email', 'ContactStatus': 'status',
+                'IsCustomer': 'is_customer', 'IsSupplier': 'is_supplier', 'FirstName': 'first_name',
+                'LastName': 'last_name', 'UpdatedDateUTC': 'updated_date_utc'},
+        search=('name', 'email', 'first_name', 'last_name'),
+        # Archiving is a modification too; without this an archived contact would linger as ACTIVE
+        params={'include_archived': True}, ids_param='i_ds'),
+    'invoices': Entity(
+        'get_invoices', 'invoices', 'invoice_id', invoice_row,
+        fields={'InvoiceNumber': 'invoice_number', 'Type': 'type', 'Status': 'status',
+                'Reference': 'reference', 'Total': 'total', 'CurrencyCode': 'currency_code',
+                'Date': 'date', 'DueDate': 'due_date', 'Contact.Name': 'contact_name',
+                'Contact.ContactID': 'contact_id', 'AmountDue': 'amount_due', 'AmountPaid': 'amount_paid',
+                'UpdatedDateUTC': 'updated_date_utc'},
+        search=('invoice_number', 'reference', 'contact_name'), ids_param='i_ds'),
+    'accounts': Entity(
+        'get_accounts', 'accounts', 'account_id', account_row,
+        fields={'Code': 'code', 'Name': 'name', 'Type': 'type', 'Class': 'class', 'Status': 'status',
+                'UpdatedDateUTC': 'updated_date_utc'},
+        search=('code', 'name'), paged=False),
+    'payments': Entity(
+        'get_payments', 'payments', 'payment_id', payment_row,
+        fields={'Date': 'date', 'Amount': 'amount', 'Reference': 'reference', 'Status': 'status',
+                'PaymentType': 'payment_type', 'Invoice.InvoiceID': 'invoice_id',
+                'UpdatedDateUTC': 'updated_date_utc'},
+        search=('reference', 'invoice_number')),
+}
+
+OPERATORS = {'=': '=', '!=': '!=', '>': '>', '>=': '>=', '<': '<', '<=': '<=', 'in': 'IN', 'contains': 'LIKE'}
+
+
+class MirrorError(RuntimeError):
+    """The mirror has no data for a tenant and Xero could not be reached to fill it"""
+
+
+@dataclass
+class SyncResult:
+    entity: str
+    fetched: int
+    changed: List[Dict[str, Any]]     # rows that are new or differ from the mirrored copy
+    full: bool                        # True when there was no high-water mark yet
+    high_water_mark: Optional[str]
+    synced_at: float
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    tenant_id TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    id TEXT NOT NULL,
+    updated_utc TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (tenant_id, entity, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    tenant_id TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    high_water_mark TEXT,
+    synced_at REAL NOT NULL,
+    changed_at REAL NOT NULL,
+    record_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tenant_id, entity)
+);
+"""
+
+
+class XeroMirror:
+    """SQLite mirror shared by every worker and the MCP server (WAL: readers never block the syncer)"""
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path, api_factory: Callable[[], Any], max_age: float = DEFAULT_MAX_AGE,
+                 page_size: int = PAGE_SIZE):
+        self.path = str(path)
+        self.api_factory = api_factory
+        self.max_age = max_age
+        self.page_size = page_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sync_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._refreshing = set()
+        XeroMirror._instances.add(self)
+
+    # Storage
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        # SQLite connections and held locks must not cross a fork
+        for mirror in list(cls._instances):
+            mirror._local = threading.local()
+            mirror._lock = threading.Lock()
+            mirror._sync_locks = {}
+            mirror._refreshing = set()
+
+    def state(self, tenant_id: str, entity: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT high_water_mark, synced_at, changed_at, record_count FROM sync_state "
+            "WHERE tenant_id = ? AND entity = ?", (tenant_id, entity)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('high_water_mark', 'synced_at', 'changed_at', 'record_count'), row))
+
+    def freshness(self, tenant_id: str, entity: str) -> Dict[str, Any]:
+        """Freshness metadata for responses served from the mirror"""
+        state = self.state(tenant_id, entity) or {}
+        synced_at = state.get('synced_at')
+        age = time.time() - synced_at if synced_at else None
+        return {
+            'source': 'mirror',
+            'synced_at': datetime.fromtimestamp(synced_at, tz=timezone.utc).isoformat() if synced_at else None,
+            'age_seconds': round(age, 1) if age is not None else None,
+            'stale': age is None or age > self.max_age,
+            'refreshing': (tenant_id, entity) in self._refreshing,
+            'high_water_mark': state.get('high_water_mark'),
+            'record_count': state.get('record_count', 0),
+        }
+
+    # Sync
+
+    def _sync_lock(self, tenant_id: str, entity: str) -> threading.Lock:
+        with self._lock:
+            return self._sync_locks.setdefault((tenant_id, entity), threading.Lock())
+
+    def sync(self, tenant_id: str, entity: str, full: bool = False) -> SyncResult:
+        """Pull records modified since the high-water mark (everything on the first sync)"""
+        spec = ENTITIES[entity]
+        with self._sync_lock(tenant_id, entity):
+            state = self.state(tenant_id, entity)
+            mark = None if full or not state else state['high_water_mark']
+            since = datetime.fromisoformat(mark) - HIGH_WATER_OVERLAP if mark else None
+            started = time.time()
+
+            rows = self._fetch(spec, tenant_id, since)
+            # The mark comes from Xero's own timestamps, so local clock skew can't skip records
+            high_water = max([mark or ''] + [r['updated_date_utc'] or '' for r in rows]) or None
+            changed = self._store(tenant_id, entity, spec, rows, high_water, started)
+            logger.info(f"Xero mirror sync {entity} for {tenant_id}: {len(rows)} fetched, "
+                        f"{len(changed)} changed ({'full' if since is None else 'since ' + mark})")
+            return SyncResult(entity, len(rows), changed, since is None, high_water, started)
+
+    def sync_records(self, tenant_id: str, entity: str, ids: Sequence[str]) -> Optional[SyncResult]:
+        """
+        Re-read just these records (e.g. the ones a Xero webhook named). The high-water mark and
+        synced_at are left alone, so the next incremental sync still covers everything else.
+        None when the tenant has never been synced (its first read syncs everything anyway).
+        """
+        spec = ENTITIES[entity]
+        if spec.ids_param is None:
+            raise ValueError(f"{entity} cannot be fetched by id")
+        ids = sorted(set(ids))
+        with self._sync_lock(tenant_id, entity):
+            state = self.state(tenant_id, entity)
+            if state is None or not ids:
+                return None
+            started = time.time()
+            api = self.api_factory()
+            method = getattr(api, spec.method)
+            rows = []
+            for start in range(0, len(ids), IDS_PER_CALL):
+                kwargs = dict(spec.params, xero_tenant_id=tenant_id)
+                kwargs[spec.ids_param] = ids[start:start + IDS_PER_CALL]
+                rows.extend(spec.row(item) for item in getattr(method(**kwargs), spec.attr, None) or [])
+            changed = self._store(tenant_id, entity, spec, rows, state['high_water_mark'], started,
+                                  synced_at=state['synced_at'])
+            logger.info(f"Xero mirror refresh of {len(ids)} {entity} for {tenant_id}: {len(changed)} changed")
+            return SyncResult(entity, len(rows), changed, False, state['high_water_mark'], state['synced_at'])
+
+    def _fetch(self, spec: Entity, tenant_id: str, since: Optional[datetime]) -> List[Dict[str, Any]]:
+        api = self.api_factory()
+        method = getattr(api, spec.method)
+        kwargs = dict(spec.params, xero_tenant_id=tenant_id)
+        if since is not None:
+            kwargs['if_modified_since'] = since
+        if not spec.paged:
+            return [spec.row(item) for item in getattr(method(**kwargs), spec.attr, None) or []]
+        return [spec.row(item) for page in iter_pages(method, spec.attr, page_size=self.page_size, **kwargs)
+                for item in page]
+
+    def _store(self, tenant_id, entity, spec, rows, high_water, started, synced_at=None) -> List[Dict[str, Any]]:
+        conn = self._connection()
+        changed = []
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in rows:
+                data = json.dumps(row, sort_keys=True)
+                current = conn.execute(
+                    "SELECT data FROM records WHERE tenant_id = ? AND entity = ? AND id = ?",
+                    (tenant_id, entity, row[spec.key])).fetchone()
+                if current is not None and current[0] == data:
+                    continue
+                conn.execute(
+                    "INSERT OR REPLACE INTO records (tenant_id, entity, id, updated_utc, data) VALUES (?, ?, ?, ?, ?)",
+                    (tenant_id, entity, row[spec.key], row['updated_date_utc'], data))
+                changed.append(row)
+            count = conn.execute("SELECT COUNT(*) FROM records WHERE tenant_id = ? AND entity = ?",
+                                 (tenant_id, entity)).fetchone()[0]
+            conn.execute(
+                "INSERT INTO sync_state (tenant_id, entity, high_water_mark, synced_at, changed_at, record_count) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (tenant_id, entity) DO UPDATE SET "
+                "high_water_mark = excluded.high_water_mark, synced_at = excluded.synced_at, "
+                "record_count = excluded.record_count, "
+                "changed_at = CASE WHEN ? THEN excluded.changed_at ELSE sync_state.changed_at END",
+                (tenant_id, entity, high_water, started if synced_at is None else synced_at, started, count,
+                 bool(changed)))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return changed
+
+    def mark_stale(self, tenant_id: str, entity: str) -> None:
+        """Force the next ensure() to sync (incrementally: the high-water mark is kept)"""
+        self._connection().execute("UPDATE sync_state SET synced_at = 0 WHERE tenant_id = ? AND entity = ?",
+                                   (tenant_id, entity))
+
+    def ensure(self, tenant_id: str, entity: str) -> Dict[str, Any]:
+        """
+        Make the mirror usable for a read: the first read of a tenant syncs inline (there is nothing
+        to serve yet); later stale reads are answered at once while a background sync catches up.
+        """
+        state = self.state(tenant_id, entity)
+        if state is None:
+            try:
+                self.sync(tenant_id, entity)
+            except Exception as e:
+                raise MirrorError(f"Xero mirror for {entity} is empty and the initial sync failed: {e}") from e
+        elif time.time() - state['synced_at'] > self.max_age:
+            self.refresh_in_background(tenant_id, entity)
+        return self.freshness(tenant_id, entity)
+
+    def refresh_in_background(self, tenant_id: str, entity: str) -> bool:
+        key = (tenant_id, entity)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.sync(tenant_id, entity)
+            except Exception as e:
+                logger.warning(f"Background Xero mirror sync of {entity} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name=f"xero-mirror-{entity}", daemon=True).start()
+        return True
+
+    # Reads
+
+    def _column(self, spec: Entity, name: str) -> str:
+        """Row field for a Xero field name or a row field name (whitelisted: used in SQL)"""
+        column = spec.fields.get(name, name)
+        if column not in spec.fields.values() and column != spec.key:
+            raise ValueError(f"Unknown field '{name}'")
+        return column
+
+    def query(self, tenant_id: str, entity: str, where: Sequence[Tuple[str, str, Any]] = (),
+              search: str = '', order: Optional[str] = None, limit: Optional[int] = None,
+              offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Rows plus the total matching count.
+        where: (field, op, value) with op in =, !=, >, >=, <, <=, in, contains
+        order: Xero-style 'Date DESC' (or a row field name)
+        """
+        spec = ENTITIES[entity]
+        clauses, params = ["tenant_id = ?", "entity = ?"], [tenant_id, entity]
+        for name, op, value in where:
+            column, sql_op = self._column(spec, name), OPERATORS.get(op)
+            if sql_op is None:
+                raise ValueError(f"Unknown operator '{op}'")
+            expr = f"json_extract(data, '$.\"{column}\"')"
+            if op == 'in':
+                values = list(value)
+                clauses.append(f"{expr} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(values)
+            elif op == 'contains':
+                clauses.append(f"{expr} LIKE ? ESCAPE '\\'")
+                params.append(f"%{_escape_like(value)}%")
+            else:
+                clauses.append(f"{expr} {sql_op} ?")
+                params.append(value)
+        if search and spec.search:
+            clauses.append('(' + ' OR '.join(f"json_extract(data, '$.\"{c}\"') LIKE ? ESCAPE '\\'"
+                                             for c in spec.search) + ')')
+            params.extend([f"%{_escape_like(search)}%"] * len(spec.search))
+        where_sql = ' AND '.join(clauses)
+
+        order_sql = "id"
+        if order:
+            name, _, direction = order.strip().partition(' ')
+            direction = 'DESC' if direction.strip().upper() == 'DESC' else 'ASC'
+            column = self._column(spec, name)
+            order_sql = f"json_extract(data, '$.\"{column}\"') COLLATE NOCASE {direction}, id"
+
+        conn = self._connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM records WHERE {where_sql}", params).fetchone()[0]
+        sql = f"SELECT data FROM records WHERE {where_sql} ORDER BY {order_sql}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [int(limit), int(offset)]
+        rows = [json.loads(data) for (data,) in conn.execute(sql, params)]
+        return rows, total
+
+    def version(self, tenant_id: str, entity: str) -> Optional[Version]:
+        """Data version for conditional responses: changes whenever a sync changed rows"""
+        state = self.state(tenant_id, entity)
+        if state is None:
+            return None
+        return Version(f"mirror-{state['changed_at']:.6f}", state['changed_at'])
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=XeroMirror._after_fork_in_child)
+
+
+def _escape_like(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def mirror_enabled(config: Optional[Dict[str, Any]] = None) -> bool:
+    value = (config or {}).get('XERO_MIRROR', os.getenv('FCC_XERO_MIRROR', '1'))
+    return str(value).lower() not in ('0', 'false', 'no', 'off')
+
+
+def open_mirror(api_factory: Callable[[], Any], path=None, max_age=None) -> XeroMirror:
+    """Mirror at the configured path (the web app and the MCP server share the file)"""
+    return XeroMirror(
+        path or os.getenv('FCC_XERO_MIRROR_PATH') or DEFAULT_PATH,
+        api_factory,
+        max_age=float(max_age or os.getenv('FCC_XERO_MIRROR_MAX_AGE')
+                      or (WEBHOOK_MAX_AGE if os.getenv('XERO_WEBHOOK_KEY') else DEFAULT_MAX_AGE)),
+    )
+
+
+def configure_xero_mirror(app, api_factory: Callable[[], Any]) -> Optional[XeroMirror]:
+    """Attach a XeroMirror to the app (None when disabled); idempotent"""
+    if 'xero_mirror' not in app.extensions:
+        mirror = None
+        if mirror_enabled(app.config):
+            mirror = open_mirror(api_factory, app.config.get('XERO_MIRROR_PATH'),
+                                 app.config.get('XERO_MIRROR_MAX_AGE'))
+        app.extensions['xero_mirror'] = mirror
+    return app.extensions['xero_mirror']
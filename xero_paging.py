@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Xero Paging for Financial Command Center AI
+Generators over every page of Xero's paged collections. Without `page`, Xero returns only
+the first 100 records, so every list, export and sync path walks the pages through here:
+- page N+1 is fetched in the background while page N is being consumed
+- at most FCC_XERO_PREFETCH_PAGES pages wait in memory, however large the organisation
+- a single short first page never starts a thread
+
+Usage:
+    for invoice in iter_invoices(AccountingApi(api_client), tenant_id, statuses=['AUTHORISED']):
+        writer.writerow(...)
+    for page in iter_pages(api.get_payments, 'payments', xero_tenant_id=tenant_id):
+        ...
+
+Environment (optional):
+    FCC_XERO_PAGE_SIZE=1000              # records per request (Xero allows up to 1000)
+    FCC_XERO_PREFETCH_PAGES=2            # pages fetched ahead of the consumer (0: no prefetch)
+"""
+
+import os
+import queue
+import logging
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from flask import has_request_context, copy_current_request_context
+except ImportError:  # standalone MCP use without Flask
+    has_request_context = lambda: False
+    copy_current_request_context = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = int(os.getenv('FCC_XERO_PAGE_SIZE', '1000'))
+PREFETCH_PAGES = int(os.getenv('FCC_XERO_PREFETCH_PAGES', '2'))
+MAX_PAGES = 1000
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _is_last(result: Any, items: List[Any], page: int, page_size: int) -> bool:
+    page_count = getattr(getattr(result, 'pagination', None), 'page_count', None)
+    return len(items) < page_size or (isinstance(page_count, int) and page >= page_count)
+
+
+def _check_cut_off(attr: str, last_page: int) -> None:
+    if last_page == MAX_PAGES:
+        logger.warning(f"Stopped paging {attr} after {MAX_PAGES} pages")
+
+
+def iter_pages(fetch: Callable[..., Any], attr: str, page_size: Optional[int] = None,
+               prefetch: Optional[int] = None, max_pages: Optional[int] = None,
+               meta: Optional[Dict[str, Any]] = None, start_page: int = 1, **kwargs) -> Iterator[List[Any]]:
+    """
+    Yield each non-empty page (a list of records) of fetch(page=..., page_size=..., **kwargs).
+    attr is the list attribute on the response ('invoices', 'contacts', ...).
+    max_pages stops early without fetching (and prefetching) past what the caller needs.
+    start_page resumes a walk (e.g. an interrupted export); max_pages still counts from page 1.
+    meta, if given, receives Xero's 'total' item count once the first page is in.
+    """
+    page_size = page_size or PAGE_SIZE
+    prefetch = PREFETCH_PAGES if prefetch is None else prefetch
+    last_page = min(max_pages or MAX_PAGES, MAX_PAGES)
+
+    result = fetch(page=start_page, page_size=page_size, **kwargs)
+    items = getattr(result, attr, None) or []
+    if meta is not None:
+        meta['total'] = getattr(getattr(result, 'pagination', None), 'item_count', None)
+    if items:
+        yield items
+    if _is_last(result, items, start_page, page_size) or last_page <= start_page:
+        return
+    if prefetch <= 0:
+        for page in range(start_page + 1, last_page + 1):
+            result = fetch(page=page, page_size=page_size, **kwargs)
+            items = getattr(result, attr, None) or []
+            if items:
+                yield items
+            if _is_last(result, items, page, page_size):
+                return
+        _check_cut_off(attr, last_page)
+        return
+
+    pages: queue.Queue = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for page in range(start_page + 1, last_page + 1):
+                result = fetch(page=page, page_size=page_size, **kwargs)
+                items = getattr(result, attr, None) or []
+                if items and not put(items):
+                    return
+                if _is_last(result, items, page, page_size):
+                    break
+            else:
+                _check_cut_off(attr, last_page)
+        except BaseException as e:
+            put(_Failed(e))
+            return
+        put(_DONE)
+
+    if has_request_context():
+        # The web app's token getter reads the session
+        produce = copy_current_request_context(produce)
+    worker = threading.Thread(target=produce, name=f"xero-pages-{attr}", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failed):
+                raise item.error
+            yield item
+    finally:
+        # Consumer finished or gave up early (limit reached, client disconnected)
+        stop.set()
+
+
+class Records:
+    """Iterator over records; .total is Xero's item count for the whole query (after the first record)"""
+
+    def __init__(self, fetch: Callable[..., Any], attr: str, limit: Optional[int] = None, **kwargs):
+        if limit is not None and limit > 0:
+            kwargs.setdefault('page_size', min(limit, PAGE_SIZE))
+            kwargs.setdefault('max_pages', -(-limit // kwargs['page_size']))
+        self._meta: Dict[str, Any] = {}
+        records = (record for page in iter_pages(fetch, attr, meta=self._meta, **kwargs) for record in page)
+        self._records = islice(records, max(0, limit)) if limit is not None else records
+
+    @property
+    def total(self) -> Optional[int]:
+        return self._meta.get('total')
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._records)
+
+
+def iter_records(fetch: Callable[..., Any], attr: str, limit: Optional[int] = None, **kwargs) -> Records:
+    """Records across all pages; with limit, pages are no larger than needed and paging stops early"""
+    return Records(fetch, attr, limit=limit, **kwargs)
+
+
+def iter_contacts(api, tenant_id: str, **kwargs) -> Records:
+    return iter_records(api.get_contacts, 'contacts', xero_tenant_id=tenant_id, **kwargs)
+
+
+def iter_invoices(api, tenant_id: str, **kwargs) -> Records:
+    return iter_records(api.get_invoices, 'invoices', xero_tenant_id=tenant_id, **kwargs)
+
+
+def iter_payments(api, tenant_id: str, **kwargs) -> Records:
+    return iter_records(api.get_payments, 'payments', xero_tenant_id=tenant_id, **kwargs)
+
+
+def iter_bank_transactions(api, tenant_id: str, **kwargs) -> Records:
+    return iter_records(api.get_bank_transactions, 'bank_transactions', xero_tenant_id=tenant_id, **kwargs)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Xero Query Translation for Financial Command Center AI
+One description of an invoice listing (statuses, type, date range, contact, order, page, limit)
+translated for whichever backend answers it, so only the requested slice crosses the wire:
+- Xero: `statuses`, `where`, `order`, `page`/`page_size` and `contact_i_ds` arguments
+- the local mirror: SQL conditions, ORDER BY and LIMIT/OFFSET
+
+Usage:
+    query = InvoiceQuery.from_args(request.args, sorts=INVOICE_SORTS, default_sort='-date')
+    result = api.get_invoices(xero_tenant_id=tenant_id, **query.xero_kwargs())
+    rows, total = mirror.query(tenant_id, 'invoices', **query.mirror_kwargs())
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+INVOICE_TYPES = ('ACCREC', 'ACCPAY')
+INVOICE_STATUSES = ('DRAFT', 'SUBMITTED', 'AUTHORISED', 'PAID', 'VOIDED', 'DELETED')
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+_GUID = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+class QueryError(ValueError):
+    """A parameter that can't be translated (answer 400)"""
+
+
+def quote(value: str) -> str:
+    """String literal for a Xero where clause"""
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _date(name: str, value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise QueryError(f"{name} must be YYYY-MM-DD, got {value!r}")
+
+
+def _positive_int(name: str, value, default: int) -> int:
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise QueryError(f"{name} must be an integer, got {value!r}")
+    if number < 1:
+        raise QueryError(f"{name} must be at least 1")
+    return number
+
+
+@dataclass(frozen=True)
+class InvoiceQuery:
+    """One page of an invoice listing, independent of where it is answered"""
+    statuses: Tuple[str, ...] = ()
+    invoice_type: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    contact: str = ''                 # name contains (case-insensitive)
+    contact_id: Optional[str] = None
+    order: str = 'Date DESC'          # Xero order expression
+    page: int = 1
+    limit: int = DEFAULT_LIMIT
+
+    def __post_init__(self):
+        unknown = set(self.statuses) - set(INVOICE_STATUSES)
+        if unknown:
+            raise QueryError(f"Unknown status {', '.join(sorted(unknown))}")
+        if self.invoice_type and self.invoice_type not in INVOICE_TYPES:
+            raise QueryError(f"Unknown type '{self.invoice_type}' (use ACCREC or ACCPAY)")
+        if self.contact_id and not _GUID.match(self.contact_id):
+            raise QueryError("contact_id must be a Xero ContactID (GUID)")
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise QueryError("date_from is after date_to")
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str], sorts: Mapping[str, str], default_sort: str,
+                  default_status: str = '', max_limit: int = MAX_LIMIT) -> "InvoiceQuery":
+        """?status=AUTHORISED,PAID&type=ACCREC&date_from=&date_to=&contact=&contact_id=&sort=-date&page=&limit="""
+        sort = args.get('sort') or default_sort
+        if sort not in sorts:
+            raise QueryError(f"Unknown sort '{sort}' (use one of: {', '.join(sorts)})")
+        status = args.get('status', default_status)
+        return cls(
+            statuses=tuple(s.strip().upper() for s in status.split(',') if s.strip()),
+            invoice_type=(args.get('type') or '').strip().upper() or None,
+            date_from=_date('date_from', args.get('date_from')),
+            date_to=_date('date_to', args.get('date_to')),
+            contact=(args.get('contact') or '').strip(),
+            contact_id=(args.get('contact_id') or '').strip() or None,
+            order=sorts[sort],
+            page=_positive_int('page', args.get('page'), 1),
+            limit=min(_positive_int('limit', args.get('limit'), DEFAULT_LIMIT), max_limit),
+        )
+
+    def where(self) -> Optional[str]:
+        """Xero where expression for the filters Xero has no dedicated argument for"""
+        clauses = []
+        if self.invoice_type:
+            clauses.append(f'Type=={quote(self.invoice_type)}')
+        if self.date_from:
+            d = self.date_from
+            clauses.append(f'Date>=DateTime({d.year},{d.month:02d},{d.day:02d})')
+        if self.date_to:
+            d = self.date_to
+            clauses.append(f'Date<=DateTime({d.year},{d.month:02d},{d.day:02d})')
+        if self.contact:
+            clauses.append(f'Contact.Name.ToLower().Contains({quote(self.contact.lower())})')
+        return ' && '.join(clauses) or None
+
+    def xero_kwargs(self) -> Dict[str, Any]:
+        """Arguments for AccountingApi.get_invoices: exactly one page of `limit` invoices"""
+        kwargs: Dict[str, Any] = {'order': self.order, 'page': self.page, 'page_size': self.limit}
+        if self.statuses:
+            kwargs['statuses'] = list(self.statuses)
+        if self.contact_id:
+            kwargs['contact_i_ds'] = [self.contact_id]
+        where = self.where()
+        if where:
+            kwargs['where'] = where
+        return kwargs
+
+    def mirror_kwargs(self) -> Dict[str, Any]:
+        """Arguments for XeroMirror.query over 'invoices'"""
+        conditions = []
+        if self.statuses:
+            conditions.append(('status', 'in', list(self.statuses)))
+        if self.invoice_type:
+            conditions.append(('type', '=', self.invoice_type))
+        if self.date_from:
+            conditions.append(('date', '>=', self.date_from.isoformat()))
+        if self.date_to:
+            # Stored dates are ISO strings and may carry a time part
+            conditions.append(('date', '<=', self.date_to.isoformat() + 'T23:59:59.999999'))
+        if self.contact:
+            conditions.append(('contact_name', 'contains', self.contact))
+        if self.contact_id:
+            conditions.append(('contact_id', '=', self.contact_id))
+        return {'where': conditions, 'order': self.order, 'limit': self.limit,
+                'offset': (self.page - 1) * self.limit}
+
+    def filters(self) -> Dict[str, Any]:
+        """The effective parameters, echoed back in responses"""
+        return {
+            'status': ','.join(self.statuses),
+            'type': self.invoice_type,
+            'date_from': self.date_from.isoformat() if self.date_from else None,
+            'date_to': self.date_to.isoformat() if self.date_to else None,
+            'contact': self.contact or None,
+            'contact_id': self.contact_id,
+            'order': self.order,
+            'page': self.page,
+            'limit': self.limit,
+        }
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Xero Reports for Financial Command Center AI
+Profit & Loss, Balance Sheet, Trial Balance and Aged Receivables/Payables behind a
+report cache, because Xero report calls are slow and count against a 60/minute budget:
+- entries are keyed by tenant, report and its period parameters (SQLite, shared by the
+  web workers and the MCP server, and kept across restarts)
+- a closed period (ending on or before the organisation's lock date) is cached for good;
+  without a lock date nothing is closed, since an old period can still be edited
+- an open period is reused until the TTL passes or the tenant's mirrored invoices,
+  payments or accounts change (incremental syncs and webhooks move that stamp)
+- identical concurrent misses make one Xero call; if Xero fails, the last copy is
+  served marked stale
+- aged receivables/payables are computed from today's outstanding invoices (mirror when
+  enabled), bucketed by days overdue, so they cost no report call at all. They are always
+  as of today: invoices paid since a past date are no longer outstanding, so a historical
+  aged view cannot be rebuilt from them
+
+Usage:
+    reports = XeroReports(lambda tenant_id: AccountingApi(get_api_client(tenant_id)), mirror=mirror)
+    result = reports.get(tenant_id, 'profit-and-loss', {'from_date': '2024-01-01', 'to_date': '2024-03-31'})
+    result['data'], result['cached'], result['closed']
+
+Environment:
+    FCC_XERO_REPORT_CACHE            cache file (default tokens/xero_reports.db)
+    FCC_XERO_REPORT_TTL              seconds an open-period report is reused (default 900)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import weakref
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from xero_mirror import enum_value
+from xero_tenants import outstanding_invoices
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = Path(__file__).resolve().parent / "tokens" / "xero_reports.db"
+REPORT_TTL = float(os.getenv("FCC_XERO_REPORT_TTL", "900"))
+ORGANISATION_TTL = 3600.0
+TIMEFRAMES = ('MONTH', 'QUARTER', 'YEAR')
+AGED_BUCKETS = ('current', '1-30', '31-60', '61-90', '90+')
+
+
+class ReportError(ValueError):
+    """Unknown report or invalid report parameters"""
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    method: Optional[str]                 # AccountingApi method (None: computed from invoices)
+    period: str                           # 'range' (from_date..to_date), 'as_of' (date) or 'today'
+    options: Tuple[str, ...] = ()         # extra parameters passed through to Xero
+    invoice_type: Optional[str] = None    # aged reports: ACCREC | ACCPAY
+    depends_on: Tuple[str, ...] = ('invoices', 'payments', 'accounts')
+
+
+REPORTS: Dict[str, ReportSpec] = {
+    'profit-and-loss': ReportSpec('get_report_profit_and_loss', 'range',
+                                  ('periods', 'timeframe', 'standard_layout', 'payments_only')),
+    'balance-sheet': ReportSpec('get_report_balance_sheet', 'as_of',
+                                ('periods', 'timeframe', 'standard_layout', 'payments_only')),
+    'trial-balance': ReportSpec('get_report_trial_balance', 'as_of', ('payments_only',)),
+    'aged-receivables': ReportSpec(None, 'today', ('contact_id',), invoice_type='ACCREC', depends_on=('invoices',)),
+    'aged-payables': ReportSpec(None, 'today', ('contact_id',), invoice_type='ACCPAY', depends_on=('invoices',)),
+}
+
+
+def _date(value, name: str) -> date:
+    try:
+        return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ReportError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def _flag(value) -> bool:
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def report_params(report: str, args: Optional[Dict[str, Any]] = None, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Validated, normalised parameters (the cache key): P&L defaults to this month to date,
+    the others to today; aged reports only exist as of today. Blank values are dropped.
+    """
+    spec = REPORTS.get(report)
+    if spec is None:
+        raise ReportError(f"Unknown report '{report}'. Use one of: {', '.join(REPORTS)}")
+    args = {k: v for k, v in (args or {}).items() if v not in (None, '')}
+    today = today or date.today()
+    params: Dict[str, Any] = {}
+    if spec.period == 'range':
+        params['from_date'] = _date(args.get('from_date', today.replace(day=1)), 'from_date').isoformat()
+        params['to_date'] = _date(args.get('to_date', today), 'to_date').isoformat()
+        if params['from_date'] > params['to_date']:
+            raise ReportError("from_date must not be after to_date")
+    elif spec.period == 'today':
+        if 'date' in args and _date(args['date'], 'date') != today:
+            raise ReportError(f"{report} is only available as of today")
+        params['date'] = today.isoformat()
+    else:
+        params['date'] = _date(args.get('date', today), 'date').isoformat()
+    for option in spec.options:
+        if option not in args:
+            continue
+        value = args[option]
+        if option == 'periods':
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ReportError("periods must be a number from 1 to 11")
+            if not 1 <= value <= 11:
+                raise ReportError("periods must be a number from 1 to 11")
+            if value == 1:
+                continue
+        elif option == 'timeframe':
+            value = str(value).upper()
+            if value not in TIMEFRAMES:
+                raise ReportError(f"timeframe must be one of {', '.join(TIMEFRAMES)}")
+        elif option in ('standard_layout', 'payments_only'):
+            value = _flag(value)
+            if not value:
+                continue
+        else:
+            value = str(value)
+        params[option] = value
+    return params
+
+
+def period_end(report: str, params: Dict[str, Any]) -> date:
+    return date.fromisoformat(params['to_date'] if REPORTS[report].period == 'range' else params['date'])
+
+
+def report_rows(rows) -> List[Dict[str, Any]]:
+    """Xero report rows as plain data: type, title, cell values, nested rows"""
+    out = []
+    for row in rows or []:
+        item = {'type': enum_value(getattr(row, 'row_type', None), None), 'title': getattr(row, 'title', None) or None,
+                'cells': [getattr(cell, 'value', None) for cell in getattr(row, 'cells', None) or []]}
+        # The first cell of an account line links to the account
+        for cell in (getattr(row, 'cells', None) or [])[:1]:
+            for attribute in getattr(cell, 'attributes', None) or []:
+                if getattr(attribute, 'id', None) == 'account':
+                    item['account_id'] = attribute.value
+        if getattr(row, 'rows', None):
+            item['rows'] = report_rows(row.rows)
+        out.append(item)
+    return out
+
+
+def report_data(response) -> Dict[str, Any]:
+    reports = getattr(response, 'reports', None) or []
+    if not reports:
+        raise RuntimeError("Xero returned no report")
+    report = reports[0]
+    updated = getattr(report, 'updated_date_utc', None)
+    return {
+        'name': report.report_name,
+        'titles': list(getattr(report, 'report_titles', None) or []),
+        'date': getattr(report, 'report_date', None),
+        'updated_date_utc': updated.isoformat() if hasattr(updated, 'isoformat') else updated,
+        'rows': report_rows(getattr(report, 'rows', None)),
+    }
+
+
+def aged(rows: List[Dict[str, Any]], as_of: date, contact_id: Optional[str] = None) -> Dict[str, Any]:
+    """Amounts due per contact and currency, bucketed by days overdue on `as_of`"""
+    contacts: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    totals: Dict[str, Dict[str, float]] = {}
+    for row in rows:
+        if contact_id and row.get('contact_id') != contact_id:
+            continue
+        currency = row.get('currency_code') or 'USD'
+        due = row.get('due_date')
+        days = (as_of - date.fromisoformat(due[:10])).days if due else 0
+        bucket = ('current' if days <= 0 else '1-30' if days <= 30 else '31-60' if days <= 60
+                  else '61-90' if days <= 90 else '90+')
+        amount = float(row.get('amount_due') or 0)
+        entry = contacts.setdefault((row.get('contact_id') or '', currency), dict(
+            {'contact_id': row.get('contact_id'), 'contact_name': row.get('contact_name'), 'currency': currency,
+             'total': 0.0}, **{name: 0.0 for name in AGED_BUCKETS}))
+        entry[bucket] += amount
+        entry['total'] += amount
+        total = totals.setdefault(currency, dict({'total': 0.0}, **{name: 0.0 for name in AGED_BUCKETS}))
+        total[bucket] += amount
+        total['total'] += amount
+    for entry in list(contacts.values()) + list(totals.values()):
+        for key, value in entry.items():
+            if isinstance(value, float):
+                entry[key] = round(value, 2)
+    return {'as_of': as_of.isoformat(), 'buckets': list(AGED_BUCKETS), 'totals': totals,
+            'contacts': sorted(contacts.values(), key=lambda e: -e['total'])}
+
+
+class ReportCache:
+    """(tenant, report, params) -> report data; SQLite so every process shares one copy"""
+    _instances = weakref.WeakSet()
+
+    def __init__(self, path=None, ttl: float = REPORT_TTL):
+        self.path = str(path or os.getenv("FCC_XERO_REPORT_CACHE") or DEFAULT_PATH)
+        self.ttl = ttl
+        self._local = threading.local()
+        ReportCache._instances.add(self)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports (tenant_id TEXT NOT NULL, report TEXT NOT NULL, "
+                "params_key TEXT NOT NULL, params TEXT NOT NULL, data TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                "closed INTEGER NOT NULL, version TEXT, PRIMARY KEY (tenant_id, report, params_key)) WITHOUT ROWID")
+            self._local.conn = conn
+        return conn
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        # SQLite connections must not cross a fork
+        for cache in list(cls._instances):
+            cache._local = threading.local()
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def get(self, tenant_id: str, report: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(
+            "SELECT data, fetched_at, closed, version FROM reports WHERE tenant_id = ? AND report = ? AND params_key = ?",
+            (tenant_id, report, self.key(params))).fetchone()
+        if row is None:
+            return None
+        return {'data': json.loads(row[0]), 'fetched_at': row[1], 'closed': bool(row[2]), 'version': row[3]}
+
+    def fresh(self, entry: Optional[Dict[str, Any]], version: Optional[str]) -> bool:
+        """Closed periods never expire; open ones until the TTL or a data change"""
+        if entry is None:
+            return False
+        if entry['closed']:
+            return True
+        return entry['version'] == version and time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, tenant_id: str, report: str, params: Dict[str, Any], data: Any, closed: bool,
+            version: Optional[str]) -> Dict[str, Any]:
+        fetched_at = time.time()
+        self._connection().execute(
+            "INSERT OR REPLACE INTO reports (tenant_id, report, params_key, params, data, fetched_at, closed, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (tenant_id, report, self.key(params), json.dumps(params, sort_keys=True), json.dumps(data),
+             fetched_at, int(closed), version))
+        return {'data': data, 'fetched_at': fetched_at, 'closed': closed, 'version': version}
+
+    def invalidate(self, tenant_id: str, report: Optional[str] = None, closed: bool = False) -> int:
+        """Drop a tenant's open-period entries (closed ones too with closed=True)"""
+        sql, params = "DELETE FROM reports WHERE tenant_id = ?", [tenant_id]
+        if report:
+            sql += " AND report = ?"
+            params.append(report)
+        if not closed:
+            sql += " AND closed = 0"
+        return self._connection().execute(sql, params).rowcount
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=ReportCache._after_fork_in_child)
+
+
+class XeroReports:
+    """Reports for any tenant through the cache; api_factory(tenant_id) -> AccountingApi"""
+
+    def __init__(self, api_factory: Callable[[str], Any], cache: Optional[ReportCache] = None, mirror=None):
+        self.api_factory = api_factory
+        self.cache = cache or ReportCache()
+        self.mirror = mirror
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, str, str], threading.Lock] = {}
+        self._lock_dates: Dict[str, Tuple[float, Optional[date]]] = {}
+
+    # Period state
+
+    def lock_date(self, tenant_id: str) -> Optional[date]:
+        """The organisation's latest lock date (period or end-of-year), re-read hourly"""
+        cached = self._lock_dates.get(tenant_id)
+        if cached and time.time() - cached[0] < ORGANISATION_TTL:
+            return cached[1]
+        lock = None
+        try:
+            organisations = self.api_factory(tenant_id).get_organisations(tenant_id).organisations or []
+            dates = [getattr(org, name, None) for org in organisations[:1]
+                     for name in ('period_lock_date', 'end_of_year_lock_date')]
+            dates = [d if isinstance(d, date) else date.fromisoformat(str(d)[:10]) for d in dates if d]
+            lock = max(dates) if dates else None
+        except Exception as e:
+            logger.warning(f"Could not read Xero lock dates for {tenant_id}: {e}")
+            if cached:
+                return cached[1]
+        self._lock_dates[tenant_id] = (time.time(), lock)
+        return lock
+
+    def is_closed(self, tenant_id: str, report: str, params: Dict[str, Any]) -> bool:
+        """Nothing can change any more: the period ends on or before the lock date (no lock date: never)"""
+        if REPORTS[report].method is None:
+            return False    # aged balances move with every payment, whatever the as-of date
+        end = period_end(report, params)
+        lock = self.lock_date(tenant_id)
+        return lock is not None and end <= lock
+
+    def version(self, tenant_id: str, report: str) -> Optional[str]:
+        """Change stamp of the mirrored data the report depends on (None without a mirror)"""
+        if self.mirror is None:
+            return None
+        stamps = []
+        for entity in REPORTS[report].depends_on:
+            state = self.mirror.state(tenant_id, entity)
+            stamps.append(f"{entity}:{state['changed_at']:.6f}" if state else f"{entity}:-")
+        return ','.join(stamps)
+
+    # Reports
+
+    def _run(self, tenant_id: str, report: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        spec = REPORTS[report]
+        if spec.method is None:
+            # Same client as the report API calls, so one endpoint never mixes token sources
+            api = self.api_factory(tenant_id) if self.mirror is None else None
+            rows = outstanding_invoices(tenant_id, spec.invoice_type, self.mirror, api=api)
+            return aged(rows, date.fromisoformat(params['date']), params.get('contact_id'))
+        method = getattr(self.api_factory(tenant_id), spec.method)
+        return report_data(method(tenant_id, **params))
+
+    def _flight(self, key: Tuple[str, str, str]) -> threading.Lock:
+        with self._lock:
+            return self._inflight.setdefault(key, threading.Lock())
+
+    def get(self, tenant_id: str, report: str, args: Optional[Dict[str, Any]] = None,
+            refresh: bool = False) -> Dict[str, Any]:
+        """
+        {report, tenant_id, params, closed, cached, stale, fetched_at, age_seconds, data}.
+        Raises ReportError for bad parameters; Xero errors only when there is no copy to fall back on.
+        """
+        params = report_params(report, args)
+        closed = self.is_closed(tenant_id, report, params)
+        version = None if closed else self.version(tenant_id, report)
+        entry = self.cache.get(tenant_id, report, params)
+        cached, stale, error = True, False, None
+        if refresh or not self.cache.fresh(entry, version):
+            # One Xero call per key, however many requests miss at once
+            with self._flight((tenant_id, report, ReportCache.key(params))):
+                entry = self.cache.get(tenant_id, report, params)
+                if refresh or not self.cache.fresh(entry, version):
+                    try:
+                        data = self._run(tenant_id, report, params)
+                        entry = self.cache.put(tenant_id, report, params, data, closed, version)
+                        cached = False
+                    except Exception as e:
+                        if entry is None:
+                            raise
+                        logger.warning(f"Xero {report} for {tenant_id} failed, serving the cached copy: {e}")
+                        stale, error = True, str(e)
+        result = {
+            'report': report,
+            'tenant_id': tenant_id,
+            'params': params,
+            'closed': closed,
+            'cached': cached,
+            'stale': stale,
+            'fetched_at': entry['fetched_at'],
+            'age_seconds': round(time.time() - entry['fetched_at'], 1),
+            'data': entry['data'],
+        }
+        if error:
+            result['error'] = error
+        return result
+
+    def invalidate(self, tenant_id: str, report: Optional[str] = None) -> int:
+        return self.cache.invalidate(tenant_id, report)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Xero Tenants for Financial Command Center AI
+Firm-wide views across every connected Xero organisation (an accounting firm's clients):
+- each tenant's query runs concurrently on its own pooled ApiClient and is metered
+  against that tenant's own rate budget, so N organisations take about as long as one
+- results are merged (totals per currency, never converted) and every tenant is
+  annotated with its status and latency; a failing or slow tenant doesn't sink the rest
+- tenant reads come from the local mirror when it is enabled, else from Xero
+
+Usage:
+    report = outstanding(get_tenants(), kind='ACCREC', mirror=mirror)
+    report['totals']['USD']['outstanding'], report['tenants'][0]['overdue']
+
+    results = across_tenants(lambda tenant_id: ..., get_tenants())
+
+Environment:
+    FCC_XERO_FIRM_TIMEOUT     seconds each tenant gets in a firm-wide view (default 30)
+    FCC_FANOUT_WORKERS        tenants queried at once (default 16)
+"""
+
+import os
+import logging
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from fanout import gather
+from lazy_imports import lazy_attr
+from xero_client import get_api_client
+from xero_mirror import invoice_row
+from xero_paging import iter_invoices
+
+logger = logging.getLogger(__name__)
+
+AccountingApi = lazy_attr("xero_python.accounting", "AccountingApi")
+
+FIRM_TIMEOUT = float(os.getenv("FCC_XERO_FIRM_TIMEOUT", "30"))
+OUTSTANDING_KINDS = {'ACCREC': 'receivables', 'ACCPAY': 'payables'}
+
+
+def across_tenants(fn: Callable[[str], Any], tenants: List[Dict[str, Any]],
+                   timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    fn(tenant_id) for every tenant concurrently; one entry per tenant, in the order given:
+    {tenant_id, tenant_name, status, latency_ms, [error], [result]}
+    """
+    names = {tenant['tenant_id']: tenant.get('tenant_name') for tenant in tenants}
+    results = gather({tid: (lambda tid=tid: fn(tid)) for tid in names},
+                     timeout=FIRM_TIMEOUT if timeout is None else timeout)
+    entries = []
+    for tid, result in results.items():
+        entry = {'tenant_id': tid, 'tenant_name': names[tid], **result.annotation()}
+        if result.ok:
+            entry['result'] = result.value
+        entries.append(entry)
+    return entries
+
+
+def outstanding_invoices(tenant_id: str, kind: str, mirror=None, api=None) -> List[Dict[str, Any]]:
+    """
+    Approved, unpaid invoices of one type, as mirror rows (amount_due, due_date, contact, ...).
+    Without a mirror they are read live through `api` (default: the tenant's pooled client).
+    """
+    if mirror is not None:
+        mirror.ensure(tenant_id, 'invoices')
+        rows, _ = mirror.query(tenant_id, 'invoices', where=[('type', '=', kind), ('status', '=', 'AUTHORISED'),
+                                                             ('amount_due', '>', 0)])
+        return rows
+    api = api or AccountingApi(get_api_client(tenant_id))
+    return [invoice_row(i) for i in iter_invoices(api, tenant_id, statuses=['AUTHORISED'],
+                                                  where=f'Type=="{kind}" AND AmountDue>0', summary_only=True)]
+
+
+def summarise(rows: List[Dict[str, Any]], today: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+    """Outstanding and overdue amounts and counts per currency"""
+    today = (today or date.today()).isoformat()
+    summary: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        bucket = summary.setdefault(row.get('currency_code') or 'USD',
+                                    {'outstanding': 0.0, 'overdue': 0.0, 'count': 0, 'overdue_count': 0})
+        amount = float(row.get('amount_due') or 0)
+        bucket['outstanding'] += amount
+        bucket['count'] += 1
+        if row.get('due_date') and row['due_date'][:10] < today:
+            bucket['overdue'] += amount
+            bucket['overdue_count'] += 1
+    for bucket in summary.values():
+        bucket['outstanding'] = round(bucket['outstanding'], 2)
+        bucket['overdue'] = round(bucket['overdue'], 2)
+    return summary
+
+
+def outstanding(tenants: List[Dict[str, Any]], kind: str = 'ACCREC', mirror=None,
+                timeout: Optional[float] = None, today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Receivables (ACCREC) or payables (ACCPAY) still owed, per tenant and firm-wide.
+    Totals are per currency; tenants are ordered by what they are owed (largest first).
+    """
+    kind = kind.upper()
+    if kind not in OUTSTANDING_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(OUTSTANDING_KINDS)}")
+    entries = across_tenants(lambda tid: summarise(outstanding_invoices(tid, kind, mirror), today), tenants, timeout)
+
+    totals: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        for currency, bucket in entry.get('result', {}).items():
+            total = totals.setdefault(currency, {'outstanding': 0.0, 'overdue': 0.0, 'count': 0,
+                                                 'overdue_count': 0, 'tenants': 0})
+            for key in ('outstanding', 'overdue', 'count', 'overdue_count'):
+                total[key] += bucket[key]
+            total['tenants'] += 1
+    for total in totals.values():
+        total['outstanding'] = round(total['outstanding'], 2)
+        total['overdue'] = round(total['overdue'], 2)
+
+    entries.sort(key=lambda e: -sum(b['outstanding'] for b in e.get('result', {}).values()))
+    failed = [e for e in entries if e['status'] != 'ok']
+    for entry in entries:
+        entry['by_currency'] = entry.pop('result', {})
+    return {
+        'kind': kind,
+        'view': OUTSTANDING_KINDS[kind],
+        'tenant_count': len(entries),
+        'complete': not failed,
+        'totals': totals,
+        'tenants': entries,
+    }
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Xero Webhooks for Financial Command Center AI
+Receives Xero's contact and invoice change notifications so local data is refreshed when
+something actually changed, instead of polling Xero on a timer:
+- the x-xero-signature header (base64 HMAC-SHA256 of the raw body with the webhook key)
+  is verified locally; Xero's intent-to-receive check is answered by the same rule
+  (200 with an empty body when the signature is valid, 401 when it is not)
+- the request is acknowledged at once (Xero allows 5 seconds); events are coalesced per
+  tenant and entity and applied by a background worker
+- applying an event re-reads only the named records into the mirror (one by-id call for
+  up to 50 records). Every cache derived from the mirror (conditional ETags, the contact
+  index, live pages, other processes) sees the change through the mirror's change stamp
+- Xero has its 200 by then and will not resend, so a refresh that fails (429, 5xx, expired
+  token) is retried with backoff; if every retry fails the entity is marked stale so the
+  next read runs an incremental sync instead of waiting out the polling backstop
+
+Usage:
+    receiver = XeroWebhookReceiver(mirror, on_change=lambda tenant_id, entity, rows: ...)
+    status = receiver.handle(raw_body, request.headers.get('x-xero-signature'))
+    return '', status
+
+Environment:
+    XERO_WEBHOOK_KEY          the webhook signing key from the Xero developer portal
+    FCC_XERO_WEBHOOK_DELAY    seconds events are gathered before a batch is applied (default 1)
+"""
+
+import os
+import hmac
+import json
+import base64
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = 'x-xero-signature'
+# Xero event category -> mirror entity
+CATEGORY_ENTITIES = {'CONTACT': 'contacts', 'INVOICE': 'invoices'}
+BATCH_DELAY = float(os.getenv('FCC_XERO_WEBHOOK_DELAY', '1'))
+# Seconds before each retry of a failed refresh
+RETRY_DELAYS = (5.0, 30.0, 120.0)
+
+
+def webhook_key() -> str:
+    return os.getenv('XERO_WEBHOOK_KEY', '')
+
+
+def webhooks_enabled() -> bool:
+    """A signing key is configured, so Xero pushes changes and polling is only a backstop"""
+    return bool(webhook_key())
+
+
+def signature(payload: bytes, key: str) -> str:
+    return base64.b64encode(hmac.new(key.encode('utf-8'), payload, hashlib.sha256).digest()).decode('ascii')
+
+
+def verify_signature(payload: bytes, header: Optional[str], key: str) -> bool:
+    """Constant-time check of x-xero-signature against the raw request body"""
+    if not header or not key:
+        return False
+    return hmac.compare_digest(signature(payload, key), header.strip())
+
+
+@dataclass(frozen=True)
+class XeroEvent:
+    tenant_id: str
+    category: str           # CONTACT | INVOICE
+    event_type: str         # CREATE | UPDATE
+    resource_id: str
+    event_date: Optional[str] = None
+
+    @property
+    def entity(self) -> Optional[str]:
+        return CATEGORY_ENTITIES.get(self.category)
+
+
+def parse_events(payload: bytes) -> List[XeroEvent]:
+    """Events in a (verified) notification body; an intent-to-receive check has none"""
+    body = json.loads(payload or b'{}')
+    events = []
+    for event in body.get('events') or []:
+        if event.get('tenantId') and event.get('resourceId'):
+            events.append(XeroEvent(str(event['tenantId']), str(event.get('eventCategory', '')).upper(),
+                                    str(event.get('eventType', '')).upper(), str(event['resourceId']),
+                                    event.get('eventDateUtc')))
+    return events
+
+
+class XeroWebhookReceiver:
+    """
+    Verifies notifications and applies them to the mirror in the background.
+    on_change(tenant_id, entity, rows) is called with the rows that actually changed
+    (or with no mirror, with {'<key>': id} stubs for the ids named by the events).
+    """
+    _instances = weakref.WeakSet()
+
+    def __init__(self, mirror=None, on_change: Optional[Callable[[str, str, List[Dict[str, Any]]], None]] = None,
+                 key: Optional[str] = None, delay: float = BATCH_DELAY, retry_delays: Tuple[float, ...] = RETRY_DELAYS):
+        self.mirror = mirror
+        self.on_change = on_change
+        self.key = key
+        self.delay = delay
+        self.retry_delays = tuple(retry_delays)
+        self._reset()
+        self.stats = {'received': 0, 'rejected': 0, 'events': 0, 'applied': 0, 'retried': 0, 'failed': 0}
+        XeroWebhookReceiver._instances.add(self)
+
+    def _reset(self) -> None:
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], Set[str]] = {}
+        self._attempts: Dict[Tuple[str, str], int] = {}     # retry number of a pending batch
+        self._scheduled = 0                                 # retries waiting out their backoff
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._worker: Optional[threading.Thread] = None
+
+    @classmethod
+    def _after_fork_in_child(cls):
+        # The worker thread, its queue and retry timers belong to the parent
+        for receiver in list(cls._instances):
+            receiver._reset()
+
+    # Receiving
+
+    def handle(self, payload: bytes, header: Optional[str]) -> int:
+        """HTTP status for a notification: 200 (accepted), 401 (bad signature), 500 (no key configured)"""
+        key = self.key if self.key is not None else webhook_key()
+        if not key:
+            logger.error("Xero webhook received but XERO_WEBHOOK_KEY is not set")
+            return 500
+        if not verify_signature(payload, header, key):
+            self.stats['rejected'] += 1
+            return 401
+        self.stats['received'] += 1
+        try:
+            events = parse_events(payload)
+        except ValueError as e:
+            logger.warning(f"Xero webhook with an unreadable body: {e}")
+            return 200      # signed by Xero; a retry would not parse either
+        self.enqueue(events)
+        return 200
+
+    def enqueue(self, events: List[XeroEvent]) -> None:
+        queued = 0
+        with self._lock:
+            for event in events:
+                if event.entity is None:
+                    logger.debug(f"Xero webhook event for {event.category} ignored")
+                    continue
+                self._pending.setdefault((event.tenant_id, event.entity), set()).add(event.resource_id)
+                queued += 1
+            if queued:
+                self.stats['events'] += queued
+                self._idle.clear()
+                self._ensure_worker()
+        if queued:
+            self._wake.set()
+
+    # Applying
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='xero-webhooks', daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            # Gather the burst Xero sends for one edit (and repeated edits) into one call
+            if self.delay:
+                time.sleep(self.delay)
+            with self._lock:
+                self._wake.clear()
+                batch, self._pending = self._pending, {}
+                attempts, self._attempts = self._attempts, {}
+                if not batch:
+                    self._set_idle_if_done()
+                    continue
+            for (tenant_id, entity), ids in batch.items():
+                self.apply(tenant_id, entity, ids, attempts.get((tenant_id, entity), 0))
+            with self._lock:
+                self._set_idle_if_done()
+
+    def _set_idle_if_done(self) -> None:
+        if not self._pending and not self._scheduled:
+            self._idle.set()
+
+    def apply(self, tenant_id: str, entity: str, ids: Set[str], attempt: int = 0) -> List[Dict[str, Any]]:
+        """Refresh the named records now; returns the rows that changed (a failure is retried later)"""
+        try:
+            if self.mirror is not None:
+                result = self.mirror.sync_records(tenant_id, entity, ids)
+                changed = result.changed if result is not None else []
+            else:
+                key = 'contact_id' if entity == 'contacts' else 'invoice_id'
+                changed = [{key: resource_id} for resource_id in sorted(ids)]
+            self.stats['applied'] += len(ids)
+        except Exception as e:
+            self._retry(tenant_id, entity, set(ids), attempt, e)
+            return []
+        if changed and self.on_change is not None:
+            try:
+                self.on_change(tenant_id, entity, changed)
+            except Exception as e:
+                logger.warning(f"Xero webhook change listener failed: {e}")
+        return changed
+
+    def _retry(self, tenant_id: str, entity: str, ids: Set[str], attempt: int, error: Exception) -> None:
+        if attempt < len(self.retry_delays):
+            delay = self.retry_delays[attempt]
+            logger.warning(f"Xero webhook refresh of {len(ids)} {entity} for {tenant_id} failed, "
+                           f"retrying in {delay:g}s: {error}")
+            self.stats['retried'] += len(ids)
+            with self._lock:
+                self._scheduled += 1
+                self._idle.clear()
+            timer = threading.Timer(delay, self._requeue, (tenant_id, entity, ids, attempt + 1))
+            timer.daemon = True
+            timer.start()
+            return
+        self.stats['failed'] += len(ids)
+        logger.warning(f"Xero webhook refresh of {len(ids)} {entity} for {tenant_id} gave up after "
+                       f"{attempt} retries, next read will sync: {error}")
+        if self.mirror is not None:
+            try:
+                self.mirror.mark_stale(tenant_id, entity)
+            except Exception as e:
+                logger.warning(f"Could not mark the Xero mirror's {entity} for {tenant_id} stale: {e}")
+
+    def _requeue(self, tenant_id: str, entity: str, ids: Set[str], attempt: int) -> None:
+        key = (tenant_id, entity)
+        with self._lock:
+            self._scheduled = max(0, self._scheduled - 1)
+            self._pending.setdefault(key, set()).update(ids)
+            self._attempts[key] = max(attempt, self._attempts.get(key, 0))
+            self._idle.clear()
+            self._ensure_worker()
+        self._wake.set()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued event has been applied (tests, graceful shutdown)"""
+        return self._idle.wait(timeout)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=XeroWebhookReceiver._after_fork_in_child)